@@ -8,6 +8,7 @@ from pydantic import BaseModel, Field
 from trade_execution.models.Order import Order, OrderSide, OrderType
 from trade_execution.models.Account import Account
 from trade_execution.models.OrderBook import OrderBook
+from trade_execution.models.MarketSnapshot import MarketSnapshot
 from trade_execution.models.Trade import Trade
 from trade_execution.models.ConnectionManager import ConnectionManager
 from trade_execution.handlers.order_status_handler import OrderStatusHandler
@@ -16,12 +17,26 @@ from trade_execution.models.APIConnectInfo import APIConnectInfo
 
 from trade_execution.strategies.moving_average import MovingAverageStrategy
 from trade_execution.strategies.mean_reversion import MeanReversionStrategy
+from trade_execution.strategies.momentum import MomentumStrategy
+from trade_execution.strategies.pool import StrategyPool
+from trade_execution.strategies.feature_cache import FeatureCache
 from trade_execution.handlers.order_book_handler import OrderBookHandler
+from trade_execution.handlers.kline_handler import KlineHandler
+from trade_execution.models.BarStore import BarStore
+from trade_execution.services.market_data_journal import MarketDataJournal
+from trade_execution.services.backtest_jobs import BacktestJobQueue, FAILED, JOB_KINDS, SUCCEEDED
+from trade_execution.services.result_cache import BacktestResultCache
+from trade_execution.services.data_warmup import DataWarmup
+from trade_execution.services.strategy_scheduler import StrategyScheduler
+from trade_execution.services.robustness import backtest_sample, run_robustness
 
 import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('trade_execution.api.server')
 import asyncio
+import functools
+import math
+import numpy as np
 
 class BacktestRequest(BaseModel):
     symbol: str
@@ -30,6 +45,58 @@ class BacktestRequest(BaseModel):
     end_date: datetime = Field(default_factory=lambda: datetime.now())
     initial_capital: float = 10000.0
     parameters: Dict[str, Any] = {}
+    # Downsample the graph data to about this many points ("lttb" or "minmax"); trade markers are always kept
+    max_points: Optional[int] = None
+    downsample: str = "lttb"
+
+class SweepRequest(BaseModel):
+    symbol: str
+    strategy_id: str
+    start_date: datetime = Field(default_factory=lambda: datetime.now() - timedelta(days=365))
+    end_date: datetime = Field(default_factory=lambda: datetime.now())
+    initial_capital: float = 10000.0
+    grid: Dict[str, List[Any]]
+    parameters: Dict[str, Any] = {}
+    rank_by: str = "sharpe_ratio"
+    top_n: Optional[int] = None
+
+class WalkForwardRequest(BaseModel):
+    symbol: str
+    strategy_id: str
+    start_date: datetime = Field(default_factory=lambda: datetime.now() - timedelta(days=5 * 365))
+    end_date: datetime = Field(default_factory=lambda: datetime.now())
+    initial_capital: float = 10000.0
+    grid: Dict[str, List[Any]]
+    train_size: int = 504
+    test_size: int = 126
+    mode: str = "rolling"
+    parameters: Dict[str, Any] = {}
+    rank_by: str = "sharpe_ratio"
+
+class PortfolioBacktestRequest(BaseModel):
+    symbols: List[str]
+    strategy_id: str
+    start_date: datetime = Field(default_factory=lambda: datetime.now() - timedelta(days=365))
+    end_date: datetime = Field(default_factory=lambda: datetime.now())
+    initial_capital: float = 10000.0
+    parameters: Dict[str, Any] = {}
+    allocation: str = "equal"
+    max_weight: Optional[float] = None
+    vol_window: int = 20
+
+class RobustnessRequest(BaseModel):
+    # Exactly one of: bar returns, round-trip trade returns, or a backtest to analyse
+    returns: Optional[List[float]] = None
+    trade_returns: Optional[List[float]] = None
+    backtest: Optional[BacktestRequest] = None
+    method: str = "block_bootstrap"
+    n_paths: int = 10000
+    block_size: int = 20
+    confidence: float = 0.95
+    initial_capital: Optional[float] = None
+    periods_per_year: Optional[float] = None
+    seed: Optional[int] = None
+
 class OrderRequest(BaseModel):
     code: str
     side: str
@@ -59,14 +126,35 @@ class StrategyRequest(BaseModel):
     is_backtest: bool = False
     parameters: Dict[str, Any] = {}
 
+class BatchStrategyRequest(BaseModel):
+    codes: List[str]
+    strategy_id: str
+    ktype: str = "K_DAY"
+    parameters: Dict[str, Any] = {}
+    qty: int = 100
+    price: Optional[float] = None
+    live: bool = False
+
+class ScheduledStrategyRequest(BaseModel):
+    code: str
+    strategy_id: str
+    ktype: str = "K_DAY"
+    parameters: Dict[str, Any] = {}
+    qty: int = 100
+    price: Optional[float] = None
+    live: bool = False
+
 # Create router
 router = APIRouter()
 
+# Seconds between backtest job status checks on the job WebSocket
+JOB_PROGRESS_INTERVAL = 0.25
+
 # Strategy mapping
 STRATEGY_MAP = {
     "moving_average": MovingAverageStrategy(),
     "mean_reversion": MeanReversionStrategy(),
-    # "momentum": MomentumStrategy()
+    "momentum": MomentumStrategy()
 }
 
 @router.websocket("/ws/orderbook")
@@ -187,7 +275,8 @@ async def get_account_balance():
         logger.info("Fetching account balance...")
         account = Account()
         logger.info("Account() object created")
-        balance = account.getBalance()
+        # Off the event loop, so concurrent account queries spread over the trade context pool
+        balance = await asyncio.get_running_loop().run_in_executor(None, account.getBalance)
         return balance
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -205,13 +294,14 @@ async def get_market_positions(request: MarketPositionRequest):
     try:
         account = Account()
         # Force simulation environment
-        positions = account.getPositions(
+        positions = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            account.getPositions,
             trd_env="SIMULATE",
             trd_mkt=request.trd_mkt,
             pl_ratio_min=request.pl_ratio_min,
             pl_ratio_max=request.pl_ratio_max,
             refresh_cache=request.refresh_cache
-        )
+        ))
         return positions
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -221,7 +311,8 @@ async def get_transaction_history(request: HistoryRequest):
     """Get transaction history"""
     try:
         account = Account()
-        history = account.getTransactionHistory(request.start_date, request.end_date)
+        history = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            account.getTransactionHistory, request.start_date, request.end_date))
         return {"transactions": history[:request.limit]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -230,7 +321,8 @@ async def get_transaction_history(request: HistoryRequest):
 async def get_historical_orders(request: HistoryRequest):
     try:
         account = Account()
-        history = account.getHistoricalOrders(request.start_date, request.end_date)
+        history = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            account.getHistoricalOrders, request.start_date, request.end_date))
         return {"orders": history[:request.limit]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -239,21 +331,75 @@ async def get_historical_orders(request: HistoryRequest):
 @router.post("/strategy/run")
 async def run_strategy(request: StrategyRequest):
     """Run a trading strategy"""
+    if request.strategy_id not in STRATEGY_MAP:
+        raise HTTPException(status_code=404, detail=f"Strategy {request.strategy_id} not found")
     try:
-        if request.strategy_id not in STRATEGY_MAP:
-            raise HTTPException(status_code=404, detail=f"Strategy {request.strategy_id} not found")
-            
-        strategy = STRATEGY_MAP[request.strategy_id]
-        result = strategy.run(
-            code=request.code, 
-            is_backtest=request.is_backtest,
-            **request.parameters
-        )
-        
-        return result
+        # Runs share pooled instances with immutable parameters, so they need no locks
+        # and can run concurrently off the event loop
+        strategy = StrategyPool.getInstance().get(type(STRATEGY_MAP[request.strategy_id]), request.parameters)
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            strategy.run, code=request.code, is_backtest=request.is_backtest, **request.parameters
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/strategy/run_batch")
+async def run_strategy_batch(request: BatchStrategyRequest):
+    """Run a trading strategy over a list of codes at once"""
+    if request.strategy_id not in STRATEGY_MAP:
+        raise HTTPException(status_code=404, detail=f"Strategy {request.strategy_id} not found")
+    if not request.codes:
+        raise HTTPException(status_code=400, detail="No codes given")
+    try:
+        strategy = StrategyPool.getInstance().get(type(STRATEGY_MAP[request.strategy_id]), request.parameters)
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            strategy.run_batch, request.codes, ktype=request.ktype, qty=request.qty,
+            price=request.price, live=request.live
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch strategy run error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/strategy/scheduler/instances")
+async def register_scheduled_strategy(request: ScheduledStrategyRequest):
+    """Run a strategy instance on every bar close of a code's k-lines"""
+    if request.strategy_id not in STRATEGY_MAP:
+        raise HTTPException(status_code=404, detail=f"Strategy {request.strategy_id} not found")
+    try:
+        # Every scheduled instance gets its own strategy object and indicator state
+        strategy = type(STRATEGY_MAP[request.strategy_id]).create(**request.parameters)
+        instance = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            StrategyScheduler.getInstance().register, strategy, request.code, ktype=request.ktype,
+            qty=request.qty, price=request.price, live=request.live
+        ))
+        return instance.to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Strategy scheduling error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/strategy/scheduler")
+async def get_strategy_scheduler():
+    """Scheduled strategy instances with their per-instance and per-bar timing stats"""
+    return StrategyScheduler.getInstance().info()
+
+@router.get("/strategy/features")
+async def get_feature_cache():
+    """Entries, memory use and hit/update counts of the shared indicator feature cache"""
+    return FeatureCache.getInstance().info()
+
+@router.delete("/strategy/scheduler/instances/{instance_id}")
+async def unregister_scheduled_strategy(instance_id: str = Path(..., description="The ID of the scheduled instance")):
+    """Stop running a scheduled strategy instance"""
+    if not StrategyScheduler.getInstance().unregister(instance_id):
+        raise HTTPException(status_code=404, detail=f"Scheduled strategy {instance_id} not found")
+    return {"instance_id": instance_id, "status": "REMOVED"}
+
 @router.get("/strategy/list")
 async def list_strategies():
     """List available trading strategies"""
@@ -276,53 +422,146 @@ async def get_order_book(code: str = Path(..., description="The security code"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/market/snapshot")
+async def get_market_snapshot(codes: str = Query(..., description="Comma-separated security codes")):
+    """Get market snapshots of many securities, fetched in chunks across the quote context pool"""
+    code_list = [code.strip() for code in codes.split(",") if code.strip()]
+    try:
+        data = await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(MarketSnapshot().getSnapshots, code_list))
+        return {"snapshots": data.to_dict(orient="records")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Connection pool endpoints
+@router.get("/connections/pools")
+async def get_connection_pools():
+    """Size, routing, health and per-context latency histograms of the OpenD context pools"""
+    api_info = APIConnectInfo.getInstance()
+    return {"quote": api_info.quote_pool.info(), "trade": api_info.trade_pool.info()}
+
+@router.post("/connections/pools/check")
+async def check_connection_pools():
+    """Probe every pooled OpenD context now"""
+    api_info = APIConnectInfo.getInstance()
+    loop = asyncio.get_running_loop()
+    quote = await loop.run_in_executor(None, api_info.quote_pool.check_health)
+    trade = await loop.run_in_executor(None, api_info.trade_pool.check_health)
+    return {"quote": quote, "trade": trade}
+
+# Map API strategy ids to BacktestService strategy ids
+BACKTEST_STRATEGY_MAP = {
+    "moving_average": "sma_crossover",
+    "mean_reversion": "mean_reversion",
+    "momentum": "momentum"
+    # Add more strategy mappings as they become available
+}
+
+def sanitize_json(obj):
+    """Replace NaN/inf with None and NumPy scalars with Python numbers before JSON serialization"""
+    if isinstance(obj, dict):
+        return {k: sanitize_json(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [sanitize_json(item) for item in obj]
+    elif isinstance(obj, (float, np.float64, np.float32)):
+        if math.isnan(obj) or math.isinf(obj):
+            return None
+        return float(obj)
+    elif isinstance(obj, np.integer):
+        return int(obj)
+    return obj
+
+def backtest_arguments(request: BacktestRequest) -> Dict[str, Any]:
+    """BacktestService.run_backtest arguments of a backtest request"""
+    return {
+        'strategy_id': BACKTEST_STRATEGY_MAP[request.strategy_id],
+        'symbol': request.symbol,
+        'start_date': request.start_date,
+        'end_date': request.end_date,
+        'initial_capital': request.initial_capital,
+        'parameters': request.parameters,
+        'max_points': request.max_points,
+        'downsample': request.downsample,
+    }
+
+def sweep_arguments(request: SweepRequest) -> Dict[str, Any]:
+    """BacktestService.run_sweep arguments of a sweep request"""
+    return {
+        'strategy_id': BACKTEST_STRATEGY_MAP[request.strategy_id],
+        'symbol': request.symbol,
+        'start_date': request.start_date,
+        'end_date': request.end_date,
+        'grid': request.grid,
+        'initial_capital': request.initial_capital,
+        'parameters': request.parameters,
+        'rank_by': request.rank_by,
+        'top_n': request.top_n,
+    }
+
+def walk_forward_arguments(request: WalkForwardRequest) -> Dict[str, Any]:
+    """BacktestService.run_walk_forward arguments of a walk-forward request"""
+    return {
+        'strategy_id': BACKTEST_STRATEGY_MAP[request.strategy_id],
+        'symbol': request.symbol,
+        'start_date': request.start_date,
+        'end_date': request.end_date,
+        'grid': request.grid,
+        'train_size': request.train_size,
+        'test_size': request.test_size,
+        'mode': request.mode,
+        'initial_capital': request.initial_capital,
+        'parameters': request.parameters,
+        'rank_by': request.rank_by,
+    }
+
+def portfolio_arguments(request: PortfolioBacktestRequest) -> Dict[str, Any]:
+    """BacktestService.run_portfolio_backtest arguments of a portfolio backtest request"""
+    return {
+        'strategy_id': BACKTEST_STRATEGY_MAP[request.strategy_id],
+        'symbols': request.symbols,
+        'start_date': request.start_date,
+        'end_date': request.end_date,
+        'initial_capital': request.initial_capital,
+        'parameters': request.parameters,
+        'allocation': request.allocation,
+        'max_weight': request.max_weight,
+        'vol_window': request.vol_window,
+    }
+
+def data_version(arguments: Dict[str, Any]) -> List[int]:
+    """Bar cache versions of the symbols a backtest request reads"""
+    from trade_execution.services.backtest_service import BacktestService
+
+    symbols = arguments['symbols'] if 'symbols' in arguments else [arguments['symbol']]
+    return [BacktestService.data_version(symbol) for symbol in symbols]
+
+async def run_cached(kind: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a backtest of the given job kind through the result cache, off the event loop"""
+    from trade_execution.services.backtest_service import BacktestService
+
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+        BacktestResultCache.getInstance().get_or_compute, kind, arguments,
+        functools.partial(getattr(BacktestService, JOB_KINDS[kind]), **arguments),
+        functools.partial(data_version, arguments)
+    ))
+
 @router.post("/backtest")
 async def run_backtest(request: BacktestRequest):
     """Run a backtest with the specified strategy and parameters"""
     try:
-        from trade_execution.services.backtest_service import BacktestService
-        import math
-        import numpy as np
-        
-        # Map the strategy_id from the request to an actual strategy
-        strategy_mapping = {
-            "moving_average": "sma_crossover",
-            "mean_reversion": "mean_reversion"
-            # Add more strategy mappings as they become available
-        }
-        
-        if request.strategy_id not in strategy_mapping:
+        if request.strategy_id not in BACKTEST_STRATEGY_MAP:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Strategy {request.strategy_id} not found"
             )
             
-        # Run the backtest
-        result = BacktestService.run_backtest(
-            strategy_id=strategy_mapping[request.strategy_id],
-            symbol=request.symbol,
-            start_date=request.start_date,
-            end_date=request.end_date,
-            initial_capital=request.initial_capital,
-            parameters=request.parameters
-        )
-        
-        # Sanitize the result to handle special float values before JSON serialization
-        def sanitize_json(obj):
-            if isinstance(obj, dict):
-                return {k: sanitize_json(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [sanitize_json(item) for item in obj]
-            elif isinstance(obj, (float, np.float64, np.float32)):
-                if math.isnan(obj) or math.isinf(obj):
-                    return None
-                return float(obj)
-            elif isinstance(obj, np.integer):
-                return int(obj)
-            return obj
+        # Identical requests are served from the result cache; misses run off the event loop
+        result = await run_cached("backtest", backtest_arguments(request))
         
-        sanitized_result = sanitize_json(result)
-        return sanitized_result
+        # The graph data columns are already JSON-ready; only the metrics need sanitizing
+        return {**result, 'metrics': sanitize_json(result['metrics'])}
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -332,6 +571,212 @@ async def run_backtest(request: BacktestRequest):
         logger.error(f"Backtest error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/backtest/sweep")
+async def run_backtest_sweep(request: SweepRequest):
+    """Backtest every combination of a parameter grid and return the runs ranked by a metric"""
+    if request.strategy_id not in BACKTEST_STRATEGY_MAP:
+        raise HTTPException(status_code=404, detail=f"Strategy {request.strategy_id} not found")
+    try:
+        result = await run_cached("sweep", sweep_arguments(request))
+        return sanitize_json(result)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Backtest sweep error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/backtest/walk_forward")
+async def run_backtest_walk_forward(request: WalkForwardRequest):
+    """Optimize on rolling or anchored train slices and return the stitched out-of-sample results"""
+    if request.strategy_id not in BACKTEST_STRATEGY_MAP:
+        raise HTTPException(status_code=404, detail=f"Strategy {request.strategy_id} not found")
+    try:
+        result = await run_cached("walk_forward", walk_forward_arguments(request))
+        return sanitize_json(result)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Walk-forward error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/backtest/robustness")
+async def run_backtest_robustness(request: RobustnessRequest):
+    """Bootstrap confidence intervals of Sharpe ratio, max drawdown and final value"""
+    inputs = [request.returns, request.trade_returns, request.backtest]
+    if sum(value is not None for value in inputs) != 1:
+        raise HTTPException(status_code=400, detail="Give exactly one of returns, trade_returns or backtest")
+    if request.backtest is not None and request.backtest.strategy_id not in BACKTEST_STRATEGY_MAP:
+        raise HTTPException(status_code=404, detail=f"Strategy {request.backtest.strategy_id} not found")
+    try:
+        options = {'initial_capital': request.initial_capital, 'periods_per_year': request.periods_per_year}
+        if request.backtest is not None:
+            # Resample every bar of the backtest, whatever its chart downsampling
+            arguments = dict(backtest_arguments(request.backtest), max_points=None)
+            result = await run_cached("backtest", arguments)
+            sample, periods_per_year = backtest_sample(result['graph_data'], request.method)
+            options['initial_capital'] = options['initial_capital'] or request.backtest.initial_capital
+            options['periods_per_year'] = options['periods_per_year'] or periods_per_year
+        else:
+            sample = request.returns if request.returns is not None else request.trade_returns
+
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            run_robustness, np.asarray(sample, dtype=float), method=request.method, n_paths=request.n_paths,
+            block_size=request.block_size, confidence=request.confidence, seed=request.seed,
+            **{name: value for name, value in options.items() if value is not None}
+        ))
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Robustness analysis error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/backtest/portfolio")
+async def run_portfolio_backtest(request: PortfolioBacktestRequest):
+    """Backtest a strategy over a list of symbols sharing one capital pool"""
+    if request.strategy_id not in BACKTEST_STRATEGY_MAP:
+        raise HTTPException(status_code=404, detail=f"Strategy {request.strategy_id} not found")
+    try:
+        result = await run_cached("portfolio", portfolio_arguments(request))
+        return sanitize_json(result)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Portfolio backtest error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Backtest job endpoints
+def submit_job(kind: str, request, arguments) -> Dict[str, Any]:
+    """Queue a job in the backtest worker pool and return its status right away"""
+    if request.strategy_id not in BACKTEST_STRATEGY_MAP:
+        raise HTTPException(status_code=404, detail=f"Strategy {request.strategy_id} not found")
+    try:
+        arguments = arguments(request)
+        queue = BacktestJobQueue.getInstance()
+        cache = BacktestResultCache.getInstance()
+        cached = cache.get(kind, arguments, data_version(arguments))
+        if cached is not None:
+            return queue.add_completed(arguments, cached, kind=kind).to_dict()
+        return queue.submit(
+            arguments, kind=kind,
+            on_success=lambda result: cache.put(kind, arguments, data_version(arguments), result)
+        ).to_dict()
+    except Exception as e:
+        logger.error(f"Backtest job submission error: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.post("/backtest/jobs")
+async def submit_backtest_job(request: BacktestRequest):
+    """Queue a backtest and return its job id"""
+    return submit_job("backtest", request, backtest_arguments)
+
+@router.post("/backtest/sweep/jobs")
+async def submit_sweep_job(request: SweepRequest):
+    """Queue a parameter sweep and return its job id"""
+    return submit_job("sweep", request, sweep_arguments)
+
+@router.post("/backtest/walk_forward/jobs")
+async def submit_walk_forward_job(request: WalkForwardRequest):
+    """Queue a walk-forward optimization and return its job id"""
+    return submit_job("walk_forward", request, walk_forward_arguments)
+
+@router.post("/backtest/portfolio/jobs")
+async def submit_portfolio_job(request: PortfolioBacktestRequest):
+    """Queue a portfolio backtest and return its job id"""
+    return submit_job("portfolio", request, portfolio_arguments)
+
+@router.get("/backtest/cache")
+async def get_backtest_cache_stats():
+    """Backtest result cache size and hit/miss statistics"""
+    return BacktestResultCache.getInstance().info()
+
+@router.get("/backtest/warmup")
+async def get_backtest_warmup():
+    """Symbol universe kept warm in the bar cache and the outcome of its last warm-up"""
+    warmup = DataWarmup.getActiveInstance()
+    if warmup is None:
+        raise HTTPException(status_code=404, detail="No warm-up universe configured")
+    return warmup.status()
+
+@router.post("/backtest/warmup")
+async def run_backtest_warmup():
+    """Refresh the bar cache of the warm-up universe now"""
+    warmup = DataWarmup.getActiveInstance()
+    if warmup is None:
+        raise HTTPException(status_code=404, detail="No warm-up universe configured")
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, warmup.run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Bar cache warm-up error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/backtest/jobs")
+async def list_backtest_jobs():
+    """List queued, running and recently finished backtest jobs"""
+    return BacktestJobQueue.getInstance().jobs()
+
+@router.get("/backtest/jobs/{job_id}")
+async def get_backtest_job(job_id: str = Path(..., description="The ID of the backtest job")):
+    """Get the status and progress of a backtest job"""
+    job = BacktestJobQueue.getInstance().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backtest job {job_id} not found")
+    return job.to_dict()
+
+@router.get("/backtest/jobs/{job_id}/result")
+async def get_backtest_job_result(job_id: str = Path(..., description="The ID of the backtest job")):
+    """Get the result of a finished backtest job"""
+    job = BacktestJobQueue.getInstance().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backtest job {job_id} not found")
+    if job.status == SUCCEEDED:
+        return sanitize_json(job.result)
+    if job.status == FAILED:
+        status_code = {'ValueError': 400, 'NotImplementedError': 501}.get(job.error_type, 500)
+        raise HTTPException(status_code=status_code, detail=job.error)
+    raise HTTPException(status_code=409, detail=f"Backtest job {job_id} is {job.status}")
+
+@router.delete("/backtest/jobs/{job_id}")
+async def cancel_backtest_job(job_id: str = Path(..., description="The ID of the backtest job")):
+    """Cancel a backtest job that has not started yet"""
+    queue = BacktestJobQueue.getInstance()
+    if queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Backtest job {job_id} not found")
+    if not queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Backtest job {job_id} is already running or finished")
+    return {"job_id": job_id, "status": "CANCELLED"}
+
+@router.websocket("/ws/backtest/jobs/{job_id}")
+async def websocket_backtest_job(websocket: WebSocket, job_id: str):
+    """WebSocket endpoint pushing a backtest job's status until it finishes"""
+    await websocket.accept()
+    queue = BacktestJobQueue.getInstance()
+    version = None
+    try:
+        while True:
+            job = queue.get(job_id)
+            if job is None:
+                await websocket.send_json({"job_id": job_id, "error": "Backtest job not found"})
+                break
+            if job.version != version:
+                version = job.version
+                await websocket.send_json(job.to_dict())
+            if job.finished:
+                break
+            await asyncio.sleep(JOB_PROGRESS_INTERVAL)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"WebSocket error: {str(e)}")
+
 # Main FastAPI application
 def create_app():
     app = FastAPI(
@@ -349,17 +794,20 @@ def create_app():
         
         # Get the current event loop
         loop = asyncio.get_running_loop()
+
+        # Optional recorder for order book and order pushes (configured in main.py)
+        journal = MarketDataJournal.getActiveInstance()
         
         # Register the OrderHandler with the trade context
         order_status_handler = OrderStatusHandler()
-        order_handler = OrderHandler(order_status_handler, loop=loop)
+        order_handler = OrderHandler(order_status_handler, loop=loop, journal=journal)
         api_info.trade_context.set_handler(order_handler)
         logger.info("Order status handlers registered with Futu API")
         
         # Subscribe to HK.00700 order book
         try:
             # Create order book handler
-            order_book_handler = OrderBookHandler(loop=loop)
+            order_book_handler = OrderBookHandler(loop=loop, journal=journal)
             api_info.quote_context.set_handler(order_book_handler)
             
             # Subscribe to order book for HK.00700
@@ -370,6 +818,35 @@ def create_app():
                 logger.info("Successfully subscribed to HK.00700 order book")
         except Exception as e:
             logger.error(f"Error setting up order book subscription: {str(e)}")
+
+        # Keep strategy bar buffers current from CUR_KLINE pushes
+        api_info.quote_context.set_handler(KlineHandler(BarStore.getInstance()))
+        logger.info("K-line handler registered with Futu API")
+
+        # Evaluate scheduled strategy instances on this loop when pushes close a bar
+        StrategyScheduler.getInstance().attach(loop)
+
+        # Optional bar cache warm-up of a symbol universe (configured in main.py)
+        warmup = DataWarmup.getActiveInstance()
+        if warmup:
+            warmup.start()
+
+        # Probe the pooled query contexts in the background (pool sizes configured in main.py)
+        api_info.quote_pool.start_health_checks(api_info.POOL_HEALTH_INTERVAL)
+        api_info.trade_pool.start_health_checks(api_info.POOL_HEALTH_INTERVAL)
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        journal = MarketDataJournal.getActiveInstance()
+        if journal:
+            journal.close()
+        warmup = DataWarmup.getActiveInstance()
+        if warmup:
+            warmup.close()
+        BacktestJobQueue.getInstance().shutdown()
+        api_info = APIConnectInfo.getInstance()
+        api_info.quote_pool.close()
+        api_info.trade_pool.close()
     
     @app.get("/")
     async def root():
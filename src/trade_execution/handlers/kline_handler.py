@@ -0,0 +1,26 @@
+from futu import *
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('trade_execution.handlers.kline_handler')
+
+class KlineHandler(CurKlineHandlerBase):
+    def __init__(self, bar_store):
+        super().__init__()
+        self.bar_store = bar_store  # BarStore whose buffers are kept current by the pushes
+        
+    def on_recv_rsp(self, rsp_pb):
+        ret_code, data = super(KlineHandler, self).on_recv_rsp(rsp_pb)
+        if ret_code != RET_OK:
+            logger.error(f"KlineHandler error: {data}")
+            return ret_code, data
+
+        self.process_kline(data)
+        return ret_code, data
+
+    def process_kline(self, data):
+        """Apply a parsed CUR_KLINE push to the bar store"""
+        try:
+            self.bar_store.on_kline(data)
+        except Exception as e:
+            logger.error(f"Failed to apply k-line push: {str(e)}")
@@ -8,20 +8,29 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger('trade_execution.handlers.order_book_handler')
 
 class OrderBookHandler(OrderBookHandlerBase):
-    def __init__(self, loop=None):
+    def __init__(self, loop=None, journal=None):
         super().__init__()
         self.loop = loop  # Store the event loop reference
+        self.journal = journal  # Optional MarketDataJournal recording every push
         
     def on_recv_rsp(self, rsp_pb):
         ret_code, data = super(OrderBookHandler, self).on_recv_rsp(rsp_pb)
         if ret_code != RET_OK:
             logger.error(f"OrderBookHandler error: {data}")
             return ret_code, data
-            
+
+        self.process_order_book(data)
+        return ret_code, data
+
+    def process_order_book(self, data):
+        """Record and broadcast a parsed order book push (also used to replay recorded data)"""
         # Process the order book data
         code = data.get('code')
         bid_list = data.get('Bid')
         ask_list = data.get('Ask')
+
+        if self.journal:
+            self.journal.record_order_book(code, bid_list, ask_list)
         
         message = {
             "type": "order_book_update",
@@ -39,8 +48,6 @@ class OrderBookHandler(OrderBookHandlerBase):
             )
         else:
             logger.error("No running event loop available to process order book update")
-            
-        return ret_code, data
         
     async def _broadcast_update(self, message):
         """Broadcast order book update to all connected WebSocket clients"""
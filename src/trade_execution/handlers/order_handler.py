@@ -6,35 +6,43 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger('trade_execution.handlers.order_handler')
 
 class OrderHandler(TradeOrderHandlerBase):
-    def __init__(self, ws_handler, loop=None):
+    def __init__(self, ws_handler, loop=None, journal=None):
         self.ws_handler = ws_handler
         self.loop = loop  # Store the event loop reference
+        self.journal = journal  # Optional MarketDataJournal recording every push
         super().__init__()
     
     def on_recv_rsp(self, rsp_pb):
         ret, data = super(OrderHandler, self).on_recv_rsp(rsp_pb)
         if ret == RET_OK:
-            # Process each order in the dataframe
-            for _, row in data.iterrows():
-                order_data = {
-                    "order_id": row['order_id'],
-                    "code": row['code'],
-                    "order_status": row['order_status'],
-                    "qty": row['qty'],
-                    "price": row['price'],
-                    "trd_side": row['trd_side']
-                }
-                
-                # Use run_coroutine_threadsafe instead of create_task
-                if self.loop and self.loop.is_running():
-                    asyncio.run_coroutine_threadsafe(
-                        self.ws_handler.process_order_update(order_data),
-                        self.loop
-                    )
-                else:
-                    logger.error("No running event loop available to process order update")
-                
-                # Log the order status
-                logger.info(f"[OrderStatus] {row['order_status']} for {row['code']}, ID: {row['order_id']}")
+            self.process_orders(data)
         
-        return ret, data
\ No newline at end of file
+        return ret, data
+
+    def process_orders(self, data):
+        """Record and forward a parsed order push (also used to replay recorded data)"""
+        # Process each order in the dataframe
+        for _, row in data.iterrows():
+            order_data = {
+                "order_id": row['order_id'],
+                "code": row['code'],
+                "order_status": row['order_status'],
+                "qty": row['qty'],
+                "price": row['price'],
+                "trd_side": row['trd_side']
+            }
+
+            if self.journal:
+                self.journal.record_order(order_data)
+            
+            # Use run_coroutine_threadsafe instead of create_task
+            if self.loop and self.loop.is_running():
+                asyncio.run_coroutine_threadsafe(
+                    self.ws_handler.process_order_update(order_data),
+                    self.loop
+                )
+            else:
+                logger.error("No running event loop available to process order update")
+            
+            # Log the order status
+            logger.info(f"[OrderStatus] {row['order_status']} for {row['code']}, ID: {row['order_id']}")
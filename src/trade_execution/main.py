@@ -1,14 +1,67 @@
+import os
 import uvicorn
 from trade_execution.api.server import create_app
 from trade_execution.models.APIConnectInfo import APIConnectInfo
 from trade_execution.models.ConnectionManager import ConnectionManager
+from trade_execution.services.market_data_journal import MarketDataJournal
+from trade_execution.services.bar_cache import BarCache
+from trade_execution.services.bar_providers import LocalFileBarProvider
+from trade_execution.services.backtest_service import DEFAULT_WARMUP_DAYS, BacktestService
+from trade_execution.services.data_warmup import DataWarmup
+from trade_execution.services.backtest_jobs import BacktestJobQueue
+from trade_execution.services.result_cache import BacktestResultCache
+from trade_execution.strategies.feature_cache import FeatureCache
 
 # Configure Futu OpenD connection
 APIConnectInfo.getInstance(
     FUTU_OPEND_ADDRESS="127.0.0.1",  # Default for local OpenD
-    FUTU_OPEND_PORT=11111            # Default port, adjust if needed
+    FUTU_OPEND_PORT=11111,           # Default port, adjust if needed
+    # Extra OpenD connections for independent queries; the pools open on first use
+    QUOTE_POOL_SIZE=int(os.environ.get("TRADE_EXECUTION_QUOTE_POOL_SIZE", 1)),
+    TRADE_POOL_SIZE=int(os.environ.get("TRADE_EXECUTION_TRADE_POOL_SIZE", 1)),
+    POOL_ROUTING=os.environ.get("TRADE_EXECUTION_POOL_ROUTING", "round_robin")
 )
 
+# Optional market data journal: set a directory to record order book and order pushes
+JOURNAL_DIR = os.environ.get("TRADE_EXECUTION_JOURNAL_DIR")
+if JOURNAL_DIR:
+    MarketDataJournal.getInstance(root_dir=JOURNAL_DIR)
+
+# Local historical bar cache shared by both backtest paths
+BAR_CACHE_DIR = os.environ.get("TRADE_EXECUTION_BAR_CACHE_DIR")
+if BAR_CACHE_DIR:
+    BarCache.getInstance(root_dir=BAR_CACHE_DIR)
+
+# Optional offline bar source: one CSV or Parquet file per symbol instead of Yahoo Finance
+BAR_DATA_DIR = os.environ.get("TRADE_EXECUTION_BAR_DATA_DIR")
+if BAR_DATA_DIR:
+    BacktestService.bar_provider = LocalFileBarProvider(BAR_DATA_DIR)
+
+# Optional bar cache warm-up: comma-separated symbols fetched in bulk at startup,
+# then every TRADE_EXECUTION_WARMUP_INTERVAL seconds if set
+WARMUP_SYMBOLS = os.environ.get("TRADE_EXECUTION_WARMUP_SYMBOLS")
+if WARMUP_SYMBOLS:
+    DataWarmup.getInstance(
+        symbols=[symbol.strip() for symbol in WARMUP_SYMBOLS.split(",") if symbol.strip()],
+        lookback_days=int(os.environ.get("TRADE_EXECUTION_WARMUP_DAYS", DEFAULT_WARMUP_DAYS)),
+        interval=float(os.environ.get("TRADE_EXECUTION_WARMUP_INTERVAL", 0))
+    )
+
+# Worker processes running queued backtest jobs
+BACKTEST_WORKERS = os.environ.get("TRADE_EXECUTION_BACKTEST_WORKERS")
+if BACKTEST_WORKERS:
+    BacktestJobQueue.getInstance(max_workers=int(BACKTEST_WORKERS))
+
+# Optional on-disk tier of the backtest result cache
+RESULT_CACHE_DIR = os.environ.get("TRADE_EXECUTION_RESULT_CACHE_DIR")
+if RESULT_CACHE_DIR:
+    BacktestResultCache.getInstance(disk_dir=RESULT_CACHE_DIR)
+
+# Memory budget of the indicator features shared by live strategies, in bytes
+FEATURE_CACHE_BYTES = os.environ.get("TRADE_EXECUTION_FEATURE_CACHE_BYTES")
+if FEATURE_CACHE_BYTES:
+    FeatureCache.getInstance(memory_budget=int(FEATURE_CACHE_BYTES))
+
 ConnectionManager.getInstance()
 app = create_app()
 
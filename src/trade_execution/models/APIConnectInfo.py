@@ -2,6 +2,9 @@ from pydantic import BaseModel
 from typing import Optional
 from futu import *
 import logging
+import threading
+
+from trade_execution.models.ContextPool import ROUND_ROBIN, ContextPool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -16,9 +19,21 @@ class APIConnectInfo():
     TRADING_PWD: str = "123456"
     TRADING_PERIOD: str = "1d"
 
+    # Contexts per type in the query pools, the primary contexts included
+    QUOTE_POOL_SIZE: int = 1
+    TRADE_POOL_SIZE: int = 1
+    POOL_ROUTING: str = ROUND_ROBIN
+    # Seconds between pool health checks; 0 disables them
+    POOL_HEALTH_INTERVAL: float = 30.0
+
+    # Primary contexts: subscriptions, push handlers and orders
     quote_context: Optional[OpenQuoteContext] = None
     trade_context: Optional[OpenSecTradeContext] = None
 
+    _quote_pool: Optional[ContextPool] = None
+    _trade_pool: Optional[ContextPool] = None
+    _pool_lock = threading.Lock()
+
     _instance = None
 
     model_config = {
@@ -26,7 +41,9 @@ class APIConnectInfo():
     }
 
     def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+        super().__init__()
+        for key, value in kwargs.items():
+            setattr(self, key, value)
         logger.info(f"Initializing APIConnectInfo with address={self.FUTU_OPEND_ADDRESS}, port={self.FUTU_OPEND_PORT}")
         
         if not self.quote_context:
@@ -45,6 +62,40 @@ class APIConnectInfo():
         
         logger.info(f"APIConnectInfo initialized with trading environment: {self.TRADING_ENV}")
 
+    @property
+    def quote_pool(self) -> ContextPool:
+        """
+        Pool of quote contexts for independent queries (history k-lines, snapshots);
+        opened on first use with the primary quote context as its first member
+        """
+        if self._quote_pool is None:
+            with self._pool_lock:
+                if self._quote_pool is None:
+                    self._quote_pool = ContextPool(
+                        "quote",
+                        lambda: OpenQuoteContext(host=self.FUTU_OPEND_ADDRESS, port=self.FUTU_OPEND_PORT),
+                        size=self.QUOTE_POOL_SIZE, routing=self.POOL_ROUTING, primary=self.quote_context,
+                        health_check=lambda context: context.get_global_state()[0] == RET_OK
+                    )
+        return self._quote_pool
+
+    @property
+    def trade_pool(self) -> ContextPool:
+        """
+        Pool of trade contexts for account, order and deal queries; orders are still
+        placed on the primary trade context, which receives the order pushes
+        """
+        if self._trade_pool is None:
+            with self._pool_lock:
+                if self._trade_pool is None:
+                    self._trade_pool = ContextPool(
+                        "trade",
+                        lambda: OpenSecTradeContext(host=self.FUTU_OPEND_ADDRESS, port=self.FUTU_OPEND_PORT),
+                        size=self.TRADE_POOL_SIZE, routing=self.POOL_ROUTING, primary=self.trade_context,
+                        health_check=lambda context: context.get_acc_list()[0] == RET_OK
+                    )
+        return self._trade_pool
+
     # Singleton pattern
     @classmethod
     def getInstance(cls, **kwargs):
@@ -37,7 +37,7 @@ class Account():
             Exception: If balance retrieval fails
         """
         logger.info("Fet")
-        ret, data = self.info.trade_context.accinfo_query()
+        ret, data = self.info.trade_pool.accinfo_query()
         if ret != RET_OK:
             raise Exception(f"Failed to get account info: {data}")
         return data
@@ -78,7 +78,7 @@ class Account():
         if pl_ratio_max is not None:
             query_params['pl_ratio_max'] = pl_ratio_max
         
-        ret, data = self.info.trade_context.position_list_query(**query_params)
+        ret, data = self.info.trade_pool.position_list_query(**query_params)
         if ret != RET_OK:
             raise Exception(f"Failed to get positions: {data}")
             
@@ -108,7 +108,7 @@ class Account():
         Raises:
             Exception: If transaction history retrieval fails
         """
-        ret, data = self.info.trade_context.history_deal_list_query(
+        ret, data = self.info.trade_pool.history_deal_list_query(
             start=start_date.strftime("%Y-%m-%d"),
             end=end_date.strftime("%Y-%m-%d"),
             trd_env=self.info.TRADING_ENV
@@ -118,7 +118,7 @@ class Account():
         return data.to_dict('records')
     
     def getHistoricalOrders(self, start_date: datetime, end_date: datetime) -> List[Dict]:
-        ret, data = self.info.trade_context.history_order_list_query(
+        ret, data = self.info.trade_pool.history_order_list_query(
             start=start_date.strftime("%Y-%m-%d"),
             end=end_date.strftime("%Y-%m-%d"),
             trd_env=self.info.TRADING_ENV
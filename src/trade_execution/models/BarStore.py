@@ -0,0 +1,252 @@
+from futu import *
+from trade_execution.models.APIConnectInfo import APIConnectInfo
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import threading
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('trade_execution.models.BarStore')
+
+# Column layout of a k-line buffer, in get_cur_kline column order
+KLINE_COLUMNS = {
+    'time_key': 'datetime64[ns]',
+    'open': np.float64,
+    'close': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'volume': np.int64,
+    'turnover': np.float64,
+}
+
+# get_cur_kline returns at most 1000 bars
+MAX_CUR_KLINE = 1000
+
+# A completed bar: (code, ktype, time_key, close)
+ClosedBar = Tuple[str, str, np.datetime64, float]
+
+
+class KlineRingBuffer:
+    """
+    Fixed-capacity ring buffer of k-line bars for one (code, ktype).
+
+    Every bar is written twice, at ``i`` and ``i + capacity``, so the most recent
+    ``n`` bars are always one contiguous slice and can be handed out as views.
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.size = 0
+        self._head = 0  # Slot of the next bar to be appended
+        self._columns = {name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in KLINE_COLUMNS.items()}
+        self._lock = threading.Lock()
+
+    @property
+    def last_time(self) -> Optional[np.datetime64]:
+        if self.size == 0:
+            return None
+        return self._columns['time_key'][self._head + self.capacity - 1]
+
+    def _write(self, slot: int, bar: Dict):
+        for name, column in self._columns.items():
+            column[slot] = bar[name]
+            column[slot + self.capacity] = bar[name]
+
+    def load(self, frame: pd.DataFrame):
+        """Replace the buffer contents with the most recent bars of a k-line frame"""
+        frame = frame.iloc[-self.capacity:]
+        n = len(frame)
+        with self._lock:
+            for name, column in self._columns.items():
+                values = frame[name].to_numpy(dtype=column.dtype)
+                column[:n] = values
+                column[self.capacity:self.capacity + n] = values
+            self.size = n
+            self._head = n % self.capacity
+
+    def push(self, bar: Dict) -> bool:
+        """
+        Apply a pushed bar: update the live bar in place or append a new one
+
+        Args:
+            bar: Bar values keyed by column name, time_key as np.datetime64
+
+        Returns:
+            bool: False if the bar is older than the last stored bar and was ignored
+        """
+        with self._lock:
+            last_time = self.last_time
+            if last_time is not None and bar['time_key'] < last_time:
+                return False
+            if last_time is not None and bar['time_key'] == last_time:
+                self._write((self._head - 1) % self.capacity, bar)
+            else:
+                self._write(self._head, bar)
+                self._head = (self._head + 1) % self.capacity
+                self.size = min(self.size + 1, self.capacity)
+            return True
+
+    def view(self, count: int) -> Dict[str, np.ndarray]:
+        """
+        Return the last ``count`` bars as views into the buffer
+
+        The views are not copies: the live bar reflects later pushes, and bars are
+        overwritten once ``capacity`` newer bars have been appended.
+        """
+        with self._lock:
+            n = min(count, self.size)
+            end = self._head + self.capacity
+            return {name: column[end - n:end] for name, column in self._columns.items()}
+
+
+class BarStore:
+    """
+    Live k-line store keyed by (code, ktype).
+
+    A buffer is seeded once from get_cur_kline when first requested and subscribed to
+    the matching SubType.K_* push; KlineHandler then keeps it current so strategies
+    read recent bars without another quote request. Listeners are told about every
+    bar that a push completes, i.e. when a bar with a later time starts.
+    """
+    _instance = None
+
+    def __init__(self, capacity: int = MAX_CUR_KLINE):
+        self.capacity = min(capacity, MAX_CUR_KLINE)
+        self.info = APIConnectInfo.getInstance()
+        self.buffers: Dict[Tuple[str, str], KlineRingBuffer] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[List[ClosedBar]], None]] = []
+
+    @classmethod
+    def getInstance(cls, **kwargs) -> 'BarStore':
+        if not cls._instance:
+            logger.info("Creating new BarStore instance")
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    def get_buffer(self, code: str, ktype: str) -> KlineRingBuffer:
+        """
+        Get the buffer for (code, ktype), subscribing and seeding it on first use
+
+        Raises:
+            Exception: If the subscription or the seeding request fails
+        """
+        key = (code, ktype)
+        buffer = self.buffers.get(key)
+        if buffer is not None:
+            return buffer
+
+        with self._lock:
+            buffer = self.buffers.get(key)
+            if buffer is not None:
+                return buffer
+            self._subscribe([code], ktype)
+            return self._seed(code, ktype)
+
+    def get_buffers(self, codes: List[str], ktype: str) -> Tuple[Dict[str, KlineRingBuffer], Dict[str, str]]:
+        """
+        Get the buffers of many codes, subscribing all new codes in one request
+
+        Returns:
+            Tuple[Dict[str, KlineRingBuffer], Dict[str, str]]: Buffer of every code that
+            could be seeded, and the error of every code that could not
+
+        Raises:
+            Exception: If the subscription fails
+        """
+        errors = {}
+        missing = [code for code in dict.fromkeys(codes) if (code, ktype) not in self.buffers]
+        if missing:
+            with self._lock:
+                missing = [code for code in missing if (code, ktype) not in self.buffers]
+                if missing:
+                    self._subscribe(missing, ktype)
+                # get_cur_kline takes a single code, so seeding stays one request per new code
+                for code in missing:
+                    try:
+                        self._seed(code, ktype)
+                    except Exception as e:
+                        errors[code] = str(e)
+        buffers = {code: self.buffers[(code, ktype)] for code in codes if (code, ktype) in self.buffers}
+        return buffers, errors
+
+    def _subscribe(self, codes: List[str], ktype: str):
+        # get_cur_kline requires the k-line subscription, which also starts the pushes
+        ret, data = self.info.quote_context.subscribe(codes, [ktype], subscribe_push=True)
+        if ret != RET_OK:
+            raise Exception(f"Failed to subscribe to {ktype} for {', '.join(codes)}: {data}")
+
+    def _seed(self, code: str, ktype: str) -> KlineRingBuffer:
+        ret, data = self.info.quote_context.get_cur_kline(code=code, num=self.capacity, ktype=ktype)
+        if ret != RET_OK:
+            raise Exception(f"Failed to get historical data: {data}")
+
+        buffer = KlineRingBuffer(self.capacity)
+        buffer.load(self._normalize(data))
+        self.buffers[(code, ktype)] = buffer
+        logger.info(f"Seeded {ktype} bar buffer for {code} with {buffer.size} bars")
+        return buffer
+
+    def get_bars(self, code: str, ktype: str, count: int) -> pd.DataFrame:
+        """
+        Return the last ``count`` bars of (code, ktype) as a DataFrame of buffer views
+
+        Args:
+            code: Security code
+            ktype: K-line type (e.g., KLType.K_DAY)
+            count: Number of bars to return
+
+        Returns:
+            pd.DataFrame: Bars with get_cur_kline price/volume columns
+        """
+        views = self.get_buffer(code, ktype).view(count)
+        return pd.DataFrame(views, copy=False)
+
+    def get_close_matrix(self, codes: List[str], ktype: str, count: int) -> Tuple[np.ndarray, Dict[str, str]]:
+        """
+        Return the last ``count`` closes of many codes as one (count x code) array
+
+        Codes with fewer bars are NaN-padded at the start; codes that could not be
+        seeded are all NaN.
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, str]]: The closes, and the seeding error of
+            every code that has none
+        """
+        buffers, errors = self.get_buffers(codes, ktype)
+        closes = np.full((count, len(codes)), np.nan)
+        for j, code in enumerate(codes):
+            buffer = buffers.get(code)
+            if buffer is not None:
+                values = buffer.view(count)['close']
+                closes[count - len(values):, j] = values
+        return closes, errors
+
+    def add_listener(self, callback: Callable[[List[ClosedBar]], None]):
+        """Call ``callback`` from the push thread with the bars completed by each push"""
+        self._listeners.append(callback)
+
+    def on_kline(self, data: pd.DataFrame):
+        """Apply a CUR_KLINE push to the buffers it belongs to"""
+        data = self._normalize(data)
+        closed: List[ClosedBar] = []
+        for bar in data.to_dict('records'):
+            buffer = self.buffers.get((bar['code'], bar['k_type']))
+            if buffer is None:
+                continue
+            bar['time_key'] = np.datetime64(bar['time_key'], 'ns')
+            last = buffer.view(1)
+            last_time = last['time_key'][0] if len(last['time_key']) else None
+            last_close = float(last['close'][0]) if last_time is not None else None
+            # A bar with a later time completes the previous one
+            if buffer.push(bar) and last_time is not None and bar['time_key'] > last_time:
+                closed.append((bar['code'], bar['k_type'], last_time, last_close))
+        if closed:
+            for listener in self._listeners:
+                listener(closed)
+
+    @staticmethod
+    def _normalize(data: pd.DataFrame) -> pd.DataFrame:
+        data = data.copy()
+        data['time_key'] = pd.to_datetime(data['time_key'])
+        return data
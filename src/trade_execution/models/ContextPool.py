@@ -0,0 +1,229 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from futu import RET_OK
+import logging
+
+logger = logging.getLogger('trade_execution.models.ContextPool')
+
+# Query routing rules
+ROUND_ROBIN = "round_robin"
+LEAST_LOADED = "least_loaded"
+ROUTING_RULES = (ROUND_ROBIN, LEAST_LOADED)
+
+# Upper bounds of the latency histogram buckets, in milliseconds; the last bucket is open
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class _PooledContext:
+    """One OpenD context of a pool with its load, health and latency statistics"""
+    def __init__(self, index: int, context: Any):
+        self.index = index
+        self.context = context
+        self.in_flight = 0
+        self.healthy = True
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.last_error: Optional[str] = None
+        self.last_check: Optional[float] = None
+
+    def record(self, elapsed_ms: float, error: Optional[str]):
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        if error is not None:
+            self.errors += 1
+            self.last_error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            'index': self.index,
+            'healthy': self.healthy,
+            'in_flight': self.in_flight,
+            'calls': self.calls,
+            'errors': self.errors,
+            'mean_ms': self.total_ms / self.calls if self.calls else 0.0,
+            'max_ms': self.max_ms,
+            'latency_histogram': dict(zip(labels, self.histogram)),
+            'last_error': self.last_error,
+            'last_check': self.last_check,
+        }
+
+
+class ContextPool:
+    """
+    A pool of OpenD contexts of one type (quote or trade).
+
+    The first context is the primary: subscriptions, push handlers and order
+    placement stay pinned to it, since OpenD delivers pushes and subscription-backed
+    data per connection. Independent queries go through ``acquire`` or are called on
+    the pool itself (``pool.get_market_snapshot(codes)``), which routes each one to a
+    healthy context round-robin or to the least loaded one, so they no longer queue
+    behind each other on a single socket. Every routed call is timed into its
+    context's latency histogram; ``check_health`` probes the contexts and unhealthy
+    ones are skipped until a later check passes.
+    """
+    def __init__(self, name: str, factory: Callable[[], Any], size: int = 1, routing: str = ROUND_ROBIN,
+                 primary: Any = None, health_check: Optional[Callable[[Any], bool]] = None):
+        """
+        Args:
+            name: Pool name used in logs and info
+            factory: Opens a new context
+            size: Number of contexts, the primary included
+            routing: ROUND_ROBIN or LEAST_LOADED
+            primary: Existing context to use as the primary instead of opening one
+            health_check: Returns whether a context answers; None to treat every
+                          context as healthy
+
+        Raises:
+            ValueError: If the size or routing rule is invalid
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        if routing not in ROUTING_RULES:
+            raise ValueError(f"Unknown routing rule: {routing}")
+        self.name = name
+        self.routing = routing
+        self.health_check = health_check
+        contexts = [primary if primary is not None else factory()]
+        for _ in range(size - 1):
+            contexts.append(factory())
+        self._slots = [_PooledContext(i, context) for i, context in enumerate(contexts)]
+        self._owns_primary = primary is None
+        self._next = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        logger.info(f"Opened {name} context pool of {size} with {routing} routing")
+
+    @property
+    def primary(self) -> Any:
+        """The context pinned for subscriptions, push handlers and orders"""
+        return self._slots[0].context
+
+    @property
+    def size(self) -> int:
+        return len(self._slots)
+
+    def _pick(self) -> _PooledContext:
+        with self._lock:
+            slots = [slot for slot in self._slots if slot.healthy] or self._slots
+            if self.routing == LEAST_LOADED:
+                slot = min(slots, key=lambda slot: (slot.in_flight, slot.calls))
+            else:
+                slot = slots[self._next % len(slots)]
+                self._next += 1
+            slot.in_flight += 1
+            return slot
+
+    def _release(self, slot: _PooledContext, started: float, error: Optional[str]):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            slot.in_flight -= 1
+            slot.record(elapsed_ms, error)
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """
+        Hold one routed context for a sequence of calls that belong together, such
+        as the pages of one paginated request; the whole block is timed as one call
+        """
+        slot = self._pick()
+        started = time.perf_counter()
+        error = None
+        try:
+            yield slot.context
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self._release(slot, started, error)
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """
+        Call a context method on a routed context
+
+        A (ret, data, ...) result whose ret is not RET_OK counts as an error.
+        """
+        slot = self._pick()
+        started = time.perf_counter()
+        error = None
+        try:
+            result = getattr(slot.context, method)(*args, **kwargs)
+            if isinstance(result, tuple) and result and result[0] != RET_OK:
+                error = str(result[1]) if len(result) > 1 else str(result[0])
+            return result
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self._release(slot, started, error)
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        # Context methods called on the pool are routed queries
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return functools.partial(self.call, name)
+
+    def check_health(self) -> List[bool]:
+        """Probe every context now and return whether each one is healthy"""
+        results = []
+        for slot in self._slots:
+            healthy = True
+            if self.health_check is not None:
+                try:
+                    healthy = bool(self.health_check(slot.context))
+                except Exception as e:
+                    healthy = False
+                    slot.last_error = str(e)
+            if healthy != slot.healthy:
+                log = logger.info if healthy else logger.warning
+                log(f"{self.name} context {slot.index} is {'healthy' if healthy else 'unhealthy'}")
+            slot.healthy = healthy
+            slot.last_check = time.time()
+            results.append(healthy)
+        return results
+
+    def start_health_checks(self, interval: float):
+        """Check the contexts every ``interval`` seconds on a background thread"""
+        if self._thread is not None or not interval:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._health_loop, args=(interval,),
+                                        name=f"{self.name}-pool-health", daemon=True)
+        self._thread.start()
+
+    def _health_loop(self, interval: float):
+        while not self._stopped.wait(interval):
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.error(f"{self.name} pool health check failed: {str(e)}")
+
+    def close(self):
+        """Stop health checks and close the contexts the pool opened itself"""
+        self._stopped.set()
+        self._thread = None
+        for slot in self._slots[0 if self._owns_primary else 1:]:
+            try:
+                slot.context.close()
+            except Exception as e:
+                logger.error(f"Failed to close {self.name} context {slot.index}: {str(e)}")
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'name': self.name,
+                'size': len(self._slots),
+                'routing': self.routing,
+                'contexts': [slot.to_dict() for slot in self._slots],
+            }
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+from futu import *
+from trade_execution.models.APIConnectInfo import APIConnectInfo
+from typing import List
+import pandas as pd
+
+# OpenD accepts at most this many codes per get_market_snapshot request
+MAX_SNAPSHOT_CODES = 400
+
+
+class MarketSnapshot:
+    """
+    Market snapshots of many securities.
+    Requests of more than MAX_SNAPSHOT_CODES codes are split into chunks that run
+    concurrently across the quote context pool.
+    """
+    info: APIConnectInfo = APIConnectInfo.getInstance()
+
+    def getSnapshots(self, codes: List[str]) -> pd.DataFrame:
+        """
+        Retrieves market snapshots for the given security codes
+
+        Args:
+            codes: Security codes (e.g., ["HK.00700", "HK.09988"])
+
+        Returns:
+            pd.DataFrame: One snapshot row per code, in request order
+
+        Raises:
+            ValueError: If no codes are given
+            Exception: If a snapshot request fails
+        """
+        codes = list(dict.fromkeys(codes))
+        if not codes:
+            raise ValueError("At least one code is required")
+        chunks = [codes[i:i + MAX_SNAPSHOT_CODES] for i in range(0, len(codes), MAX_SNAPSHOT_CODES)]
+        pool = self.info.quote_pool
+        if len(chunks) == 1:
+            return self._getChunk(pool, chunks[0])
+        with ThreadPoolExecutor(max_workers=min(len(chunks), pool.size)) as executor:
+            frames = list(executor.map(lambda chunk: self._getChunk(pool, chunk), chunks))
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def _getChunk(pool, codes: List[str]) -> pd.DataFrame:
+        ret, data = pool.get_market_snapshot(codes)
+        if ret != RET_OK:
+            raise Exception(f"Failed to get market snapshot: {data}")
+        return data
@@ -181,7 +181,7 @@ class Order:
             Exception: If order retrieval fails
         """
         info = APIConnectInfo.getInstance()
-        ret, data = info.trade_context.order_list_query(order_id=order_id, trd_env=info.TRADING_ENV)
+        ret, data = info.trade_pool.order_list_query(order_id=order_id, trd_env=info.TRADING_ENV)
         
         if ret != RET_OK:
             raise Exception(f"Failed to get order: {data}")
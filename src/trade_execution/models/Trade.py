@@ -34,7 +34,7 @@ class Trade:
             Exception: If trade retrieval fails
         """
         info = APIConnectInfo.getInstance()
-        ret, data = info.trade_context.deal_list_query(order_id=order_id)
+        ret, data = info.trade_pool.deal_list_query(order_id=order_id)
         
         if ret != RET_OK:
             raise Exception(f"Failed to get trades for order {order_id}: {data}")
@@ -74,7 +74,7 @@ class Trade:
             
         date_str = date.strftime("%Y-%m-%d")
         
-        ret, data = info.trade_context.history_deal_list_query(
+        ret, data = info.trade_pool.history_deal_list_query(
             start=date_str,
             end=date_str
         )
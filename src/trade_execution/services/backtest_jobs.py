@@ -0,0 +1,291 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+import logging
+
+from trade_execution.services.bar_cache import BarCache
+
+logger = logging.getLogger('trade_execution.services.backtest_jobs')
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+CANCELLED = "CANCELLED"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_PENDING = 100
+DEFAULT_MAX_FINISHED = 200
+
+# BacktestService method run by each job kind
+JOB_KINDS = {
+    "backtest": "run_backtest",
+    "sweep": "run_sweep",
+    "walk_forward": "run_walk_forward",
+    "portfolio": "run_portfolio_backtest",
+}
+
+# Progress queue of a worker process, set by _init_worker
+_progress_queue = None
+
+
+def _init_worker(progress_queue, bar_cache_dir: str, bar_provider):
+    global _progress_queue
+    _progress_queue = progress_queue
+    # Share the server's bar cache so workers do not download bars it already has
+    BarCache.getInstance(root_dir=bar_cache_dir)
+    # and fetch missing bars from the same source, e.g. local files when offline
+    from trade_execution.services.backtest_service import BacktestService
+    BacktestService.bar_provider = bar_provider
+
+
+def _run_job(job_id: str, kind: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Entry point of a job in a worker process"""
+    from trade_execution.services.backtest_service import BacktestService
+
+    def progress(fraction: float, message: str):
+        _progress_queue.put((job_id, fraction, message))
+
+    progress(0.0, "Started")
+    if kind in ("sweep", "walk_forward"):
+        # The job pool is the unit of parallelism; do not nest another pool per job
+        kwargs = dict(kwargs, max_workers=1)
+    return getattr(BacktestService, JOB_KINDS[kind])(progress=progress, **kwargs)
+
+
+class BacktestJob:
+    """State of one submitted backtest; results are kept until the job is evicted"""
+    def __init__(self, job_id: str, kind: str, request: Dict[str, Any]):
+        self.job_id = job_id
+        self.kind = kind
+        self.request = request
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.error_type: Optional[str] = None
+        # Bumped on every change so watchers can tell when to push an update
+        self.version = 0
+        self.future: Optional[Future] = None
+        self.on_success: Optional[Callable[[Dict[str, Any]], None]] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+
+
+class BacktestJobQueue:
+    """
+    Runs backtests as jobs in a pool of worker processes.
+
+    Backtests are CPU-heavy pandas/NumPy work; running them in separate processes
+    keeps the API event loop, order placement and WebSocket pushes responsive. The
+    pool size caps how many backtests run at once and ``max_pending`` bounds the
+    backlog. Workers report progress through a queue that a listener thread applies
+    to the job records; the ``max_finished`` most recently submitted finished jobs
+    are kept for result retrieval. A pool broken by a crashed worker is replaced on
+    the next submit and the jobs it held are failed.
+    """
+    _instance = None
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_pending: int = DEFAULT_MAX_PENDING,
+                 max_finished: int = DEFAULT_MAX_FINISHED):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, BacktestJob]" = OrderedDict()
+        # Reentrant: cancelling the futures of a broken pool runs their callbacks in place
+        self._lock = threading.RLock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._progress_queue = None
+        self._listener: Optional[threading.Thread] = None
+
+    @classmethod
+    def getInstance(cls, **kwargs) -> 'BacktestJobQueue':
+        if not cls._instance:
+            logger.info("Creating new BacktestJobQueue instance")
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    def _ensure_pool(self):
+        if self._executor is not None:
+            return
+        from trade_execution.services.backtest_service import BacktestService
+
+        # Spawned workers do not inherit the server's OpenD and event loop threads
+        context = multiprocessing.get_context('spawn')
+        self._progress_queue = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=context, initializer=_init_worker,
+            initargs=(self._progress_queue, BarCache.getInstance().root_dir, BacktestService.bar_provider)
+        )
+        self._listener = threading.Thread(target=self._listen, name="backtest-job-progress", daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        queue = self._progress_queue
+        while True:
+            update = queue.get()
+            if update is None:
+                return
+            job_id, fraction, message = update
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.finished:
+                    continue
+                if job.status == QUEUED:
+                    job.status = RUNNING
+                    job.started_at = time.time()
+                job.progress = fraction
+                job.message = message
+                job.version += 1
+
+    def submit(self, request: Dict[str, Any], kind: str = "backtest",
+               on_success: Optional[Callable[[Dict[str, Any]], None]] = None) -> BacktestJob:
+        """
+        Queue a job
+
+        Args:
+            request: Keyword arguments of the BacktestService method of the job kind
+            kind: Job kind, one of JOB_KINDS
+            on_success: Called with the result when the job succeeds
+
+        Returns:
+            BacktestJob: The queued job
+
+        Raises:
+            ValueError: If the job kind is unknown
+            Exception: If too many jobs are already waiting
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if not job.finished)
+            if pending >= self.max_pending:
+                raise Exception(f"Too many pending backtest jobs ({pending}), try again later")
+            job = BacktestJob(uuid.uuid4().hex, kind, request)
+            job.on_success = on_success
+            self._ensure_pool()
+            try:
+                job.future = self._executor.submit(_run_job, job.job_id, kind, request)
+            except BrokenProcessPool:
+                logger.error("Backtest worker pool is broken, starting a new one")
+                self._reset_pool()
+                self._ensure_pool()
+                job.future = self._executor.submit(_run_job, job.job_id, kind, request)
+            # Only jobs that reached a pool count as pending
+            self._jobs[job.job_id] = job
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        logger.info(f"Queued {kind} job {job.job_id}")
+        return job
+
+    def _reset_pool(self):
+        """Drop a broken worker pool and fail the jobs it held; the caller holds the lock"""
+        executor, self._executor = self._executor, None
+        for job in self._jobs.values():
+            if job.finished or job.future is None:
+                continue
+            job.status = FAILED
+            job.error = "Backtest worker process terminated abruptly"
+            job.error_type = BrokenProcessPool.__name__
+            job.message = "Failed"
+            job.finished_at = time.time()
+            job.future = None
+            job.version += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+        self._progress_queue.put(None)
+        self._evict()
+
+    def _finish(self, job: BacktestJob, future: Future):
+        with self._lock:
+            if job.finished:
+                # Already failed when its broken pool was replaced
+                return
+            job.finished_at = time.time()
+            try:
+                job.result = future.result()
+                job.status = SUCCEEDED
+                job.progress = 1.0
+                job.message = "Done"
+            except CancelledError:
+                job.status = CANCELLED
+                job.message = "Cancelled"
+            except Exception as e:
+                job.status = FAILED
+                job.error = str(e)
+                job.error_type = type(e).__name__
+                job.message = "Failed"
+                logger.error(f"Backtest job {job.job_id} failed: {e}")
+            job.future = None
+            job.version += 1
+            self._evict()
+        if job.status == SUCCEEDED and job.on_success:
+            try:
+                job.on_success(job.result)
+            except Exception as e:
+                logger.error(f"Backtest job {job.job_id} success callback failed: {e}")
+
+    def add_completed(self, request: Dict[str, Any], result: Dict[str, Any], kind: str = "backtest") -> BacktestJob:
+        """Record a job whose result is already known, e.g. from the result cache"""
+        job = BacktestJob(uuid.uuid4().hex, kind, request)
+        job.status = SUCCEEDED
+        job.progress = 1.0
+        job.message = "Cached"
+        job.result = result
+        job.started_at = job.finished_at = job.submitted_at
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._evict()
+        return job
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[BacktestJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [job.to_dict() for job in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started yet; returns False if it is running or finished"""
+        job = self.get(job_id)
+        if job is None or job.future is None:
+            return False
+        return job.future.cancel()
+
+    def shutdown(self, wait: bool = False):
+        """Stop the worker pool; queued jobs are cancelled"""
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._progress_queue.put(None)
+        self._executor = None
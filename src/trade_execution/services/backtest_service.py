@@ -1,23 +1,142 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import logging
+import time
+
+from trade_execution.services.bar_cache import BarCache
+from trade_execution.services.bar_providers import BarProvider, YahooBarProvider
+from trade_execution.services.graph_data import columnar_graph_data
+from trade_execution.services.metrics import DEFAULT_ROLLING_WINDOW, analyze_equity
+from trade_execution.services.parameter_sweep import run_sweep
+from trade_execution.services.portfolio_backtest import align_prices, run_portfolio_backtest
+from trade_execution.services.signal_kernels import RollingSums, bollinger_positions, rsi_positions
+from trade_execution.services.walk_forward import walk_forward
+from trade_execution.services.simulation import simulate_all_in
+from trade_execution.strategies.indicators import wilder_rsi
 
 logger = logging.getLogger('trade_execution.services.backtest_service')
 
+# Bar cache key of the daily Yahoo Finance bars used by backtests
+DATA_SOURCE = "yfinance"
+DATA_INTERVAL = "1d"
+
+# Default history kept warm in the bar cache for the configured universe, in days
+DEFAULT_WARMUP_DAYS = 5 * 365
+
 class BacktestService:
+    # Source of bars missing from the bar cache; LocalFileBarProvider serves offline runs
+    bar_provider: BarProvider = YahooBarProvider()
+
+    @staticmethod
+    def download_bars(symbol: str, start: date, end: date) -> pd.DataFrame:
+        """Download daily bars for an inclusive date range from the bar provider"""
+        return BacktestService.bar_provider.download([symbol], start, end)[symbol]
+
     @staticmethod
     def fetch_data(symbol: str, start_date: datetime, end_date: datetime) -> pd.Series:
-        """Fetch historical price data for a symbol"""
+        """Fetch historical price data for a symbol (end date exclusive) through the bar cache"""
         logger.info(f"Fetching data for {symbol} from {start_date} to {end_date}")
-        data = yf.download(symbol, start=start_date.strftime('%Y-%m-%d'), 
-                          end=end_date.strftime('%Y-%m-%d'), auto_adjust=False)
-        if isinstance(data.columns, pd.MultiIndex):
-            return data['Adj Close', symbol]
-        else:
-            return data['Adj Close']
+        bars = BarCache.getInstance().get(
+            DATA_SOURCE, symbol, DATA_INTERVAL, start_date.date(), end_date.date() - timedelta(days=1),
+            lambda start, end: BacktestService.download_bars(symbol, start, end)
+        )
+        if bars.empty:
+            raise ValueError(f"No data for {symbol} between {start_date.date()} and {end_date.date()}")
+        data = bars['adj_close']
+        data.index.name = 'Date'
+        return data
+
+    @staticmethod
+    def fetch_bars(symbols: List[str], start_date: datetime, end_date: datetime) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch daily bars of many symbols (end date exclusive) through the bar cache
+
+        The date ranges missing from the cache are collected for every symbol first;
+        each distinct range is downloaded with a single bar provider request for all
+        the symbols missing it, so one symbol with a long gap does not make the others
+        download that gap too. Each symbol's cache entry is then filled from its
+        slices of those downloads.
+
+        Returns:
+            Dict[str, pd.DataFrame]: Bars of every symbol, indexed by time
+        """
+        cache = BarCache.getInstance()
+        start, end = start_date.date(), end_date.date() - timedelta(days=1)
+        missing = {symbol: cache.missing_ranges(DATA_SOURCE, symbol, DATA_INTERVAL, start, end)
+                   for symbol in symbols}
+        by_range: Dict[Tuple[date, date], List[str]] = {}
+        for symbol, ranges in missing.items():
+            for missing_range in ranges:
+                by_range.setdefault(missing_range, []).append(symbol)
+        downloaded: Dict[Tuple[str, date, date], pd.DataFrame] = {}
+        for (range_start, range_end), range_symbols in sorted(by_range.items()):
+            bars = BacktestService.bar_provider.download(range_symbols, range_start, range_end)
+            for symbol in range_symbols:
+                downloaded[(symbol, range_start, range_end)] = bars[symbol]
+
+        def fetcher(symbol: str):
+            def fetch(fetch_start: date, fetch_end: date) -> pd.DataFrame:
+                bars = downloaded.get((symbol, fetch_start, fetch_end))
+                if bars is None:
+                    # Another process changed the cache since the ranges were collected
+                    return BacktestService.download_bars(symbol, fetch_start, fetch_end)
+                return bars
+            return fetch
+
+        stale = [symbol for symbol, ranges in missing.items() if ranges]
+        logger.info(f"Fetching data for {len(symbols)} symbol(s) from {start_date} to {end_date} "
+                    f"({len(stale)} not fully cached)")
+        return {symbol: cache.get(DATA_SOURCE, symbol, DATA_INTERVAL, start, end, fetcher(symbol))
+                for symbol in symbols}
+
+    @staticmethod
+    def fetch_many(symbols: List[str], start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        Fetch historical prices of many symbols (end date exclusive), aligned on one date index
+
+        Returns:
+            pd.DataFrame: (time x symbol) adjusted closes, forward-filled inside each
+            symbol's history and NaN outside it
+        """
+        bars = BacktestService.fetch_bars(symbols, start_date, end_date)
+        prices = align_prices({symbol: frame.get('adj_close', pd.Series(dtype=np.float64))
+                               for symbol, frame in bars.items()})
+        prices.index.name = 'Date'
+        return prices
+
+    @staticmethod
+    def warm_up(symbols: List[str], lookback_days: int = DEFAULT_WARMUP_DAYS) -> Dict[str, Any]:
+        """
+        Fill the bar cache with the completed daily bars of a symbol universe
+
+        Returns:
+            Dict[str, Any]: The symbols that had to be downloaded and the number of
+            cached bars of every symbol
+        """
+        started = time.perf_counter()
+        end_date = datetime.combine(date.today(), datetime.min.time())
+        start_date = end_date - timedelta(days=lookback_days)
+        cache = BarCache.getInstance()
+        stale = [symbol for symbol in symbols
+                 if cache.missing_ranges(DATA_SOURCE, symbol, DATA_INTERVAL,
+                                         start_date.date(), end_date.date() - timedelta(days=1))]
+        bars = BacktestService.fetch_bars(symbols, start_date, end_date)
+        elapsed = time.perf_counter() - started
+        logger.info(f"Warmed up {len(symbols)} symbol(s), downloaded {len(stale)}, in {elapsed:.2f}s")
+        return {
+            'start_date': start_date.date().isoformat(),
+            'end_date': end_date.date().isoformat(),
+            'downloaded': stale,
+            'bars': {symbol: len(frame) for symbol, frame in bars.items()},
+            'elapsed_seconds': elapsed,
+        }
+
+    @staticmethod
+    def data_version(symbol: str) -> int:
+        """Version of the cached bars of a symbol; changes whenever they are rewritten"""
+        return BarCache.getInstance().data_version(DATA_SOURCE, symbol, DATA_INTERVAL)
 
     @staticmethod
     def calculate_sma(data: pd.Series, window: int) -> pd.Series:
@@ -31,129 +150,89 @@ class BacktestService:
         signals['signal'] = 0.0
         signals.loc[short_sma > long_sma, 'signal'] = 1.0
         signals['positions'] = signals['signal'].diff()
-        signals['positions'].iloc[0] = signals['signal'].iloc[0]
+        signals.loc[signals.index[0], 'positions'] = signals['signal'].iloc[0]
         return signals
 
     @staticmethod
-    def simulate_trades(data: pd.Series, signals: pd.DataFrame, initial_capital: float) -> pd.DataFrame:
-        """Simulate trades based on signals"""
-        positions = signals['positions']
-        price = data
-        
-        cash = initial_capital
-        shares = 0
-        portfolio = pd.DataFrame(index=data.index)
-        portfolio['holdings'] = 0.0
-        portfolio['cash'] = 0.0
-        portfolio['total'] = 0.0
-        
-        for t in data.index:
-            if positions[t] == 1:  # buy
-                shares = cash / price[t]
-                cash = 0
-            elif positions[t] == -1:  # sell
-                cash = shares * price[t]
-                shares = 0
-            holdings = shares * price[t]
-            portfolio.loc[t, 'holdings'] = holdings
-            portfolio.loc[t, 'cash'] = cash
-            portfolio.loc[t, 'total'] = cash + holdings
-        
-        return portfolio
+    def simulate_trades(data: pd.Series, signals: pd.DataFrame, initial_capital: float,
+                        commission: float = 0.0, min_commission: float = 0.0,
+                        slippage: float = 0.0, lot_size: int = 0) -> pd.DataFrame:
+        """Simulate trades based on signals using the NumPy simulation kernel"""
+        result = simulate_all_in(
+            data.to_numpy(dtype=float), signals['positions'].to_numpy(dtype=float), initial_capital,
+            commission=commission, min_commission=min_commission, slippage=slippage, lot_size=lot_size
+        )
+        return pd.DataFrame({
+            'holdings': result['holdings'],
+            'cash': result['cash'],
+            'total': result['total'],
+            'shares': result['shares'],
+        }, index=data.index)
 
     @staticmethod
-    def calculate_metrics(data: pd.Series, signals: pd.DataFrame, portfolio: pd.DataFrame, 
+    def analyze_portfolio(data: pd.Series, signals: pd.DataFrame, portfolio: pd.DataFrame,
+                          initial_capital: float, rolling_window: Optional[int] = None) -> Dict[str, Any]:
+        """Metrics and risk series of a simulated portfolio; see metrics.analyze_equity"""
+        return analyze_equity(
+            portfolio['total'].to_numpy(dtype=float), initial_capital,
+            position_changes=signals['positions'].to_numpy(dtype=float),
+            shares=portfolio['shares'].to_numpy(dtype=float) if 'shares' in portfolio else None,
+            prices=data.to_numpy(dtype=float), rolling_window=rolling_window
+        )
+
+    @staticmethod
+    def calculate_metrics(data: pd.Series, signals: pd.DataFrame, portfolio: pd.DataFrame,
                           initial_capital: float) -> Dict[str, Any]:
         """Calculate comprehensive backtesting metrics"""
-        # Calculate returns
-        portfolio['returns'] = portfolio['total'].pct_change()
-        
-        # Net performance
-        net_performance = (portfolio['total'][-1] - initial_capital) / initial_capital
-        
-        # Number of trades
-        num_trades = len(signals[signals['positions'] != 0])
-        
-        # Trading period in years
-        trading_days = len(portfolio)
-        years = trading_days / 252  # Assuming 252 trading days per year
-        
-        # Annualized return
-        annualized_return = (1 + net_performance) ** (1 / years) - 1 if years > 0 else 0
-        
-        # Volatility (annualized)
-        volatility = portfolio['returns'].std() * np.sqrt(252) if len(portfolio) > 1 else 0
-        
-        # Sharpe ratio (assuming risk-free rate of 0 for simplicity)
-        sharpe_ratio = annualized_return / volatility if volatility > 0 else 0
-        
-        # Maximum drawdown
-        cumulative_returns = (1 + portfolio['returns'].fillna(0)).cumprod()
-        peak = cumulative_returns.expanding(min_periods=1).max()
-        drawdown = (cumulative_returns / peak) - 1
-        max_drawdown = drawdown.min()
-        
-        # Win rate and average profit
-        trades = signals[signals['positions'] != 0]
-        if num_trades > 0:
-            portfolio_at_trades = portfolio.loc[trades.index, 'total']
-            trade_returns = portfolio_at_trades.pct_change().fillna(0)
-            win_rate = len(trade_returns[trade_returns > 0]) / len(trade_returns)
-            avg_profit_per_trade = net_performance / num_trades
-        else:
-            win_rate = 0
-            avg_profit_per_trade = 0
-        
-        return {
-            'net_performance': float(net_performance),
-            'annualized_return': float(annualized_return),
-            'volatility': float(volatility),
-            'sharpe_ratio': float(sharpe_ratio),
-            'max_drawdown': float(max_drawdown),
-            'win_rate': float(win_rate),
-            'avg_profit_per_trade': float(avg_profit_per_trade),
-            'num_trades': int(num_trades),
-            'final_value': float(portfolio['total'][-1]),
-            'initial_value': float(initial_capital)
-        }
+        return BacktestService.analyze_portfolio(data, signals, portfolio, initial_capital)['metrics']
 
     @staticmethod
-    def prepare_graph_data(data: pd.Series, short_sma: pd.Series, long_sma: pd.Series, 
-                          signals: pd.DataFrame, portfolio: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Prepare data for visualization"""
-        graph_data = pd.DataFrame(index=data.index)
-        graph_data['date'] = graph_data.index.strftime('%Y-%m-%d')
-        graph_data['price'] = data
-        graph_data['short_sma'] = short_sma
-        graph_data['long_sma'] = long_sma
-        
-        # Add portfolio value
-        graph_data['portfolio_value'] = portfolio['total']
-        
-        # Calculate percentage change from initial
-        initial_value = portfolio['total'].iloc[0]
-        graph_data['portfolio_performance'] = (portfolio['total'] / initial_value - 1) * 100
-        
-        # Initialize trade marker columns with null values
-        graph_data['buyPrice'] = np.nan
-        graph_data['sellPrice'] = np.nan
-        
-        # Mark buy and sell points
-        buy_dates = signals[signals['positions'] == 1].index
-        sell_dates = signals[signals['positions'] == -1].index
-        
-        graph_data.loc[buy_dates, 'buyPrice'] = data.loc[buy_dates]
-        graph_data.loc[sell_dates, 'sellPrice'] = data.loc[sell_dates]
-        
-        # Convert to records format for frontend visualization
-        return graph_data.reset_index().to_dict(orient='records')
+    def prepare_graph_data(data: pd.Series, short_sma: Optional[pd.Series], long_sma: Optional[pd.Series],
+                          signals: pd.DataFrame, portfolio: pd.DataFrame,
+                          max_points: Optional[int] = None, downsample: str = 'lttb',
+                          risk_series: Optional[Dict[str, np.ndarray]] = None,
+                          indicators: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, List[Any]]:
+        """
+        Prepare columnar data for visualization, optionally downsampled to about
+        ``max_points`` points; bars with a trade marker are always kept. Drawdown and
+        rolling risk series from analyze_portfolio are added as extra columns, as are
+        the ``indicators`` of strategies other than the SMA crossover (whose SMAs are
+        then None).
+        """
+        price = data.to_numpy(dtype=float)
+        total = portfolio['total'].to_numpy(dtype=float)
+        positions = signals['positions'].to_numpy(dtype=float)
+
+        # Trade marker columns are null except on buy and sell bars
+        columns = {'price': price}
+        if short_sma is not None and long_sma is not None:
+            columns['short_sma'] = short_sma.to_numpy(dtype=float)
+            columns['long_sma'] = long_sma.to_numpy(dtype=float)
+        for name, values in (indicators or {}).items():
+            columns[name] = np.asarray(values, dtype=float)
+        columns.update({
+            'portfolio_value': total,
+            'portfolio_performance': (total / total[0] - 1) * 100,
+            'buyPrice': np.where(positions == 1, price, np.nan),
+            'sellPrice': np.where(positions == -1, price, np.nan),
+        })
+        for name in ('drawdown', 'rolling_sharpe', 'rolling_volatility'):
+            if risk_series and name in risk_series:
+                columns[name] = risk_series[name]
+        return columnar_graph_data(columns, data.index, max_points=max_points, method=downsample)
 
     @staticmethod
     def backtest_sma_strategy(symbol: str, start_date: datetime, end_date: datetime, 
                              short_window: int, long_window: int, 
-                             initial_capital: float = 10000.0) -> Dict[str, Any]:
+                             initial_capital: float = 10000.0,
+                             costs: Optional[Dict[str, Any]] = None,
+                             max_points: Optional[int] = None, downsample: str = 'lttb',
+                             rolling_window: int = DEFAULT_ROLLING_WINDOW,
+                             progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
         """Run a complete SMA crossover strategy backtest"""
         data = BacktestService.fetch_data(symbol, start_date, end_date)
+        if progress:
+            progress(0.5, "Simulating")
         short_sma = BacktestService.calculate_sma(data, short_window)
         long_sma = BacktestService.calculate_sma(data, long_window)
         
@@ -167,30 +246,202 @@ class BacktestService:
         long_sma = long_sma.iloc[start_idx:]
         
         signals = BacktestService.generate_signals(short_sma, long_sma)
-        portfolio = BacktestService.simulate_trades(data, signals, initial_capital)
-        metrics = BacktestService.calculate_metrics(data, signals, portfolio, initial_capital)
-        graph_data = BacktestService.prepare_graph_data(data, short_sma, long_sma, signals, portfolio)
+        portfolio = BacktestService.simulate_trades(data, signals, initial_capital, **(costs or {}))
+        if progress:
+            progress(0.8, "Calculating metrics")
+        analysis = BacktestService.analyze_portfolio(data, signals, portfolio, initial_capital, rolling_window)
+        graph_data = BacktestService.prepare_graph_data(data, short_sma, long_sma, signals, portfolio,
+                                                        max_points=max_points, downsample=downsample,
+                                                        risk_series=analysis['series'])
         
         return {
-            'metrics': metrics,
+            'metrics': analysis['metrics'],
             'graph_data': graph_data
         }
 
+    @staticmethod
+    def backtest_mean_reversion_strategy(symbol: str, start_date: datetime, end_date: datetime,
+                                         window: int, num_std: float,
+                                         initial_capital: float = 10000.0,
+                                         costs: Optional[Dict[str, Any]] = None,
+                                         max_points: Optional[int] = None, downsample: str = 'lttb',
+                                         rolling_window: int = DEFAULT_ROLLING_WINDOW,
+                                         progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+        """
+        Run a complete Bollinger Band mean reversion strategy backtest
+
+        Long from the bar price crosses below the lower band until it crosses above the
+        upper band, as MeanReversionStrategy signals; the bands come from cumulative
+        sums and the positions from array operations over the whole series.
+        """
+        data = BacktestService.fetch_data(symbol, start_date, end_date)
+        if progress:
+            progress(0.5, "Simulating")
+        rolling = RollingSums(data.to_numpy(dtype=float))
+        start_idx, changes = bollinger_positions(rolling, window, num_std)
+        middle = rolling.mean(window)[start_idx:]
+        band = rolling.std(window)[start_idx:] * num_std
+
+        # Slice from where the bands are defined
+        data = data.iloc[start_idx:]
+        signals = pd.DataFrame({'positions': changes}, index=data.index)
+        portfolio = BacktestService.simulate_trades(data, signals, initial_capital, **(costs or {}))
+        if progress:
+            progress(0.8, "Calculating metrics")
+        analysis = BacktestService.analyze_portfolio(data, signals, portfolio, initial_capital, rolling_window)
+        graph_data = BacktestService.prepare_graph_data(
+            data, None, None, signals, portfolio, max_points=max_points, downsample=downsample,
+            risk_series=analysis['series'],
+            indicators={'middle_band': middle, 'upper_band': middle + band, 'lower_band': middle - band}
+        )
+
+        return {
+            'metrics': analysis['metrics'],
+            'graph_data': graph_data
+        }
+
+    @staticmethod
+    def backtest_momentum_strategy(symbol: str, start_date: datetime, end_date: datetime,
+                                   period: int, oversold: float, overbought: float,
+                                   initial_capital: float = 10000.0,
+                                   costs: Optional[Dict[str, Any]] = None,
+                                   max_points: Optional[int] = None, downsample: str = 'lttb',
+                                   rolling_window: int = DEFAULT_ROLLING_WINDOW,
+                                   progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+        """
+        Run a complete RSI momentum strategy backtest
+
+        Long from the bar RSI recovers above ``oversold`` until it falls back below
+        ``overbought``, as MomentumStrategy signals; RSI and positions are computed
+        for the whole series at once.
+        """
+        data = BacktestService.fetch_data(symbol, start_date, end_date)
+        if progress:
+            progress(0.5, "Simulating")
+        rolling = RollingSums(data.to_numpy(dtype=float))
+        rsi = wilder_rsi(rolling.values, period) if 0 < period < len(rolling) else None
+        start_idx, changes = rsi_positions(rolling, period, oversold, overbought, rsi)
+        rsi = rsi[start_idx:]
+
+        # Slice from where the RSI is defined
+        data = data.iloc[start_idx:]
+        signals = pd.DataFrame({'positions': changes}, index=data.index)
+        portfolio = BacktestService.simulate_trades(data, signals, initial_capital, **(costs or {}))
+        if progress:
+            progress(0.8, "Calculating metrics")
+        analysis = BacktestService.analyze_portfolio(data, signals, portfolio, initial_capital, rolling_window)
+        graph_data = BacktestService.prepare_graph_data(data, None, None, signals, portfolio,
+                                                        max_points=max_points, downsample=downsample,
+                                                        risk_series=analysis['series'],
+                                                        indicators={'rsi': rsi})
+
+        return {
+            'metrics': analysis['metrics'],
+            'graph_data': graph_data
+        }
+
+    @staticmethod
+    def trading_costs(parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract commission, slippage and lot size settings from request parameters"""
+        return {
+            'commission': float(parameters.get('commission', 0.0)),
+            'min_commission': float(parameters.get('min_commission', 0.0)),
+            'slippage': float(parameters.get('slippage', 0.0)),
+            'lot_size': int(parameters.get('lot_size', 0)),
+        }
+
     @staticmethod
     def run_backtest(strategy_id: str, symbol: str, start_date: datetime, end_date: datetime, 
-                    initial_capital: float = 10000.0, parameters: Dict[str, Any] = {}) -> Dict[str, Any]:
-        """Run a backtest with the specified strategy"""
+                    initial_capital: float = 10000.0, parameters: Dict[str, Any] = {},
+                    max_points: Optional[int] = None, downsample: str = 'lttb',
+                    progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+        """
+        Run a backtest with the specified strategy, optionally reporting progress as (fraction, message)
+
+        The graph data is columnar; ``max_points`` downsamples it with the ``downsample``
+        method ("lttb" or "minmax") while the metrics use every bar.
+        """
         if strategy_id == "sma_crossover":
             short_window = parameters.get('short_window', 20)
             long_window = parameters.get('long_window', 50)
             return BacktestService.backtest_sma_strategy(
-                symbol, start_date, end_date, short_window, long_window, initial_capital
+                symbol, start_date, end_date, short_window, long_window, initial_capital,
+                costs=BacktestService.trading_costs(parameters),
+                max_points=max_points, downsample=downsample,
+                rolling_window=int(parameters.get('rolling_window', DEFAULT_ROLLING_WINDOW)), progress=progress
+            )
+        elif strategy_id == "momentum":
+            return BacktestService.backtest_momentum_strategy(
+                symbol, start_date, end_date, int(parameters.get('period', 14)),
+                float(parameters.get('oversold', 30.0)), float(parameters.get('overbought', 70.0)),
+                initial_capital, costs=BacktestService.trading_costs(parameters),
+                max_points=max_points, downsample=downsample,
+                rolling_window=int(parameters.get('rolling_window', DEFAULT_ROLLING_WINDOW)), progress=progress
             )
         elif strategy_id == "mean_reversion":
-            # Add implementation for mean reversion strategy
-            window = parameters.get('window', 20)
-            num_std = parameters.get('num_std', 2.0)
-            # Placeholder for mean reversion implementation
-            raise NotImplementedError("Mean reversion backtesting not yet implemented")
+            return BacktestService.backtest_mean_reversion_strategy(
+                symbol, start_date, end_date, int(parameters.get('window', 20)),
+                float(parameters.get('num_std', 2.0)), initial_capital,
+                costs=BacktestService.trading_costs(parameters),
+                max_points=max_points, downsample=downsample,
+                rolling_window=int(parameters.get('rolling_window', DEFAULT_ROLLING_WINDOW)), progress=progress
+            )
         else:
-            raise ValueError(f"Unknown strategy: {strategy_id}")
\ No newline at end of file
+            raise ValueError(f"Unknown strategy: {strategy_id}")
+
+    @staticmethod
+    def run_sweep(strategy_id: str, symbol: str, start_date: datetime, end_date: datetime,
+                  grid: Dict[str, List[Any]], initial_capital: float = 10000.0,
+                  parameters: Dict[str, Any] = {}, rank_by: str = 'sharpe_ratio',
+                  top_n: Optional[int] = None, max_workers: Optional[int] = None,
+                  progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+        """Backtest every combination of a parameter grid on prices fetched once"""
+        data = BacktestService.fetch_data(symbol, start_date, end_date)
+        result = run_sweep(
+            data.to_numpy(dtype=float), strategy_id, grid, initial_capital,
+            costs=BacktestService.trading_costs(parameters), rank_by=rank_by,
+            top_n=top_n, max_workers=max_workers, progress=progress
+        )
+        result['symbol'] = symbol
+        return result
+
+    @staticmethod
+    def run_walk_forward(strategy_id: str, symbol: str, start_date: datetime, end_date: datetime,
+                         grid: Dict[str, List[Any]], train_size: int, test_size: int,
+                         mode: str = 'rolling', initial_capital: float = 10000.0,
+                         parameters: Dict[str, Any] = {}, rank_by: str = 'sharpe_ratio',
+                         max_workers: Optional[int] = None,
+                         progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+        """Walk-forward optimize a strategy over rolling or anchored train/test folds"""
+        data = BacktestService.fetch_data(symbol, start_date, end_date)
+        result = walk_forward(
+            data.to_numpy(dtype=float), strategy_id, grid, train_size, test_size, mode=mode,
+            initial_capital=initial_capital, costs=BacktestService.trading_costs(parameters),
+            rank_by=rank_by, max_workers=max_workers, index=data.index, progress=progress
+        )
+        result['symbol'] = symbol
+        return result
+
+    @staticmethod
+    def run_portfolio_backtest(strategy_id: str, symbols: List[str], start_date: datetime, end_date: datetime,
+                               initial_capital: float = 10000.0, parameters: Dict[str, Any] = {},
+                               allocation: str = 'equal', max_weight: Optional[float] = None,
+                               vol_window: int = 20,
+                               progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+        """Backtest a strategy over a list of symbols sharing one capital pool"""
+        if not symbols:
+            raise ValueError("No symbols given")
+        prices = BacktestService.fetch_many(symbols, start_date, end_date)
+        if progress:
+            progress(0.8, f"Fetched {len(symbols)} symbols")
+        missing = [symbol for symbol in symbols if prices[symbol].isna().all()]
+        if missing:
+            raise ValueError(f"No data for symbols: {', '.join(missing)}")
+
+        costs = BacktestService.trading_costs(parameters)
+        # Portfolio positions are fractional; lot sizes do not apply
+        costs.pop('lot_size')
+        return run_portfolio_backtest(
+            prices, strategy_id, parameters, allocation=allocation,
+            max_weight=max_weight, vol_window=vol_window, initial_capital=initial_capital, costs=costs
+        )
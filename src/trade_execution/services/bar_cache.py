@@ -0,0 +1,434 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows: entries are only coordinated between threads
+    fcntl = None
+
+logger = logging.getLogger('trade_execution.services.bar_cache')
+
+DEFAULT_ROOT = os.path.join(os.path.expanduser("~"), ".trade_execution", "bar_cache")
+
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+TIME_COLUMN = "time"
+
+# Relative price change of a refetched cached bar that means the source restated its history
+RESTATED_RTOL = 1e-9
+
+# Fetchers take an inclusive date range and return bars indexed by a DatetimeIndex
+Fetcher = Callable[[date, date], pd.DataFrame]
+
+# Exchange timezone and session close (closing auction included) of each market
+EXCHANGE_SESSIONS = {
+    'US': ('America/New_York', time(16, 0)),
+    'HK': ('Asia/Hong_Kong', time(16, 10)),
+    'SH': ('Asia/Shanghai', time(15, 0)),
+    'SZ': ('Asia/Shanghai', time(15, 0)),
+}
+# Markets of Yahoo Finance symbol suffixes; symbols without one are US listings
+YAHOO_SUFFIXES = {'.HK': 'HK', '.SS': 'SH', '.SZ': 'SZ'}
+DEFAULT_MARKET = 'US'
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def symbol_market(symbol: str) -> str:
+    """Market of a Futu code ("HK.00700") or Yahoo Finance symbol ("0700.HK", "AAPL")"""
+    symbol = symbol.upper()
+    prefix, dot, _ = symbol.partition('.')
+    if dot and prefix in EXCHANGE_SESSIONS:
+        return prefix
+    for suffix, market in YAHOO_SUFFIXES.items():
+        if symbol.endswith(suffix):
+            return market
+    return DEFAULT_MARKET
+
+
+def last_completed_session(symbol: str, now: datetime) -> date:
+    """
+    Exchange-local date of the last session of the symbol's market that has closed;
+    weekends and holidays simply have no bars
+    """
+    zone, close = EXCHANGE_SESSIONS[symbol_market(symbol)]
+    local = now.astimezone(ZoneInfo(zone))
+    return local.date() if local.time() >= close else local.date() - timedelta(days=1)
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _merge_ranges(ranges: List[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    merged: List[Tuple[date, date]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _missing_ranges(covered: List[Tuple[date, date]], start: date, end: date) -> List[Tuple[date, date]]:
+    """Parts of [start, end] not contained in the covered ranges"""
+    gaps = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end < cursor:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start - timedelta(days=1)))
+        cursor = max(cursor, covered_end + timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class _CacheEntry:
+    """
+    Files of one (source, symbol, interval): one .npy file per column inside a
+    versioned directory, plus a meta file with the covered date ranges.
+
+    Processes sharing the cache directory coordinate through an flock on the entry's
+    lock file. A new version is built in a private directory and renamed into place
+    before the meta file switches to it, and the previous version is kept until the
+    next write for readers that loaded the old meta file.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.version = 0
+        self.covered: List[Tuple[date, date]] = []
+        self.columns: List[str] = []
+        self._meta_mtime = None
+        self.refresh()
+
+    @contextmanager
+    def file_lock(self, exclusive: bool = False):
+        """Lock the entry against other processes: shared to read, exclusive to write"""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, LOCK_FILE), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Reload the meta file if another process has rewritten it"""
+        meta_path = os.path.join(self.path, META_FILE)
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        self._meta_mtime = mtime
+        with open(meta_path) as f:
+            meta = json.load(f)
+        self.version = meta['version']
+        self.columns = meta['columns']
+        self.covered = [(date.fromisoformat(s), date.fromisoformat(e)) for s, e in meta['covered']]
+
+    def _data_dir(self, version: int) -> str:
+        return os.path.join(self.path, f"v{version}")
+
+    def read(self) -> Dict[str, np.ndarray]:
+        """Memory-map every stored column"""
+        if not self.columns:
+            return {}
+        data_dir = self._data_dir(self.version)
+        return {name: np.load(os.path.join(data_dir, name + ".npy"), mmap_mode='r')
+                for name in [TIME_COLUMN] + self.columns}
+
+    def write(self, arrays: Dict[str, np.ndarray], covered: List[Tuple[date, date]]):
+        """
+        Write a new version of the columns and switch the meta file over to it; the
+        caller holds the exclusive file lock
+        """
+        version = self.version + 1
+        os.makedirs(self.path, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix=".build-", dir=self.path)
+        try:
+            for name, values in arrays.items():
+                np.save(os.path.join(build_dir, name + ".npy"), values)
+            # Left over by a writer that died before switching the meta file over
+            shutil.rmtree(self._data_dir(version), ignore_errors=True)
+            os.replace(build_dir, self._data_dir(version))
+        except BaseException:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+
+        meta = {
+            'version': version,
+            'columns': [name for name in arrays if name != TIME_COLUMN],
+            'covered': [[s.isoformat(), e.isoformat()] for s, e in covered],
+        }
+        meta_path = os.path.join(self.path, META_FILE)
+        fd, tmp_path = tempfile.mkstemp(prefix=META_FILE, suffix=".tmp", dir=self.path)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+        self._meta_mtime = os.stat(meta_path).st_mtime_ns
+        self.version = version
+        self.columns = meta['columns']
+        self.covered = covered
+
+        # Keep the previous version: another process may have read the old meta file
+        # and not mapped its columns yet. Mapped files stay readable after removal.
+        for name in os.listdir(self.path):
+            match = re.fullmatch(r'v(\d+)', name)
+            if match and int(match.group(1)) < version - 1:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+
+class BarCache:
+    """
+    Local columnar cache of historical bars keyed by (source, symbol, interval).
+
+    Prices are stored as float64 and volumes as int64 in memory-mapped .npy files.
+    Only completed sessions are persisted, so a request only fetches the date gaps the
+    cache has not seen; bars of a session that has not closed yet in the exchange's
+    timezone are always fetched live. Each gap fetch also refetches one cached bar
+    next to it: adjusted prices are restated after every later dividend or split, and
+    when that bar has changed the whole entry is refetched so cached and new bars
+    stay on one adjustment basis.
+    """
+    _instance = None
+
+    def __init__(self, root_dir: str = DEFAULT_ROOT, clock: Callable[[], datetime] = _utc_now):
+        """
+        Args:
+            root_dir: Directory of the cache files, shared by every process
+            clock: Current timezone-aware time, used to tell completed sessions apart
+        """
+        self.root_dir = root_dir
+        self.clock = clock
+        os.makedirs(root_dir, exist_ok=True)
+        self._entries: Dict[Tuple[str, str, str], _CacheEntry] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'fetches': 0}
+
+    @classmethod
+    def getInstance(cls, **kwargs) -> 'BarCache':
+        if not cls._instance:
+            logger.info("Creating new BarCache instance")
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    def _entry(self, source: str, symbol: str, interval: str) -> _CacheEntry:
+        key = (source, symbol, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                safe_symbol = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+                entry = _CacheEntry(os.path.join(self.root_dir, source, interval, safe_symbol))
+                self._entries[key] = entry
+            return entry
+
+    def data_version(self, source: str, symbol: str, interval: str) -> int:
+        """Version number that changes whenever cached bars for the key are rewritten"""
+        entry = self._entry(source, symbol, interval)
+        with entry.lock, entry.file_lock():
+            entry.refresh()
+            return entry.version
+
+    def missing_ranges(self, source: str, symbol: str, interval: str, start, end) -> List[Tuple[date, date]]:
+        """
+        Date ranges a get() over [start, end] would fetch: the completed sessions not yet
+        cached, each with the cached bar next to it that is refetched to check for
+        restated history, plus, when the range reaches a session that has not closed
+        yet, the live part
+        """
+        start, end = _as_date(start), _as_date(end)
+        last_complete = last_completed_session(symbol, self.clock())
+        entry = self._entry(source, symbol, interval)
+        with entry.lock, entry.file_lock():
+            entry.refresh()
+            stored_end = min(end, last_complete)
+            gaps = _missing_ranges(entry.covered, start, stored_end) if start <= stored_end else []
+            times = entry.read().get(TIME_COLUMN) if gaps else None
+            ranges = [self._fetch_range(times, self._anchor(times, gap_start, gap_end), gap_start, gap_end)
+                      for gap_start, gap_end in gaps]
+        if end > last_complete:
+            ranges.append((max(start, last_complete + timedelta(days=1)), end))
+        return ranges
+
+    def get(self, source: str, symbol: str, interval: str, start, end, fetch: Fetcher) -> pd.DataFrame:
+        """
+        Get bars for an inclusive date range, fetching only what is not cached
+
+        Args:
+            source: Data source name (e.g., "yfinance", "futu")
+            symbol: Security symbol or code
+            interval: Bar interval (e.g., "1d", KLType.K_DAY)
+            start: First date of the range
+            end: Last date of the range (inclusive)
+            fetch: Called with (start, end) dates for every missing range
+
+        Returns:
+            pd.DataFrame: Bars indexed by time, prices as float64
+        """
+        start, end = _as_date(start), _as_date(end)
+        last_complete = last_completed_session(symbol, self.clock())
+        entry = self._entry(source, symbol, interval)
+
+        stored_end = min(end, last_complete)
+        with entry.lock:
+            with entry.file_lock():
+                entry.refresh()
+                gaps = _missing_ranges(entry.covered, start, stored_end) if start <= stored_end else []
+                if not gaps:
+                    frame = self._slice(entry.read(), start, stored_end)
+            if gaps:
+                # Another process may have filled the gaps while no lock was held
+                with entry.file_lock(exclusive=True):
+                    entry.refresh()
+                    gaps = _missing_ranges(entry.covered, start, stored_end) if start <= stored_end else []
+                    if gaps:
+                        self._fill(entry, symbol, gaps, fetch)
+                    frame = self._slice(entry.read(), start, stored_end)
+            self.stats['misses' if gaps else 'hits'] += 1
+
+        # Bars of the open session are still forming: fetch them live and keep them out of the cache
+        if end > last_complete:
+            self.stats['fetches'] += 1
+            live = fetch(max(start, last_complete + timedelta(days=1)), end)
+            if len(live):
+                frame = pd.concat([frame, live.astype({c: np.float64 for c in live.columns
+                                                       if live[c].dtype.kind == 'f'})])
+        return frame
+
+    def _fill(self, entry: _CacheEntry, symbol: str, gaps: List[Tuple[date, date]], fetch: Fetcher):
+        arrays = entry.read()
+        times = arrays.get(TIME_COLUMN)
+        frames = []
+        restated = False
+        for gap_start, gap_end in gaps:
+            # Refetch one cached bar next to the gap to check the source has not restated
+            # adjusted history (dividends and splits rewrite every earlier adjusted bar)
+            anchor = self._anchor(times, gap_start, gap_end)
+            fetch_start, fetch_end = self._fetch_range(times, anchor, gap_start, gap_end)
+            fetched = self._fetch(symbol, fetch, fetch_start, fetch_end)
+            if anchor is not None and self._restated(arrays, anchor, fetched):
+                restated = True
+                break
+            frames.append(fetched)
+
+        covered = _merge_ranges(entry.covered + gaps)
+        if restated:
+            # Cached bars are on an old adjustment basis: rewrite the whole entry
+            logger.info(f"Bar cache history of {symbol} was restated by its source; refetching it")
+            frames = [self._fetch(symbol, fetch, start, end) for start, end in covered]
+            arrays = {}
+
+        # Sources return empty frames with their usual columns when they have no bars
+        fetched_columns = list(frames[0].columns) if frames else []
+        frames = [frame for frame in frames if len(frame)]
+        if arrays and not len(arrays[TIME_COLUMN]):
+            arrays = {}
+        if frames:
+            new = pd.concat(frames)
+            columns = entry.columns if arrays else list(new.columns)
+            new_arrays = {TIME_COLUMN: new.index.values.astype('datetime64[ns]').astype(np.int64)}
+            for name in columns:
+                values = new[name].to_numpy()
+                new_arrays[name] = values.astype(np.float64 if values.dtype.kind == 'f' else np.int64)
+            if arrays:
+                arrays = {name: np.concatenate([arrays[name], new_arrays[name]]) for name in new_arrays}
+            else:
+                arrays = new_arrays
+            # Refetched anchor bars duplicate cached bars with the same values; keep one
+            order = np.argsort(arrays[TIME_COLUMN], kind='stable')
+            times = arrays[TIME_COLUMN][order]
+            keep = np.ones(len(times), dtype=bool)
+            keep[1:] = times[1:] != times[:-1]
+            arrays = {name: values[order][keep] for name, values in arrays.items()}
+        elif not arrays:
+            arrays = {TIME_COLUMN: np.empty(0, dtype=np.int64)}
+            arrays.update({name: np.empty(0, dtype=np.float64) for name in fetched_columns})
+
+        entry.write({name: np.asarray(values) for name, values in arrays.items()}, covered)
+
+    def _fetch(self, symbol: str, fetch: Fetcher, start: date, end: date) -> pd.DataFrame:
+        logger.info(f"Bar cache miss for {symbol}: fetching {start} to {end}")
+        self.stats['fetches'] += 1
+        fetched = fetch(start, end)
+        if not len(fetched):
+            return fetched
+        # Only keep bars inside the range; sources may return extra rows
+        days = fetched.index.normalize()
+        return fetched[(days >= pd.Timestamp(start)) & (days <= pd.Timestamp(end))]
+
+    @staticmethod
+    def _anchor(times: Optional[np.ndarray], gap_start: date, gap_end: date) -> Optional[int]:
+        """Index of the cached bar just before the gap, or else just after it"""
+        if times is None or not len(times):
+            return None
+        before = np.searchsorted(times, np.datetime64(gap_start, 'ns').astype(np.int64), side='left') - 1
+        if before >= 0:
+            return int(before)
+        after = np.searchsorted(times, np.datetime64(gap_end + timedelta(days=1), 'ns').astype(np.int64),
+                                side='left')
+        return int(after) if after < len(times) else None
+
+    @staticmethod
+    def _fetch_range(times: Optional[np.ndarray], anchor: Optional[int], gap_start: date,
+                     gap_end: date) -> Tuple[date, date]:
+        """The gap widened to include its anchor bar"""
+        if anchor is None:
+            return gap_start, gap_end
+        anchor_day = pd.Timestamp(times[anchor]).date()
+        return min(gap_start, anchor_day), max(gap_end, anchor_day)
+
+    @staticmethod
+    def _restated(arrays: Dict[str, np.ndarray], anchor: int, fetched: pd.DataFrame) -> bool:
+        """Whether the refetched anchor bar has other prices than the cached one"""
+        if not len(fetched):
+            return False
+        match = np.flatnonzero(fetched.index.values.astype('datetime64[ns]').astype(np.int64)
+                               == arrays[TIME_COLUMN][anchor])
+        if not len(match):
+            return False
+        for name, values in arrays.items():
+            if name == TIME_COLUMN or values.dtype.kind != 'f' or name not in fetched:
+                continue
+            refetched = fetched[name].to_numpy(dtype=np.float64)[match[0]]
+            if not np.isclose(refetched, values[anchor], rtol=RESTATED_RTOL, atol=0.0, equal_nan=True):
+                return True
+        return False
+
+    @staticmethod
+    def _slice(arrays: Dict[str, np.ndarray], start: date, end: date) -> pd.DataFrame:
+        if not arrays:
+            return pd.DataFrame(index=pd.DatetimeIndex([]))
+        times = arrays[TIME_COLUMN]
+        lo = np.searchsorted(times, np.datetime64(start, 'ns').astype(np.int64), side='left')
+        hi = np.searchsorted(times, np.datetime64(end + timedelta(days=1), 'ns').astype(np.int64), side='left')
+        index = pd.DatetimeIndex(times[lo:hi].astype('datetime64[ns]'))
+        return pd.DataFrame({
+            name: values[lo:hi].astype(np.float64) if values.dtype.kind == 'f' else np.array(values[lo:hi])
+            for name, values in arrays.items() if name != TIME_COLUMN
+        }, index=index)
@@ -0,0 +1,114 @@
+import os
+import re
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from typing import Dict, List
+
+import pandas as pd
+import logging
+
+logger = logging.getLogger('trade_execution.services.bar_providers')
+
+# Yahoo Finance columns stored in the bar cache
+YF_COLUMNS = {
+    'Open': 'open',
+    'High': 'high',
+    'Low': 'low',
+    'Close': 'close',
+    'Adj Close': 'adj_close',
+    'Volume': 'volume',
+}
+BAR_COLUMNS = list(YF_COLUMNS.values())
+
+
+def empty_bars() -> pd.DataFrame:
+    return pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([]))
+
+
+def normalize_bars(data: pd.DataFrame) -> pd.DataFrame:
+    """Daily bars with the bar cache columns and a timezone-naive DatetimeIndex"""
+    if data.empty:
+        return empty_bars()
+    data = data.rename(columns=YF_COLUMNS).rename(columns=lambda name: str(name).lower().replace(' ', '_'))
+    if 'adj_close' not in data and 'close' in data:
+        data['adj_close'] = data['close']
+    data = data[BAR_COLUMNS]
+    data.index = pd.DatetimeIndex(data.index).tz_localize(None)
+    return data.sort_index()
+
+
+class BarProvider(ABC):
+    """Source of daily bars for many symbols over an inclusive date range"""
+    @abstractmethod
+    def download(self, symbols: List[str], start: date, end: date) -> Dict[str, pd.DataFrame]:
+        """
+        Download daily bars of every symbol
+
+        Returns:
+            Dict[str, pd.DataFrame]: Bars of each symbol (empty if it has none), with the
+            bar cache columns and a DatetimeIndex
+        """
+        pass
+
+
+class YahooBarProvider(BarProvider):
+    """Yahoo Finance bars, fetched for all symbols in one request"""
+    def download(self, symbols: List[str], start: date, end: date) -> Dict[str, pd.DataFrame]:
+        logger.info(f"Downloading data for {len(symbols)} symbol(s) from {start} to {end}")
+        import yfinance as yf
+
+        data = yf.download(symbols, start=start.strftime('%Y-%m-%d'),
+                           end=(end + timedelta(days=1)).strftime('%Y-%m-%d'),
+                           auto_adjust=False, group_by='column', progress=False)
+        bars = {}
+        for symbol in symbols:
+            frame = data
+            if isinstance(data.columns, pd.MultiIndex):
+                level = next((i for i in range(data.columns.nlevels)
+                              if symbol in data.columns.get_level_values(i)), None)
+                frame = data.xs(symbol, axis=1, level=level) if level is not None else pd.DataFrame()
+            # Symbols without data come back as all-NaN columns in multi-symbol downloads
+            bars[symbol] = normalize_bars(frame.dropna(how='all'))
+        return bars
+
+
+class LocalFileBarProvider(BarProvider):
+    """
+    Bars read from one file per symbol in a directory, for offline use
+
+    Files are named after the symbol (characters other than letters, digits, '.', '_'
+    and '-' replaced by '_') with a .csv or .parquet suffix, have a date column or
+    index and either Yahoo Finance or bar cache column names.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, symbol: str):
+        name = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+        for suffix in ('.parquet', '.csv'):
+            path = os.path.join(self.directory, name + suffix)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def read(self, symbol: str) -> pd.DataFrame:
+        path = self._path(symbol)
+        if path is None:
+            logger.warning(f"No local bar file for {symbol} in {self.directory}")
+            return empty_bars()
+        if path.endswith('.parquet'):
+            data = pd.read_parquet(path)
+        else:
+            data = pd.read_csv(path)
+        date_column = next((c for c in data.columns if str(c).lower() in ('date', 'datetime', 'time')), None)
+        if date_column is not None:
+            data = data.set_index(pd.to_datetime(data.pop(date_column)))
+        return normalize_bars(data)
+
+    def download(self, symbols: List[str], start: date, end: date) -> Dict[str, pd.DataFrame]:
+        bars = {}
+        for symbol in symbols:
+            data = self.read(symbol)
+            days = data.index.normalize()
+            bars[symbol] = data[(days >= pd.Timestamp(start)) & (days <= pd.Timestamp(end))]
+        return bars
@@ -0,0 +1,88 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+import logging
+
+from trade_execution.services.backtest_service import DEFAULT_WARMUP_DAYS, BacktestService
+
+logger = logging.getLogger('trade_execution.services.data_warmup')
+
+
+class DataWarmup:
+    """
+    Keeps the bar cache warm for a configured symbol universe.
+
+    A background thread fetches the universe's completed daily bars with one bulk
+    request when started and then again every ``interval`` seconds, so backtests on
+    those symbols read memory-mapped bars instead of waiting on a download.
+    """
+    _instance = None
+
+    def __init__(self, symbols: List[str], lookback_days: int = DEFAULT_WARMUP_DAYS, interval: float = 0):
+        """
+        Args:
+            symbols: Symbol universe to keep cached
+            lookback_days: History to cache, in days before today
+            interval: Seconds between refreshes; 0 to warm up once at startup
+        """
+        self.symbols = list(symbols)
+        self.lookback_days = lookback_days
+        self.interval = interval
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def getInstance(cls, **kwargs) -> 'DataWarmup':
+        if not cls._instance:
+            logger.info("Creating new DataWarmup instance")
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    @classmethod
+    def getActiveInstance(cls) -> Optional['DataWarmup']:
+        """Return the configured warm-up job, or None if no universe is configured"""
+        return cls._instance
+
+    def run(self) -> Dict[str, Any]:
+        """Warm up the cache now; concurrent calls wait for the running one"""
+        with self._lock:
+            report = BacktestService.warm_up(self.symbols, self.lookback_days)
+            self.last_report = report
+            self.last_error = None
+            return report
+
+    def start(self):
+        """Start the background warm-up thread"""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._loop, name="bar-cache-warmup", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            try:
+                self.run()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Bar cache warm-up failed: {str(e)}")
+            if not self.interval or self._stopped.wait(self.interval):
+                return
+
+    def close(self):
+        """Stop refreshing; a warm-up in progress is not waited for (the thread is a daemon)"""
+        self._stopped.set()
+        self._thread = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'symbols': self.symbols,
+            'lookback_days': self.lookback_days,
+            'interval': self.interval,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'last_report': self.last_report,
+            'last_error': self.last_error,
+        }
@@ -0,0 +1,403 @@
+import heapq
+import itertools
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import logging
+
+from trade_execution.services.market_data_journal import ORDER_BOOK, JournalReader
+
+logger = logging.getLogger('trade_execution.services.fill_simulator')
+
+BUY = "BUY"
+SELL = "SELL"
+
+# Order statuses, named as in models.Order.OrderStatus
+SUBMITTED = "SUBMITTED"
+FILLED_PART = "FILLED_PART"
+FILLED_ALL = "FILLED_ALL"
+CANCELLED_PART = "CANCELLED_PART"
+CANCELLED_ALL = "CANCELLED_ALL"
+
+MAKER = "maker"
+TAKER = "taker"
+
+# Event kinds of the exchange-side event queue
+_SUBMIT = 0
+_CANCEL = 1
+
+# Relative tolerance when matching an order price to a book level
+PRICE_TOLERANCE = 1e-9
+
+
+class BookSnapshots:
+    """
+    Array-backed sequence of order book snapshots of one security
+
+    Each row holds the top levels of both sides as delivered to OrderBookHandler
+    (best price first), so the replay indexes arrays instead of building level
+    objects.
+    """
+    def __init__(self, ts: np.ndarray, bid_price: np.ndarray, bid_volume: np.ndarray,
+                 ask_price: np.ndarray, ask_volume: np.ndarray,
+                 n_bid: Optional[np.ndarray] = None, n_ask: Optional[np.ndarray] = None):
+        self.ts = np.ascontiguousarray(ts, dtype=np.int64)
+        self.bid_price = np.ascontiguousarray(bid_price, dtype=np.float64)
+        self.bid_volume = np.ascontiguousarray(bid_volume, dtype=np.float64)
+        self.ask_price = np.ascontiguousarray(ask_price, dtype=np.float64)
+        self.ask_volume = np.ascontiguousarray(ask_volume, dtype=np.float64)
+        depth = self.bid_price.shape[1]
+        self.n_bid = (np.full(len(self.ts), depth) if n_bid is None else np.asarray(n_bid)).astype(np.int64)
+        self.n_ask = (np.full(len(self.ts), depth) if n_ask is None else np.asarray(n_ask)).astype(np.int64)
+        if np.any(np.diff(self.ts) < 0):
+            raise ValueError("Book snapshots must be in timestamp order")
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def from_records(cls, records: np.ndarray) -> 'BookSnapshots':
+        """Snapshots of journal ORDER_BOOK records of one security"""
+        return cls(records['ts'], records['bid_price'], records['bid_volume'],
+                   records['ask_price'], records['ask_volume'], records['n_bid'], records['n_ask'])
+
+    @classmethod
+    def from_journal(cls, journal_dir: str, code: str, day: date) -> 'BookSnapshots':
+        """Snapshots of one security recorded by MarketDataJournal on one day"""
+        reader = JournalReader(journal_dir)
+        if code not in reader.codes:
+            raise ValueError(f"No journal data for {code}")
+        records = reader.open_segment(day, ORDER_BOOK)
+        records = records[records['code_id'] == reader.code_id(code)]
+        if len(records) == 0:
+            raise ValueError(f"No order book data for {code} on {day}")
+        # Equal timestamps keep their recorded order
+        return cls.from_records(records[np.argsort(records['ts'], kind='stable')])
+
+
+class SimOrder:
+    """State of one simulated order"""
+    def __init__(self, order_id: str, side: str, qty: float, price: Optional[float], submitted_ts: int):
+        self.order_id = order_id
+        self.side = side
+        self.qty = float(qty)
+        self.price = price
+        self.submitted_ts = submitted_ts
+        self.arrived_ts: Optional[int] = None
+        self.status = SUBMITTED
+        self.filled_qty = 0.0
+        self.notional = 0.0
+        # Displayed volume ahead of the order at its price, and that level's last seen volume
+        self.queue_ahead = 0.0
+        self.level_volume = 0.0
+        # Whether the order's price was the best on its side before the latest snapshot
+        self.was_at_touch = False
+        self.cancel_requested = False
+
+    @property
+    def remaining(self) -> float:
+        return self.qty - self.filled_qty
+
+    @property
+    def active(self) -> bool:
+        return self.status in (SUBMITTED, FILLED_PART)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'order_id': self.order_id,
+            'side': self.side,
+            'qty': self.qty,
+            'price': self.price,
+            'status': self.status,
+            'filled_qty': self.filled_qty,
+            'avg_price': self.notional / self.filled_qty if self.filled_qty else None,
+            'submitted_ts': self.submitted_ts,
+            'arrived_ts': self.arrived_ts,
+        }
+
+
+class FillSimulator:
+    """
+    Event-driven simulator that fills orders against recorded order book depth.
+
+    Orders reach the book ``latency_ns`` after they are submitted, through a heap of
+    timestamped exchange events merged with the book snapshots. Marketable orders
+    walk the opposite side level by level and are filled at each level's price, up to
+    its displayed volume; volume taken from a snapshot stays taken until the next one.
+    The rest of a limit order joins the back of the queue at its price. Its queue
+    position shrinks as displayed volume at that level decreases; decreases while the
+    level is the best price are taken to be trades, so any excess beyond the volume
+    ahead fills the order. Resting orders also fill when the opposite side moves
+    through their price. Market orders do not rest: their unfilled part is cancelled.
+
+    The simulated orders do not change later snapshots, so the impact of one order
+    lasts only until the next book update.
+    """
+    def __init__(self, books: BookSnapshots, latency_ns: int = 0, cancel_latency_ns: Optional[int] = None,
+                 commission: float = 0.0, min_commission: float = 0.0):
+        """
+        Args:
+            books: Recorded book snapshots to replay
+            latency_ns: Delay between submitting an order and its arrival at the book
+            cancel_latency_ns: Delay of cancel requests, defaults to ``latency_ns``
+            commission: Commission rate on filled notional
+            min_commission: Minimum commission per fill
+        """
+        self.books = books
+        self.latency_ns = int(latency_ns)
+        self.cancel_latency_ns = self.latency_ns if cancel_latency_ns is None else int(cancel_latency_ns)
+        self.commission = commission
+        self.min_commission = min_commission
+
+        self.orders: Dict[str, SimOrder] = {}
+        self._resting: List[SimOrder] = []
+        self._events: List[Tuple[int, int, int, SimOrder]] = []
+        self._sequence = itertools.count()
+        self._ids = itertools.count(1)
+        self._fills: List[Tuple[int, str, str, float, float, str, float]] = []
+        self._strategy = None
+
+        self.now = int(books.ts[0]) if len(books) else 0
+        self._row = -1
+        # Volume taken from each level of the current snapshot by simulated orders
+        depth = books.bid_price.shape[1]
+        self._bid_taken = np.zeros(depth)
+        self._ask_taken = np.zeros(depth)
+        self.position = 0.0
+        self.cash = 0.0
+        self.fees = 0.0
+
+    # Order entry, usable before run() to schedule orders and from strategy callbacks
+
+    def submit(self, side: str, qty: float, price: Optional[float] = None, ts: Optional[int] = None) -> str:
+        """
+        Submit an order; it reaches the book ``latency_ns`` after ``ts``
+
+        Args:
+            side: BUY or SELL
+            qty: Quantity
+            price: Limit price, None for a market order
+            ts: Submission time (ns), defaults to the current replay time
+
+        Returns:
+            str: The simulated order id
+
+        Raises:
+            ValueError: If the side or quantity is invalid
+        """
+        if side not in (BUY, SELL):
+            raise ValueError(f"Unknown order side: {side}")
+        if qty <= 0:
+            raise ValueError("Order quantity must be positive")
+        ts = self.now if ts is None else int(ts)
+        order = SimOrder(f"SIM{next(self._ids)}", side, qty, price, ts)
+        self.orders[order.order_id] = order
+        heapq.heappush(self._events, (ts + self.latency_ns, next(self._sequence), _SUBMIT, order))
+        return order.order_id
+
+    def cancel(self, order_id: str, ts: Optional[int] = None) -> bool:
+        """Request the cancellation of an order; it takes effect ``cancel_latency_ns`` later"""
+        order = self.orders.get(order_id)
+        if order is None or not order.active or order.cancel_requested:
+            return False
+        order.cancel_requested = True
+        ts = self.now if ts is None else int(ts)
+        heapq.heappush(self._events, (ts + self.cancel_latency_ns, next(self._sequence), _CANCEL, order))
+        return True
+
+    # Book access for strategies
+
+    def best_bid(self) -> Optional[float]:
+        row = self._row
+        return float(self.books.bid_price[row, 0]) if row >= 0 and self.books.n_bid[row] else None
+
+    def best_ask(self) -> Optional[float]:
+        row = self._row
+        return float(self.books.ask_price[row, 0]) if row >= 0 and self.books.n_ask[row] else None
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return bid if ask is None else ask
+        return (bid + ask) / 2
+
+    # Matching
+
+    def _level(self, prices: np.ndarray, count: int, price: float) -> int:
+        matches = np.flatnonzero(np.abs(prices[:count] - price) <= PRICE_TOLERANCE * max(abs(price), 1.0))
+        return int(matches[0]) if len(matches) else -1
+
+    def _fill(self, order: SimOrder, qty: float, price: float, liquidity: str):
+        order.filled_qty += qty
+        order.notional += qty * price
+        if order.remaining <= 1e-9:
+            order.filled_qty = order.qty
+            order.status = FILLED_ALL
+        else:
+            order.status = FILLED_PART
+        fee = max(qty * price * self.commission, self.min_commission) if (self.commission or self.min_commission) else 0.0
+        sign = 1.0 if order.side == BUY else -1.0
+        self.position += sign * qty
+        self.cash -= sign * qty * price + fee
+        self.fees += fee
+        self._fills.append((self.now, order.order_id, order.side, price, qty, liquidity, fee))
+        if self._strategy is not None and hasattr(self._strategy, 'on_fill'):
+            self._strategy.on_fill(self, self._fills[-1])
+
+    def _take(self, order: SimOrder, limit: Optional[float], fill_price: Optional[float], liquidity: str):
+        """Fill an order against the opposite side up to ``limit``, at each level's price or ``fill_price``"""
+        row = self._row
+        if order.side == BUY:
+            prices, volumes, count, taken = self.books.ask_price[row], self.books.ask_volume[row], self.books.n_ask[row], self._ask_taken
+        else:
+            prices, volumes, count, taken = self.books.bid_price[row], self.books.bid_volume[row], self.books.n_bid[row], self._bid_taken
+        for k in range(count):
+            if order.remaining <= 0:
+                break
+            price = prices[k]
+            if limit is not None and (price > limit if order.side == BUY else price < limit):
+                break
+            available = volumes[k] - taken[k]
+            if available <= 0:
+                continue
+            qty = min(order.remaining, available)
+            taken[k] += qty
+            self._fill(order, qty, float(price if fill_price is None else fill_price), liquidity)
+
+    def _arrive(self, order: SimOrder):
+        order.arrived_ts = self.now
+        if self._row < 0:
+            # Nothing to trade against before the first snapshot
+            if order.price is None:
+                order.status = CANCELLED_ALL
+                return
+        else:
+            self._take(order, order.price, None, TAKER)
+        if not order.active:
+            return
+        if order.price is None:
+            order.status = CANCELLED_PART if order.filled_qty else CANCELLED_ALL
+            return
+        order.queue_ahead = order.level_volume = self._own_level_volume(order)
+        self._resting.append(order)
+
+    def _own_level_volume(self, order: SimOrder) -> float:
+        """Displayed volume at the order's price on its own side, NaN if it is not known yet"""
+        row = self._row
+        if row < 0:
+            return float('nan')
+        if order.side == BUY:
+            prices, volumes, count = self.books.bid_price[row], self.books.bid_volume[row], self.books.n_bid[row]
+            beyond = count == len(prices) and order.price < prices[count - 1]
+        else:
+            prices, volumes, count = self.books.ask_price[row], self.books.ask_volume[row], self.books.n_ask[row]
+            beyond = count == len(prices) and order.price > prices[count - 1]
+        level = self._level(prices, count, order.price)
+        if level >= 0:
+            return float(volumes[level])
+        return float('nan') if beyond else 0.0
+
+    def _at_touch(self, order: SimOrder) -> bool:
+        best = self.best_bid() if order.side == BUY else self.best_ask()
+        return best is not None and abs(best - order.price) <= PRICE_TOLERANCE * max(abs(order.price), 1.0)
+
+    def _update_resting(self):
+        """Advance the queue of every resting order after the book moved to a new snapshot"""
+        for order in self._resting:
+            if not order.active:
+                continue
+            # The opposite side trading through the order's price fills it at its price
+            opposite = self.best_ask() if order.side == BUY else self.best_bid()
+            if opposite is not None and (opposite <= order.price if order.side == BUY else opposite >= order.price):
+                self._take(order, order.price, order.price, MAKER)
+                if not order.active:
+                    continue
+
+            volume = self._own_level_volume(order)
+            if np.isnan(volume):
+                # The level left the displayed depth; keep the last known queue
+                continue
+            if np.isnan(order.level_volume):
+                order.level_volume = order.queue_ahead = volume
+                continue
+            decrease = order.level_volume - volume
+            if decrease > 0:
+                excess = decrease - order.queue_ahead
+                order.queue_ahead = max(order.queue_ahead - decrease, 0.0)
+                if excess > 0 and order.was_at_touch:
+                    self._fill(order, min(excess, order.remaining), order.price, MAKER)
+            order.level_volume = volume
+        self._resting = [order for order in self._resting if order.active]
+
+    def _process(self, kind: int, order: SimOrder):
+        if kind == _SUBMIT:
+            self._arrive(order)
+        elif order.active:
+            order.status = CANCELLED_PART if order.filled_qty else CANCELLED_ALL
+
+    def _drain(self, until: Optional[int]):
+        """Process exchange events before ``until`` (all events if None) against the current book"""
+        while self._events and (until is None or self._events[0][0] < until):
+            ts, _, kind, order = heapq.heappop(self._events)
+            self.now = max(self.now, ts)
+            self._process(kind, order)
+
+    def run(self, strategy: Any = None) -> Dict[str, Any]:
+        """
+        Replay the book snapshots, filling scheduled and strategy orders
+
+        Args:
+            strategy: Optional object with ``on_book(simulator, row)``, called after every
+                      snapshot, and optionally ``on_fill(simulator, fill)``; it trades
+                      through ``submit`` and ``cancel``
+
+        Returns:
+            Dict[str, Any]: Orders, columnar fills, final position, cash, fees and the
+            P&L marked to the final mid price
+        """
+        started = time.perf_counter()
+        self._strategy = strategy
+        books = self.books
+        ts = books.ts
+        for row in range(len(books)):
+            self._drain(int(ts[row]))
+            for order in self._resting:
+                order.was_at_touch = self._at_touch(order)
+            self._row = row
+            self.now = int(ts[row])
+            self._bid_taken[:] = 0.0
+            self._ask_taken[:] = 0.0
+            if self._resting:
+                self._update_resting()
+            if strategy is not None:
+                strategy.on_book(self, row)
+        self._drain(None)
+        elapsed = time.perf_counter() - started
+        logger.info(f"Replayed {len(books)} book snapshots with {len(self.orders)} orders and "
+                    f"{len(self._fills)} fills in {elapsed:.2f}s")
+        return self.report(elapsed)
+
+    def report(self, elapsed: Optional[float] = None) -> Dict[str, Any]:
+        fills = list(zip(*self._fills)) if self._fills else [[]] * 7
+        mark = self.mid()
+        return {
+            'snapshots': len(self.books),
+            'orders': [order.to_dict() for order in self.orders.values()],
+            'fills': {
+                'ts': list(fills[0]),
+                'order_id': list(fills[1]),
+                'side': list(fills[2]),
+                'price': list(fills[3]),
+                'qty': list(fills[4]),
+                'liquidity': list(fills[5]),
+                'fee': list(fills[6]),
+            },
+            'position': self.position,
+            'cash': self.cash,
+            'fees': self.fees,
+            'mark_price': mark,
+            'pnl': self.cash + self.position * mark if mark is not None else None,
+            'elapsed_seconds': elapsed,
+        }
@@ -0,0 +1,147 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger('trade_execution.services.graph_data')
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+
+def json_column(values: np.ndarray) -> list:
+    """List of a column's values with NaN and infinities replaced by None"""
+    values = np.asarray(values)
+    if values.dtype.kind != 'f':
+        return values.tolist()
+    finite = np.isfinite(values)
+    if finite.all():
+        return values.tolist()
+    column = values.astype(object)
+    column[~finite] = None
+    return column.tolist()
+
+
+def lttb_indices(values: np.ndarray, target: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets selection of ``target`` points of a series
+
+    The first and last points are always kept; each bucket in between contributes
+    the point forming the largest triangle with the previously selected point and
+    the average of the next bucket, which preserves the visual shape of the curve.
+    NaN values are treated as 0 for the selection.
+    """
+    n = len(values)
+    if target >= n:
+        return np.arange(n)
+    if target < 3:
+        return np.array([0, n - 1])[:target]
+    y = np.nan_to_num(np.asarray(values, dtype=np.float64))
+    x = np.arange(n, dtype=np.float64)
+    edges = np.linspace(1, n - 1, target - 1).astype(np.int64)
+
+    selected = np.empty(target, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(target - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[end:next_end].mean() if next_end > end else x[-1]
+        next_y = y[end:next_end].mean() if next_end > end else y[-1]
+        # Twice the triangle areas; the constant factor does not change the argmax
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def minmax_indices(values: np.ndarray, target: int) -> np.ndarray:
+    """
+    Min/max bucketing: the lowest and highest point of each of ``target // 2`` buckets
+
+    The first and last points are always kept. NaN values are never selected as a
+    bucket's extreme unless the whole bucket is NaN.
+    """
+    n = len(values)
+    if target >= n:
+        return np.arange(n)
+    y = np.asarray(values, dtype=np.float64)
+    buckets = max(target // 2, 1)
+    bucket = np.arange(n) * buckets // n
+    # Sorted by bucket then value, each bucket's run starts at its minimum and ends at its maximum
+    ascending = np.lexsort((np.nan_to_num(y, nan=np.inf), bucket))
+    descending = np.lexsort((np.nan_to_num(y, nan=-np.inf), bucket))
+    sorted_buckets = bucket[ascending]
+    first = np.searchsorted(sorted_buckets, np.arange(buckets), side='left')
+    last = np.searchsorted(sorted_buckets, np.arange(buckets), side='right') - 1
+    return np.unique(np.concatenate(([0, n - 1], ascending[first], descending[last])))
+
+
+def downsample_indices(values: np.ndarray, target: int, method: str = 'lttb',
+                       keep: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Bars to keep when drawing a series with about ``target`` points
+
+    Args:
+        values: Series that drives the selection (e.g., the price)
+        target: Number of points to select; bars in ``keep`` come on top of it
+        method: "lttb" or "minmax"
+        keep: Boolean mask of bars that are always kept (e.g., trade markers)
+
+    Returns:
+        np.ndarray: Ascending bar indices
+
+    Raises:
+        ValueError: If the method is unknown or the target is not positive
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    if target < 1:
+        raise ValueError("The downsampling target must be positive")
+    selected = lttb_indices(values, target) if method == 'lttb' else minmax_indices(values, target)
+    if keep is not None:
+        selected = np.union1d(selected, np.flatnonzero(keep))
+    return selected
+
+
+def columnar_graph_data(columns: Dict[str, np.ndarray], index: pd.DatetimeIndex,
+                        max_points: Optional[int] = None, method: str = 'lttb',
+                        driver: str = 'price', markers: tuple = ('buyPrice', 'sellPrice')) -> Dict[str, list]:
+    """
+    Columnar chart payload, optionally downsampled, with NaN as None
+
+    Args:
+        columns: Equal-length arrays keyed by column name
+        index: Bar timestamps, rendered as the 'date' column
+        max_points: Downsample to about this many points; None keeps every bar
+        method: Downsampling method, see downsample_indices
+        driver: Column whose shape guides the downsampling
+        markers: Columns whose non-NaN bars are always kept
+
+    Returns:
+        Dict[str, list]: 'date' and every column as JSON-ready lists
+
+    Raises:
+        ValueError: If the downsampling method or target is invalid
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    if max_points is not None and max_points < 1:
+        raise ValueError("max_points must be positive")
+    n = len(index)
+    rows = None
+    if max_points is not None and max_points < n:
+        keep = np.zeros(n, dtype=bool)
+        for name in markers:
+            if name in columns:
+                keep |= ~np.isnan(columns[name])
+        rows = downsample_indices(columns[driver], max_points, method, keep)
+        logger.debug(f"Downsampled graph data from {n} to {len(rows)} points with {method}")
+
+    dates = index.strftime('%Y-%m-%d').to_numpy()
+    graph_data = {'date': (dates if rows is None else dates[rows]).tolist()}
+    for name, values in columns.items():
+        values = np.asarray(values)
+        graph_data[name] = json_column(values if rows is None else values[rows])
+    return graph_data
@@ -0,0 +1,205 @@
+import threading
+import weakref
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from futu import RET_OK, AuType, KLType
+import logging
+
+from trade_execution.models.ContextPool import ContextPool
+
+logger = logging.getLogger('trade_execution.services.history_fetcher')
+
+# Rough number of bars per calendar day, used to size date chunks to about one page
+BARS_PER_DAY = {
+    KLType.K_1M: 400,
+    KLType.K_3M: 140,
+    KLType.K_5M: 80,
+    KLType.K_15M: 28,
+    KLType.K_30M: 14,
+    KLType.K_60M: 7,
+    KLType.K_DAY: 1,
+    KLType.K_WEEK: 1 / 5,
+    KLType.K_MON: 1 / 20,
+    KLType.K_QUARTER: 1 / 60,
+    KLType.K_YEAR: 1 / 250,
+}
+
+EMPTY_COLUMNS = ['code', 'time_key', 'open', 'close', 'high', 'low', 'volume', 'turnover']
+
+# OpenD allows 60 history k-line requests per 30 seconds
+REQUESTS_PER_WINDOW = 60
+WINDOW_SECONDS = 30.0
+
+
+class RateLimiter:
+    """Sliding-window limiter shared by the fetch threads"""
+    def __init__(self, max_requests: int = REQUESTS_PER_WINDOW, window: float = WINDOW_SECONDS):
+        self.max_requests = max_requests
+        self.window = window
+        self._sent: deque = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0] >= self.window:
+                    self._sent.popleft()
+                if len(self._sent) < self.max_requests:
+                    self._sent.append(now)
+                    return
+                wait = self.window - (now - self._sent[0])
+            time.sleep(wait)
+
+
+# Chunks fetched at once per quote context
+WORKERS_PER_CONTEXT = 4
+
+# OpenD enforces the limit per connection, so fetchers share one limiter per context;
+# a limiter goes away with its context
+_rate_limiters: "weakref.WeakKeyDictionary[Any, RateLimiter]" = weakref.WeakKeyDictionary()
+_rate_limiters_lock = threading.Lock()
+
+
+def rate_limiter_for(context) -> RateLimiter:
+    """The limiter shared by every request on one OpenD context"""
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(context)
+        if limiter is None:
+            limiter = _rate_limiters[context] = RateLimiter()
+        return limiter
+
+
+class HistoryKlineFetcher:
+    """
+    Fetches a long history k-line range as concurrent date chunks.
+
+    Each chunk follows ``page_req_key`` until OpenD has returned every bar, so nothing
+    is truncated at ``max_count``; chunks run in a small thread pool under the OpenD
+    request rate limit and are stitched into one de-duplicated frame. Given a
+    ContextPool, each chunk runs on its own routed context under that context's
+    rate limit, so a pool of N contexts fetches up to N chunks at once.
+    """
+    def __init__(self, quote_context, max_workers: Optional[int] = None, max_count: int = 1000,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """
+        Args:
+            quote_context: Quote context or ContextPool of quote contexts
+            max_workers: Chunks fetched at once; by default WORKERS_PER_CONTEXT per context
+            max_count: Bars per page
+            rate_limiter: Limiter of every request; by default each context's own
+        """
+        self.quote_context = quote_context
+        if max_workers is None:
+            size = quote_context.size if isinstance(quote_context, ContextPool) else 1
+            max_workers = WORKERS_PER_CONTEXT * size
+        self.max_workers = max_workers
+        self.max_count = max_count
+        self.rate_limiter = rate_limiter
+
+    @contextmanager
+    def _context(self):
+        """A context for the pages of one chunk, which follow each other on one connection"""
+        if isinstance(self.quote_context, ContextPool):
+            with self.quote_context.acquire() as context:
+                yield context
+        else:
+            yield self.quote_context
+
+    def chunk_range(self, start: date, end: date, ktype: str) -> List[Tuple[date, date]]:
+        """Split [start, end] into consecutive date chunks of about one page each"""
+        chunk_days = max(1, int(self.max_count / BARS_PER_DAY.get(ktype, 1)))
+        chunks = []
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(end, chunk_start + timedelta(days=chunk_days - 1))
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end + timedelta(days=1)
+        return chunks
+
+    def _quota(self) -> Tuple[int, int, List[Dict]]:
+        ret, data = self.quote_context.get_history_kl_quota(get_detail=True)
+        if ret != RET_OK:
+            raise Exception(f"Failed to get history k-line quota: {data}")
+        return data
+
+    def _fetch_chunk(self, code: str, start: date, end: date, ktype: str, autype: str) -> Tuple[List[pd.DataFrame], int]:
+        pages = []
+        page_req_key = None
+        with self._context() as quote_context:
+            rate_limiter = self.rate_limiter or rate_limiter_for(quote_context)
+            while True:
+                rate_limiter.acquire()
+                ret, data, page_req_key = quote_context.request_history_kline(
+                    code=code,
+                    start=start.strftime("%Y-%m-%d"),
+                    end=end.strftime("%Y-%m-%d"),
+                    ktype=ktype,
+                    autype=autype,
+                    max_count=self.max_count,
+                    page_req_key=page_req_key
+                )
+                if ret != RET_OK:
+                    raise Exception(f"Failed to get historical data for {code} {start} to {end}: {data}")
+                pages.append(data)
+                if page_req_key is None:
+                    return pages, len(pages)
+
+    def fetch(self, code: str, start: date, end: date, ktype: str = KLType.K_DAY,
+              autype: str = AuType.QFQ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Fetch every k-line of an inclusive date range
+
+        Args:
+            code: Security code
+            start: First date of the range
+            end: Last date of the range
+            ktype: K-line period
+            autype: Price adjustment type
+
+        Returns:
+            Tuple[pd.DataFrame, Dict[str, Any]]: K-lines sorted by time_key, and a report
+            with chunk/page counts and the history quota consumed
+
+        Raises:
+            Exception: If the quota is exhausted or any page request fails
+        """
+        used_before, remain_before, detail = self._quota()
+        if remain_before <= 0 and code not in {item['code'] for item in detail}:
+            raise Exception(f"History k-line quota exhausted, cannot fetch {code}")
+
+        chunks = self.chunk_range(start, end, ktype)
+        results = []
+        if chunks:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+                results = list(executor.map(
+                    lambda chunk: self._fetch_chunk(code, chunk[0], chunk[1], ktype, autype), chunks
+                ))
+
+        frames = [page for pages, _ in results for page in pages if len(page)]
+        if frames:
+            data = pd.concat(frames, ignore_index=True)
+            data = data.drop_duplicates(subset='time_key', keep='first')
+            data = data.sort_values('time_key').reset_index(drop=True)
+        else:
+            data = results[0][0][0] if results else pd.DataFrame(columns=EMPTY_COLUMNS)
+
+        used_after, remain_after, _ = self._quota()
+        report = {
+            'code': code,
+            'ktype': ktype,
+            'chunks': len(chunks),
+            'pages': sum(count for _, count in results),
+            'rows': len(data),
+            'quota_used': used_after,
+            'quota_remaining': remain_after,
+            'quota_consumed': used_after - used_before,
+        }
+        logger.info(f"Fetched history k-lines: {report}")
+        return data, report
@@ -0,0 +1,400 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import logging
+
+logger = logging.getLogger('trade_execution.services.market_data_journal')
+
+# Number of price levels stored per side of the book
+BOOK_DEPTH = 10
+
+ORDER_BOOK = "order_book"
+ORDER = "order"
+
+# Fixed-width record layouts. Timestamps are local receive times in epoch nanoseconds.
+ORDER_BOOK_DTYPE = np.dtype([
+    ('ts', '<i8'),
+    ('code_id', '<u4'),
+    ('n_bid', 'u1'),
+    ('n_ask', 'u1'),
+    ('bid_price', '<f8', (BOOK_DEPTH,)),
+    ('bid_volume', '<i8', (BOOK_DEPTH,)),
+    ('bid_orders', '<i4', (BOOK_DEPTH,)),
+    ('ask_price', '<f8', (BOOK_DEPTH,)),
+    ('ask_volume', '<i8', (BOOK_DEPTH,)),
+    ('ask_orders', '<i4', (BOOK_DEPTH,)),
+])
+
+ORDER_DTYPE = np.dtype([
+    ('ts', '<i8'),
+    ('code_id', '<u4'),
+    ('order_id', 'S24'),
+    ('order_status', 'S20'),
+    ('trd_side', 'S12'),
+    ('qty', '<f8'),
+    ('price', '<f8'),
+])
+
+RECORD_DTYPES = {
+    ORDER_BOOK: ORDER_BOOK_DTYPE,
+    ORDER: ORDER_DTYPE,
+}
+
+# Every segment file starts with a 64 byte header followed by packed records
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('itemsize', '<u4'),
+    ('count', '<u8'),
+    ('reserved', 'V40'),
+])
+HEADER_SIZE = HEADER_DTYPE.itemsize
+MAGIC = b"TEJRNL01"
+VERSION = 1
+
+CODES_FILE = "codes.json"
+SEGMENT_SUFFIX = ".seg"
+
+
+def _segment_path(root_dir: str, day: date, kind: str) -> str:
+    return os.path.join(root_dir, day.strftime("%Y%m%d"), kind + SEGMENT_SUFFIX)
+
+
+def _level_fields(level: Any) -> Tuple[float, int, int]:
+    """Extract (price, volume, order count) from a Futu order book level"""
+    if isinstance(level, dict):
+        return (
+            level.get('Price', level.get('price', 0.0)),
+            level.get('Volume', level.get('volume', 0)),
+            level.get('OrderNum', level.get('order_num', 0)),
+        )
+    price = level[0]
+    volume = level[1] if len(level) > 1 else 0
+    orders = level[2] if len(level) > 2 else 0
+    return price, volume, orders
+
+
+class _SegmentWriter:
+    """
+    Append-only writer for a single memory-mapped segment file.
+    The file is grown geometrically and remapped when it runs out of space.
+    """
+    def __init__(self, path: str, dtype: np.dtype, initial_capacity: int):
+        self.path = path
+        self.dtype = dtype
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE:
+            header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)[0]
+            if header['magic'] != MAGIC or header['itemsize'] != dtype.itemsize:
+                raise ValueError(f"Incompatible journal segment: {path}")
+            self.count = int(header['count'])
+            capacity = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+        else:
+            self.count = 0
+            capacity = 0
+
+        self._header = None
+        self._records = None
+        self._map(max(capacity, initial_capacity, 1))
+
+    def _map(self, capacity: int):
+        self.close()
+        size = HEADER_SIZE + capacity * self.dtype.itemsize
+        with open(self.path, 'ab') as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self.capacity = capacity
+        self._header = np.memmap(self.path, dtype=HEADER_DTYPE, mode='r+', shape=(1,))
+        self._header['magic'] = MAGIC
+        self._header['version'] = VERSION
+        self._header['itemsize'] = self.dtype.itemsize
+        self._header['count'] = self.count
+        self._records = np.memmap(self.path, dtype=self.dtype, mode='r+',
+                                  offset=HEADER_SIZE, shape=(capacity,))
+
+    def append(self, batch: np.ndarray):
+        required = self.count + len(batch)
+        if required > self.capacity:
+            capacity = self.capacity
+            while capacity < required:
+                capacity *= 2
+            self._map(capacity)
+        self._records[self.count:required] = batch
+        self.count = required
+        # Publish the new count only after the records are in place
+        self._header['count'] = self.count
+
+    def flush(self):
+        if self._records is not None:
+            self._records.flush()
+            self._header.flush()
+
+    def close(self):
+        if self._records is not None:
+            self.flush()
+            # Drop the maps so the file can be grown or rotated
+            self._records = None
+            self._header = None
+
+
+class MarketDataJournal:
+    """
+    Optional recorder for order book and order status pushes.
+
+    Push callbacks only append raw updates to an in-memory queue; a background
+    writer thread converts them in batches into fixed-width records and writes
+    them into memory-mapped, daily-rotated segment files under ``root_dir``.
+    """
+    _instance = None
+
+    def __init__(self, root_dir: str, batch_size: int = 1024, flush_interval: float = 0.5,
+                 initial_capacity: int = 65536, max_pending: int = 1_000_000):
+        self.root_dir = root_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.initial_capacity = initial_capacity
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.written = {ORDER_BOOK: 0, ORDER: 0}
+
+        os.makedirs(root_dir, exist_ok=True)
+        self._code_ids: Dict[str, int] = {}
+        self._load_codes()
+
+        self._pending = {ORDER_BOOK: deque(), ORDER: deque()}
+        self._writers: Dict[Tuple[date, str], _SegmentWriter] = {}
+        self._wakeup = threading.Event()
+        # Drain passes in progress; their popped updates are off the queues but not yet written
+        self._in_flight = 0
+        self._idle = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="market-data-journal", daemon=True)
+        self._thread.start()
+        logger.info(f"Market data journal recording to {root_dir}")
+
+    @classmethod
+    def getInstance(cls, **kwargs) -> 'MarketDataJournal':
+        if not cls._instance:
+            logger.info("Creating new MarketDataJournal instance")
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    @classmethod
+    def getActiveInstance(cls) -> Optional['MarketDataJournal']:
+        """Return the configured journal, or None if recording is disabled"""
+        return cls._instance
+
+    # Callback side: these must never touch the disk
+
+    def record_order_book(self, code: str, bid_list: List, ask_list: List, ts: Optional[int] = None):
+        """Queue an order book update for recording"""
+        self._enqueue(ORDER_BOOK, (ts or time.time_ns(), code, bid_list, ask_list))
+
+    def record_order(self, order_data: Dict[str, Any], ts: Optional[int] = None):
+        """Queue an order status update for recording"""
+        self._enqueue(ORDER, (ts or time.time_ns(), order_data))
+
+    def _enqueue(self, kind: str, item: Tuple):
+        pending = self._pending[kind]
+        if len(pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        pending.append(item)
+        if len(pending) >= self.batch_size:
+            self._wakeup.set()
+
+    # Writer side
+
+    def _load_codes(self):
+        path = os.path.join(self.root_dir, CODES_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                codes = json.load(f)
+            self._code_ids = {code: i for i, code in enumerate(codes)}
+
+    def _save_codes(self):
+        codes = sorted(self._code_ids, key=self._code_ids.get)
+        path = os.path.join(self.root_dir, CODES_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(codes, f)
+        os.replace(tmp_path, path)
+
+    def _code_id(self, code: str) -> int:
+        code_id = self._code_ids.get(code)
+        if code_id is None:
+            code_id = len(self._code_ids)
+            self._code_ids[code] = code_id
+            self._save_codes()
+        return code_id
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self._drain()
+            except Exception as e:
+                logger.error(f"Market data journal write failed: {str(e)}")
+        self._drain()
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+    def _drain(self):
+        with self._idle:
+            self._in_flight += 1
+        try:
+            for kind, pending in self._pending.items():
+                items = []
+                while pending:
+                    items.append(pending.popleft())
+                if not items:
+                    continue
+                convert = self._order_book_batch if kind == ORDER_BOOK else self._order_batch
+                try:
+                    batch = convert(items)
+                    self._write(kind, batch)
+                except Exception:
+                    self.dropped += len(items)
+                    raise
+                self.written[kind] += len(batch)
+            for writer in self._writers.values():
+                writer.flush()
+        finally:
+            with self._idle:
+                self._in_flight -= 1
+                self._idle.notify_all()
+
+    def _order_book_batch(self, items: List[Tuple]) -> np.ndarray:
+        batch = np.zeros(len(items), dtype=ORDER_BOOK_DTYPE)
+        for i, (ts, code, bid_list, ask_list) in enumerate(items):
+            record = batch[i]
+            record['ts'] = ts
+            record['code_id'] = self._code_id(code)
+            for side, levels in (('bid', bid_list or []), ('ask', ask_list or [])):
+                levels = levels[:BOOK_DEPTH]
+                record['n_' + side] = len(levels)
+                for j, level in enumerate(levels):
+                    price, volume, orders = _level_fields(level)
+                    record[side + '_price'][j] = price
+                    record[side + '_volume'][j] = volume
+                    record[side + '_orders'][j] = orders
+        return batch
+
+    def _order_batch(self, items: List[Tuple]) -> np.ndarray:
+        batch = np.zeros(len(items), dtype=ORDER_DTYPE)
+        for i, (ts, order_data) in enumerate(items):
+            record = batch[i]
+            record['ts'] = ts
+            record['code_id'] = self._code_id(str(order_data.get('code', '')))
+            record['order_id'] = str(order_data.get('order_id', '')).encode()
+            record['order_status'] = str(order_data.get('order_status', '')).encode()
+            record['trd_side'] = str(order_data.get('trd_side', '')).encode()
+            record['qty'] = order_data.get('qty') or 0
+            record['price'] = order_data.get('price') or 0.0
+        return batch
+
+    def _write(self, kind: str, batch: np.ndarray):
+        # Split the batch on local calendar day so each day lands in its own segment
+        first = datetime.fromtimestamp(int(batch['ts'][0]) / 1e9).astimezone()
+        offset = int(first.utcoffset().total_seconds() * 1e9)
+        days = (batch['ts'] + offset) // 86_400_000_000_000
+        boundaries = np.flatnonzero(days[1:] != days[:-1]) + 1
+        for chunk in np.split(batch, boundaries):
+            day = datetime.fromtimestamp(int(chunk['ts'][0]) / 1e9).date()
+            self._writer(day, kind).append(chunk)
+
+    def _writer(self, day: date, kind: str) -> _SegmentWriter:
+        key = (day, kind)
+        writer = self._writers.get(key)
+        if writer is None:
+            # Rotate: close segments of previous days for this record kind
+            for old_key in [k for k in self._writers if k[1] == kind]:
+                self._writers.pop(old_key).close()
+            writer = _SegmentWriter(_segment_path(self.root_dir, day, kind),
+                                    RECORD_DTYPES[kind], self.initial_capacity)
+            self._writers[key] = writer
+        return writer
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until everything queued so far has been written"""
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while any(self._pending.values()) or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._wakeup.set()
+                self._idle.wait(min(remaining, 0.01))
+
+    def close(self):
+        """Write out pending updates and stop the writer thread"""
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join()
+        logger.info(f"Market data journal closed. Written: {self.written}, dropped: {self.dropped}")
+        if MarketDataJournal._instance is self:
+            MarketDataJournal._instance = None
+
+
+class JournalReader:
+    """
+    Reads journal segments back as NumPy structured arrays.
+    Arrays are memory-mapped views of the segment files, so no records are copied.
+    """
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        path = os.path.join(root_dir, CODES_FILE)
+        self.codes: List[str] = []
+        if os.path.exists(path):
+            with open(path) as f:
+                self.codes = json.load(f)
+
+    def code_id(self, code: str) -> int:
+        return self.codes.index(code)
+
+    def days(self) -> List[date]:
+        days = []
+        for name in sorted(os.listdir(self.root_dir)):
+            if os.path.isdir(os.path.join(self.root_dir, name)) and name.isdigit():
+                days.append(datetime.strptime(name, "%Y%m%d").date())
+        return days
+
+    def open_segment(self, day: date, kind: str) -> np.ndarray:
+        """Map the records of one segment without copying them"""
+        path = _segment_path(self.root_dir, day, kind)
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)[0]
+        dtype = RECORD_DTYPES[kind]
+        if header['magic'] != MAGIC or header['itemsize'] != dtype.itemsize:
+            raise ValueError(f"Incompatible journal segment: {path}")
+        count = int(header['count'])
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(count,))
+
+    def iter_segments(self, kind: str, start: Optional[date] = None,
+                      end: Optional[date] = None) -> Iterator[Tuple[date, np.ndarray]]:
+        """
+        Iterate over daily segments of one record kind
+
+        Args:
+            kind: ORDER_BOOK or ORDER
+            start: First day to include (inclusive)
+            end: Last day to include (inclusive)
+
+        Yields:
+            Tuple[date, np.ndarray]: The day and its records as a memory-mapped structured array
+        """
+        for day in self.days():
+            if (start and day < start) or (end and day > end):
+                continue
+            if os.path.exists(_segment_path(self.root_dir, day, kind)):
+                yield day, self.open_segment(day, kind)
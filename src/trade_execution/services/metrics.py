@@ -0,0 +1,138 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from trade_execution.services.signal_kernels import RollingSums
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Window of the rolling Sharpe ratio and volatility series, about one quarter of daily bars
+DEFAULT_ROLLING_WINDOW = 63
+
+# Rolling standard deviations of returns below this are treated as zero
+FLAT_VOLATILITY = 1e-7
+
+# Scalar metrics of every backtest; 'turnover' is reported too when share counts are known
+METRIC_NAMES = ('net_performance', 'annualized_return', 'volatility', 'sharpe_ratio', 'sortino_ratio',
+                'calmar_ratio', 'max_drawdown', 'exposure', 'win_rate', 'avg_profit_per_trade', 'num_trades',
+                'final_value', 'initial_value')
+
+
+def analyze_equity(total: np.ndarray, initial_capital: float, position_changes: Optional[np.ndarray] = None,
+                   shares: Optional[np.ndarray] = None, prices: Optional[np.ndarray] = None,
+                   rolling_window: Optional[int] = None,
+                   periods_per_year: float = TRADING_DAYS_PER_YEAR) -> Dict[str, Any]:
+    """
+    Performance and risk metrics of a portfolio value curve, on NumPy arrays
+
+    Bar returns and the running peak are computed once and every statistic is
+    derived from them; the inputs are never modified.
+
+    Args:
+        total: Portfolio value of every bar
+        initial_capital: Starting capital
+        position_changes: Position change of every bar (non-zero on trade bars)
+        shares: Shares held after every bar; gives exposure and turnover exactly
+        prices: Price of every bar, required with ``shares`` for turnover
+        rolling_window: Window of the rolling Sharpe ratio and volatility series,
+                        None to skip them
+        periods_per_year: Bars per year, used to annualize
+
+    Returns:
+        Dict[str, Any]: 'metrics' with every name in METRIC_NAMES (and 'turnover', the
+        annualized traded value over the average portfolio value, when ``shares`` and
+        ``prices`` are given), and 'series' with per-bar 'returns' and 'drawdown', plus
+        'rolling_sharpe' and 'rolling_volatility' when a rolling window is given
+    """
+    total = np.asarray(total, dtype=np.float64)
+    n = len(total)
+
+    returns = np.empty(n)
+    returns[0] = np.nan
+    returns[1:] = total[1:] / total[:-1] - 1
+    tail = returns[1:]
+
+    net_performance = (total[-1] - initial_capital) / initial_capital
+    years = n / periods_per_year
+    annualized_return = (1 + net_performance) ** (1 / years) - 1 if years > 0 else 0
+
+    root_periods = np.sqrt(periods_per_year)
+    volatility = tail.std(ddof=1) * root_periods if n > 2 else 0
+    sharpe_ratio = annualized_return / volatility if volatility > 0 else 0
+    # Downside deviation against a zero target
+    downside = np.sqrt(np.mean(np.minimum(tail, 0.0) ** 2)) * root_periods if n > 1 else 0
+    sortino_ratio = annualized_return / downside if downside > 0 else 0
+
+    # Drawdown of the value curve relative to its running peak
+    drawdown = total / np.maximum.accumulate(total) - 1
+    max_drawdown = drawdown.min()
+    calmar_ratio = annualized_return / -max_drawdown if max_drawdown < 0 else 0
+
+    metrics = {
+        'net_performance': float(net_performance),
+        'annualized_return': float(annualized_return),
+        'volatility': float(volatility),
+        'sharpe_ratio': float(sharpe_ratio),
+        'sortino_ratio': float(sortino_ratio),
+        'calmar_ratio': float(calmar_ratio),
+        'max_drawdown': float(max_drawdown),
+    }
+
+    changes = None if position_changes is None else np.asarray(position_changes, dtype=np.float64)
+    if shares is not None:
+        shares = np.asarray(shares, dtype=np.float64)
+        metrics['exposure'] = float(np.count_nonzero(shares) / n)
+    elif changes is not None:
+        metrics['exposure'] = float(np.count_nonzero(np.cumsum(np.nan_to_num(changes)) > 0) / n)
+    else:
+        metrics['exposure'] = 0.0
+    if shares is not None and prices is not None:
+        traded = np.abs(np.diff(shares, prepend=0.0)) * np.asarray(prices, dtype=np.float64)
+        metrics['turnover'] = float(traded.sum() / total.mean() / years) if years > 0 else 0.0
+
+    # As in the original calculate_metrics, trades are the bars with a non-zero (or NaN) change
+    trade_bars = np.flatnonzero(changes != 0) if changes is not None else np.empty(0, dtype=np.int64)
+    num_trades = len(trade_bars)
+    if num_trades > 0:
+        at_trades = total[trade_bars]
+        win_rate = np.count_nonzero(at_trades[1:] / at_trades[:-1] > 1) / num_trades
+        avg_profit_per_trade = net_performance / num_trades
+    else:
+        win_rate = 0
+        avg_profit_per_trade = 0
+    metrics.update({
+        'win_rate': float(win_rate),
+        'avg_profit_per_trade': float(avg_profit_per_trade),
+        'num_trades': int(num_trades),
+        'final_value': float(total[-1]),
+        'initial_value': float(initial_capital),
+    })
+
+    series = {'returns': returns, 'drawdown': drawdown}
+    if rolling_window:
+        rolling = RollingSums(np.nan_to_num(returns))
+        rolling_mean = rolling.mean(rolling_window)
+        rolling_std = rolling.std(rolling_window)
+        # The first return is undefined, so the first full window ends one bar later
+        rolling_std[:rolling_window] = np.nan
+        # Windows spent flat have zero volatility; drop the rounding noise of the running sums
+        rolling_std[rolling_std < FLAT_VOLATILITY] = 0.0
+        series['rolling_volatility'] = rolling_std * root_periods
+        with np.errstate(divide='ignore', invalid='ignore'):
+            series['rolling_sharpe'] = np.where(rolling_std > 0, rolling_mean / rolling_std * root_periods, np.nan)
+    return {'metrics': metrics, 'series': series}
+
+
+def compute_metrics(total: np.ndarray, position_changes: np.ndarray, initial_capital: float) -> Dict[str, Any]:
+    """
+    Backtest metrics from a portfolio value curve, on NumPy arrays
+
+    Args:
+        total: Portfolio value of every bar
+        position_changes: Position change of every bar (non-zero on trade bars)
+        initial_capital: Starting capital
+
+    Returns:
+        Dict[str, Any]: The metrics reported by BacktestService.calculate_metrics
+    """
+    return analyze_equity(total, initial_capital, position_changes)['metrics']
@@ -0,0 +1,261 @@
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import logging
+
+from trade_execution.services.metrics import METRIC_NAMES, compute_metrics
+from trade_execution.services.signal_kernels import (
+    RollingSums, bollinger_crossings, hold_crossings, position_changes, sma_crossover_signal
+)
+from trade_execution.services.simulation import simulate_all_in
+
+logger = logging.getLogger('trade_execution.services.parameter_sweep')
+
+# Swept parameters of each strategy and their defaults in BacktestService.run_backtest
+SWEEP_PARAMETERS = {
+    'sma_crossover': {'short_window': 20, 'long_window': 50},
+    'mean_reversion': {'window': 20, 'num_std': 2.0},
+}
+
+# Below this many combinations the pool start-up costs more than it saves
+MIN_PARALLEL_COMBINATIONS = 64
+
+# Number of progress reports of an in-process sweep
+PROGRESS_STEPS = 20
+
+# Per-process state of pool workers, set by _attach_worker
+_worker: Dict[str, Any] = {}
+
+
+def expand_grid(strategy_id: str, grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Expand a parameter grid into the list of valid parameter combinations
+
+    Args:
+        strategy_id: Strategy to sweep ("sma_crossover" or "mean_reversion")
+        grid: Values to try for each parameter; missing parameters use their default
+
+    Returns:
+        List[Dict[str, Any]]: One parameter dict per combination
+
+    Raises:
+        ValueError: If the strategy or a parameter is unknown, or a value list is empty
+    """
+    if strategy_id not in SWEEP_PARAMETERS:
+        raise ValueError(f"Parameter sweep not supported for strategy: {strategy_id}")
+    defaults = SWEEP_PARAMETERS[strategy_id]
+    unknown = set(grid) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {strategy_id}: {', '.join(sorted(unknown))}")
+
+    names = list(defaults)
+    values = []
+    for name in names:
+        options = grid.get(name, [defaults[name]])
+        if not isinstance(options, (list, tuple)):
+            options = [options]
+        if not options:
+            raise ValueError(f"No values given for {name}")
+        values.append(options)
+
+    combinations = [dict(zip(names, combination)) for combination in itertools.product(*values)]
+    if strategy_id == 'sma_crossover':
+        combinations = [c for c in combinations if c['short_window'] < c['long_window']]
+    return combinations
+
+
+def strategy_positions(rolling: RollingSums, strategy_id: str, parameters: Dict[str, Any],
+                       start: int = 0, end: Optional[int] = None) -> Tuple[int, np.ndarray]:
+    """
+    Position changes of one parameter combination over bars [start, end)
+
+    The strategy's signal is computed once over the whole series and cached on
+    ``rolling``, so every slice sees indicators warmed up on the bars before it.
+    Slices start flat; bars before the indicators are defined are skipped.
+
+    Returns:
+        Tuple[int, np.ndarray]: First simulated bar, and the position changes from it to ``end``
+
+    Raises:
+        ValueError: If the windows are too large for the slice
+    """
+    key = (strategy_id, tuple(sorted(parameters.items())))
+    cached = rolling.signals.get(key)
+    if cached is None:
+        if strategy_id == 'sma_crossover':
+            cached = sma_crossover_signal(rolling, int(parameters['short_window']), int(parameters['long_window']))
+        else:
+            if int(parameters['window']) < 2:
+                raise ValueError("Window size must be at least 2")
+            cached = bollinger_crossings(rolling, int(parameters['window']), float(parameters['num_std']))
+        rolling.signals[key] = cached
+
+    warmup, signal = cached
+    end = len(rolling) if end is None else end
+    first = max(start, warmup)
+    if first >= end:
+        raise ValueError("Window sizes are too large for the data")
+    if strategy_id == 'sma_crossover':
+        return first, position_changes(signal[first:end])
+    return first, position_changes(hold_crossings(signal[first:end]))
+
+
+def evaluate(rolling: RollingSums, strategy_id: str, parameters: Dict[str, Any],
+             initial_capital: float, costs: Dict[str, Any],
+             start: int = 0, end: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Backtest one parameter combination over bars [start, end) of precomputed rolling sums
+
+    Returns:
+        Dict[str, Any]: The parameters and the BacktestService metrics of the run
+    """
+    first, changes = strategy_positions(rolling, strategy_id, parameters, start, end)
+    portfolio = simulate_all_in(rolling.values[first:first + len(changes)], changes, initial_capital, **costs)
+    return {'parameters': parameters, **compute_metrics(portfolio['total'], changes, initial_capital)}
+
+
+def _evaluate_all(rolling: RollingSums, strategy_id: str, combinations: List[Dict[str, Any]],
+                  initial_capital: float, costs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    results = []
+    for parameters in combinations:
+        try:
+            results.append(evaluate(rolling, strategy_id, parameters, initial_capital, costs))
+        except ValueError as e:
+            logger.debug(f"Skipping {parameters}: {e}")
+    return results
+
+
+def _attach_worker(name: str, length: int, offset: float):
+    """Pool initializer: map the parent's prices and cumulative sums from shared memory"""
+    shm = SharedMemory(name=name)
+    arrays = np.ndarray((3, length + 1), dtype=np.float64, buffer=shm.buf)
+    _worker['shm'] = shm
+    _worker['rolling'] = RollingSums(arrays[0, :length], arrays[1], arrays[2], offset)
+
+
+def _call_worker(function: Callable, args: Tuple) -> Any:
+    return function(_worker['rolling'], *args)
+
+
+def _batches(items: List[Any], count: int) -> List[List[Any]]:
+    size = max(1, -(-len(items) // count))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# Progress callbacks take the completed fraction and a message
+Progress = Callable[[float, str], None]
+
+
+def map_shared(rolling: RollingSums, function: Callable, tasks: List[Tuple], max_workers: int,
+               progress: Optional[Progress] = None) -> List[Any]:
+    """
+    Run ``function(rolling, *args)`` for every args tuple in a process pool
+
+    The prices and cumulative sums are copied once into shared memory, which every
+    worker maps instead of receiving them with each task. ``function`` must be a
+    module-level function so it can be sent to the workers.
+
+    Returns:
+        List[Any]: The results in task order
+    """
+    length = len(rolling)
+    shm = SharedMemory(create=True, size=3 * (length + 1) * 8)
+    try:
+        arrays = np.ndarray((3, length + 1), dtype=np.float64, buffer=shm.buf)
+        arrays[0, :length] = rolling.values
+        arrays[1] = rolling.sums
+        arrays[2] = rolling.squares
+        del arrays
+
+        # Spawned workers do not inherit the server's OpenD and event loop threads
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                 initializer=_attach_worker,
+                                 initargs=(shm.name, length, rolling.offset)) as executor:
+            futures = [executor.submit(_call_worker, function, args) for args in tasks]
+            if progress:
+                for done, _ in enumerate(as_completed(futures), start=1):
+                    progress(done / len(futures), f"Completed {done}/{len(futures)} tasks")
+            return [future.result() for future in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def run_sweep(prices: np.ndarray, strategy_id: str, grid: Dict[str, List[Any]],
+              initial_capital: float = 10000.0, costs: Optional[Dict[str, Any]] = None,
+              rank_by: str = 'sharpe_ratio', top_n: Optional[int] = None,
+              max_workers: Optional[int] = None, progress: Optional[Progress] = None) -> Dict[str, Any]:
+    """
+    Backtest every combination of a parameter grid on one price series
+
+    Cumulative sums of the prices are computed once, so each combination's
+    indicators cost O(n). Large grids are spread over a process pool that reads the
+    prices and sums from shared memory instead of receiving a copy per task.
+
+    Args:
+        prices: Price of every bar, oldest first
+        strategy_id: Strategy to sweep ("sma_crossover" or "mean_reversion")
+        grid: Values to try for each parameter
+        initial_capital: Starting capital of every run
+        costs: Trading cost settings passed to the simulation
+        rank_by: Metric to rank the runs by, highest first
+        top_n: Only return the best N runs
+        max_workers: Pool size; defaults to the CPU count, 1 runs in-process
+        progress: Called with the completed fraction as batches finish
+
+    Returns:
+        Dict[str, Any]: The combination count, elapsed time and the ranked results
+
+    Raises:
+        ValueError: If the grid or ranking metric is invalid
+    """
+    if rank_by not in METRIC_NAMES:
+        raise ValueError(f"Unknown ranking metric: {rank_by}")
+    combinations = expand_grid(strategy_id, grid)
+    if not combinations:
+        raise ValueError("The parameter grid has no valid combinations")
+
+    started = time.perf_counter()
+    rolling = RollingSums(np.asarray(prices, dtype=np.float64))
+    costs = costs or {}
+    max_workers = min(max_workers or os.cpu_count() or 1, len(combinations))
+
+    if max_workers <= 1 or len(combinations) < MIN_PARALLEL_COMBINATIONS:
+        results = []
+        for batch in _batches(combinations, PROGRESS_STEPS):
+            results.extend(_evaluate_all(rolling, strategy_id, batch, initial_capital, costs))
+            if progress:
+                progress(len(results) / len(combinations), f"Evaluated {len(results)} combinations")
+        workers = 1
+    else:
+        # A few batches per worker balance the load without per-combination overhead
+        tasks = [(strategy_id, batch, initial_capital, costs)
+                 for batch in _batches(combinations, max_workers * 4)]
+        results = [result for batch in map_shared(rolling, _evaluate_all, tasks, max_workers, progress)
+                   for result in batch]
+        workers = max_workers
+
+    results.sort(key=lambda result: result[rank_by], reverse=True)
+    for rank, result in enumerate(results, start=1):
+        result['rank'] = rank
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Swept {len(combinations)} {strategy_id} combinations on {len(rolling)} bars "
+                f"with {workers} worker(s) in {elapsed:.2f}s")
+    return {
+        'strategy_id': strategy_id,
+        'bars': len(rolling),
+        'combinations': len(combinations),
+        'evaluated': len(results),
+        'workers': workers,
+        'rank_by': rank_by,
+        'elapsed_seconds': elapsed,
+        'results': results[:top_n] if top_n else results,
+    }
@@ -0,0 +1,251 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import logging
+
+from trade_execution.services.metrics import compute_metrics
+from trade_execution.services.signal_kernels import RollingSums, bollinger_crossings, hold_crossings
+
+logger = logging.getLogger('trade_execution.services.portfolio_backtest')
+
+ALLOCATION_RULES = ('equal', 'capped', 'vol_scaled')
+
+DEFAULT_MAX_WEIGHT = 0.1
+DEFAULT_VOL_WINDOW = 20
+
+
+def align_prices(series: Dict[str, pd.Series]) -> pd.DataFrame:
+    """
+    Align per-symbol price series into one (time x symbol) frame on the union of
+    their dates. Gaps inside a symbol's history are forward-filled; bars before its
+    first or after its last price stay NaN.
+    """
+    prices = pd.concat(series, axis=1).sort_index()
+    return prices.ffill().where(prices.bfill().notna())
+
+
+def portfolio_signals(prices: np.ndarray, strategy_id: str, parameters: Dict[str, Any]) -> np.ndarray:
+    """
+    Long/flat signal of every (bar, symbol) computed on the whole 2-D price array at once
+
+    Args:
+        prices: (time x symbol) prices; NaN where a symbol does not trade
+        strategy_id: "sma_crossover" or "mean_reversion"
+        parameters: Strategy parameters, with BacktestService.run_backtest defaults
+
+    Returns:
+        np.ndarray: 1.0 where the strategy wants to hold the symbol, 0.0 elsewhere
+
+    Raises:
+        ValueError: If the strategy is unknown
+    """
+    tradable = ~np.isnan(prices)
+    # Indicators need finite inputs; untradable bars are masked out of the signal below
+    filled = pd.DataFrame(prices).ffill().bfill().to_numpy()
+    rolling = RollingSums(filled)
+    if strategy_id == 'sma_crossover':
+        short_sma = rolling.mean(int(parameters.get('short_window', 20)))
+        long_sma = rolling.mean(int(parameters.get('long_window', 50)))
+        signal = (short_sma > long_sma).astype(np.float64)
+    elif strategy_id == 'mean_reversion':
+        _, crossings = bollinger_crossings(rolling, int(parameters.get('window', 20)),
+                                           float(parameters.get('num_std', 2.0)))
+        signal = hold_crossings(crossings)
+    else:
+        raise ValueError(f"Portfolio backtest not supported for strategy: {strategy_id}")
+    signal[~tradable] = 0.0
+    return signal
+
+
+def allocation_weights(signal: np.ndarray, rows: np.ndarray, rule: str = 'equal',
+                       max_weight: Optional[float] = None, volatility: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Target weights of the active symbols on the given rows
+
+    Args:
+        signal: (time x symbol) long/flat signal
+        rows: Bars to compute weights for
+        rule: "equal" splits capital evenly over active symbols, "capped" also limits
+              every weight to ``max_weight`` and keeps the rest in cash, "vol_scaled"
+              weights by inverse volatility (capped if ``max_weight`` is given)
+        max_weight: Largest weight of one symbol
+        volatility: (time x symbol) volatility, required for "vol_scaled"
+
+    Returns:
+        np.ndarray: (len(rows) x symbol) weights summing to at most 1
+
+    Raises:
+        ValueError: If the rule is unknown
+    """
+    if rule not in ALLOCATION_RULES:
+        raise ValueError(f"Unknown allocation rule: {rule}")
+    active = signal[rows] > 0
+    if rule == 'vol_scaled':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse = 1.0 / volatility[rows]
+        valid = active & np.isfinite(inverse)
+        # Symbols without a usable volatility yet get the average of the others
+        counts = valid.sum(axis=1, keepdims=True)
+        fallback = np.where(valid, inverse, 0.0).sum(axis=1, keepdims=True) / np.maximum(counts, 1)
+        fallback[counts == 0] = 1.0
+        raw = np.where(valid, inverse, np.where(active, fallback, 0.0))
+    else:
+        raw = active.astype(np.float64)
+    totals = raw.sum(axis=1, keepdims=True)
+    weights = np.divide(raw, totals, out=np.zeros_like(raw), where=totals > 0)
+    if rule == 'capped' or (rule == 'vol_scaled' and max_weight):
+        weights = np.minimum(weights, max_weight or DEFAULT_MAX_WEIGHT)
+    return weights
+
+
+def simulate_portfolio(prices: np.ndarray, weights: np.ndarray, rows: np.ndarray, initial_capital: float,
+                       commission: float = 0.0, min_commission: float = 0.0,
+                       slippage: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Simulate a portfolio rebalanced to target weights on the given rows
+
+    All symbols share one cash balance. On each rebalance row the portfolio value is
+    split by the target weights, net of the trading costs; share counts are constant
+    in between, so the curves are filled with array operations.
+
+    Args:
+        prices: (time x symbol) finite prices
+        weights: (len(rows) x symbol) target weights
+        rows: Rebalance bars, ascending
+        initial_capital: Starting cash
+        commission: Commission rate on traded notional
+        min_commission: Minimum commission per traded symbol
+        slippage: Adverse price move applied to every fill, as a fraction of price
+
+    Returns:
+        Dict[str, np.ndarray]: 'total' and 'cash' per bar, 'shares' and 'holdings' per
+        (bar, symbol), and per-symbol 'trades' and 'costs' (commission plus slippage)
+    """
+    n_bars, n_symbols = prices.shape
+    cash = float(initial_capital)
+    shares = np.zeros(n_symbols)
+    shares_after = np.zeros((len(rows), n_symbols))
+    cash_after = np.zeros(len(rows))
+    trades = np.zeros(n_symbols, dtype=np.int64)
+    costs = np.zeros(n_symbols)
+    for j, t in enumerate(rows):
+        price = prices[t]
+        equity = cash + shares @ price
+        target = weights[j] * equity / (price * (1 + commission + slippage))
+        trade = target - shares
+        # Ignore rebalancing dust
+        trade[np.abs(trade) * price < 1e-9 * max(equity, 1.0)] = 0.0
+        notional = np.abs(trade) * price
+        fee = np.where(notional > 0, np.maximum(notional * commission, min_commission), 0.0)
+        cash -= trade @ price + (notional * slippage).sum() + fee.sum()
+        shares = shares + trade
+        trades += notional > 0
+        costs += fee + notional * slippage
+        shares_after[j] = shares
+        cash_after[j] = cash
+
+    segment = np.searchsorted(rows, np.arange(n_bars), side='right') - 1
+    traded = segment >= 0
+    shares_curve = np.zeros((n_bars, n_symbols))
+    cash_curve = np.full(n_bars, float(initial_capital))
+    shares_curve[traded] = shares_after[segment[traded]]
+    cash_curve[traded] = cash_after[segment[traded]]
+    holdings = shares_curve * prices
+    return {
+        'total': cash_curve + holdings.sum(axis=1),
+        'cash': cash_curve,
+        'shares': shares_curve,
+        'holdings': holdings,
+        'trades': trades,
+        'costs': costs,
+    }
+
+
+def run_portfolio_backtest(prices: pd.DataFrame, strategy_id: str, parameters: Optional[Dict[str, Any]] = None,
+                           allocation: str = 'equal', max_weight: Optional[float] = None,
+                           vol_window: int = DEFAULT_VOL_WINDOW, initial_capital: float = 10000.0,
+                           costs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Backtest a strategy over a universe of symbols sharing one capital pool
+
+    Signals are computed for every (bar, symbol) in one pass over the 2-D price
+    array. The portfolio is rebalanced to the allocation rule's weights whenever the
+    set of held symbols changes.
+
+    Args:
+        prices: Aligned (time x symbol) prices, e.g. from align_prices
+        strategy_id: "sma_crossover" or "mean_reversion"
+        parameters: Strategy parameters
+        allocation: Allocation rule, one of ALLOCATION_RULES
+        max_weight: Weight cap for "capped" (default 10%) and "vol_scaled"
+        vol_window: Window of the return volatility used by "vol_scaled"
+        initial_capital: Starting capital
+        costs: Trading cost settings (commission, min_commission, slippage)
+
+    Returns:
+        Dict[str, Any]: Portfolio metrics, per-symbol metrics and the equity curve
+
+    Raises:
+        ValueError: If the strategy or allocation rule is unknown, or there is no data
+    """
+    if allocation not in ALLOCATION_RULES:
+        raise ValueError(f"Unknown allocation rule: {allocation}")
+    if prices.empty:
+        raise ValueError("No price data for the requested symbols")
+    symbols = [str(symbol) for symbol in prices.columns]
+    values = prices.to_numpy(dtype=np.float64)
+    signal = portfolio_signals(values, strategy_id, parameters or {})
+    filled = pd.DataFrame(values).ffill().bfill().to_numpy()
+
+    volatility = None
+    if allocation == 'vol_scaled':
+        returns = np.zeros_like(filled)
+        returns[1:] = filled[1:] / filled[:-1] - 1
+        volatility = RollingSums(returns).std(vol_window)
+
+    # Rebalance on the first bar and whenever the set of held symbols changes
+    changed = np.ones(len(signal), dtype=bool)
+    changed[1:] = (signal[1:] != signal[:-1]).any(axis=1)
+    rows = np.flatnonzero(changed)
+    weights = allocation_weights(signal, rows, allocation, max_weight, volatility)
+    result = simulate_portfolio(filled, weights, rows, initial_capital, **(costs or {}))
+
+    total = result['total']
+    trade_bars = np.zeros(len(total))
+    trade_bars[rows] = 1.0
+    metrics = compute_metrics(total, trade_bars, initial_capital)
+    metrics['rebalances'] = int(len(rows))
+    metrics['num_trades'] = int(result['trades'].sum())
+
+    # Per-symbol P&L: holding over each bar's price move, less trading costs
+    shares = result['shares']
+    pnl = (shares[:-1] * np.diff(filled, axis=0)).sum(axis=0) - result['costs']
+    held = shares > 0
+    weight_curve = result['holdings'] / total[:, None]
+    per_symbol = [{
+        'symbol': symbol,
+        'pnl': float(pnl[i]),
+        'return_contribution': float(pnl[i] / initial_capital),
+        'num_trades': int(result['trades'][i]),
+        'exposure': float(held[:, i].mean()),
+        'average_weight': float(weight_curve[:, i].mean()),
+        'final_weight': float(weight_curve[-1, i]),
+        'costs': float(result['costs'][i]),
+    } for i, symbol in enumerate(symbols)]
+
+    index = pd.DatetimeIndex(prices.index)
+    logger.info(f"Portfolio backtest of {strategy_id} over {len(symbols)} symbols and "
+                f"{len(total)} bars with {len(rows)} rebalances")
+    return {
+        'strategy_id': strategy_id,
+        'allocation': allocation,
+        'symbols': symbols,
+        'metrics': metrics,
+        'symbol_metrics': per_symbol,
+        'equity_curve': {
+            'date': list(index.strftime('%Y-%m-%d')),
+            'portfolio_value': total.tolist(),
+            'cash': result['cash'].tolist(),
+        },
+    }
@@ -0,0 +1,257 @@
+import argparse
+import asyncio
+import logging
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from starlette.websockets import WebSocketState
+
+from trade_execution.handlers.order_book_handler import OrderBookHandler
+from trade_execution.handlers.order_handler import OrderHandler
+from trade_execution.handlers.order_status_handler import OrderStatusHandler
+from trade_execution.models.ConnectionManager import ConnectionManager
+from trade_execution.services.market_data_journal import ORDER, ORDER_BOOK, JournalReader
+
+logger = logging.getLogger('trade_execution.services.replay_engine')
+
+# Per-message loggers that would otherwise dominate a max-speed replay
+HANDLER_LOGGERS = [
+    'trade_execution.handlers.order_book_handler',
+    'trade_execution.handlers.order_handler',
+    'trade_execution.handlers.order_status_handler',
+    'trade_execution.models.ConnectionManager',
+]
+
+ORDER_COLUMNS = ['order_id', 'code', 'order_status', 'qty', 'price', 'trd_side']
+
+
+class SimulatedWebSocket:
+    """Stand-in for a connected WebSocket client that timestamps every message it receives"""
+    def __init__(self, name: str):
+        self.name = name
+        self.client_state = WebSocketState.CONNECTING
+        self.received_ns: List[int] = []
+
+    async def accept(self):
+        self.client_state = WebSocketState.CONNECTED
+
+    async def send_json(self, message: Dict):
+        self.received_ns.append(time.perf_counter_ns())
+
+    async def close(self):
+        self.client_state = WebSocketState.DISCONNECTED
+
+
+class ReplayEngine:
+    """
+    Replays journal segments through OrderBookHandler and OrderHandler.
+
+    Recorded updates are rebuilt into the payloads Futu delivers to the handlers and fed
+    from a separate thread, as the SDK callback thread would, in timestamp order. Every
+    broadcast travels through ConnectionManager to simulated WebSocket clients, which
+    lets the engine report end-to-end throughput and latency of the streaming path.
+    """
+    def __init__(self, journal_dir: str, speed: Optional[float] = 1.0, num_clients: int = 1,
+                 codes: Optional[List[str]] = None, start: Optional[date] = None,
+                 end: Optional[date] = None, quiet: bool = True):
+        """
+        Args:
+            journal_dir: Root directory of a MarketDataJournal
+            speed: Replay speed relative to recorded time (1.0 real-time, 10.0 for 10x),
+                   None or 0 to replay as fast as possible
+            num_clients: Number of simulated WebSocket clients to broadcast to
+            codes: Only replay these security codes
+            start: First journal day to replay (inclusive)
+            end: Last journal day to replay (inclusive)
+            quiet: Silence per-message handler logging while replaying
+        """
+        self.reader = JournalReader(journal_dir)
+        self.speed = speed or None
+        self.num_clients = num_clients
+        self.codes = codes
+        self.start = start
+        self.end = end
+        self.quiet = quiet
+
+    def _code_filter(self, records: np.ndarray) -> np.ndarray:
+        if not self.codes:
+            return records
+        ids = [self.reader.code_id(code) for code in self.codes if code in self.reader.codes]
+        return records[np.isin(records['code_id'], ids)]
+
+    def events(self) -> Iterator[Tuple[int, str, np.void]]:
+        """
+        Iterate over recorded updates in deterministic replay order
+
+        Yields:
+            Tuple[int, str, np.void]: Timestamp (ns), record kind and the raw record
+        """
+        book_days = dict(self.reader.iter_segments(ORDER_BOOK, self.start, self.end))
+        order_days = dict(self.reader.iter_segments(ORDER, self.start, self.end))
+        for day in sorted(set(book_days) | set(order_days)):
+            streams = []
+            for kind, days in ((ORDER_BOOK, book_days), (ORDER, order_days)):
+                if day in days:
+                    streams.append((kind, self._code_filter(days[day])))
+            # Stable sort keeps the recorded order for equal timestamps
+            ts = np.concatenate([records['ts'] for _, records in streams])
+            kinds = np.concatenate([np.full(len(records), i) for i, (_, records) in enumerate(streams)])
+            positions = np.concatenate([np.arange(len(records)) for _, records in streams])
+            for i in np.argsort(ts, kind='stable'):
+                kind, records = streams[kinds[i]]
+                yield int(ts[i]), kind, records[positions[i]]
+
+    def order_book_payload(self, record: np.void) -> Dict[str, Any]:
+        """Rebuild the order book dict OrderBookHandler receives from the SDK"""
+        payload = {'code': self.reader.codes[record['code_id']]}
+        for side, key in (('bid', 'Bid'), ('ask', 'Ask')):
+            n = int(record['n_' + side])
+            prices = record[side + '_price'][:n].tolist()
+            volumes = record[side + '_volume'][:n].tolist()
+            orders = record[side + '_orders'][:n].tolist()
+            payload[key] = [(p, v, o, {}) for p, v, o in zip(prices, volumes, orders)]
+        return payload
+
+    def order_payload(self, record: np.void) -> pd.DataFrame:
+        """Rebuild the order DataFrame OrderHandler receives from the SDK"""
+        row = {
+            'order_id': record['order_id'].decode(),
+            'code': self.reader.codes[record['code_id']],
+            'order_status': record['order_status'].decode(),
+            'qty': float(record['qty']),
+            'price': float(record['price']),
+            'trd_side': record['trd_side'].decode(),
+        }
+        return pd.DataFrame([row], columns=ORDER_COLUMNS)
+
+    def _feed(self, order_book_handler: OrderBookHandler, order_handler: OrderHandler,
+              injected_ns: List[int]):
+        """Push every recorded event into the handlers, pacing by recorded timestamps"""
+        first_ts = None
+        wall_start = time.perf_counter()
+        for ts, kind, record in self.events():
+            if kind == ORDER_BOOK:
+                payload = self.order_book_payload(record)
+            else:
+                payload = self.order_payload(record)
+
+            if self.speed:
+                if first_ts is None:
+                    first_ts = ts
+                delay = (ts - first_ts) / 1e9 / self.speed - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            injected_ns.append(time.perf_counter_ns())
+            if kind == ORDER_BOOK:
+                order_book_handler.process_order_book(payload)
+            else:
+                order_handler.process_orders(payload)
+
+    async def run(self, drain_timeout: float = 30.0) -> Dict[str, Any]:
+        """
+        Replay the journal and measure the streaming path
+
+        Args:
+            drain_timeout: Seconds to wait for in-flight broadcasts after the last event
+
+        Returns:
+            Dict[str, Any]: Event counts, throughput and delivery latency statistics
+        """
+        loop = asyncio.get_running_loop()
+        order_book_handler = OrderBookHandler(loop=loop)
+        order_handler = OrderHandler(OrderStatusHandler(), loop=loop)
+
+        connection_manager = ConnectionManager.getInstance()
+        clients = [SimulatedWebSocket(f"replay-{i}") for i in range(self.num_clients)]
+        for client in clients:
+            await connection_manager.connect(client)
+
+        saved_levels = {}
+        if self.quiet:
+            for name in HANDLER_LOGGERS:
+                handler_logger = logging.getLogger(name)
+                saved_levels[name] = handler_logger.level
+                handler_logger.setLevel(logging.WARNING)
+
+        injected_ns: List[int] = []
+        try:
+            started = time.perf_counter()
+            await loop.run_in_executor(None, self._feed, order_book_handler, order_handler, injected_ns)
+            fed = time.perf_counter()
+
+            # Wait for the broadcasts still queued on the event loop
+            deadline = fed + drain_timeout
+            while any(len(c.received_ns) < len(injected_ns) for c in clients) and time.perf_counter() < deadline:
+                await asyncio.sleep(0.001)
+            finished = time.perf_counter()
+        finally:
+            for client in clients:
+                await connection_manager.disconnect(client)
+            for name, level in saved_levels.items():
+                logging.getLogger(name).setLevel(level)
+
+        return self._report(injected_ns, clients, fed - started, finished - started)
+
+    @staticmethod
+    def _report(injected_ns: List[int], clients: List[SimulatedWebSocket],
+                feed_seconds: float, total_seconds: float) -> Dict[str, Any]:
+        injected = np.asarray(injected_ns, dtype=np.int64)
+        latencies = []
+        for client in clients:
+            # Broadcasts reach each client in injection order
+            received = np.asarray(client.received_ns[:len(injected)], dtype=np.int64)
+            latencies.append(received - injected[:len(received)])
+        latency_us = np.concatenate(latencies) / 1e3 if latencies else np.empty(0)
+        delivered = int(sum(len(c.received_ns) for c in clients))
+
+        report = {
+            'events': len(injected),
+            'clients': len(clients),
+            'delivered': delivered,
+            'expected': len(injected) * len(clients),
+            'feed_seconds': feed_seconds,
+            'total_seconds': total_seconds,
+            'events_per_second': len(injected) / total_seconds if total_seconds > 0 else 0.0,
+            'messages_per_second': delivered / total_seconds if total_seconds > 0 else 0.0,
+        }
+        if len(latency_us):
+            report['latency_us'] = {
+                'mean': float(latency_us.mean()),
+                'p50': float(np.percentile(latency_us, 50)),
+                'p90': float(np.percentile(latency_us, 90)),
+                'p99': float(np.percentile(latency_us, 99)),
+                'max': float(latency_us.max()),
+            }
+        return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay a market data journal through the push handlers")
+    parser.add_argument("journal_dir", help="Root directory of the recorded journal")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Replay speed multiple (1 = real-time, 0 = as fast as possible)")
+    parser.add_argument("--clients", type=int, default=1, help="Number of simulated WebSocket clients")
+    parser.add_argument("--codes", nargs="*", help="Only replay these security codes")
+    parser.add_argument("--start", help="First day to replay (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Last day to replay (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    engine = ReplayEngine(
+        args.journal_dir,
+        speed=args.speed,
+        num_clients=args.clients,
+        codes=args.codes,
+        start=datetime.strptime(args.start, "%Y-%m-%d").date() if args.start else None,
+        end=datetime.strptime(args.end, "%Y-%m-%d").date() if args.end else None,
+    )
+    report = asyncio.run(engine.run())
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import logging
+
+logger = logging.getLogger('trade_execution.services.result_cache')
+
+DEFAULT_MAX_ENTRIES = 256
+# Results of ranges that reach today depend on bars that are still forming
+DEFAULT_LIVE_TTL = 60.0
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-ready form of request arguments in which equivalent requests are equal"""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    # Backtests use whole days, so times of day do not change the result
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        value = float(value)
+        return int(value) if value.is_integer() else value
+    return str(value)
+
+
+def _json_default(value: Any) -> Any:
+    """JSON form of the NumPy and date values a result may hold"""
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot store a {type(value).__name__} in the result cache")
+
+
+class BacktestResultCache:
+    """
+    Content-addressed cache of backtest results.
+
+    Results are keyed by a hash of the canonical request arguments and the version
+    of the cached bars they were computed from, so a rewrite of the bar cache
+    invalidates them. An in-memory LRU tier is backed by an optional directory of
+    JSON results, which are plain data and cannot run code when loaded.
+    Ranges that end today or later are cached in memory only, for ``live_ttl`` seconds.
+    """
+    _instance = None
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, disk_dir: Optional[str] = None,
+                 live_ttl: float = DEFAULT_LIVE_TTL):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.live_ttl = live_ttl
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        # key -> (expires_at or None, result)
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'expired': 0, 'stores': 0, 'evictions': 0}
+
+    @classmethod
+    def getInstance(cls, **kwargs) -> 'BacktestResultCache':
+        if not cls._instance:
+            logger.info("Creating new BacktestResultCache instance")
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    @staticmethod
+    def key(kind: str, arguments: Dict[str, Any], data_version: Any) -> str:
+        """Hash of the canonical request and the data version"""
+        canonical = json.dumps({'kind': kind, 'arguments': _canonical(arguments), 'data_version': data_version},
+                               sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    @staticmethod
+    def is_live(arguments: Dict[str, Any]) -> bool:
+        """Whether the requested range reaches today"""
+        end = arguments.get('end_date')
+        if isinstance(end, datetime):
+            end = end.date()
+        return isinstance(end, date) and end >= date.today()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key + ".json")
+
+    def get(self, kind: str, arguments: Dict[str, Any], data_version: Any) -> Optional[Any]:
+        """Cached result of a request, or None"""
+        key = self.key(kind, arguments, data_version)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] is None or entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[1]
+                del self._entries[key]
+                self.stats['expired'] += 1
+
+            if self.disk_dir and os.path.exists(self._disk_path(key)):
+                try:
+                    with open(self._disk_path(key)) as f:
+                        result = json.load(f)
+                except Exception as e:
+                    logger.warning(f"Dropping unreadable cached result {key}: {e}")
+                    os.remove(self._disk_path(key))
+                else:
+                    self._store_memory(key, None, result)
+                    self.stats['disk_hits'] += 1
+                    return result
+
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, kind: str, arguments: Dict[str, Any], data_version: Any, result: Any):
+        """Cache the result of a request; live ranges expire after ``live_ttl`` seconds"""
+        key = self.key(kind, arguments, data_version)
+        live = self.is_live(arguments)
+        with self._lock:
+            self._store_memory(key, time.time() + self.live_ttl if live else None, result)
+            self.stats['stores'] += 1
+        if self.disk_dir and not live:
+            path = self._disk_path(key)
+            with open(path + ".tmp", 'w') as f:
+                json.dump(result, f, default=_json_default)
+            os.replace(path + ".tmp", path)
+
+    def _store_memory(self, key: str, expires_at: Optional[float], result: Any):
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def get_or_compute(self, kind: str, arguments: Dict[str, Any], compute: Callable[[], Any],
+                       data_version: Callable[[], Any]) -> Any:
+        """
+        Return the cached result of a request, computing and caching it on a miss
+
+        Args:
+            kind: Request kind (e.g., "backtest", "sweep")
+            arguments: Request arguments
+            compute: Runs the request
+            data_version: Returns the current version of the request's input data
+
+        Returns:
+            Any: The result
+        """
+        result = self.get(kind, arguments, data_version())
+        if result is None:
+            result = compute()
+            # Running may have filled the bar cache; key the result by the data it used
+            self.put(kind, arguments, data_version(), result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.disk_dir, name))
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'disk_dir': self.disk_dir, 'live_ttl': self.live_ttl, **self.stats}
@@ -0,0 +1,207 @@
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import logging
+
+from trade_execution.services.metrics import TRADING_DAYS_PER_YEAR
+
+logger = logging.getLogger('trade_execution.services.robustness')
+
+# block_bootstrap resamples blocks of consecutive returns; the trade methods
+# reorder (trade_reshuffle) or redraw with replacement (trade_bootstrap) trade returns.
+# Reordering trades keeps the final value and only changes the path, e.g. the drawdown.
+RESAMPLING_METHODS = ('block_bootstrap', 'trade_reshuffle', 'trade_bootstrap')
+
+ROBUSTNESS_METRICS = ('final_value', 'net_performance', 'sharpe_ratio', 'max_drawdown')
+
+# Memory bound of one chunk of resampled paths, in bytes per (paths x time) matrix
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+MAX_PATHS = 100_000
+
+
+def returns_from_values(values: np.ndarray) -> np.ndarray:
+    """Bar returns of a portfolio value curve; NaN bars are dropped"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    return values[1:] / values[:-1] - 1
+
+
+def trade_returns_from_values(values: np.ndarray, entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+    """
+    Round-trip returns of an all-in/all-out backtest
+
+    Args:
+        values: Portfolio value of every bar
+        entries: Boolean mask of buy bars
+        exits: Boolean mask of sell bars
+
+    Returns:
+        np.ndarray: Value change from each entry to the following exit (or the last
+        bar for a position still open)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    entry_bars = np.flatnonzero(entries)
+    exit_bars = np.flatnonzero(exits)
+    # Each entry closes at the first exit after it, or at the last bar if there is none
+    following = np.searchsorted(exit_bars, entry_bars, side='right')
+    closes = np.append(exit_bars, len(values) - 1)[following]
+    return values[closes] / values[entry_bars] - 1
+
+
+def backtest_sample(graph_data: Dict[str, list], method: str) -> Tuple[np.ndarray, float]:
+    """
+    Sample to resample from a backtest's columnar graph data
+
+    Returns:
+        Tuple[np.ndarray, float]: Bar returns for block_bootstrap or round-trip trade
+        returns for the trade methods, and the number of those periods per year
+    """
+    values = np.array(graph_data['portfolio_value'], dtype=np.float64)
+    if method == 'block_bootstrap':
+        return returns_from_values(values), TRADING_DAYS_PER_YEAR
+    entries = np.array(graph_data['buyPrice'], dtype=np.float64)
+    exits = np.array(graph_data['sellPrice'], dtype=np.float64)
+    trades = trade_returns_from_values(values, ~np.isnan(entries), ~np.isnan(exits))
+    years = len(values) / TRADING_DAYS_PER_YEAR
+    return trades, max(len(trades), 1) / years
+
+
+def resample_paths(sample: np.ndarray, n_paths: int, method: str, rng: np.random.Generator,
+                   block_size: int = 20) -> np.ndarray:
+    """
+    (paths x time) matrix of resampled return sequences of the sample's length
+
+    Block bootstrap draws circular blocks of ``block_size`` consecutive returns so
+    that short-range autocorrelation and volatility clustering survive resampling.
+    """
+    n = len(sample)
+    if method == 'block_bootstrap':
+        block_size = max(1, min(block_size, n))
+        n_blocks = -(-n // block_size)
+        starts = rng.integers(0, n, (n_paths, n_blocks, 1))
+        index = (starts + np.arange(block_size)) % n
+        return sample[index.reshape(n_paths, -1)[:, :n]]
+    if method == 'trade_reshuffle':
+        return rng.permuted(np.broadcast_to(sample, (n_paths, n)), axis=1)
+    if method == 'trade_bootstrap':
+        return sample[rng.integers(0, n, (n_paths, n))]
+    raise ValueError(f"Unknown resampling method: {method}")
+
+
+def path_metrics(returns: np.ndarray, initial_capital: float,
+                 periods_per_year: float = TRADING_DAYS_PER_YEAR) -> Dict[str, np.ndarray]:
+    """
+    Metrics of every path of a (paths x time) return matrix, computed as in compute_metrics
+
+    Returns:
+        Dict[str, np.ndarray]: One value per path for each of ROBUSTNESS_METRICS
+    """
+    growth = np.cumprod(1 + returns, axis=1)
+    final = growth[:, -1]
+    # The running peak includes the starting value
+    peak = np.maximum(np.maximum.accumulate(growth, axis=1), 1.0)
+    max_drawdown = np.minimum((growth / peak - 1).min(axis=1), 0.0)
+
+    years = returns.shape[1] / periods_per_year
+    # A path that loses everything has an annualized return of -100%
+    annualized = np.where(final > 0, np.maximum(final, 0) ** (1 / years), 0.0) - 1
+    volatility = returns.std(axis=1, ddof=1) * np.sqrt(periods_per_year) if returns.shape[1] > 1 \
+        else np.zeros(len(returns))
+    sharpe = np.divide(annualized, volatility, out=np.zeros_like(annualized), where=volatility > 0)
+    return {
+        'final_value': final * initial_capital,
+        'net_performance': final - 1,
+        'sharpe_ratio': sharpe,
+        'max_drawdown': max_drawdown,
+    }
+
+
+def _chunks(n_paths: int, chunk_paths: int) -> Iterator[int]:
+    while n_paths > 0:
+        size = min(chunk_paths, n_paths)
+        yield size
+        n_paths -= size
+
+
+def run_robustness(sample: np.ndarray, method: str = 'block_bootstrap', n_paths: int = 10000,
+                   block_size: int = 20, confidence: float = 0.95, initial_capital: float = 10000.0,
+                   periods_per_year: float = TRADING_DAYS_PER_YEAR, seed: Optional[int] = None,
+                   chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Dict[str, Any]:
+    """
+    Monte Carlo robustness analysis of a return series or trade list
+
+    Resampled paths are generated and evaluated as (paths x time) matrices, a chunk
+    of paths at a time so that memory stays within ``chunk_bytes`` per matrix however
+    many paths are requested.
+
+    Args:
+        sample: Bar returns (block_bootstrap) or round-trip trade returns (trade methods)
+        method: One of RESAMPLING_METHODS
+        n_paths: Number of resampled paths
+        block_size: Block length of block_bootstrap, in bars
+        confidence: Width of the reported confidence intervals (e.g., 0.95)
+        initial_capital: Starting value of every path
+        periods_per_year: Sample periods per year, used to annualize the Sharpe ratio
+        seed: Random seed, for reproducible results
+        chunk_bytes: Memory bound of one (paths x time) matrix
+
+    Returns:
+        Dict[str, Any]: Observed metrics of the sample and, for each of
+        ROBUSTNESS_METRICS, the mean, standard deviation, median and confidence
+        interval over the paths, plus the probability of a loss
+
+    Raises:
+        ValueError: If the inputs are invalid
+    """
+    if method not in RESAMPLING_METHODS:
+        raise ValueError(f"Unknown resampling method: {method}")
+    if not 0 < confidence < 1:
+        raise ValueError("Confidence must be between 0 and 1")
+    if not 1 <= n_paths <= MAX_PATHS:
+        raise ValueError(f"The number of paths must be between 1 and {MAX_PATHS}")
+    if block_size < 1:
+        raise ValueError("Block size must be positive")
+    sample = np.asarray(sample, dtype=np.float64)
+    sample = sample[np.isfinite(sample)]
+    if len(sample) < 2:
+        raise ValueError("At least two returns are needed to resample")
+
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    chunk_paths = max(1, chunk_bytes // (8 * len(sample)))
+    collected = {name: [] for name in ROBUSTNESS_METRICS}
+    for size in _chunks(n_paths, chunk_paths):
+        paths = resample_paths(sample, size, method, rng, block_size)
+        for name, values in path_metrics(paths, initial_capital, periods_per_year).items():
+            collected[name].append(values)
+
+    observed = path_metrics(sample[None, :], initial_capital, periods_per_year)
+    tail = (1 - confidence) / 2
+    distributions = {}
+    for name in ROBUSTNESS_METRICS:
+        values = np.concatenate(collected[name])
+        low, median, high = np.quantile(values, [tail, 0.5, 1 - tail])
+        distributions[name] = {
+            'observed': float(observed[name][0]),
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+            'median': float(median),
+            'ci_low': float(low),
+            'ci_high': float(high),
+        }
+    loss_probability = float(np.mean(np.concatenate(collected['final_value']) < initial_capital))
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Robustness analysis ({method}): {n_paths} paths x {len(sample)} periods in {elapsed:.2f}s")
+    return {
+        'method': method,
+        'paths': n_paths,
+        'periods': len(sample),
+        'block_size': block_size if method == 'block_bootstrap' else None,
+        'confidence': confidence,
+        'initial_capital': initial_capital,
+        'metrics': distributions,
+        'loss_probability': loss_probability,
+        'elapsed_seconds': elapsed,
+    }
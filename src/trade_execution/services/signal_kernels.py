@@ -0,0 +1,151 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from trade_execution.strategies.indicators import NAN, RollingSums, wilder_rsi
+
+
+def position_changes(signal: np.ndarray) -> np.ndarray:
+    """Bar-to-bar change of a 0/1 position signal; the first bar opens the initial position"""
+    changes = np.empty(len(signal), dtype=np.float64)
+    if len(signal):
+        changes[0] = signal[0]
+        changes[1:] = np.diff(signal)
+    return changes
+
+
+def hold_crossings(crossings: np.ndarray) -> np.ndarray:
+    """
+    Long/flat state from entry (+1) and exit (-1) events along axis 0: each event's
+    state is held until the next event, starting flat
+    """
+    crossings = np.asarray(crossings)
+    n = len(crossings)
+    bars = np.arange(n).reshape((n,) + (1,) * (crossings.ndim - 1))
+    # Index of the latest event at every bar; bar 0 when there has been none yet
+    latest = np.where(crossings != 0, bars, 0)
+    np.maximum.accumulate(latest, axis=0, out=latest)
+    return (np.take_along_axis(crossings, latest, axis=0) > 0).astype(np.float64)
+
+
+def sma_crossover_signal(rolling: RollingSums, short_window: int, long_window: int) -> Tuple[int, np.ndarray]:
+    """
+    Long-while-above SMA crossover state of every bar of the series
+
+    Returns:
+        Tuple[int, np.ndarray]: First bar where both SMAs are defined, and an int8
+        array that is 1 where the short SMA is above the long SMA
+    """
+    warmup = max(short_window, long_window) - 1
+    return warmup, (rolling.mean(short_window) > rolling.mean(long_window)).astype(np.int8)
+
+
+def bollinger_crossings(rolling: RollingSums, window: int, num_std: float) -> Tuple[int, np.ndarray]:
+    """
+    Bollinger Band crossings of every bar of the series, as MeanReversionStrategy signals
+
+    Returns:
+        Tuple[int, np.ndarray]: First bar where the bands are defined, and an int8
+        array that is +1 where price crosses below the lower band, -1 where it crosses
+        above the upper band and 0 elsewhere
+    """
+    close = rolling.values
+    ma = rolling.mean(window)
+    band = rolling.std(window) * num_std
+    upper, lower = ma + band, ma - band
+
+    crossings = np.zeros(close.shape, dtype=np.int8)
+    crossings[1:][(close[:-1] >= lower[:-1]) & (close[1:] < lower[1:])] = 1
+    crossings[1:][(close[:-1] <= upper[:-1]) & (close[1:] > upper[1:])] = -1
+    return window - 1, crossings
+
+
+def rsi_crossings(rolling: RollingSums, period: int, oversold: float, overbought: float,
+                  rsi: Optional[np.ndarray] = None) -> Tuple[int, np.ndarray]:
+    """
+    RSI level crossings of every bar of the series, as MomentumStrategy signals;
+    ``rsi`` is the series' RSI when the caller has already computed it
+
+    Returns:
+        Tuple[int, np.ndarray]: First bar where the RSI is defined, and an int8 array
+        that is +1 where RSI crosses above ``oversold``, -1 where it crosses below
+        ``overbought`` and 0 elsewhere
+    """
+    if rsi is None:
+        rsi = wilder_rsi(rolling.values, period)
+    crossings = np.zeros(rsi.shape, dtype=np.int8)
+    crossings[1:][(rsi[:-1] <= oversold) & (rsi[1:] > oversold)] = 1
+    crossings[1:][(rsi[:-1] >= overbought) & (rsi[1:] < overbought)] = -1
+    return period, crossings
+
+
+def sma_crossover_positions(rolling: RollingSums, short_window: int,
+                            long_window: int) -> Tuple[int, np.ndarray]:
+    """
+    Long-while-above SMA crossover positions, as in BacktestService.generate_signals
+
+    Args:
+        rolling: Cumulative sums of the price series
+        short_window: Short SMA window
+        long_window: Long SMA window
+
+    Returns:
+        Tuple[int, np.ndarray]: First bar where both SMAs are defined, and the position
+        changes from that bar on
+
+    Raises:
+        ValueError: If the windows are too large for the data
+    """
+    start, signal = sma_crossover_signal(rolling, short_window, long_window)
+    if start >= len(rolling):
+        raise ValueError("Window sizes are too large for the data")
+    return start, position_changes(signal[start:])
+
+
+def bollinger_positions(rolling: RollingSums, window: int, num_std: float) -> Tuple[int, np.ndarray]:
+    """
+    Mean reversion positions: go long when price crosses below the lower band and
+    exit when it crosses above the upper band, as MeanReversionStrategy signals
+
+    Args:
+        rolling: Cumulative sums of the price series
+        window: Lookback period of the bands
+        num_std: Number of standard deviations for the bands
+
+    Returns:
+        Tuple[int, np.ndarray]: First bar where the bands are defined, and the position
+        changes from that bar on
+
+    Raises:
+        ValueError: If the window is too large for the data
+    """
+    if window < 2 or window > len(rolling):
+        raise ValueError("Window size is too large for the data")
+    start, crossings = bollinger_crossings(rolling, window, num_std)
+    return start, position_changes(hold_crossings(crossings[start:]))
+
+
+def rsi_positions(rolling: RollingSums, period: int, oversold: float, overbought: float,
+                  rsi: Optional[np.ndarray] = None) -> Tuple[int, np.ndarray]:
+    """
+    RSI momentum positions: go long when RSI recovers above the oversold level and
+    exit when it falls back below the overbought level, as MomentumStrategy signals
+
+    Args:
+        rolling: Cumulative sums of the price series
+        period: RSI period
+        oversold: Oversold RSI level
+        overbought: Overbought RSI level
+        rsi: RSI of the whole series, if already computed
+
+    Returns:
+        Tuple[int, np.ndarray]: First bar where the RSI is defined, and the position
+        changes from that bar on
+
+    Raises:
+        ValueError: If the period is too large for the data
+    """
+    if period < 1 or period >= len(rolling):
+        raise ValueError("RSI period is too large for the data")
+    start, crossings = rsi_crossings(rolling, period, oversold, overbought, rsi)
+    return start, position_changes(hold_crossings(crossings[start:]))
@@ -0,0 +1,92 @@
+import math
+from typing import Dict
+
+import numpy as np
+
+
+def trade_fee(notional: float, commission: float, min_commission: float) -> float:
+    """Commission charged on a trade of the given notional value"""
+    if notional <= 0:
+        return 0.0
+    return max(notional * commission, min_commission)
+
+
+def simulate_all_in(prices: np.ndarray, position_changes: np.ndarray, initial_capital: float,
+                    commission: float = 0.0, min_commission: float = 0.0,
+                    slippage: float = 0.0, lot_size: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Simulate an all-in/all-out strategy over contiguous price and position-change arrays
+
+    A positive position change buys with all available cash, a negative one sells the
+    whole holding. Only bars with a position change are visited; cash and shares are
+    constant in between, so the holdings/cash/total curves are filled with array
+    operations. With no costs and fractional shares this reproduces the original
+    per-bar simulation exactly.
+
+    Args:
+        prices: Price of every bar
+        position_changes: +1 to buy, -1 to sell, 0 (or NaN) for no change
+        initial_capital: Starting cash
+        commission: Commission rate on traded notional (e.g., 0.001 for 10 bps)
+        min_commission: Minimum commission per trade
+        slippage: Adverse price move applied to every fill, as a fraction of price
+        lot_size: Trade in whole lots of this many shares; 0 allows fractional shares
+
+    Returns:
+        Dict[str, np.ndarray]: 'holdings', 'cash', 'total' and 'shares' per bar, plus
+        'trade_index' (bars where a trade was filled) and 'fees' (commission per trade)
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    changes = np.nan_to_num(np.asarray(position_changes, dtype=np.float64))
+    n = len(prices)
+
+    cash = float(initial_capital)
+    shares = 0.0
+    trade_index = []
+    cash_after = []
+    shares_after = []
+    fees = []
+    for i in np.flatnonzero(changes):
+        price = prices[i]
+        if changes[i] > 0 and shares == 0:
+            fill_price = price * (1 + slippage)
+            quantity = cash / (fill_price * (1 + commission))
+            if min_commission and quantity * fill_price * commission < min_commission:
+                quantity = max(cash - min_commission, 0.0) / fill_price
+            if lot_size:
+                quantity = math.floor(quantity / lot_size) * lot_size
+            if quantity <= 0:
+                continue
+            fee = trade_fee(quantity * fill_price, commission, min_commission)
+            # Fractional all-in buys spend the cash exactly; avoid rounding residue
+            cash = cash - (quantity * fill_price + fee) if lot_size else 0.0
+            shares = quantity
+        elif changes[i] < 0 and shares > 0:
+            fill_price = price * (1 - slippage)
+            fee = trade_fee(shares * fill_price, commission, min_commission)
+            cash += shares * fill_price - fee
+            shares = 0.0
+        else:
+            continue
+        trade_index.append(i)
+        cash_after.append(cash)
+        shares_after.append(shares)
+        fees.append(fee)
+
+    trade_index = np.asarray(trade_index, dtype=np.int64)
+    segment = np.searchsorted(trade_index, np.arange(n), side='right') - 1
+    traded = segment >= 0
+    cash_curve = np.full(n, float(initial_capital))
+    shares_curve = np.zeros(n)
+    cash_curve[traded] = np.asarray(cash_after)[segment[traded]]
+    shares_curve[traded] = np.asarray(shares_after)[segment[traded]]
+    holdings = shares_curve * prices
+
+    return {
+        'holdings': holdings,
+        'cash': cash_curve,
+        'total': cash_curve + holdings,
+        'shares': shares_curve,
+        'trade_index': trade_index,
+        'fees': np.asarray(fees, dtype=np.float64),
+    }
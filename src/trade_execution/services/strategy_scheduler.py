@@ -0,0 +1,282 @@
+import asyncio
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import logging
+
+from futu import KLType
+
+from trade_execution.models.BarStore import BarStore, ClosedBar
+from trade_execution.models.Order import OrderSide
+
+logger = logging.getLogger('trade_execution.services.strategy_scheduler')
+
+# Time allowed for evaluating every instance on one bar close, in milliseconds
+DEFAULT_LATENCY_BUDGET_MS = 50.0
+
+
+class ScheduledStrategy:
+    """
+    One registered (strategy, code, ktype) instance.
+
+    Strategies with feature signals read their indicators from the shared
+    FeatureCache, so instances on the same code compute each indicator once per bar;
+    other strategies keep their own incremental indicator state.
+    """
+    def __init__(self, instance_id: str, strategy, code: str, ktype: str, qty: int,
+                 price: Optional[float], live: bool):
+        self.instance_id = instance_id
+        self.strategy = strategy
+        self.code = code
+        self.ktype = ktype
+        self.qty = qty
+        self.price = price
+        self.live = live
+        self.uses_features = strategy.supports_features
+        self.state = None if self.uses_features else strategy.create_signal_state()
+        if self.state is None and not self.uses_features:
+            raise ValueError(f"{strategy.name} does not support incremental signals")
+        self.last_bar_time: Optional[np.datetime64] = None
+        self.last_signal: Optional[OrderSide] = None
+        self.last_order_id: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.evaluations = 0
+        self.signals = 0
+        self.orders = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.last_ns = 0
+
+    def seed(self, times: np.ndarray, closes: np.ndarray):
+        """Feed completed bars into the indicator state, oldest first"""
+        if self.uses_features:
+            # Bring the shared features up to the last completed bar now rather than
+            # at the first bar close
+            if len(closes):
+                self.strategy.signal_from_features(self.code, self.ktype, times, closes)
+            return
+        for close in closes:
+            self.strategy.on_bar(self.state, float(close))
+
+    def evaluate(self, bar_time: np.datetime64, close: float,
+                 bars: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                 signals: Optional[Dict[Any, Optional[OrderSide]]] = None) -> Optional[OrderSide]:
+        """
+        Evaluate one completed bar and return its signal, timing the evaluation
+
+        Args:
+            bar_time: Time of the completed bar
+            close: Its close
+            bars: (times, closes) of the buffered bars up to the completed one, read by
+                  strategies with feature signals
+            signals: Feature signals already generated on these bars, by strategy class
+                     and parameters; filled in with this instance's signal
+        """
+        started = time.perf_counter_ns()
+        if self.uses_features:
+            # Parameters are immutable, so equal ones give equal signals on the same bars
+            key = (type(self.strategy), self.strategy.parameters)
+            if signals is not None and key in signals:
+                signal = signals[key]
+            else:
+                signal = self.strategy.signal_from_features(self.code, self.ktype, *bars)
+                if signals is not None:
+                    signals[key] = signal
+        else:
+            signal = self.strategy.on_bar(self.state, close)
+        elapsed = time.perf_counter_ns() - started
+        self.evaluations += 1
+        self.total_ns += elapsed
+        self.last_ns = elapsed
+        self.max_ns = max(self.max_ns, elapsed)
+        self.last_bar_time = bar_time
+        if signal is not None:
+            self.signals += 1
+            self.last_signal = signal
+        return signal
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'instance_id': self.instance_id,
+            'strategy': self.strategy.name,
+            'code': self.code,
+            'ktype': self.ktype,
+            'parameters': self.strategy.parameters,
+            'qty': self.qty,
+            'price': self.price,
+            'live': self.live,
+            'last_bar_time': str(self.last_bar_time) if self.last_bar_time is not None else None,
+            'last_signal': self.last_signal.value if self.last_signal else None,
+            'last_order_id': self.last_order_id,
+            'last_error': self.last_error,
+            'stats': {
+                'evaluations': self.evaluations,
+                'signals': self.signals,
+                'orders': self.orders,
+                'errors': self.errors,
+                'mean_us': self.total_ns / self.evaluations / 1000 if self.evaluations else 0.0,
+                'max_us': self.max_ns / 1000,
+                'last_us': self.last_ns / 1000,
+            },
+        }
+
+
+class StrategyScheduler:
+    """
+    Runs registered strategy instances on every bar close of their (code, ktype).
+
+    BarStore reports the bars completed by each k-line push; the scheduler hands them
+    to the server's event loop, evaluates each closed bar with O(1) incremental updates
+    for every instance on that (code, ktype), generating the signal of each distinct
+    feature strategy and parameter set only once, and sends the resulting order
+    intents through StrategyBase.place_order on the default executor so that order
+    round trips never hold up evaluation of the next bar.
+    """
+    _instance = None
+
+    def __init__(self, bar_store: Optional[BarStore] = None,
+                 latency_budget_ms: float = DEFAULT_LATENCY_BUDGET_MS):
+        self.bar_store = bar_store or BarStore.getInstance()
+        self.latency_budget_ms = latency_budget_ms
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.instances: Dict[str, ScheduledStrategy] = {}
+        self._by_key: Dict[Tuple[str, str], List[ScheduledStrategy]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.stats = {'bars': 0, 'evaluations': 0, 'over_budget': 0, 'last_ms': 0.0, 'max_ms': 0.0}
+        self.bar_store.add_listener(self.on_bars_closed)
+
+    @classmethod
+    def getInstance(cls, **kwargs) -> 'StrategyScheduler':
+        if not cls._instance:
+            logger.info("Creating new StrategyScheduler instance")
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Evaluate bar closes on ``loop`` instead of the push thread"""
+        self.loop = loop
+
+    def register(self, strategy, code: str, ktype: str = KLType.K_DAY, qty: int = 100,
+                 price: Optional[float] = None, live: bool = False) -> ScheduledStrategy:
+        """
+        Register a set-up strategy object to run on every bar close of (code, ktype)
+
+        The bar buffer is seeded (and subscribed) on first use and the instance's own
+        indicator state, if it has one, is warmed up on its completed bars.
+
+        Args:
+            strategy: Strategy object, already set up, used by this instance only
+            code: Security code
+            ktype: K-line type whose bar closes trigger evaluation
+            qty: Order quantity of every signal
+            price: Limit price, None for market orders
+            live: Submit orders; otherwise they are only created, as in /strategy/run
+
+        Returns:
+            ScheduledStrategy: The registered instance
+
+        Raises:
+            ValueError: If the strategy has neither feature signals nor incremental signal state
+        """
+        instance = ScheduledStrategy(f"sched-{next(self._ids)}", strategy, code, ktype, qty, price, live)
+        bars = self.bar_store.get_bars(code, ktype, self.bar_store.capacity)
+        # The last bar is still forming; it is evaluated once a later bar closes it
+        instance.seed(bars['time_key'].to_numpy()[:-1], bars['close'].to_numpy()[:-1])
+        with self._lock:
+            self.instances[instance.instance_id] = instance
+            self._by_key.setdefault((code, ktype), []).append(instance)
+        logger.info(f"Scheduled {strategy.name} on {code} {ktype} as {instance.instance_id}")
+        return instance
+
+    def unregister(self, instance_id: str) -> bool:
+        with self._lock:
+            instance = self.instances.pop(instance_id, None)
+            if instance is None:
+                return False
+            self._by_key[(instance.code, instance.ktype)].remove(instance)
+        return True
+
+    def on_bars_closed(self, closed: List[ClosedBar]):
+        """BarStore listener, called on the push thread"""
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.evaluate, closed)
+        else:
+            self.evaluate(closed)
+
+    def evaluate(self, closed: List[ClosedBar]) -> List[Tuple[ScheduledStrategy, OrderSide]]:
+        """
+        Evaluate every instance on the given closed bars and dispatch their order intents
+
+        Returns:
+            List[Tuple[ScheduledStrategy, OrderSide]]: The order intents
+        """
+        started = time.perf_counter()
+        intents = []
+        evaluations = 0
+        for code, ktype, bar_time, close in closed:
+            with self._lock:
+                instances = list(self._by_key.get((code, ktype), ()))
+            bars = None
+            if any(instance.uses_features for instance in instances):
+                bars = self._bars_until(code, ktype, bar_time)
+            signals = {}
+            for instance in instances:
+                try:
+                    signal = instance.evaluate(bar_time, close, bars, signals)
+                except Exception as e:
+                    instance.errors += 1
+                    instance.last_error = str(e)
+                    logger.error(f"Strategy instance {instance.instance_id} failed: {str(e)}")
+                    continue
+                if signal is not None:
+                    intents.append((instance, signal))
+            evaluations += len(instances)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats['bars'] += len(closed)
+        self.stats['evaluations'] += evaluations
+        self.stats['last_ms'] = elapsed_ms
+        self.stats['max_ms'] = max(self.stats['max_ms'], elapsed_ms)
+        if elapsed_ms > self.latency_budget_ms:
+            self.stats['over_budget'] += 1
+            logger.warning(f"Evaluated {evaluations} strategy instances in {elapsed_ms:.1f}ms, "
+                           f"over the {self.latency_budget_ms}ms budget")
+
+        for instance, signal in intents:
+            if self.loop is not None and self.loop.is_running():
+                self.loop.run_in_executor(None, self._place_order, instance, signal)
+            else:
+                self._place_order(instance, signal)
+        return intents
+
+    def _bars_until(self, code: str, ktype: str, bar_time: np.datetime64) -> Tuple[np.ndarray, np.ndarray]:
+        """Buffered (times, closes) of (code, ktype) up to and including ``bar_time``"""
+        bars = self.bar_store.get_buffer(code, ktype).view(self.bar_store.capacity)
+        end = int(np.searchsorted(bars['time_key'], bar_time, side='right'))
+        return bars['time_key'][:end], bars['close'][:end]
+
+    @staticmethod
+    def _place_order(instance: ScheduledStrategy, signal: OrderSide):
+        try:
+            order = instance.strategy.place_order(instance.code, signal, instance.qty, instance.price,
+                                                  is_backtest=not instance.live)
+            instance.orders += 1
+            instance.last_order_id = order.order_id
+        except Exception as e:
+            instance.errors += 1
+            instance.last_error = str(e)
+            logger.error(f"Order of strategy instance {instance.instance_id} failed: {str(e)}")
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            instances = list(self.instances.values())
+        return {
+            'latency_budget_ms': self.latency_budget_ms,
+            'stats': dict(self.stats),
+            'instances': [instance.to_dict() for instance in instances],
+        }
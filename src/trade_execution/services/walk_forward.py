@@ -0,0 +1,184 @@
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import logging
+
+from trade_execution.services.metrics import METRIC_NAMES, compute_metrics
+from trade_execution.services.parameter_sweep import (
+    MIN_PARALLEL_COMBINATIONS, Progress, evaluate, expand_grid, map_shared, strategy_positions
+)
+from trade_execution.services.signal_kernels import RollingSums
+from trade_execution.services.simulation import simulate_all_in
+
+logger = logging.getLogger('trade_execution.services.walk_forward')
+
+WALK_FORWARD_MODES = ('rolling', 'anchored')
+
+
+def fold_ranges(length: int, train_size: int, test_size: int, mode: str = 'rolling') -> List[Tuple[int, int, int, int]]:
+    """
+    Split a series into consecutive train/test folds
+
+    Test slices tile the series after the first ``train_size`` bars; the last one may
+    be shorter. Rolling folds train on the ``train_size`` bars before each test slice,
+    anchored folds on everything before it.
+
+    Returns:
+        List[Tuple[int, int, int, int]]: (train_start, train_end, test_start, test_end)
+        bar ranges, ends exclusive
+
+    Raises:
+        ValueError: If the sizes or mode are invalid
+    """
+    if mode not in WALK_FORWARD_MODES:
+        raise ValueError(f"Unknown walk-forward mode: {mode}")
+    if train_size < 1 or test_size < 1:
+        raise ValueError("Train and test sizes must be positive")
+
+    folds = []
+    test_start = train_size
+    while test_start < length:
+        test_end = min(test_start + test_size, length)
+        train_start = 0 if mode == 'anchored' else test_start - train_size
+        folds.append((train_start, test_start, test_start, test_end))
+        test_start = test_end
+    return folds
+
+
+def optimize_fold(rolling: RollingSums, strategy_id: str, combinations: List[Dict[str, Any]],
+                  train_start: int, train_end: int, initial_capital: float,
+                  costs: Dict[str, Any], rank_by: str) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+    """
+    Pick the combination with the best ``rank_by`` metric on one train slice
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], Optional[float]]: The best parameters and their
+        train score, or (None, None) if no combination fits the slice
+    """
+    best, best_score = None, None
+    for parameters in combinations:
+        try:
+            score = evaluate(rolling, strategy_id, parameters, initial_capital, costs,
+                             train_start, train_end)[rank_by]
+        except ValueError:
+            continue
+        if best_score is None or score > best_score:
+            best, best_score = parameters, score
+    return best, best_score
+
+
+def _label(index: Optional[Sequence], bar: int):
+    if index is None:
+        return bar
+    return pd.Timestamp(index[bar]).strftime('%Y-%m-%d')
+
+
+def walk_forward(prices: np.ndarray, strategy_id: str, grid: Dict[str, List[Any]],
+                 train_size: int, test_size: int, mode: str = 'rolling',
+                 initial_capital: float = 10000.0, costs: Optional[Dict[str, Any]] = None,
+                 rank_by: str = 'sharpe_ratio', max_workers: Optional[int] = None,
+                 index: Optional[Sequence] = None, progress: Optional[Progress] = None) -> Dict[str, Any]:
+    """
+    Walk-forward optimization: optimize on each train slice, trade the next test slice
+
+    Indicators are computed once over the whole series and cached per combination,
+    so overlapping train slices and the test slices reuse them, and test slices are
+    traded with indicators warmed up on the bars before them. Folds are optimized in
+    parallel; the out-of-sample test slices are then traded in order, each starting
+    flat with the previous slice's final value, and stitched into one equity curve.
+
+    Args:
+        prices: Price of every bar, oldest first
+        strategy_id: Strategy to optimize ("sma_crossover" or "mean_reversion")
+        grid: Values to try for each parameter
+        train_size: Bars in each train slice (the minimum for anchored folds)
+        test_size: Bars in each test slice
+        mode: "rolling" or "anchored" train slices
+        initial_capital: Starting capital of the out-of-sample run
+        costs: Trading cost settings passed to the simulation
+        rank_by: Metric used to choose each fold's parameters, highest wins
+        max_workers: Pool size; defaults to the CPU count, 1 runs in-process
+        index: Bar timestamps used to label folds and the equity curve
+        progress: Called with the completed fraction as folds are optimized
+
+    Returns:
+        Dict[str, Any]: Per-fold ranges, chosen parameters and metrics, plus the
+        stitched out-of-sample equity curve and its metrics
+
+    Raises:
+        ValueError: If the grid, sizes, mode or ranking metric are invalid
+    """
+    if rank_by not in METRIC_NAMES:
+        raise ValueError(f"Unknown ranking metric: {rank_by}")
+    combinations = expand_grid(strategy_id, grid)
+    if not combinations:
+        raise ValueError("The parameter grid has no valid combinations")
+    folds = fold_ranges(len(prices), train_size, test_size, mode)
+    if not folds:
+        raise ValueError("Not enough data for one train/test fold")
+
+    started = time.perf_counter()
+    rolling = RollingSums(np.asarray(prices, dtype=np.float64))
+    costs = costs or {}
+    max_workers = min(max_workers or os.cpu_count() or 1, len(folds))
+
+    tasks = [(strategy_id, combinations, train_start, train_end, initial_capital, costs, rank_by)
+             for train_start, train_end, _, _ in folds]
+    if max_workers <= 1 or len(folds) * len(combinations) < MIN_PARALLEL_COMBINATIONS:
+        chosen = []
+        for task in tasks:
+            chosen.append(optimize_fold(rolling, *task))
+            if progress:
+                progress(len(chosen) / len(tasks), f"Optimized {len(chosen)}/{len(tasks)} folds")
+        workers = 1
+    else:
+        chosen = map_shared(rolling, optimize_fold, tasks, max_workers, progress)
+        workers = max_workers
+
+    # Trade the test slices in order, carrying the portfolio value from fold to fold
+    capital = float(initial_capital)
+    totals, changes, fold_results = [], [], []
+    for number, ((train_start, train_end, test_start, test_end), (parameters, score)) in enumerate(zip(folds, chosen)):
+        if parameters is None:
+            total = np.full(test_end - test_start, capital)
+            fold_changes = np.zeros(test_end - test_start)
+        else:
+            first, fold_changes = strategy_positions(rolling, strategy_id, parameters, test_start, test_end)
+            total = simulate_all_in(rolling.values[first:test_end], fold_changes, capital, **costs)['total']
+        fold_results.append({
+            'fold': number,
+            'train_start': _label(index, train_start),
+            'train_end': _label(index, train_end - 1),
+            'test_start': _label(index, test_start),
+            'test_end': _label(index, test_end - 1),
+            'parameters': parameters,
+            'train_score': score,
+            'test_metrics': compute_metrics(total, fold_changes, capital),
+        })
+        totals.append(total)
+        changes.append(fold_changes)
+        capital = float(total[-1])
+
+    equity = np.concatenate(totals)
+    first_test = folds[0][2]
+    elapsed = time.perf_counter() - started
+    logger.info(f"Walk-forward {strategy_id} ({mode}): {len(folds)} folds x {len(combinations)} "
+                f"combinations with {workers} worker(s) in {elapsed:.2f}s")
+    return {
+        'strategy_id': strategy_id,
+        'mode': mode,
+        'train_size': train_size,
+        'test_size': test_size,
+        'combinations': len(combinations),
+        'workers': workers,
+        'rank_by': rank_by,
+        'elapsed_seconds': elapsed,
+        'folds': fold_results,
+        'metrics': compute_metrics(equity, np.concatenate(changes), initial_capital),
+        'equity_curve': [
+            {'date': _label(index, first_test + i), 'value': float(value)} for i, value in enumerate(equity)
+        ],
+    }
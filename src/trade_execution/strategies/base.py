@@ -1,19 +1,91 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
 from trade_execution.models.Order import Order, OrderSide
 from trade_execution.models.APIConnectInfo import APIConnectInfo
+from trade_execution.models.BarStore import BarStore
+from trade_execution.services.bar_cache import BarCache
+from trade_execution.services.history_fetcher import HistoryKlineFetcher
+from trade_execution.services.metrics import analyze_equity
+from trade_execution.strategies.feature_cache import FeatureCache
 from futu import *
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import time
+
+# Encoding of signals in per-bar signal arrays
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+SIGNAL_VALUES = {OrderSide.BUY: SIGNAL_BUY, OrderSide.SELL: SIGNAL_SELL}
+
+# K-line columns kept for backtests
+HISTORY_COLUMNS = ['open', 'close', 'high', 'low', 'volume', 'turnover']
+
+# Threads submitting the orders of one batch
+ORDER_SUBMIT_WORKERS = 4
+
+# An order to place: (code, side, qty, price or None for a market order)
+OrderIntent = Tuple[str, OrderSide, int, Optional[float]]
+
+class StrategyParameters(dict):
+    """
+    Read-only parameters of a set-up strategy
+
+    A strategy's parameters never change after setup, so one instance can serve any
+    number of concurrent runs; other parameters mean another instance. Hashable, so
+    parameter sets can key instance pools.
+    """
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Strategy parameters are immutable")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+    def __reduce__(self):
+        return StrategyParameters, (dict(self),)
+
 
 class StrategyBase(ABC):
     """
     Base abstract class for all trading strategies
+    
+    Subclasses set themselves up with default parameters on construction. Runs never
+    call setup on an existing instance: a run with other parameters is delegated to
+    a new instance (see with_parameters), so instances can be shared across threads.
     """
     def __init__(self, name: str):
         self.name = name
         self.info = APIConnectInfo.getInstance()
-        self.parameters = {}
+        self.parameters = StrategyParameters()
+        self.history_report: Optional[Dict[str, Any]] = None
+    
+    @classmethod
+    def create(cls, **parameters) -> 'StrategyBase':
+        """
+        Create a strategy instance set up with the given parameters
+        
+        Raises:
+            ValueError: If the parameters are invalid
+        """
+        strategy = cls()
+        strategy.setup(**parameters)
+        return strategy
+    
+    def with_parameters(self, **kwargs) -> 'StrategyBase':
+        """
+        Return this strategy if ``kwargs`` leave its parameters unchanged, otherwise a
+        new instance set up with the changed parameters
+        
+        Args:
+            **kwargs: Run arguments; only the strategy's parameter names are considered
+        """
+        overrides = {name: kwargs[name] for name in self.parameters if name in kwargs}
+        if all(self.parameters[name] == value for name, value in overrides.items()):
+            return self
+        return type(self).create(**{**self.parameters, **overrides})
     
     @abstractmethod
     def setup(self, **kwargs):
@@ -53,9 +125,158 @@ class StrategyBase(ABC):
         """
         pass
     
+    def create_signal_state(self) -> Optional[Dict[str, Any]]:
+        """
+        Create fresh incremental indicator state for bar-by-bar signal generation
+        
+        Returns:
+            Optional[Dict[str, Any]]: Indicator state, or None if the strategy
+                                      only supports generate_signal
+        """
+        return None
+    
+    def on_bar(self, state: Dict[str, Any], close: float, new_bar: bool = True) -> Optional[OrderSide]:
+        """
+        Feed one bar into the incremental state and generate its signal in O(1)
+        
+        Args:
+            state: State created by create_signal_state
+            close: Close price of the bar
+            new_bar: False to amend the last bar instead (a live bar still forming)
+            
+        Returns:
+            Optional[OrderSide]: Trading signal for the bar
+        """
+        raise NotImplementedError(f"{self.name} does not support incremental signals")
+    
+    def feature(self, code: str, ktype: str, name: str, times: np.ndarray, closes: np.ndarray,
+                **params) -> Tuple[Any, Any]:
+        """
+        Read a shared indicator feature at the last of the given bars
+        
+        Features come from the FeatureCache, so every strategy and instance reading the
+        same feature of the same bars shares one incremental computation per bar.
+        
+        Args:
+            code: Security code
+            ktype: K-line type
+            name: Feature name (e.g., 'sma', 'std', 'rsi')
+            times: Bar times, oldest first
+            closes: Close of every bar
+            **params: Feature parameters (e.g., window=20)
+            
+        Returns:
+            Tuple[Any, Any]: The feature's (previous bar, last bar) values
+        """
+        return FeatureCache.getInstance().get(code, ktype, name, times, closes, **params)
+    
+    def signal_from_features(self, code: str, ktype: str, times: np.ndarray,
+                             closes: np.ndarray) -> Optional[OrderSide]:
+        """
+        Generate the signal of the last bar from shared features
+        
+        Args:
+            code: Security code the bars belong to
+            ktype: K-line type of the bars
+            times: Bar times, oldest first
+            closes: Close of every bar
+            
+        Returns:
+            Optional[OrderSide]: Trading signal for the last bar
+        """
+        raise NotImplementedError(f"{self.name} does not support feature signals")
+    
+    @property
+    def supports_features(self) -> bool:
+        """Whether signal_from_features is implemented"""
+        return type(self).signal_from_features is not StrategyBase.signal_from_features
+    
+    def signal_from_closes(self, closes) -> Optional[OrderSide]:
+        """
+        Feed closes into fresh incremental state and return the signal of the last bar
+        
+        Args:
+            closes: Close prices, oldest first
+            
+        Returns:
+            Optional[OrderSide]: Trading signal for the last bar
+        """
+        state = self.create_signal_state()
+        signal = None
+        for close in closes:
+            signal = self.on_bar(state, float(close))
+        return signal
+    
+    def generate_signals(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Generate the signal of every bar in a series
+        
+        Strategies override this with a vectorized implementation; the default falls
+        back to the per-bar path.
+        
+        Args:
+            data: Market data for the whole series, oldest first
+            
+        Returns:
+            np.ndarray: Per-bar signals, SIGNAL_BUY, SIGNAL_SELL or 0 for no action
+        """
+        return self.generate_signals_per_bar(data)
+    
+    def generate_signal_matrix(self, closes: np.ndarray) -> np.ndarray:
+        """
+        Generate the signal of every bar of many series at once
+        
+        Strategies override this with an implementation vectorized across codes; the
+        default generates the signals of one column at a time.
+        
+        Args:
+            closes: (time x code) close prices, oldest first
+            
+        Returns:
+            np.ndarray: Signals shaped like ``closes``
+        """
+        signals = np.zeros(closes.shape, dtype=np.int8)
+        for j in range(closes.shape[1]):
+            signals[:, j] = self.generate_signals(pd.DataFrame({'close': closes[:, j]}))
+        return signals
+    
+    @property
+    def signal_lookback(self) -> Optional[int]:
+        """Bars that determine the signal of the last bar, None if all of them may"""
+        return None
+    
+    def generate_signals_per_bar(self, data: pd.DataFrame, incremental: bool = True) -> np.ndarray:
+        """
+        Generate the signal of every bar one bar at a time
+        
+        Args:
+            data: Market data for the whole series, oldest first
+            incremental: Use the incremental indicator state when the strategy has one,
+                         otherwise call generate_signal on a trailing window of each bar
+            
+        Returns:
+            np.ndarray: Per-bar signals, SIGNAL_BUY, SIGNAL_SELL or 0 for no action
+        """
+        signals = np.zeros(len(data), dtype=np.int8)
+        state = self.create_signal_state() if incremental else None
+        closes = data['close'].to_numpy(dtype=float)
+        for i in range(len(data)):
+            if state is not None:
+                signal = self.on_bar(state, closes[i])
+            else:
+                # Create a window of data for signal generation
+                lookback = min(i, 50)  # Use up to 50 days of lookback
+                signal = self.generate_signal(data.iloc[i-lookback:i+1])
+            if signal is not None:
+                signals[i] = SIGNAL_VALUES[signal]
+        return signals
+    
     def get_historical_data(self, code: str, period: str, count: int = 100) -> pd.DataFrame:
         """
-        Fetch historical k-line data
+        Fetch recent k-line data from the live bar store
+        
+        The first request for a (code, period) seeds the store with one get_cur_kline
+        call; later requests return views of the push-maintained buffer.
         
         Args:
             code: Security code
@@ -65,9 +286,49 @@ class StrategyBase(ABC):
         Returns:
             pd.DataFrame: Historical k-line data
         """
-        ret, data = self.info.quote_context.get_cur_kline(code=code, num=count, ktype=period)
-        if ret != RET_OK:
-            raise Exception(f"Failed to get historical data: {data}")
+        return BarStore.getInstance().get_bars(code, period, count)
+    
+    def fetch_history_kline(self, code: str, start: date, end: date, ktype: str = KLType.K_DAY) -> pd.DataFrame:
+        """
+        Fetch historical k-lines for an inclusive date range from OpenD
+        
+        The range is fetched as concurrent paginated chunks; the fetch report, including
+        the history k-line quota consumed, is kept in ``self.history_report``.
+        
+        Args:
+            code: Security code
+            start: First date of the range
+            end: Last date of the range
+            ktype: K-line period
+            
+        Returns:
+            pd.DataFrame: K-line data indexed by bar time
+        """
+        fetcher = HistoryKlineFetcher(self.info.quote_pool)
+        data, report = fetcher.fetch(code, start, end, ktype=ktype)
+        self.history_report = report
+        data = data.set_index(pd.DatetimeIndex(pd.to_datetime(data['time_key'])))
+        return data[HISTORY_COLUMNS]
+    
+    def get_backtest_data(self, code: str, start_date: datetime, end_date: datetime, ktype: str = KLType.K_DAY) -> pd.DataFrame:
+        """
+        Get historical k-lines for a backtest through the local bar cache
+        
+        Args:
+            code: Security code
+            start_date: Start date for backtest
+            end_date: End date for backtest (inclusive)
+            ktype: K-line period
+            
+        Returns:
+            pd.DataFrame: K-line data with a time_key column, oldest first
+        """
+        bars = BarCache.getInstance().get(
+            "futu", code, ktype, start_date, end_date,
+            lambda start, end: self.fetch_history_kline(code, start, end, ktype)
+        )
+        data = bars.reset_index(drop=True)
+        data.insert(0, 'time_key', bars.index.strftime("%Y-%m-%d %H:%M:%S"))
         return data
     
     def place_order(self, code: str, side: OrderSide, qty: int, price: Optional[float] = None, is_backtest: Optional[bool] = True) -> Order:
@@ -96,6 +357,98 @@ class StrategyBase(ABC):
         
         return order
     
+    def place_orders(self, intents: List[OrderIntent],
+                     is_backtest: Optional[bool] = True) -> List[Union[Order, Exception]]:
+        """
+        Place a batch of orders, submitting them concurrently
+        
+        Args:
+            intents: Orders to place
+            is_backtest: Whether to only create the orders, as in place_order
+            
+        Returns:
+            List[Union[Order, Exception]]: The order of every intent, or the exception
+            raised placing it
+        """
+        def place(intent: OrderIntent) -> Union[Order, Exception]:
+            try:
+                return self.place_order(*intent, is_backtest=is_backtest)
+            except Exception as e:
+                return e
+        
+        if is_backtest or len(intents) < 2:
+            return [place(intent) for intent in intents]
+        with ThreadPoolExecutor(max_workers=ORDER_SUBMIT_WORKERS) as executor:
+            return list(executor.map(place, intents))
+    
+    def run_batch(self, codes: List[str], ktype: str = KLType.K_DAY, qty: int = 100,
+                  price: Optional[float] = None, live: bool = False) -> Dict[str, Any]:
+        """
+        Evaluate the strategy on the latest bars of many codes and place their orders
+        
+        Bars come from the live bar store, which subscribes all new codes in one
+        request; the signals of every code are then generated at once on a
+        (bars x code) close array and the orders placed as one batch.
+        
+        Args:
+            codes: Security codes
+            ktype: K-line type
+            qty: Order quantity of every signal
+            price: Limit price, None for market orders
+            live: Submit the orders; otherwise they are only created, as in run()
+            
+        Returns:
+            Dict[str, Any]: Signal, last close and order (or error) of every code, and
+            the time spent fetching bars, evaluating and placing orders
+        """
+        started = time.perf_counter()
+        store = BarStore.getInstance()
+        count = self.signal_lookback or store.capacity
+        closes, errors = store.get_close_matrix(codes, ktype, count)
+        fetched = time.perf_counter()
+        
+        # Codes without enough bars hold, as generate_signal does
+        ready = ~np.isnan(closes).any(axis=0)
+        signals = np.zeros(len(codes), dtype=np.int8)
+        if ready.any():
+            signals[ready] = self.generate_signal_matrix(closes[:, ready])[-1]
+        evaluated = time.perf_counter()
+        
+        sides = {value: side for side, value in SIGNAL_VALUES.items()}
+        signal_columns = np.flatnonzero(signals)
+        orders = self.place_orders([(codes[j], sides[signals[j]], qty, price) for j in signal_columns],
+                                   is_backtest=not live)
+        placed = time.perf_counter()
+        
+        results = []
+        for j, code in enumerate(codes):
+            last_close = closes[-1, j]
+            results.append({
+                'code': code,
+                'signal': sides[signals[j]].value if signals[j] else "HOLD",
+                'close': None if np.isnan(last_close) else float(last_close),
+                'order_id': None,
+                'error': errors.get(code) or (None if ready[j] else "Not enough bars"),
+            })
+        for j, order in zip(signal_columns, orders):
+            if isinstance(order, Exception):
+                results[j]['error'] = str(order)
+            else:
+                results[j]['order_id'] = order.order_id
+        
+        return {
+            'strategy': self.name,
+            'parameters': dict(self.parameters),
+            'results': results,
+            'timing': {
+                'fetch_ms': (fetched - started) * 1000,
+                'evaluate_ms': (evaluated - fetched) * 1000,
+                'orders_ms': (placed - evaluated) * 1000,
+                'total_ms': (placed - started) * 1000,
+            },
+            'timestamp': datetime.now().isoformat()
+        }
+    
     def backtest(self, code: str, start_date: datetime, end_date: datetime, **kwargs) -> Dict[str, Any]:
         """
         Run a backtest for the strategy
@@ -109,101 +462,122 @@ class StrategyBase(ABC):
         Returns:
             Dict[str, Any]: Backtest results including performance metrics
         """
-        # Set up the strategy with parameters
-        self.setup(**kwargs)
+        # Runs with other parameters go to their own instance
+        strategy = self.with_parameters(**kwargs)
+        if strategy is not self:
+            return strategy.backtest(code, start_date, end_date, **kwargs)
         
         # Get historical data for the backtest period
-        days_diff = (end_date - start_date).days
-        ret, data = self.info.quote_context.get_history_kline(
-            code=code, 
-            start=start_date.strftime("%Y-%m-%d"),
-            end=end_date.strftime("%Y-%m-%d"),
-            ktype=KLType.K_DAY
-        )
+        data = self.get_backtest_data(code, start_date, end_date)
         
-        if ret != RET_OK:
-            raise Exception(f"Failed to get historical data: {data}")
-            
-        # Initialize backtest variables
         initial_capital = kwargs.get('initial_capital', 100000)
+        result = self.backtest_on_data(data, initial_capital)
+        
+        return {
+            'strategy': self.name,
+            'code': code,
+            'start_date': start_date.strftime("%Y-%m-%d"),
+            'end_date': end_date.strftime("%Y-%m-%d"),
+            'initial_capital': initial_capital,
+            'final_equity': result['final_equity'],
+            'total_return': result['total_return'],
+            'max_drawdown': result['max_drawdown'],
+            'metrics': result['metrics'],
+            'trades': result['trades'],
+            'equity_curve': result['equity_curve'],
+            'parameters': dict(self.parameters)
+        }
+    
+    def backtest_on_data(self, data: pd.DataFrame, initial_capital: float = 100000,
+                         vectorized: bool = True) -> Dict[str, Any]:
+        """
+        Simulate the strategy over k-line data, all-in on BUY and all-out on SELL
+        
+        Signals come from generate_signals for the whole series at once; the simulation
+        then only touches NumPy arrays and loops over signal bars, not every bar.
+        
+        Args:
+            data: K-line data with time_key and close columns, oldest first
+            initial_capital: Starting capital
+            vectorized: False to generate signals with the per-bar path instead
+            
+        Returns:
+            Dict[str, Any]: Final equity, total return, max drawdown, the full metrics of
+            metrics.analyze_equity, trades and equity curve
+        """
+        times = data['time_key'].to_numpy()
+        closes = data['close'].to_numpy(dtype=float)
+        if vectorized:
+            signals = self.generate_signals(data)
+        else:
+            signals = self.generate_signals_per_bar(data)
+        
+        # Only bars with a signal can change the position
         capital = initial_capital
         shares = 0
         trades = []
-        equity_curve = []
-        
-        # Run the strategy on each day
-        for i in range(len(data)):
-            date = data.iloc[i]['time_key']
-            price = data.iloc[i]['close']
-            
-            # Create a window of data for signal generation
-            lookback = min(i, 50)  # Use up to 50 days of lookback
-            window_data = data.iloc[i-lookback:i+1]
-            
-            # Generate signal
-            signal = self.generate_signal(window_data)
-            
-            # Execute trades based on signals
-            if signal == OrderSide.BUY and shares == 0:
+        trade_bars = []
+        capital_after = []
+        shares_after = []
+        for i in np.flatnonzero(signals):
+            price = closes[i]
+            if signals[i] == SIGNAL_BUY and shares == 0:
                 # Calculate shares to buy (use 90% of capital)
                 buy_amount = capital * 0.9
                 shares = int(buy_amount / price)
                 trade_value = shares * price
                 capital -= trade_value
-                trades.append({
-                    'date': date,
-                    'action': 'BUY',
-                    'price': price,
-                    'shares': shares,
-                    'value': trade_value,
-                    'capital': capital
-                })
-            
-            elif signal == OrderSide.SELL and shares > 0:
+                action = 'BUY'
+            elif signals[i] == SIGNAL_SELL and shares > 0:
                 # Sell all shares
                 trade_value = shares * price
                 capital += trade_value
-                trades.append({
-                    'date': date,
-                    'action': 'SELL',
-                    'price': price,
-                    'shares': shares,
-                    'value': trade_value,
-                    'capital': capital
-                })
-                shares = 0
-            
-            # Update equity curve
-            equity = capital + (shares * price)
-            equity_curve.append({
-                'date': date,
-                'equity': equity,
-                'price': price
+                action = 'SELL'
+            else:
+                continue
+            trades.append({
+                'date': times[i],
+                'action': action,
+                'price': price,
+                'shares': shares,
+                'value': trade_value,
+                'capital': capital
             })
+            if action == 'SELL':
+                shares = 0
+            trade_bars.append(i)
+            capital_after.append(capital)
+            shares_after.append(shares)
+        
+        # Capital and shares are constant between trades
+        segment = np.searchsorted(np.asarray(trade_bars, dtype=np.int64), np.arange(len(closes)), side='right') - 1
+        capital_curve = np.where(segment >= 0, np.asarray(capital_after + [initial_capital])[segment], initial_capital)
+        shares_curve = np.where(segment >= 0, np.asarray(shares_after + [0])[segment], 0)
+        equity = capital_curve + shares_curve * closes
         
         # Calculate performance metrics
-        final_equity = equity_curve[-1]['equity']
+        final_equity = float(equity[-1]) if len(equity) else float(initial_capital)
         total_return = (final_equity / initial_capital - 1) * 100
+        metrics = None
+        max_drawdown = 0.0
+        if len(equity):
+            position_changes = np.zeros(len(closes))
+            position_changes[trade_bars] = [1.0 if trade['action'] == 'BUY' else -1.0 for trade in trades]
+            metrics = analyze_equity(equity, initial_capital, position_changes=position_changes,
+                                     shares=shares_curve, prices=closes)['metrics']
+            # Reported as a positive percentage
+            max_drawdown = -metrics['max_drawdown'] * 100
         
-        # Calculate drawdown
-        max_equity = initial_capital
-        max_drawdown = 0
-        for point in equity_curve:
-            if point['equity'] > max_equity:
-                max_equity = point['equity']
-            drawdown = (max_equity - point['equity']) / max_equity * 100
-            max_drawdown = max(max_drawdown, drawdown)
+        equity_curve = [
+            {'date': date, 'equity': value, 'price': price}
+            for date, value, price in zip(times.tolist(), equity.tolist(), closes.tolist())
+        ]
         
         return {
-            'strategy': self.name,
-            'code': code,
-            'start_date': start_date.strftime("%Y-%m-%d"),
-            'end_date': end_date.strftime("%Y-%m-%d"),
-            'initial_capital': initial_capital,
             'final_equity': final_equity,
             'total_return': total_return,
             'max_drawdown': max_drawdown,
+            'metrics': metrics,
             'trades': trades,
-            'equity_curve': equity_curve,
-            'parameters': self.parameters
-        }
\ No newline at end of file
+            'equity_curve': equity_curve
+        }
@@ -0,0 +1,174 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import logging
+
+from trade_execution.strategies.indicators import EMA, NAN, RSI, SMA, BollingerBands, Indicator, RollingStd
+
+logger = logging.getLogger('trade_execution.strategies.feature_cache')
+
+# Streaming indicators behind every feature name; params are their keyword arguments
+FEATURES: Dict[str, Callable[..., Indicator]] = {
+    'sma': SMA,
+    'std': RollingStd,
+    'ema': EMA,
+    'rsi': RSI,
+    'bollinger': BollingerBands,
+}
+
+DEFAULT_MEMORY_BUDGET = 32 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Rough size of an entry: fixed overhead plus a Python float slot per window bar
+ENTRY_BYTES = 512
+BYTES_PER_WINDOW_BAR = 32
+
+_NANOSECONDS = np.dtype('datetime64[ns]')
+
+FeatureKey = Tuple[str, str, str, Tuple[Tuple[str, Any], ...]]
+
+
+def _nanoseconds(times: np.ndarray) -> np.ndarray:
+    """Bar times as int64 nanoseconds, so time_key strings and datetimes share entries"""
+    if times.dtype != _NANOSECONDS:
+        times = pd.to_datetime(times).to_numpy().astype(_NANOSECONDS)
+    return times.view(np.int64)
+
+
+class _FeatureEntry:
+    """Incremental indicator of one feature, advanced to the bar at ``time``"""
+    def __init__(self, indicator: Indicator, nbytes: int):
+        self.indicator = indicator
+        self.nbytes = nbytes
+        self.lock = threading.Lock()
+        self.time = None
+        self.close = NAN
+        self.previous = NAN
+        self.value = NAN
+
+
+class FeatureCache:
+    """
+    Indicator values shared by every strategy and instance on the same bars.
+
+    Entries are keyed by (code, ktype, feature, params) and hold the feature's O(1)
+    streaming indicator together with the time and close of the last bar fed to it.
+    A request for a bar the entry has already seen is a hit, a request for later bars
+    feeds only those bars, and a live bar whose close changed is amended in place, so
+    each feature is computed once per bar however many consumers read it. Entries are
+    evicted least recently used first once the estimated memory exceeds the budget.
+    """
+    _instance = None
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.memory_budget = memory_budget
+        self.max_entries = max_entries
+        self.nbytes = 0
+        self._entries: "OrderedDict[FeatureKey, _FeatureEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'updates': 0, 'rebuilds': 0, 'evictions': 0}
+
+    @classmethod
+    def getInstance(cls, **kwargs) -> 'FeatureCache':
+        if not cls._instance:
+            logger.info("Creating new FeatureCache instance")
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    @staticmethod
+    def _create(feature: str, params: Dict[str, Any]) -> Tuple[Indicator, int]:
+        if feature not in FEATURES:
+            raise ValueError(f"Unknown feature: {feature}")
+        indicator = FEATURES[feature](**params)
+        window = max([value for value in params.values() if isinstance(value, int)] or [1])
+        return indicator, ENTRY_BYTES + BYTES_PER_WINDOW_BAR * window
+
+    def _entry(self, key: FeatureKey) -> _FeatureEntry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            indicator, nbytes = self._create(key[2], dict(key[3]))
+            entry = self._entries[key] = _FeatureEntry(indicator, nbytes)
+            self.nbytes += nbytes
+            while len(self._entries) > 1 and (self.nbytes > self.memory_budget
+                                              or len(self._entries) > self.max_entries):
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.stats['evictions'] += 1
+            return entry
+
+    def get(self, code: str, ktype: str, feature: str, times: np.ndarray, closes: np.ndarray,
+            **params) -> Tuple[Any, Any]:
+        """
+        Value of a feature at the last of the given bars and at the bar before it
+
+        Args:
+            code: Security code
+            ktype: K-line type
+            feature: One of FEATURES
+            times: Bar times (datetimes or time_key strings), oldest first; the last
+                   bar is the one evaluated
+            closes: Close of every bar
+            **params: Indicator parameters (e.g., window=20)
+
+        Returns:
+            Tuple[Any, Any]: (previous, current) values, NaN until defined
+
+        Raises:
+            ValueError: If the feature is unknown
+        """
+        if len(times) == 0:
+            return NAN, NAN
+        key = (code, ktype, feature, tuple(sorted(params.items())))
+        entry = self._entry(key)
+        times = _nanoseconds(times)
+        last_time, last_close = times[-1], float(closes[-1])
+        with entry.lock:
+            if entry.time is not None and entry.time == last_time and entry.close == last_close:
+                self.stats['hits'] += 1
+                return entry.previous, entry.value
+
+            start = None
+            if entry.time is not None and entry.time <= last_time:
+                # Usually the entry is one bar behind, as on every bar close
+                start = len(times) - 2
+                if start < 0 or times[start] != entry.time:
+                    start = int(np.searchsorted(times, entry.time))
+                    if start == len(times) or times[start] != entry.time:
+                        start = None
+            if start is None:
+                if entry.time is not None and entry.time > last_time:
+                    # An older bar than the cached one: compute it without touching the entry
+                    return self._compute(feature, params, closes)
+                entry.indicator, _ = self._create(feature, params)
+                entry.previous = entry.value = NAN
+                self.stats['rebuilds'] += 1
+                new_closes = closes
+            else:
+                if float(closes[start]) != entry.close:
+                    # The bar was still forming when it was fed
+                    entry.value = entry.indicator.replace(float(closes[start]))
+                new_closes = closes[start + 1:]
+            for close in new_closes:
+                entry.previous = entry.value
+                entry.value = entry.indicator.update(float(close))
+            self.stats['updates'] += len(new_closes)
+            entry.time, entry.close = last_time, last_close
+            return entry.previous, entry.value
+
+    def _compute(self, feature: str, params: Dict[str, Any], closes: np.ndarray) -> Tuple[Any, Any]:
+        indicator, _ = self._create(feature, params)
+        previous = value = NAN
+        for close in closes:
+            previous, value = value, indicator.update(float(close))
+        return previous, value
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'nbytes': self.nbytes,
+                    'memory_budget': self.memory_budget, **self.stats}
@@ -0,0 +1,363 @@
+import math
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+NAN = float('nan')
+
+
+class Indicator:
+    """
+    Base class for streaming indicators with O(1) state updates per bar.
+
+    ``update`` consumes the close of a new bar. ``replace`` amends the close of the
+    most recent bar instead, for live bars that are still forming. Both return the
+    current value, which is NaN until enough bars have been seen, so comparisons
+    behave like pandas rolling results.
+    """
+    def __init__(self):
+        self.count = 0
+        self.value = NAN
+        self._saved = None
+
+    @property
+    def ready(self) -> bool:
+        return not (isinstance(self.value, float) and math.isnan(self.value))
+
+    def update(self, x: float):
+        self._saved = self._save()
+        self.count += 1
+        self.value = self._update(x)
+        return self.value
+
+    def replace(self, x: float):
+        if self._saved is None:
+            return self.update(x)
+        self._restore(self._saved)
+        self.value = self._update(x)
+        return self.value
+
+    def _update(self, x: float):
+        raise NotImplementedError
+
+    def _save(self):
+        raise NotImplementedError
+
+    def _restore(self, saved):
+        raise NotImplementedError
+
+
+class _Window:
+    """Fixed-size ring of the last ``size`` values"""
+    def __init__(self, size: int):
+        self.size = size
+        self.values = [0.0] * size
+        self.pos = 0
+        self.count = 0
+
+    def push(self, x: float) -> Optional[float]:
+        """Add a value and return the value that dropped out of the window, if any"""
+        dropped = self.values[self.pos] if self.count == self.size else None
+        self.values[self.pos] = x
+        self.pos = (self.pos + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        return dropped
+
+    def save(self):
+        # Only the slot about to be overwritten changes on push
+        return self.pos, self.count, self.values[self.pos]
+
+    def restore(self, saved):
+        self.pos, self.count, self.values[saved[0]] = saved
+
+
+class SMA(Indicator):
+    """Simple moving average, equal to ``Series.rolling(window).mean()``"""
+    def __init__(self, window: int):
+        super().__init__()
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self._values = _Window(window)
+        self._sum = 0.0
+
+    def _update(self, x: float) -> float:
+        dropped = self._values.push(x)
+        self._sum += x - (dropped or 0.0)
+        if self._values.count < self.window:
+            return NAN
+        return self._sum / self.window
+
+    def _save(self):
+        return self._values.save(), self._sum
+
+    def _restore(self, saved):
+        self._values.restore(saved[0])
+        self._sum = saved[1]
+
+
+class RollingStd(Indicator):
+    """
+    Rolling standard deviation, equal to ``Series.rolling(window).std(ddof)``.
+    Uses a sliding Welford update to stay numerically stable.
+    """
+    def __init__(self, window: int, ddof: int = 1):
+        super().__init__()
+        if window <= ddof:
+            raise ValueError("window must be larger than ddof")
+        self.window = window
+        self.ddof = ddof
+        self._values = _Window(window)
+        self.mean = NAN
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def _update(self, x: float) -> float:
+        dropped = self._values.push(x)
+        if dropped is None:
+            self._n += 1
+            delta = x - self._mean
+            self._mean += delta / self._n
+            self._m2 += delta * (x - self._mean)
+        else:
+            old_mean = self._mean
+            self._mean += (x - dropped) / self.window
+            self._m2 += (x - dropped) * (x - self._mean + dropped - old_mean)
+        if self._n < self.window:
+            self.mean = NAN
+            return NAN
+        self.mean = self._mean
+        return math.sqrt(max(self._m2, 0.0) / (self.window - self.ddof))
+
+    def _save(self):
+        return self._values.save(), self._n, self._mean, self._m2, self.mean
+
+    def _restore(self, saved):
+        self._values.restore(saved[0])
+        self._n, self._mean, self._m2, self.mean = saved[1:]
+
+
+class BollingerBands(Indicator):
+    """Bollinger Bands; the value is a (middle, upper, lower) tuple"""
+    def __init__(self, window: int = 20, num_std: float = 2.0):
+        super().__init__()
+        self.num_std = num_std
+        self._std = RollingStd(window)
+        self.value = (NAN, NAN, NAN)
+
+    @property
+    def ready(self) -> bool:
+        return self._std.ready
+
+    def _update(self, x: float) -> Tuple[float, float, float]:
+        std = self._std.update(x)
+        mid = self._std.mean
+        return mid, mid + self.num_std * std, mid - self.num_std * std
+
+    def replace(self, x: float):
+        if self._saved is None:
+            return self.update(x)
+        std = self._std.replace(x)
+        mid = self._std.mean
+        self.value = (mid, mid + self.num_std * std, mid - self.num_std * std)
+        return self.value
+
+    def _save(self):
+        # The inner RollingStd keeps its own undo state
+        return True
+
+    def _restore(self, saved):
+        pass
+
+
+class EMA(Indicator):
+    """Exponential moving average, equal to ``Series.ewm(span=span, adjust=False).mean()``"""
+    def __init__(self, span: Optional[int] = None, alpha: Optional[float] = None):
+        super().__init__()
+        if alpha is None:
+            if not span or span < 1:
+                raise ValueError("Either span >= 1 or alpha must be given")
+            alpha = 2.0 / (span + 1.0)
+        self.alpha = alpha
+        self._ema = NAN
+
+    def _update(self, x: float) -> float:
+        if self.count == 1:
+            self._ema = x
+        else:
+            self._ema += self.alpha * (x - self._ema)
+        return self._ema
+
+    def _save(self):
+        return self._ema
+
+    def _restore(self, saved):
+        self._ema = saved
+
+
+class RSI(Indicator):
+    """
+    Relative Strength Index with Wilder smoothing.
+    The first average gain/loss is the simple mean over ``period`` changes.
+    """
+    def __init__(self, period: int = 14):
+        super().__init__()
+        if period < 1:
+            raise ValueError("period must be at least 1")
+        self.period = period
+        self._prev = NAN
+        self._changes = 0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+
+    def _update(self, x: float) -> float:
+        prev, self._prev = self._prev, x
+        if math.isnan(prev):
+            return NAN
+        change = x - prev
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        self._changes += 1
+        if self._changes <= self.period:
+            self._avg_gain += gain / self.period
+            self._avg_loss += loss / self.period
+            if self._changes < self.period:
+                return NAN
+        else:
+            self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+            self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
+        if self._avg_loss == 0.0:
+            return 100.0 if self._avg_gain > 0.0 else 50.0
+        return 100.0 - 100.0 / (1.0 + self._avg_gain / self._avg_loss)
+
+    def _save(self):
+        return self._prev, self._changes, self._avg_gain, self._avg_loss
+
+    def _restore(self, saved):
+        self._prev, self._changes, self._avg_gain, self._avg_loss = saved
+
+
+# Vectorized counterparts for whole-series computations
+
+def shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Shift a float array forward by ``periods`` along axis 0, filling the start with NaN"""
+    shifted = np.empty_like(values, dtype=float)
+    shifted[:periods] = NAN
+    shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+class RollingSums:
+    """
+    Cumulative sums of a price series, from which the rolling mean and standard
+    deviation of any window are O(n) differences.
+
+    Time runs along axis 0; a 2-D (time x symbol) array gives per-column windows.
+    Prices are centered on their mean before summing to keep the sums small and
+    precise. The arrays can be supplied directly, e.g. views into shared memory,
+    so worker processes reuse the sums computed once by the parent. ``signals`` caches
+    full-series strategy signals so slices of the same series reuse them.
+    """
+    def __init__(self, values: np.ndarray, sums: Optional[np.ndarray] = None,
+                 squares: Optional[np.ndarray] = None, offset=None):
+        self.values = np.asarray(values, dtype=np.float64)
+        if sums is None or squares is None or offset is None:
+            offset = self.values.mean(axis=0) if len(self.values) else 0.0
+            if self.values.ndim == 1:
+                offset = float(offset)
+            centered = self.values - offset
+            zeros = np.zeros((1,) + self.values.shape[1:])
+            sums = np.concatenate((zeros, np.cumsum(centered, axis=0)))
+            squares = np.concatenate((zeros, np.cumsum(centered * centered, axis=0)))
+        self.sums = sums
+        self.squares = squares
+        self.offset = offset
+        self.signals: Dict[Any, Tuple[int, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def mean(self, window: int) -> np.ndarray:
+        """Rolling mean, NaN until the window is full"""
+        result = np.full(self.values.shape, NAN)
+        if 0 < window <= len(self.values):
+            result[window - 1:] = (self.sums[window:] - self.sums[:-window]) / window + self.offset
+        return result
+
+    def std(self, window: int, ddof: int = 1) -> np.ndarray:
+        """Rolling standard deviation, NaN until the window is full"""
+        result = np.full(self.values.shape, NAN)
+        if ddof < window <= len(self.values):
+            window_sum = self.sums[window:] - self.sums[:-window]
+            window_squares = self.squares[window:] - self.squares[:-window]
+            variance = (window_squares - window_sum * window_sum / window) / (window - ddof)
+            result[window - 1:] = np.sqrt(np.maximum(variance, 0.0))
+        return result
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling mean over a whole series in O(n) using cumulative sums
+
+    Time runs along axis 0; a 2-D (time x code) array gives per-column windows.
+    """
+    return RollingSums(values).mean(window)
+
+
+def rolling_std(values: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """Rolling standard deviation over a whole series (along axis 0) in O(n) using cumulative sums"""
+    return RollingSums(values).std(window, ddof)
+
+
+def _wilder_smooth(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder smoothing along axis 0: the mean of the first ``period`` values, then
+    ``s[t] = s[t-1] * (period - 1) / period + values[t] / period``; NaN before that
+
+    The recursion is solved in closed form with cumulative sums of values scaled by
+    powers of the decay, in blocks short enough for the scale factors to stay finite.
+    """
+    result = np.full(values.shape, NAN)
+    if len(values) < period:
+        return result
+    alpha = 1.0 / period
+    decay = 1.0 - alpha
+    result[period - 1] = values[:period].mean(axis=0)
+    if decay == 0.0:
+        result[period:] = values[period:]
+        return result
+    block = max(1, int(230.0 / -math.log(decay)))
+    state = result[period - 1]
+    for start in range(period, len(values), block):
+        chunk = values[start:start + block]
+        steps = np.arange(1, len(chunk) + 1, dtype=float).reshape((-1,) + (1,) * (values.ndim - 1))
+        growth = decay ** steps
+        smoothed = growth * (state + alpha * np.cumsum(chunk / growth, axis=0))
+        result[start:start + len(chunk)] = smoothed
+        state = smoothed[-1]
+    return result
+
+
+def wilder_rsi(values: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    Relative Strength Index with Wilder smoothing over a whole series, equal to the
+    streaming RSI fed every value; NaN for the first ``period`` bars
+
+    Time runs along axis 0; a 2-D (time x code) array gives per-column values.
+    """
+    if period < 1:
+        raise ValueError("period must be at least 1")
+    values = np.asarray(values, dtype=float)
+    result = np.full(values.shape, NAN)
+    if len(values) <= period:
+        return result
+    changes = np.diff(values, axis=0)
+    avg_gain = _wilder_smooth(np.maximum(changes, 0.0), period)
+    avg_loss = _wilder_smooth(np.maximum(-changes, 0.0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # No losses in the window: 100 after gains, 50 on a flat series
+    rsi = np.where(avg_loss == 0.0, np.where(avg_gain > 0.0, 100.0, 50.0), rsi)
+    result[period:] = rsi[period - 1:]
+    return result
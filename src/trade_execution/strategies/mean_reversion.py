@@ -1,5 +1,6 @@
-from trade_execution.strategies.base import StrategyBase
+from trade_execution.strategies.base import StrategyBase, StrategyParameters, SIGNAL_BUY, SIGNAL_SELL
 from trade_execution.models.Order import OrderSide
+from trade_execution.strategies.indicators import NAN, BollingerBands, rolling_mean, rolling_std, shift
 import pandas as pd
 import numpy as np
 from typing import Optional, Dict, Any
@@ -16,8 +17,7 @@ class MeanReversionStrategy(StrategyBase):
     
     def __init__(self, name: str = "Mean Reversion"):
         super().__init__(name)
-        self.window = 20
-        self.num_std = 2.0
+        self.setup()
     
     def setup(self, window: int = 20, num_std: float = 2.0, **kwargs):
         """
@@ -29,10 +29,10 @@ class MeanReversionStrategy(StrategyBase):
         """
         self.window = window
         self.num_std = num_std
-        self.parameters = {
+        self.parameters = StrategyParameters({
             'window': window,
             'num_std': num_std
-        }
+        })
     
     def generate_signal(self, data: pd.DataFrame) -> Optional[OrderSide]:
         """
@@ -50,38 +50,115 @@ class MeanReversionStrategy(StrategyBase):
         if len(data) < self.window:
             return None
         
-        # Calculate moving average
-        data['ma'] = data['close'].rolling(window=self.window).mean()
-        
-        # Calculate standard deviation
-        data['std'] = data['close'].rolling(window=self.window).std()
-        
-        # Calculate Bollinger Bands
-        data['upper_band'] = data['ma'] + (data['std'] * self.num_std)
-        data['lower_band'] = data['ma'] - (data['std'] * self.num_std)
+        return self.signal_from_closes(data['close'].to_numpy())
+    
+    def generate_signals(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Generate Bollinger Band signals for every bar of a series at once
         
-        # Current price
-        current_price = data['close'].iloc[-1]
+        Args:
+            data: Market data with price history, oldest first
+            
+        Returns:
+            np.ndarray: SIGNAL_BUY where price crosses below the lower band,
+                        SIGNAL_SELL where it crosses above the upper band, 0 elsewhere
+        """
+        return self.generate_signal_matrix(data['close'].to_numpy(dtype=float))
+    
+    def generate_signal_matrix(self, closes: np.ndarray) -> np.ndarray:
+        """
+        Generate Bollinger Band signals for every bar of one or many series at once
         
-        # Previous price
-        prev_price = data['close'].iloc[-2]
+        Args:
+            closes: Close prices, oldest first; a 2-D (time x code) array gives
+                    the signals of every code
+            
+        Returns:
+            np.ndarray: Signals shaped like ``closes``
+        """
+        ma = rolling_mean(closes, self.window)
+        std = rolling_std(closes, self.window)
+        upper_band = ma + std * self.num_std
+        lower_band = ma - std * self.num_std
+        prev_close = shift(closes)
         
-        # Current bands
-        current_lower = data['lower_band'].iloc[-1]
-        current_upper = data['upper_band'].iloc[-1]
+        signals = np.zeros(closes.shape, dtype=np.int8)
+        signals[(prev_close >= shift(lower_band)) & (closes < lower_band)] = SIGNAL_BUY
+        signals[(prev_close <= shift(upper_band)) & (closes > upper_band)] = SIGNAL_SELL
+        return signals
+    
+    @property
+    def signal_lookback(self) -> int:
+        """Bars that determine the signal of the last bar"""
+        return self.window + 1
+    
+    def create_signal_state(self) -> Dict[str, Any]:
+        """
+        Create incremental state: Bollinger Bands plus the previous bar's price and bands
+        """
+        return {
+            'bands': BollingerBands(self.window, self.num_std),
+            'prev': (NAN, NAN, NAN),
+            'last': (NAN, NAN, NAN),
+        }
+    
+    def on_bar(self, state: Dict[str, Any], close: float, new_bar: bool = True) -> Optional[OrderSide]:
+        """
+        Update the Bollinger Bands with one bar and check for a band crossing
         
-        # Previous bands
-        prev_lower = data['lower_band'].iloc[-2]
-        prev_upper = data['upper_band'].iloc[-2]
+        Args:
+            state: State created by create_signal_state
+            close: Close price of the bar
+            new_bar: False to amend the last bar instead
+            
+        Returns:
+            Optional[OrderSide]: BUY when price crosses below lower band, 
+                               SELL when price crosses above upper band,
+                               None otherwise
+        """
+        if new_bar:
+            state['prev'] = state['last']
+            _, current_upper, current_lower = state['bands'].update(close)
+        else:
+            _, current_upper, current_lower = state['bands'].replace(close)
+        state['last'] = (close, current_lower, current_upper)
+        prev_price, prev_lower, prev_upper = state['prev']
         
         # Generate signals
-        if prev_price >= prev_lower and current_price < current_lower:
+        if prev_price >= prev_lower and close < current_lower:
             return OrderSide.BUY
-        elif prev_price <= prev_upper and current_price > current_upper:
+        elif prev_price <= prev_upper and close > current_upper:
             return OrderSide.SELL
             
         return None
     
+    def signal_from_features(self, code: str, ktype: str, times: np.ndarray,
+                             closes: np.ndarray) -> Optional[OrderSide]:
+        """
+        Check the last bar for a band crossing, with bands built from the shared SMA
+        and standard deviation features
+        
+        Args:
+            code: Security code the bars belong to
+            ktype: K-line type of the bars
+            times: Bar times, oldest first
+            closes: Close of every bar
+            
+        Returns:
+            Optional[OrderSide]: BUY when price crosses below lower band, 
+                               SELL when price crosses above upper band,
+                               None otherwise
+        """
+        prev_ma, ma = self.feature(code, ktype, 'sma', times, closes, window=self.window)
+        prev_std, std = self.feature(code, ktype, 'std', times, closes, window=self.window)
+        close = closes[-1]
+        prev_close = closes[-2] if len(closes) > 1 else NAN
+        if prev_close >= prev_ma - self.num_std * prev_std and close < ma - self.num_std * std:
+            return OrderSide.BUY
+        elif prev_close <= prev_ma + self.num_std * prev_std and close > ma + self.num_std * std:
+            return OrderSide.SELL
+        return None
+    
     def run(self, code: str, is_backtest: bool = False, **kwargs) -> Dict[str, Any]:
         """
         Run the mean reversion strategy
@@ -94,14 +171,13 @@ class MeanReversionStrategy(StrategyBase):
         Returns:
             Dict[str, Any]: Results of the strategy execution
         """
-        # Set up the strategy
-        window = kwargs.get('window', self.window)
-        num_std = kwargs.get('num_std', self.num_std)
-        self.setup(window=window, num_std=num_std)
+        # Runs with other parameters go to their own instance
+        strategy = self.with_parameters(**kwargs)
+        if strategy is not self:
+            return strategy.run(code, is_backtest=is_backtest, **kwargs)
         
         # If backtest mode, run the backtest
         if is_backtest:
-            from datetime import datetime
             start_date = kwargs.get('start_date', datetime.now() - timedelta(days=365))
             end_date = kwargs.get('end_date', datetime.now())
             return self.backtest(code, start_date, end_date, **kwargs)
@@ -110,8 +186,9 @@ class MeanReversionStrategy(StrategyBase):
         # Get recent data
         data = self.get_historical_data(code, KLType.K_DAY, count=self.window + 10)
         
-        # Generate signal
-        signal = self.generate_signal(data)
+        # Generate signal from the features shared with other strategies on this code
+        signal = self.signal_from_features(code, KLType.K_DAY, data['time_key'].to_numpy(),
+                                           data['close'].to_numpy(dtype=float))
         
         # Execute trade based on signal
         if signal:
@@ -122,13 +199,13 @@ class MeanReversionStrategy(StrategyBase):
                 "strategy": self.name,
                 "signal": signal.value,
                 "order_id": order.order_id,
-                "parameters": self.parameters,
+                "parameters": dict(self.parameters),
                 "timestamp": datetime.now().isoformat()
             }
         else:
             return {
                 "strategy": self.name,
                 "signal": "HOLD",
-                "parameters": self.parameters,
+                "parameters": dict(self.parameters),
                 "timestamp": datetime.now().isoformat()
             }
\ No newline at end of file
@@ -0,0 +1,208 @@
+from trade_execution.strategies.base import StrategyBase, StrategyParameters, SIGNAL_BUY, SIGNAL_SELL
+from trade_execution.models.Order import OrderSide
+from trade_execution.strategies.indicators import NAN, RSI, shift, wilder_rsi
+import pandas as pd
+import numpy as np
+from typing import Optional, Dict, Any
+from futu import KLType
+from datetime import datetime, timedelta
+
+class MomentumStrategy(StrategyBase):
+    """
+    Momentum strategy based on the Relative Strength Index (RSI).
+    
+    Buy when RSI recovers above the oversold level and sell when it
+    falls back below the overbought level. RSI uses Wilder smoothing.
+    """
+    
+    def __init__(self, name: str = "RSI Momentum"):
+        super().__init__(name)
+        self.setup()
+    
+    def setup(self, period: int = 14, oversold: float = 30.0, overbought: float = 70.0, **kwargs):
+        """
+        Set up the strategy with parameters
+        
+        Args:
+            period: RSI period
+            oversold: RSI level below which the security is oversold
+            overbought: RSI level above which the security is overbought
+        """
+        if period < 1:
+            raise ValueError("period must be at least 1")
+        if not 0 < oversold < overbought < 100:
+            raise ValueError("RSI levels must satisfy 0 < oversold < overbought < 100")
+        
+        self.period = period
+        self.oversold = oversold
+        self.overbought = overbought
+        self.parameters = StrategyParameters({
+            'period': period,
+            'oversold': oversold,
+            'overbought': overbought
+        })
+    
+    def generate_signal(self, data: pd.DataFrame) -> Optional[OrderSide]:
+        """
+        Generate trading signals based on RSI level crossings
+        
+        Args:
+            data: Market data with price history
+        
+        Returns:
+            Optional[OrderSide]: BUY when RSI crosses above the oversold level,
+                               SELL when RSI crosses below the overbought level,
+                               None otherwise
+        """
+        # Check if we have enough data
+        if len(data) <= self.period:
+            return None
+        
+        return self.signal_from_closes(data['close'].to_numpy())
+    
+    def generate_signals(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Generate RSI signals for every bar of a series at once
+        
+        Args:
+            data: Market data with price history, oldest first
+        
+        Returns:
+            np.ndarray: SIGNAL_BUY where RSI crosses above the oversold level,
+                        SIGNAL_SELL where it crosses below the overbought level, 0 elsewhere
+        """
+        return self.generate_signal_matrix(data['close'].to_numpy(dtype=float))
+    
+    def generate_signal_matrix(self, closes: np.ndarray) -> np.ndarray:
+        """
+        Generate RSI signals for every bar of one or many series at once
+        
+        Args:
+            closes: Close prices, oldest first; a 2-D (time x code) array gives
+                    the signals of every code
+        
+        Returns:
+            np.ndarray: Signals shaped like ``closes``
+        """
+        rsi = wilder_rsi(closes, self.period)
+        prev_rsi = shift(rsi)
+        
+        signals = np.zeros(closes.shape, dtype=np.int8)
+        signals[(prev_rsi <= self.oversold) & (rsi > self.oversold)] = SIGNAL_BUY
+        signals[(prev_rsi >= self.overbought) & (rsi < self.overbought)] = SIGNAL_SELL
+        return signals
+    
+    @property
+    def signal_lookback(self) -> int:
+        """Bars that determine the signal of the last bar; Wilder smoothing needs several periods to settle"""
+        return max(100, 10 * self.period)
+    
+    def create_signal_state(self) -> Dict[str, Any]:
+        """
+        Create incremental state: the RSI plus its value on the previous bar
+        """
+        return {
+            'rsi': RSI(self.period),
+            'prev': NAN,
+            'last': NAN,
+        }
+    
+    def on_bar(self, state: Dict[str, Any], close: float, new_bar: bool = True) -> Optional[OrderSide]:
+        """
+        Update the RSI with one bar and check for a level crossing
+        
+        Args:
+            state: State created by create_signal_state
+            close: Close price of the bar
+            new_bar: False to amend the last bar instead
+        
+        Returns:
+            Optional[OrderSide]: BUY when RSI crosses above the oversold level,
+                               SELL when RSI crosses below the overbought level,
+                               None otherwise
+        """
+        if new_bar:
+            state['prev'] = state['last']
+            current_rsi = state['rsi'].update(close)
+        else:
+            current_rsi = state['rsi'].replace(close)
+        state['last'] = current_rsi
+        return self._crossing(state['prev'], current_rsi)
+    
+    def signal_from_features(self, code: str, ktype: str, times: np.ndarray,
+                             closes: np.ndarray) -> Optional[OrderSide]:
+        """
+        Check the last bar for a level crossing of the shared RSI feature
+        
+        Args:
+            code: Security code the bars belong to
+            ktype: K-line type of the bars
+            times: Bar times, oldest first
+            closes: Close of every bar
+        
+        Returns:
+            Optional[OrderSide]: BUY when RSI crosses above the oversold level,
+                               SELL when RSI crosses below the overbought level,
+                               None otherwise
+        """
+        prev_rsi, current_rsi = self.feature(code, ktype, 'rsi', times, closes, period=self.period)
+        return self._crossing(prev_rsi, current_rsi)
+    
+    def _crossing(self, prev_rsi: float, current_rsi: float) -> Optional[OrderSide]:
+        if prev_rsi <= self.oversold and current_rsi > self.oversold:
+            return OrderSide.BUY
+        elif prev_rsi >= self.overbought and current_rsi < self.overbought:
+            return OrderSide.SELL
+        
+        return None
+    
+    def run(self, code: str, is_backtest: bool = False, **kwargs) -> Dict[str, Any]:
+        """
+        Run the RSI momentum strategy
+        
+        Args:
+            code: Security code
+            is_backtest: Whether to run in backtest mode
+            **kwargs: Additional parameters
+        
+        Returns:
+            Dict[str, Any]: Results of the strategy execution
+        """
+        # Runs with other parameters go to their own instance
+        strategy = self.with_parameters(**kwargs)
+        if strategy is not self:
+            return strategy.run(code, is_backtest=is_backtest, **kwargs)
+        
+        # If backtest mode, run the backtest
+        if is_backtest:
+            start_date = kwargs.get('start_date', datetime.now() - timedelta(days=365))
+            end_date = kwargs.get('end_date', datetime.now())
+            return self.backtest(code, start_date, end_date, **kwargs)
+        
+        # For live trading
+        # Get recent data; Wilder smoothing needs several periods to settle
+        data = self.get_historical_data(code, KLType.K_DAY, count=self.signal_lookback)
+        
+        # Generate signal from the features shared with other strategies on this code
+        signal = self.signal_from_features(code, KLType.K_DAY, data['time_key'].to_numpy(),
+                                           data['close'].to_numpy(dtype=float))
+        
+        # Execute trade based on signal
+        if signal:
+            qty = kwargs.get('qty', 100)
+            price = kwargs.get('price', None)
+            order = self.place_order(code, signal, qty, price)
+            return {
+                "strategy": self.name,
+                "signal": signal.value,
+                "order_id": order.order_id,
+                "parameters": dict(self.parameters),
+                "timestamp": datetime.now().isoformat()
+            }
+        else:
+            return {
+                "strategy": self.name,
+                "signal": "HOLD",
+                "parameters": dict(self.parameters),
+                "timestamp": datetime.now().isoformat()
+            }
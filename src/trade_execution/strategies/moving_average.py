@@ -1,6 +1,8 @@
-from trade_execution.strategies.base import StrategyBase
+from trade_execution.strategies.base import StrategyBase, StrategyParameters, SIGNAL_BUY, SIGNAL_SELL
 from trade_execution.models.Order import OrderSide
+from trade_execution.strategies.indicators import NAN, SMA, rolling_mean, shift
 import pandas as pd
+import numpy as np
 from typing import Optional, Dict, Any
 from futu import KLType, RET_OK
 from datetime import datetime, timedelta
@@ -14,8 +16,7 @@ class MovingAverageStrategy(StrategyBase):
     
     def __init__(self, name: str = "Moving Average Crossover"):
         super().__init__(name)
-        self.short_window = 20
-        self.long_window = 50
+        self.setup()
     
     def setup(self, short_window: int = 20, long_window: int = 50, **kwargs):
         """
@@ -30,10 +31,10 @@ class MovingAverageStrategy(StrategyBase):
             
         self.short_window = short_window
         self.long_window = long_window
-        self.parameters = {
+        self.parameters = StrategyParameters({
             'short_window': short_window,
             'long_window': long_window
-        }
+        })
     
     def generate_signal(self, data: pd.DataFrame) -> Optional[OrderSide]:
         """
@@ -51,21 +52,81 @@ class MovingAverageStrategy(StrategyBase):
         if len(data) < self.long_window:
             return None
         
-        # Calculate moving averages
-        short_ma = data['close'].rolling(window=self.short_window).mean()
-        long_ma = data['close'].rolling(window=self.long_window).mean()
+        return self.signal_from_closes(data['close'].to_numpy())
+    
+    def generate_signals(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Generate crossover signals for every bar of a series at once
         
-        # Check for crossover
-        if len(short_ma) < 2 or len(long_ma) < 2:
-            return None
+        Args:
+            data: Market data with price history, oldest first
+            
+        Returns:
+            np.ndarray: SIGNAL_BUY where short MA crosses above long MA,
+                        SIGNAL_SELL where it crosses below, 0 elsewhere
+        """
+        return self.generate_signal_matrix(data['close'].to_numpy(dtype=float))
+    
+    def generate_signal_matrix(self, closes: np.ndarray) -> np.ndarray:
+        """
+        Generate crossover signals for every bar of one or many series at once
+        
+        Args:
+            closes: Close prices, oldest first; a 2-D (time x code) array gives
+                    the signals of every code
             
-        # Current situation
-        current_short = short_ma.iloc[-1]
-        current_long = long_ma.iloc[-1]
+        Returns:
+            np.ndarray: Signals shaped like ``closes``
+        """
+        short_ma = rolling_mean(closes, self.short_window)
+        long_ma = rolling_mean(closes, self.long_window)
+        prev_short = shift(short_ma)
+        prev_long = shift(long_ma)
+        
+        signals = np.zeros(closes.shape, dtype=np.int8)
+        signals[(prev_short < prev_long) & (short_ma > long_ma)] = SIGNAL_BUY
+        signals[(prev_short > prev_long) & (short_ma < long_ma)] = SIGNAL_SELL
+        return signals
+    
+    @property
+    def signal_lookback(self) -> int:
+        """Bars that determine the signal of the last bar"""
+        return self.long_window + 1
+    
+    def create_signal_state(self) -> Dict[str, Any]:
+        """
+        Create incremental state: short and long SMAs plus the previous bar's values
+        """
+        return {
+            'short': SMA(self.short_window),
+            'long': SMA(self.long_window),
+            'prev': (NAN, NAN),
+            'last': (NAN, NAN),
+        }
+    
+    def on_bar(self, state: Dict[str, Any], close: float, new_bar: bool = True) -> Optional[OrderSide]:
+        """
+        Update the moving averages with one bar and check for a crossover
         
-        # Previous situation
-        prev_short = short_ma.iloc[-2]
-        prev_long = long_ma.iloc[-2]
+        Args:
+            state: State created by create_signal_state
+            close: Close price of the bar
+            new_bar: False to amend the last bar instead
+            
+        Returns:
+            Optional[OrderSide]: BUY when short MA crosses above long MA, 
+                               SELL when short MA crosses below long MA,
+                               None otherwise
+        """
+        if new_bar:
+            state['prev'] = state['last']
+            current_short = state['short'].update(close)
+            current_long = state['long'].update(close)
+        else:
+            current_short = state['short'].replace(close)
+            current_long = state['long'].replace(close)
+        state['last'] = (current_short, current_long)
+        prev_short, prev_long = state['prev']
         
         # Generate signals
         if prev_short < prev_long and current_short > current_long:
@@ -75,6 +136,30 @@ class MovingAverageStrategy(StrategyBase):
             
         return None
     
+    def signal_from_features(self, code: str, ktype: str, times: np.ndarray,
+                             closes: np.ndarray) -> Optional[OrderSide]:
+        """
+        Check the last bar for a crossover of the shared SMA features
+        
+        Args:
+            code: Security code the bars belong to
+            ktype: K-line type of the bars
+            times: Bar times, oldest first
+            closes: Close of every bar
+            
+        Returns:
+            Optional[OrderSide]: BUY when short MA crosses above long MA,
+                               SELL when short MA crosses below long MA,
+                               None otherwise
+        """
+        prev_short, current_short = self.feature(code, ktype, 'sma', times, closes, window=self.short_window)
+        prev_long, current_long = self.feature(code, ktype, 'sma', times, closes, window=self.long_window)
+        if prev_short < prev_long and current_short > current_long:
+            return OrderSide.BUY
+        elif prev_short > prev_long and current_short < current_long:
+            return OrderSide.SELL
+        return None
+    
     def run(self, code: str, is_backtest: bool = False, **kwargs) -> Dict[str, Any]:
         """
         Run the moving average strategy
@@ -87,14 +172,13 @@ class MovingAverageStrategy(StrategyBase):
         Returns:
             Dict[str, Any]: Results of the strategy execution
         """
-        # Set up the strategy
-        short_window = kwargs.get('short_window', self.short_window)
-        long_window = kwargs.get('long_window', self.long_window)
-        self.setup(short_window=short_window, long_window=long_window)
+        # Runs with other parameters go to their own instance
+        strategy = self.with_parameters(**kwargs)
+        if strategy is not self:
+            return strategy.run(code, is_backtest=is_backtest, **kwargs)
         
         # If backtest mode, run the backtest
         if is_backtest:
-            from datetime import datetime
             start_date = kwargs.get('start_date', datetime.now() - timedelta(days=365))
             end_date = kwargs.get('end_date', datetime.now())
             return self.backtest(code, start_date, end_date, **kwargs)
@@ -103,8 +187,9 @@ class MovingAverageStrategy(StrategyBase):
         # Get recent data
         data = self.get_historical_data(code, KLType.K_DAY, count=self.long_window + 10)
         
-        # Generate signal
-        signal = self.generate_signal(data)
+        # Generate signal from the features shared with other strategies on this code
+        signal = self.signal_from_features(code, KLType.K_DAY, data['time_key'].to_numpy(),
+                                           data['close'].to_numpy(dtype=float))
         
         # Execute trade based on signal
         if signal:
@@ -115,13 +200,13 @@ class MovingAverageStrategy(StrategyBase):
                 "strategy": self.name,
                 "signal": signal.value,
                 "order_id": order.order_id,
-                "parameters": self.parameters,
+                "parameters": dict(self.parameters),
                 "timestamp": datetime.now().isoformat()
             }
         else:
             return {
                 "strategy": self.name,
                 "signal": "HOLD",
-                "parameters": self.parameters,
+                "parameters": dict(self.parameters),
                 "timestamp": datetime.now().isoformat()
             }
\ No newline at end of file
@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple, Type
+
+import logging
+
+from trade_execution.strategies.base import StrategyBase, StrategyParameters
+
+logger = logging.getLogger('trade_execution.strategies.pool')
+
+# Parameter sets kept set up at once; the least recently used are dropped first
+DEFAULT_POOL_SIZE = 256
+
+
+class StrategyPool:
+    """
+    Set-up strategy instances keyed by (strategy class, parameters).
+
+    Strategy parameters are immutable once set up, so every run with the same
+    parameters can share one instance without locking; the pool's lock only guards
+    its own lookups.
+    """
+    _instance = None
+
+    def __init__(self, max_size: int = DEFAULT_POOL_SIZE):
+        self.max_size = max_size
+        self._strategies: "OrderedDict[Tuple[Type[StrategyBase], StrategyParameters], StrategyBase]" = OrderedDict()
+        self._defaults: Dict[Type[StrategyBase], StrategyParameters] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    @classmethod
+    def getInstance(cls, **kwargs) -> 'StrategyPool':
+        if not cls._instance:
+            logger.info("Creating new StrategyPool instance")
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    def _key(self, strategy_cls: Type[StrategyBase],
+             parameters: Dict[str, Any]) -> Tuple[Type[StrategyBase], StrategyParameters]:
+        defaults = self._defaults.get(strategy_cls)
+        if defaults is None:
+            defaults = self._defaults.setdefault(strategy_cls, strategy_cls().parameters)
+        # Run arguments such as qty or dates are not strategy parameters
+        return strategy_cls, StrategyParameters({name: parameters.get(name, value) for name, value in defaults.items()})
+
+    def get(self, strategy_cls: Type[StrategyBase], parameters: Dict[str, Any]) -> StrategyBase:
+        """
+        Get the shared instance of a strategy set up with the given parameters
+
+        Args:
+            strategy_cls: Strategy class
+            parameters: Strategy parameters, possibly mixed with other run arguments;
+                        missing parameters take their defaults
+
+        Returns:
+            StrategyBase: Instance whose parameters equal the requested ones
+
+        Raises:
+            ValueError: If the parameters are invalid
+        """
+        key = self._key(strategy_cls, parameters)
+        with self._lock:
+            strategy = self._strategies.get(key)
+            if strategy is not None:
+                self._strategies.move_to_end(key)
+                self.stats['hits'] += 1
+                return strategy
+
+        # Setting up happens outside the lock; a racing duplicate is simply discarded
+        strategy = strategy_cls.create(**key[1])
+        with self._lock:
+            self.stats['misses'] += 1
+            strategy = self._strategies.setdefault(key, strategy)
+            self._strategies.move_to_end(key)
+            while len(self._strategies) > self.max_size:
+                self._strategies.popitem(last=False)
+        return strategy
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'size': len(self._strategies), 'max_size': self.max_size, **self.stats}
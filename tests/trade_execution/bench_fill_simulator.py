@@ -0,0 +1,59 @@
+"""
+Benchmark of the L2 fill simulator over one synthetic trading day of one symbol.
+
+Run with: PYTHONPATH=src python tests/trade_execution/bench_fill_simulator.py
+"""
+import time
+
+import numpy as np
+
+from trade_execution.services.fill_simulator import BUY, SELL, BookSnapshots, FillSimulator
+from trade_execution.services.market_data_journal import BOOK_DEPTH
+
+# 6.5 hours of book updates every 200 ms
+SNAPSHOTS = int(6.5 * 3600 * 5)
+TICK = 0.01
+
+
+def make_day(n=SNAPSHOTS):
+    rng = np.random.default_rng(0)
+    mid_ticks = np.round(10000 + np.cumsum(rng.choice([-1, 0, 0, 1], n))).astype(int)
+    levels = np.arange(BOOK_DEPTH)
+    bid_price = (mid_ticks[:, None] - 1 - levels) * TICK
+    ask_price = (mid_ticks[:, None] + 1 + levels) * TICK
+    bid_volume = rng.integers(1, 50, (n, BOOK_DEPTH)) * 100
+    ask_volume = rng.integers(1, 50, (n, BOOK_DEPTH)) * 100
+    ts = 1_700_000_000_000_000_000 + np.arange(n, dtype=np.int64) * 200_000_000
+    return BookSnapshots(ts, bid_price, bid_volume, ask_price, ask_volume)
+
+
+class QuoteAtTouch:
+    """Quotes both sides at the best prices and re-quotes every second"""
+    def __init__(self, size=100):
+        self.size = size
+        self.orders = []
+
+    def on_book(self, simulator, row):
+        if row % 5:
+            return
+        for order_id in self.orders:
+            simulator.cancel(order_id)
+        self.orders = [
+            simulator.submit(BUY, self.size, simulator.best_bid()),
+            simulator.submit(SELL, self.size, simulator.best_ask()),
+        ]
+
+
+def main():
+    books = make_day()
+    simulator = FillSimulator(books, latency_ns=2_000_000, commission=0.0003)
+    started = time.perf_counter()
+    report = simulator.run(QuoteAtTouch())
+    elapsed = time.perf_counter() - started
+    print(f"{len(books):,} snapshots, {len(report['orders']):,} orders, "
+          f"{len(report['fills']['qty']):,} fills in {elapsed:.2f}s "
+          f"({len(books) / elapsed:,.0f} snapshots/s), pnl {report['pnl']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark of the backtest simulation kernel against the original per-bar loop.
+
+Run with: PYTHONPATH=src python tests/trade_execution/bench_simulation.py
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from trade_execution.services.simulation import simulate_all_in
+
+
+def make_inputs(n):
+    rng = np.random.default_rng(0)
+    prices = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))),
+                       index=pd.date_range("2000-01-01", periods=n, freq="min"))
+    signal = (prices.rolling(20).mean() > prices.rolling(50).mean()).astype(float)
+    positions = signal.diff().fillna(signal.iloc[0])
+    return prices, positions
+
+
+def legacy_simulate(data, positions, initial_capital):
+    """The original BacktestService.simulate_trades loop"""
+    cash, shares = initial_capital, 0
+    portfolio = pd.DataFrame(index=data.index)
+    portfolio['holdings'] = 0.0
+    portfolio['cash'] = 0.0
+    portfolio['total'] = 0.0
+    for t in data.index:
+        if positions[t] == 1:
+            shares = cash / data[t]
+            cash = 0
+        elif positions[t] == -1:
+            cash = shares * data[t]
+            shares = 0
+        portfolio.loc[t, 'holdings'] = shares * data[t]
+        portfolio.loc[t, 'cash'] = cash
+        portfolio.loc[t, 'total'] = cash + shares * data[t]
+    return portfolio
+
+
+def main():
+    for n in (1_000, 10_000, 1_000_000):
+        prices, positions = make_inputs(n)
+        price_array, position_array = prices.to_numpy(), positions.to_numpy()
+        started = time.perf_counter()
+        simulate_all_in(price_array, position_array, 10000.0, commission=0.001, slippage=0.0005)
+        kernel = time.perf_counter() - started
+        line = f"{n:>9,} bars: kernel {kernel * 1e3:8.2f} ms"
+        if n <= 10_000:
+            started = time.perf_counter()
+            legacy_simulate(prices, positions, 10000.0)
+            legacy = time.perf_counter() - started
+            line += f", per-bar loop {legacy * 1e3:9.1f} ms ({legacy / kernel:,.0f}x)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
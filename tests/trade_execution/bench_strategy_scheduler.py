@@ -0,0 +1,75 @@
+"""
+Benchmark of bar-close evaluation of many scheduled strategy instances.
+
+Run with: PYTHONPATH=src:tests/trade_execution python tests/trade_execution/bench_strategy_scheduler.py
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from futu import RET_OK, KLType
+
+import conftest  # noqa: F401  (installs an APIConnectInfo without OpenD connections)
+from trade_execution.models.BarStore import BarStore
+from trade_execution.services.strategy_scheduler import StrategyScheduler
+from trade_execution.strategies.mean_reversion import MeanReversionStrategy
+from trade_execution.strategies.moving_average import MovingAverageStrategy
+
+CODES = 100
+INSTANCES_PER_CODE = 50
+BARS = 20
+
+
+class SyntheticQuoteContext:
+    def subscribe(self, codes, subtypes, subscribe_push=True):
+        return RET_OK, None
+
+    def get_cur_kline(self, code, num, ktype):
+        close = 100 * np.exp(np.cumsum(np.random.default_rng(hash(code) % 1000).normal(0, 0.02, num)))
+        return RET_OK, kline_frame(code, pd.date_range("2020-01-01", periods=num, freq="D"), close)
+
+
+def kline_frame(code, times, close):
+    return pd.DataFrame({
+        "code": code, "time_key": times.strftime("%Y-%m-%d %H:%M:%S"), "open": close, "close": close,
+        "high": close, "low": close, "volume": 1000, "turnover": close, "k_type": KLType.K_DAY,
+    })
+
+
+def make_strategy(i):
+    if i % 2:
+        strategy = MeanReversionStrategy.create(window=10 + i % 20, num_std=1.5 + (i % 5) / 5)
+    else:
+        strategy = MovingAverageStrategy.create(short_window=5 + i % 10, long_window=30 + i % 20)
+    # Measure evaluation only; orders are not part of the bar-close latency
+    strategy.place_order = lambda *args, **kwargs: type("Order", (), {'order_id': None})()
+    return strategy
+
+
+def main():
+    store = BarStore(capacity=200)
+    store.info = type("Info", (), {'quote_context': SyntheticQuoteContext()})()
+    scheduler = StrategyScheduler(bar_store=store, latency_budget_ms=1000.0)
+    codes = [f"HK.{i:05d}" for i in range(CODES)]
+    started = time.perf_counter()
+    for code in codes:
+        for i in range(INSTANCES_PER_CODE):
+            scheduler.register(make_strategy(i), code)
+    print(f"Registered {len(scheduler.instances):,} instances in {time.perf_counter() - started:.2f}s")
+
+    rng = np.random.default_rng(1)
+    times = pd.date_range("2020-07-19", periods=BARS, freq="D")
+    # One push per bar carrying every code, as after a session close
+    for day in times:
+        store.on_kline(pd.concat([kline_frame(code, pd.DatetimeIndex([day]), [100 * rng.lognormal(0, 0.02)])
+                                  for code in codes], ignore_index=True))
+
+    stats = scheduler.stats
+    # Every push closes the previous bar of each code, starting with the last seeded one
+    print(f"{stats['bars']:,} bar closes, {stats['evaluations']:,} evaluations; "
+          f"{stats['evaluations'] // BARS:,} instances per push evaluated in "
+          f"{stats['last_ms']:.1f}ms (worst {stats['max_ms']:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,110 @@
 import os
 import sys
 
+import numpy as np
+import pandas as pd
+import pytest
+from futu import RET_OK, KLType
+
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from trade_execution.models.APIConnectInfo import APIConnectInfo
+
+# Modules call APIConnectInfo.getInstance() at import time, which would open OpenD
+# connections. Install an instance without contexts; tests attach fakes as needed.
+if APIConnectInfo._instance is None:
+    APIConnectInfo._instance = APIConnectInfo.__new__(APIConnectInfo)
+
+from trade_execution.models.BarStore import BarStore  # noqa: E402
+from trade_execution.strategies.mean_reversion import MeanReversionStrategy  # noqa: E402
+from trade_execution.strategies.momentum import MomentumStrategy  # noqa: E402
+from trade_execution.strategies.moving_average import MovingAverageStrategy  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def feature_cache():
+    """A fresh FeatureCache per test; tests reuse codes and bar times with other prices"""
+    from trade_execution.strategies.feature_cache import FeatureCache
+
+    previous = FeatureCache._instance
+    FeatureCache._instance = FeatureCache()
+    yield FeatureCache._instance
+    FeatureCache._instance = previous
+
+
+def kline_frame(code, start, closes, ktype=KLType.K_DAY):
+    times = pd.date_range(start, periods=len(closes), freq="D")
+    return pd.DataFrame({
+        "code": code,
+        "time_key": times.strftime("%Y-%m-%d %H:%M:%S"),
+        "open": closes, "close": closes, "high": closes, "low": closes,
+        "volume": np.arange(len(closes)), "turnover": closes, "k_type": ktype,
+    })
+
+
+class FakeQuoteContext:
+    def __init__(self, frame):
+        self.frame = frame
+        self.subscriptions = []
+        self.cur_kline_calls = 0
+
+    def subscribe(self, codes, subtypes, subscribe_push=True):
+        self.subscriptions.append((codes, subtypes))
+        return RET_OK, None
+
+    def get_cur_kline(self, code, num, ktype):
+        self.cur_kline_calls += 1
+        return RET_OK, self.frame.iloc[-num:]
+
+
+def make_store(capacity, closes):
+    store = BarStore(capacity=capacity)
+    store.info = type("Info", (), {})()
+    store.info.quote_context = FakeQuoteContext(kline_frame("HK.00700", "2024-01-01", closes))
+    return store
+
+
+CODES = [f"HK.{i:05d}" for i in range(1, 9)]
+
+PARAMETER_SETS = [
+    (MovingAverageStrategy, {'short_window': 5, 'long_window': 20}),
+    (MovingAverageStrategy, {'short_window': 10, 'long_window': 40}),
+    (MovingAverageStrategy, {'short_window': 3, 'long_window': 12}),
+    (MeanReversionStrategy, {'window': 10, 'num_std': 1.0}),
+    (MeanReversionStrategy, {'window': 20, 'num_std': 1.5}),
+    (MomentumStrategy, {'period': 14, 'oversold': 30.0, 'overbought': 70.0}),
+]
+
+
+class MultiCodeQuoteContext:
+    def __init__(self, n=200):
+        self.frames = {}
+        for i, code in enumerate(CODES):
+            closes = 100 * np.exp(np.cumsum(np.random.default_rng(i).normal(0, 0.03, 3 * n)))
+            # End each history on a signal bar of one of the parameter sets
+            strategy_cls, params = PARAMETER_SETS[i % len(PARAMETER_SETS)]
+            signals = strategy_cls.create(**params).generate_signals(pd.DataFrame({'close': closes}))
+            end = np.flatnonzero(signals[n:])[-1] + n + 1
+            self.frames[code] = kline_frame(code, "2024-01-01", closes[end - n:end])
+
+    def subscribe(self, codes, subtypes, subscribe_push=True):
+        return RET_OK, None
+
+    def get_cur_kline(self, code, num, ktype):
+        return RET_OK, self.frames[code].iloc[-num:]
+
+
+@pytest.fixture
+def quote_context():
+    """Quote context serving the bar store fixture; override it for other fakes"""
+    return MultiCodeQuoteContext()
+
+
+@pytest.fixture
+def bar_store(quote_context):
+    previous = BarStore._instance
+    store = BarStore(capacity=200)
+    store.info = type("Info", (), {'quote_context': quote_context})()
+    BarStore._instance = store
+    yield store
+    BarStore._instance = previous
@@ -0,0 +1,112 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.services.backtest_jobs import CANCELLED, FAILED, SUCCEEDED, BacktestJobQueue
+from trade_execution.services.bar_cache import BarCache
+
+
+def fake_download(start, end):
+    index = pd.bdate_range(start, end)
+    rng = np.random.default_rng(len(index))
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close,
+                         'adj_close': close, 'volume': np.full(len(index), 1000)}, index=index)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    # Workers open the same cache directory, so the bars must be cached up front
+    previous = BarCache._instance
+    BarCache._instance = BarCache(root_dir=str(tmp_path))
+    BarCache._instance.get("yfinance", "TEST", "1d", datetime(2020, 1, 1), datetime(2021, 12, 31), fake_download)
+    queue = BacktestJobQueue(max_workers=1)
+    yield queue
+    queue.shutdown(wait=True)
+    BarCache._instance = previous
+
+
+def wait_for(queue, job_id, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def sweep_request(**overrides):
+    request = {
+        'strategy_id': 'sma_crossover',
+        'symbol': 'TEST',
+        'start_date': datetime(2020, 1, 1),
+        'end_date': datetime(2022, 1, 1),
+        'grid': {'short_window': [5, 10], 'long_window': [20, 40]},
+    }
+    request.update(overrides)
+    return request
+
+
+def test_job_runs_in_worker_and_keeps_result(queue):
+    job = queue.submit(sweep_request(), kind="sweep")
+    assert job.to_dict()['status'] in ("QUEUED", "RUNNING")
+
+    job = wait_for(queue, job.job_id)
+    assert job.status == SUCCEEDED, job.error
+    assert job.progress == 1.0
+    assert job.result['symbol'] == 'TEST'
+    assert job.result['combinations'] == 4
+    assert len(job.result['results']) == 4
+    assert [entry['job_id'] for entry in queue.jobs()] == [job.job_id]
+
+
+def test_failed_job_keeps_error_type(queue):
+    job = wait_for(queue, queue.submit({
+        'strategy_id': 'mean_reversion',
+        'symbol': 'TEST',
+        'start_date': datetime(2020, 1, 1),
+        'end_date': datetime(2022, 1, 1),
+        'parameters': {'window': 5000},
+    }).job_id)
+    assert job.status == FAILED
+    assert job.error_type == 'ValueError'
+
+    with pytest.raises(ValueError):
+        queue.submit({}, kind="optimize")
+
+
+def test_queued_jobs_can_be_cancelled(queue):
+    jobs = [queue.submit(sweep_request(), kind="sweep") for _ in range(4)]
+    # One job runs and one waits in the pool's call queue; the last is still pending
+    assert queue.cancel(jobs[-1].job_id)
+    assert queue.get(jobs[-1].job_id).status == CANCELLED
+    for job in jobs[:-1]:
+        assert wait_for(queue, job.job_id).status == SUCCEEDED
+    assert not queue.cancel(jobs[0].job_id)
+
+
+def test_pending_limit(queue):
+    queue.max_pending = 1
+    queue.submit(sweep_request(), kind="sweep")
+    with pytest.raises(Exception, match="Too many pending"):
+        queue.submit(sweep_request(), kind="sweep")
+
+
+def test_broken_pool_is_replaced(queue):
+    job = queue.submit(sweep_request(), kind="sweep")
+    broken = queue._executor
+    for process in list(broken._processes.values()):
+        process.kill()
+    job = wait_for(queue, job.job_id)
+    assert job.status == FAILED
+    assert job.error_type == 'BrokenProcessPool'
+
+    # The next submit starts a new pool instead of leaving the job queued forever
+    job = wait_for(queue, queue.submit(sweep_request(), kind="sweep").job_id)
+    assert job.status == SUCCEEDED, job.error
+    assert queue._executor is not broken
+    assert len(queue.jobs()) == 2
@@ -0,0 +1,128 @@
+import threading
+import time
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from trade_execution.services.bar_cache import BarCache, last_completed_session, symbol_market
+
+
+class FakeSource:
+    def __init__(self, offset=0.0):
+        self.calls = []
+        self.offset = offset
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        days = pd.bdate_range(start, end)
+        return pd.DataFrame({
+            "close": days.dayofyear.to_numpy(dtype=float) + 0.1 + self.offset,
+            "volume": np.full(len(days), 1000, dtype=np.int64),
+        }, index=days)
+
+
+def test_repeat_requests_do_no_fetches(tmp_path):
+    cache = BarCache(str(tmp_path))
+    source = FakeSource()
+    first = cache.get("test", "AAA", "1d", date(2023, 1, 1), date(2023, 3, 31), source)
+    second = cache.get("test", "AAA", "1d", date(2023, 2, 1), date(2023, 2, 28), source)
+
+    assert source.calls == [(date(2023, 1, 1), date(2023, 3, 31))]
+    pd.testing.assert_frame_equal(second, first.loc["2023-02-01":"2023-02-28"], check_freq=False)
+    assert second["close"].dtype == np.float64
+    assert cache.stats["hits"] == 1
+
+    # A new cache instance reads the same files
+    reopened = BarCache(str(tmp_path))
+    reopened.get("test", "AAA", "1d", date(2023, 1, 1), date(2023, 3, 31), source)
+    assert len(source.calls) == 1
+
+
+def test_only_missing_gaps_are_fetched(tmp_path):
+    cache = BarCache(str(tmp_path))
+    cache.get("test", "AAA", "1d", date(2023, 2, 1), date(2023, 2, 28), FakeSource())
+    version = cache.data_version("test", "AAA", "1d")
+
+    source = FakeSource()
+    frame = cache.get("test", "AAA", "1d", date(2023, 1, 15), date(2023, 3, 15), source)
+    # Each gap fetch reaches one cached bar next to it to check for restated history
+    assert source.calls == [(date(2023, 1, 15), date(2023, 2, 1)), (date(2023, 2, 28), date(2023, 3, 15))]
+    assert cache.data_version("test", "AAA", "1d") == version + 1
+
+    assert frame.loc["2023-02-01", "close"] == 32.1
+    assert frame.index.is_monotonic_increasing and not frame.index.has_duplicates
+    pd.testing.assert_frame_equal(frame, FakeSource()(date(2023, 1, 15), date(2023, 3, 15)), check_freq=False,
+                                  check_index_type=False)
+
+
+def test_restated_history_rewrites_the_entry(tmp_path):
+    cache = BarCache(str(tmp_path))
+    cache.get("test", "AAA", "1d", date(2023, 2, 1), date(2023, 2, 28), FakeSource())
+
+    # A later dividend moved every adjusted price: cached and new bars must not mix
+    source = FakeSource(offset=-0.05)
+    frame = cache.get("test", "AAA", "1d", date(2023, 2, 1), date(2023, 3, 15), source)
+    assert source.calls == [(date(2023, 2, 28), date(2023, 3, 15)), (date(2023, 2, 1), date(2023, 3, 15))]
+    pd.testing.assert_frame_equal(frame, source(date(2023, 2, 1), date(2023, 3, 15)), check_freq=False,
+                                  check_index_type=False)
+    cached = cache.get("test", "AAA", "1d", date(2023, 2, 1), date(2023, 2, 28), source)
+    assert cached["close"].iloc[0] == frame["close"].iloc[0] == 32.1 - 0.05
+
+
+def test_open_session_is_fetched_live_and_not_cached(tmp_path):
+    # 10:00 in New York on 2024-03-15: that day's US session is still open
+    cache = BarCache(str(tmp_path), clock=lambda: datetime(2024, 3, 15, 14, 0, tzinfo=timezone.utc))
+    source = FakeSource()
+    cache.get("test", "AAA", "1d", date(2024, 3, 5), date(2024, 3, 15), source)
+    cache.get("test", "AAA", "1d", date(2024, 3, 5), date(2024, 3, 15), source)
+    today = date(2024, 3, 15)
+    assert source.calls == [(date(2024, 3, 5), date(2024, 3, 14)), (today, today), (today, today)]
+
+
+def test_last_completed_session_uses_the_exchange_timezone():
+    # 02:00 on the 16th in Hong Kong: the 15th's US session is still open in New York
+    now = datetime(2024, 3, 15, 18, 0, tzinfo=timezone.utc)
+    assert last_completed_session("US.AAPL", now) == date(2024, 3, 14)
+    assert last_completed_session("AAPL", now) == date(2024, 3, 14)
+    assert last_completed_session("HK.00700", now) == date(2024, 3, 15)
+    assert last_completed_session("0700.HK", datetime(2024, 3, 15, 8, 5, tzinfo=timezone.utc)) == date(2024, 3, 14)
+    assert last_completed_session("0700.HK", datetime(2024, 3, 15, 8, 10, tzinfo=timezone.utc)) == date(2024, 3, 15)
+    assert symbol_market("600519.SS") == symbol_market("SH.600519") == "SH"
+
+
+def test_sees_writes_from_other_instances(tmp_path):
+    # Job worker processes share the cache directory with the server
+    server = BarCache(str(tmp_path))
+    worker = BarCache(str(tmp_path))
+    assert server.data_version("test", "AAA", "1d") == 0
+
+    worker.get("test", "AAA", "1d", date(2023, 1, 1), date(2023, 1, 31), FakeSource())
+    assert server.data_version("test", "AAA", "1d") == 1
+
+    source = FakeSource()
+    server.get("test", "AAA", "1d", date(2023, 1, 1), date(2023, 1, 31), source)
+    assert source.calls == []
+
+
+def test_concurrent_writers_fetch_once_and_keep_the_previous_version(tmp_path):
+    # Separate instances stand in for worker processes: only the file lock is shared
+    source = FakeSource()
+
+    def slow(start, end):
+        time.sleep(0.05)
+        return source(start, end)
+
+    caches = [BarCache(str(tmp_path)) for _ in range(4)]
+    threads = [threading.Thread(target=cache.get, args=("test", "AAA", "1d", date(2023, 1, 1),
+                                                        date(2023, 1, 31), slow)) for cache in caches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert source.calls == [(date(2023, 1, 1), date(2023, 1, 31))]
+
+    entry_dir = tmp_path / "test" / "1d" / "AAA"
+    caches[0].get("test", "AAA", "1d", date(2023, 1, 1), date(2023, 2, 28), source)
+    caches[0].get("test", "AAA", "1d", date(2023, 1, 1), date(2023, 3, 31), source)
+    assert sorted(path.name for path in entry_dir.iterdir() if path.is_dir()) == ["v2", "v3"]
@@ -0,0 +1,122 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.services.backtest_service import BacktestService
+from trade_execution.services.bar_cache import BarCache
+from trade_execution.services.bar_providers import BAR_COLUMNS, BarProvider, LocalFileBarProvider, empty_bars
+from trade_execution.services.data_warmup import DataWarmup
+
+
+def make_bars(start, end, seed=0):
+    index = pd.bdate_range(start, end)
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, len(index))))
+    return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close,
+                         'adj_close': close, 'volume': np.full(len(index), 1000)}, index=index)
+
+
+class CountingProvider(BarProvider):
+    """Serves bars from a fixed history per symbol and records every request"""
+    def __init__(self, history):
+        self.history = history
+        self.calls = []
+
+    def download(self, symbols, start, end):
+        self.calls.append((list(symbols), start, end))
+        return {symbol: self.history[symbol].loc[pd.Timestamp(start):pd.Timestamp(end)] for symbol in symbols}
+
+
+@pytest.fixture
+def provider(tmp_path):
+    history = {
+        'AAA': make_bars('2020-01-01', '2021-12-31', seed=1),
+        # Starts later and skips a month, so alignment leaves NaNs and forward-fills
+        'BBB': make_bars('2020-06-01', '2021-12-31', seed=2).drop(pd.bdate_range('2021-03-01', '2021-03-31')),
+        'CCC': make_bars('2020-01-01', '2021-12-31', seed=3),
+    }
+    previous_cache, previous_provider = BarCache._instance, BacktestService.bar_provider
+    # Sessions up to today's count as completed, whatever the time of day
+    end_of_today = datetime.combine(date.today(), time(23, 59), tzinfo=ZoneInfo('America/New_York'))
+    BarCache._instance = BarCache(root_dir=str(tmp_path / "cache"), clock=lambda: end_of_today)
+    BacktestService.bar_provider = CountingProvider(history)
+    yield BacktestService.bar_provider
+    BarCache._instance, BacktestService.bar_provider = previous_cache, previous_provider
+
+
+def test_fetch_many_downloads_all_symbols_at_once(provider):
+    symbols = ['AAA', 'BBB', 'CCC']
+    prices = BacktestService.fetch_many(symbols, datetime(2020, 1, 1), datetime(2022, 1, 1))
+    assert len(provider.calls) == 1
+    assert provider.calls[0] == (symbols, date(2020, 1, 1), date(2021, 12, 31))
+
+    assert list(prices.columns) == symbols
+    assert prices.index.equals(provider.history['AAA'].index)
+    assert prices['BBB'][:'2020-05-31'].isna().all()
+    assert prices.loc['2021-03-15', 'BBB'] == pytest.approx(provider.history['BBB'].loc['2021-02-26', 'adj_close'])
+    np.testing.assert_allclose(prices['CCC'].to_numpy(), provider.history['CCC']['adj_close'].to_numpy(),
+                               rtol=1e-6)
+
+    # Everything is cached now; a wider range only downloads the new gap and the
+    # first cached bar (checked for restated history), again in one call
+    BacktestService.fetch_many(symbols, datetime(2020, 1, 1), datetime(2022, 1, 1))
+    assert len(provider.calls) == 1
+    BacktestService.fetch_many(['AAA', 'CCC'], datetime(2019, 12, 1), datetime(2022, 1, 1))
+    assert provider.calls[1:] == [(['AAA', 'CCC'], date(2019, 12, 1), date(2020, 1, 1))]
+
+
+def test_fetch_bars_groups_symbols_by_missing_range(provider):
+    BacktestService.fetch_bars(['AAA', 'CCC'], datetime(2021, 1, 1), datetime(2022, 1, 1))
+    # BBB's long gap is downloaded for BBB alone; the others only share their short gap
+    BacktestService.fetch_bars(['AAA', 'BBB', 'CCC'], datetime(2020, 12, 1), datetime(2022, 1, 1))
+    assert provider.calls[1:] == [(['AAA', 'CCC'], date(2020, 12, 1), date(2021, 1, 1)),
+                                  (['BBB'], date(2020, 12, 1), date(2021, 12, 31))]
+
+    with pytest.raises(TypeError):
+        BarProvider()
+
+
+def test_symbols_without_bars_are_rejected(provider):
+    provider.history['BADSYM'] = empty_bars()
+    with pytest.raises(ValueError, match="No data for BADSYM"):
+        BacktestService.run_backtest("sma_crossover", "BADSYM", datetime(2021, 1, 1), datetime(2022, 1, 1))
+
+    # The empty entry keeps the provider's columns
+    bars = BarCache.getInstance().get('yfinance', 'BADSYM', '1d', date(2021, 1, 1), date(2021, 12, 31),
+                                      lambda start, end: empty_bars())
+    assert bars.empty and list(bars.columns) == BAR_COLUMNS
+    assert len(provider.calls) == 1
+
+
+def test_warm_up_fills_the_cache(provider):
+    today = date.today()
+    provider.history = {symbol: make_bars(today - timedelta(days=60), today - timedelta(days=1), seed=i)
+                        for i, symbol in enumerate(('AAA', 'BBB'))}
+    warmup = DataWarmup(['AAA', 'BBB'], lookback_days=30)
+    report = warmup.run()
+    assert report['downloaded'] == ['AAA', 'BBB']
+    assert len(provider.calls) == 1
+    assert report['bars']['AAA'] == len(pd.bdate_range(today - timedelta(days=30), today - timedelta(days=1)))
+
+    assert warmup.run()['downloaded'] == []
+    assert len(provider.calls) == 1
+    assert warmup.status()['last_report']['downloaded'] == []
+
+
+def test_local_file_provider(tmp_path):
+    bars = make_bars('2021-01-01', '2021-03-31')
+    yahoo = bars.rename(columns={'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close',
+                                 'adj_close': 'Adj Close', 'volume': 'Volume'})
+    yahoo.rename_axis('Date').to_csv(tmp_path / "HK.00700.csv")
+    bars.drop(columns='adj_close').rename_axis('date').to_csv(tmp_path / "AAPL.csv")
+
+    provider = LocalFileBarProvider(str(tmp_path))
+    result = provider.download(['HK.00700', 'AAPL', 'MSFT'], date(2021, 2, 1), date(2021, 2, 28))
+    assert list(result['HK.00700'].columns) == BAR_COLUMNS
+    assert result['HK.00700'].index.equals(pd.bdate_range('2021-02-01', '2021-02-26'))
+    np.testing.assert_allclose(result['HK.00700']['adj_close'], bars.loc['2021-02', 'adj_close'])
+    # Files without adjusted closes use the close
+    np.testing.assert_allclose(result['AAPL']['adj_close'], bars.loc['2021-02', 'close'])
+    assert result['MSFT'].empty
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from futu import KLType
+
+from conftest import kline_frame, make_store
+
+
+def test_seed_once_and_return_views():
+    store = make_store(5, [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0])
+    bars = store.get_bars("HK.00700", KLType.K_DAY, 3)
+    assert bars["close"].tolist() == [5.0, 6.0, 7.0]
+
+    store.get_bars("HK.00700", KLType.K_DAY, 5)
+    quote_context = store.info.quote_context
+    assert quote_context.cur_kline_calls == 1
+    assert quote_context.subscriptions == [(["HK.00700"], [KLType.K_DAY])]
+
+    buffer = store.get_buffer("HK.00700", KLType.K_DAY)
+    assert np.shares_memory(store.get_bars("HK.00700", KLType.K_DAY, 5)["close"].to_numpy(),
+                            buffer._columns["close"])
+
+
+def test_push_updates_live_bar_and_wraps():
+    store = make_store(4, [1.0, 2.0, 3.0])
+    store.get_bars("HK.00700", KLType.K_DAY, 4)
+
+    # Same time as the last bar: update in place
+    store.on_kline(kline_frame("HK.00700", "2024-01-03", [3.5]))
+    assert store.get_bars("HK.00700", KLType.K_DAY, 4)["close"].tolist() == [1.0, 2.0, 3.5]
+
+    # New bars append and eventually overwrite the oldest
+    store.on_kline(kline_frame("HK.00700", "2024-01-04", [4.0, 5.0, 6.0]))
+    bars = store.get_bars("HK.00700", KLType.K_DAY, 10)
+    assert bars["close"].tolist() == [3.5, 4.0, 5.0, 6.0]
+    assert bars["time_key"].iloc[-1] == pd.Timestamp("2024-01-06")
+
+    # Stale bars and unsubscribed codes are ignored
+    store.on_kline(kline_frame("HK.00700", "2024-01-02", [0.0]))
+    store.on_kline(kline_frame("HK.00005", "2024-01-07", [9.0]))
+    assert store.get_bars("HK.00700", KLType.K_DAY, 4)["close"].tolist() == [3.5, 4.0, 5.0, 6.0]
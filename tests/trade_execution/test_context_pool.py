@@ -0,0 +1,173 @@
+import gc
+import threading
+from datetime import date
+
+import pandas as pd
+import pytest
+from futu import RET_ERROR, RET_OK, KLType
+
+from trade_execution.models.ContextPool import LEAST_LOADED, ContextPool
+from trade_execution.models.MarketSnapshot import MAX_SNAPSHOT_CODES, MarketSnapshot
+from trade_execution.services import history_fetcher
+from trade_execution.services.history_fetcher import HistoryKlineFetcher, RateLimiter, rate_limiter_for
+
+
+class ConcurrencyProbe:
+    """Tracks requests in progress across contexts; the first ``wait_for`` wait for each other"""
+    def __init__(self, wait_for=1):
+        self.barrier = threading.Barrier(wait_for, timeout=10.0)
+        self.lock = threading.Lock()
+        self.started = 0
+        self.active = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.started += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            wait = self.started <= self.barrier.parties
+        if wait:
+            self.barrier.wait()
+
+    def __exit__(self, *exc_info):
+        with self.lock:
+            self.active -= 1
+
+
+class FakeContext:
+    """One OpenD connection: requests on it are served one at a time"""
+    def __init__(self, probe=None):
+        self.probe = probe or ConcurrencyProbe()
+        self.calls = 0
+        self.healthy = True
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def get_global_state(self):
+        return (RET_OK, {}) if self.healthy else (RET_ERROR, "disconnected")
+
+    def get_market_snapshot(self, codes):
+        with self.lock:
+            self.calls += 1
+            return RET_OK, pd.DataFrame({"code": codes})
+
+    def get_history_kl_quota(self, get_detail=False):
+        return RET_OK, (0, 100, [])
+
+    def request_history_kline(self, code, start, end, ktype, autype, max_count, page_req_key):
+        with self.lock, self.probe:
+            self.calls += 1
+        days = pd.bdate_range(start, end)
+        return RET_OK, pd.DataFrame({"code": code, "time_key": days.strftime("%Y-%m-%d 00:00:00")}), None
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(size, primary=None, **kwargs):
+    return ContextPool("quote", FakeContext, size=size, primary=primary,
+                       health_check=lambda context: context.get_global_state()[0] == RET_OK, **kwargs)
+
+
+def test_round_robin_spreads_queries_and_keeps_primary():
+    primary = FakeContext()
+    pool = make_pool(3, primary=primary)
+    assert pool.primary is primary and pool.size == 3
+
+    for _ in range(6):
+        ret, data = pool.get_market_snapshot(["HK.00700"])
+        assert ret == RET_OK
+    assert [slot.context.calls for slot in pool._slots] == [2, 2, 2]
+
+    # The pool closes only the contexts it opened
+    pool.close()
+    assert not primary.closed and all(slot.context.closed for slot in pool._slots[1:])
+
+
+def test_least_loaded_skips_busy_contexts():
+    pool = make_pool(2, routing=LEAST_LOADED)
+    with pool.acquire() as busy:
+        for _ in range(3):
+            pool.get_market_snapshot(["HK.00700"])
+    assert busy.calls == 0
+
+
+def test_unhealthy_contexts_are_skipped_until_they_recover():
+    pool = make_pool(3)
+    pool._slots[1].context.healthy = False
+    assert pool.check_health() == [True, False, True]
+
+    for _ in range(4):
+        pool.get_market_snapshot(["HK.00700"])
+    assert pool._slots[1].context.calls == 0
+
+    pool._slots[1].context.healthy = True
+    assert pool.check_health() == [True, True, True]
+    for _ in range(3):
+        pool.get_market_snapshot(["HK.00700"])
+    assert pool._slots[1].context.calls == 1
+
+
+def test_failed_results_and_latency_are_recorded():
+    pool = make_pool(1)
+    pool.get_market_snapshot(["HK.00700"])
+    pool.primary.get_market_snapshot = lambda codes: (RET_ERROR, "too many codes")
+    pool.get_market_snapshot(["HK.00700"])
+
+    stats = pool.info()["contexts"][0]
+    assert stats["calls"] == 2 and stats["errors"] == 1
+    assert stats["last_error"] == "too many codes"
+    assert sum(stats["latency_histogram"].values()) == 2 and stats["in_flight"] == 0
+
+
+def test_invalid_pool_configuration():
+    with pytest.raises(ValueError):
+        make_pool(0)
+    with pytest.raises(ValueError):
+        make_pool(2, routing="random")
+
+
+def test_history_chunks_run_across_the_pool():
+    def fetch(size):
+        # Fails with a broken barrier unless ``size`` requests are in progress at once
+        probe = ConcurrencyProbe(wait_for=size)
+        pool = ContextPool("quote", lambda: FakeContext(probe), size=size)
+        fetcher = HistoryKlineFetcher(pool, max_count=20, rate_limiter=RateLimiter(1000, 1.0))
+        data, report = fetcher.fetch("HK.00700", date(2020, 1, 1), date(2020, 12, 31), KLType.K_DAY)
+        return data, report, pool, probe
+
+    single_data, report, _, single = fetch(1)
+    pooled_data, _, pool, pooled = fetch(4)
+
+    assert report["chunks"] >= 12
+    assert pooled_data["time_key"].tolist() == single_data["time_key"].tolist()
+    assert all(slot.context.calls > 0 for slot in pool._slots)
+    # One connection serves one request at a time; the pool serves one per context
+    assert single.peak == 1
+    assert pooled.peak == 4
+
+
+def test_rate_limiters_follow_their_contexts():
+    registered = len(history_fetcher._rate_limiters)
+    context = FakeContext()
+    limiter = rate_limiter_for(context)
+    assert rate_limiter_for(context) is limiter
+    assert rate_limiter_for(FakeContext()) is not limiter
+
+    del context
+    gc.collect()
+    assert len(history_fetcher._rate_limiters) == registered
+
+
+def test_snapshots_are_chunked_across_the_pool(monkeypatch):
+    pool = make_pool(2)
+    monkeypatch.setattr(MarketSnapshot.info, "_quote_pool", pool, raising=False)
+    codes = [f"HK.{i:05d}" for i in range(MAX_SNAPSHOT_CODES * 2 + 1)]
+
+    data = MarketSnapshot().getSnapshots(codes + codes[:10])
+    assert data["code"].tolist() == codes
+    assert sum(slot.context.calls for slot in pool._slots) == 3
+    assert all(slot.context.calls > 0 for slot in pool._slots)
+    with pytest.raises(ValueError):
+        MarketSnapshot().getSnapshots([])
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.strategies.feature_cache import FeatureCache
+from trade_execution.strategies.mean_reversion import MeanReversionStrategy
+from trade_execution.strategies.moving_average import MovingAverageStrategy
+
+from conftest import PARAMETER_SETS
+
+
+def bars(n, seed=0):
+    times = np.arange(np.datetime64("2024-01-01"), np.datetime64("2024-01-01") + n).astype("datetime64[ns]")
+    closes = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.03, n)))
+    return times, closes
+
+
+def test_feature_is_computed_once_per_bar():
+    cache = FeatureCache()
+    times, closes = bars(60)
+    expected = pd.Series(closes).rolling(20).mean().to_numpy()
+
+    assert cache.get("HK.00700", "K_DAY", "sma", times[:40], closes[:40], window=20) \
+        == pytest.approx((expected[38], expected[39]))
+    assert cache.stats['updates'] == 40
+    # Same bar again: a hit; later bars: only the new ones are fed
+    cache.get("HK.00700", "K_DAY", "sma", times[:40], closes[:40], window=20)
+    previous, current = cache.get("HK.00700", "K_DAY", "sma", times[:43], closes[:43], window=20)
+    assert (previous, current) == pytest.approx((expected[41], expected[42]))
+    assert cache.stats == {'hits': 1, 'updates': 43, 'rebuilds': 1, 'evictions': 0}
+
+    # The last bar's close changed while it was forming: amended in place
+    live = closes[:43].copy()
+    live[-1] *= 1.01
+    previous, current = cache.get("HK.00700", "K_DAY", "sma", times[:43], live, window=20)
+    assert current == pytest.approx(pd.Series(live).rolling(20).mean().iloc[-1])
+    assert previous == pytest.approx(expected[41])
+
+    # Bars that do not continue the cached ones start the feature over
+    other_times, other_closes = bars(30, seed=1)
+    other_times = other_times + np.timedelta64(365, "D")
+    current = cache.get("HK.00700", "K_DAY", "sma", other_times, other_closes, window=20)[1]
+    assert current == pytest.approx(other_closes[-20:].mean())
+    assert cache.stats['rebuilds'] == 2
+
+    # An older bar is computed on the side and leaves the entry where it was
+    assert cache.get("HK.00700", "K_DAY", "sma", times[:25], closes[:25], window=20)[1] \
+        == pytest.approx(expected[24])
+    assert cache.get("HK.00700", "K_DAY", "sma", other_times, other_closes, window=20)[1] == current
+
+    with pytest.raises(ValueError):
+        cache.get("HK.00700", "K_DAY", "macd", times, closes)
+
+
+def test_least_recently_used_features_are_evicted():
+    times, closes = bars(30)
+    cache = FeatureCache(max_entries=2)
+    for window in (5, 10, 5, 20):
+        cache.get("HK.00700", "K_DAY", "sma", times, closes, window=window)
+    assert cache.stats['evictions'] == 1
+    # SMA(10) was dropped, SMA(5) kept as recently used
+    cache.get("HK.00700", "K_DAY", "sma", times, closes, window=5)
+    assert cache.stats['hits'] == 2
+
+    budget = FeatureCache(memory_budget=3000)
+    for code in ("HK.00001", "HK.00002", "HK.00003"):
+        budget.get(code, "K_DAY", "std", times, closes, window=20)
+    assert budget.info()['entries'] == 2 and budget.nbytes <= budget.memory_budget
+
+
+def test_strategies_share_features(feature_cache):
+    times, closes = bars(120)
+    strategies = [MovingAverageStrategy.create(short_window=20, long_window=50),
+                  MovingAverageStrategy.create(short_window=5, long_window=20),
+                  MeanReversionStrategy.create(window=20, num_std=2.0)]
+    for strategy in strategies:
+        strategy.signal_from_features("HK.00700", "K_DAY", times, closes)
+    # SMA(5), SMA(20), SMA(50) and STD(20); SMA(20) is read by all three
+    assert feature_cache.info()['entries'] == 4
+    assert feature_cache.stats['updates'] == 4 * len(closes)
+    assert feature_cache.stats['hits'] == 2
+
+
+@pytest.mark.parametrize("strategy_cls, params", PARAMETER_SETS)
+def test_feature_signals_match_generate_signals(strategy_cls, params):
+    times, closes = bars(300, seed=3)
+    strategy = strategy_cls.create(**params)
+    expected = strategy.generate_signals(pd.DataFrame({'close': closes}))
+    signals = np.zeros(len(closes))
+    for end in range(1, len(closes) + 1):
+        signal = strategy.signal_from_features("HK.00700", "K_DAY", times[:end], closes[:end])
+        signals[end - 1] = 0 if signal is None else (1 if signal.value == "BUY" else -1)
+    assert np.count_nonzero(expected) > 0
+    np.testing.assert_array_equal(signals, expected)
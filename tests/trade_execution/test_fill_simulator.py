@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from trade_execution.services.fill_simulator import (
+    BUY, CANCELLED_ALL, FILLED_ALL, FILLED_PART, MAKER, SELL, TAKER, BookSnapshots, FillSimulator
+)
+from trade_execution.services.market_data_journal import JournalReader, MarketDataJournal
+
+
+def make_books(levels, depth=3, step=1_000_000):
+    """Snapshots from (bid levels, ask levels) pairs of (price, volume) lists"""
+    n = len(levels)
+    arrays = {name: np.zeros((n, depth)) for name in ('bid_price', 'bid_volume', 'ask_price', 'ask_volume')}
+    n_bid, n_ask = np.zeros(n, dtype=int), np.zeros(n, dtype=int)
+    for row, (bids, asks) in enumerate(levels):
+        for side, side_levels, counts in (('bid', bids, n_bid), ('ask', asks, n_ask)):
+            counts[row] = len(side_levels)
+            for k, (price, volume) in enumerate(side_levels):
+                arrays[side + '_price'][row, k] = price
+                arrays[side + '_volume'][row, k] = volume
+    return BookSnapshots(np.arange(n) * step, n_bid=n_bid, n_ask=n_ask, **arrays)
+
+
+def test_market_order_walks_depth_and_consumes_the_snapshot():
+    books = make_books([([(9.9, 100)], [(10.0, 100), (10.1, 200), (10.2, 500)])] * 2)
+    simulator = FillSimulator(books)
+    first = simulator.submit(BUY, 250)
+    second = simulator.submit(BUY, 100)
+    report = simulator.run()
+
+    assert report['fills']['price'] == [10.0, 10.1, 10.1, 10.2]
+    assert report['fills']['qty'] == [100, 150, 50, 50]
+    assert set(report['fills']['liquidity']) == {TAKER}
+    assert simulator.orders[first].status == FILLED_ALL
+    assert simulator.orders[first].to_dict()['avg_price'] == pytest.approx((1000 + 1515) / 250)
+    assert simulator.orders[second].filled_qty == 100
+    assert report['position'] == 350
+
+
+def test_latency_delays_arrival_to_a_later_book():
+    books = make_books([
+        ([(9.9, 100)], [(10.0, 100)]),
+        ([(10.4, 100)], [(10.5, 100)]),
+    ])
+    simulator = FillSimulator(books, latency_ns=1_500_000)
+    order_id = simulator.submit(BUY, 10, price=10.2, ts=0)
+    report = simulator.run()
+    # The order arrives after the second snapshot, when the ask is above its limit
+    order = simulator.orders[order_id]
+    assert order.arrived_ts == 1_500_000 and order.filled_qty == 0
+    assert report['fills']['qty'] == []
+
+
+def test_queue_position_and_trade_through():
+    bid_volumes = [100, 30, 200, 150]
+    books = make_books([([(9.9, volume), (9.8, 500)], [(10.0, 300)]) for volume in bid_volumes]
+                       + [([(9.7, 100)], [(9.9, 40)])])
+    simulator = FillSimulator(books)
+    order_id = simulator.submit(BUY, 50, price=9.9)
+    report = simulator.run()
+
+    order = simulator.orders[order_id]
+    # 70 of the 100 ahead traded, 200 joined behind, then 50 traded: 20 reach the order;
+    # the ask then drops to the order's price and fills 30 more
+    assert report['fills']['qty'] == [20, 30]
+    assert report['fills']['liquidity'] == [MAKER, MAKER]
+    assert report['fills']['price'] == [9.9, 9.9]
+    assert order.status == FILLED_ALL
+
+
+def test_cancel_takes_effect_after_latency():
+    books = make_books([([(9.9, 100)], [(10.0, 100)])] * 2)
+
+    class CancelOnFirstBook:
+        def on_book(self, simulator, row):
+            if row == 0:
+                self.order_id = simulator.submit(SELL, 10, price=10.5)
+                simulator.cancel(self.order_id)
+
+    strategy = CancelOnFirstBook()
+    simulator = FillSimulator(books, latency_ns=100)
+    simulator.run(strategy)
+    assert simulator.orders[strategy.order_id].status == CANCELLED_ALL
+
+    books = make_books([([(9.9, 100)], [(10.0, 100)]), ([(9.8, 100)], [(10.0, 100)])])
+    simulator = FillSimulator(books, latency_ns=100, commission=0.001, min_commission=1.0)
+    partial = simulator.submit(SELL, 150, price=9.9, ts=0)
+    report = simulator.run()
+    assert simulator.orders[partial].status == FILLED_PART
+    assert report['fees'] == pytest.approx(1.0)
+    assert report['cash'] == pytest.approx(990 - 1.0)
+
+
+def test_books_from_journal(tmp_path):
+    journal = MarketDataJournal(str(tmp_path))
+    for i in range(5):
+        journal.record_order_book("HK.00700", [(350.0, 100 + i, 1)], [(350.2, 200, 2)], ts=1_000 + i)
+    journal.record_order_book("HK.00005", [(60.0, 400, 3)], [(60.05, 800, 4)], ts=1_002)
+    journal.close()
+
+    day = JournalReader(str(tmp_path)).days()[0]
+    books = BookSnapshots.from_journal(str(tmp_path), "HK.00700", day)
+    assert len(books) == 5
+    assert books.bid_volume[:, 0].tolist() == [100, 101, 102, 103, 104]
+    assert books.n_ask.tolist() == [1] * 5
+    with pytest.raises(ValueError):
+        BookSnapshots.from_journal(str(tmp_path), "US.AAPL", day)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.services.backtest_service import BacktestService
+from trade_execution.services.graph_data import (
+    downsample_indices, json_column, lttb_indices, minmax_indices
+)
+
+
+def random_walk(n=5000, seed=3):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+def test_json_column_replaces_non_finite_values():
+    assert json_column(np.array([1.5, np.nan, np.inf, -2.0])) == [1.5, None, None, -2.0]
+    assert json_column(np.array([1, 2])) == [1, 2]
+
+
+def test_lttb_keeps_endpoints_and_target_count():
+    values = random_walk()
+    selected = lttb_indices(values, 500)
+    assert len(selected) == 500
+    assert selected[0] == 0 and selected[-1] == len(values) - 1
+    assert np.all(np.diff(selected) > 0)
+    np.testing.assert_array_equal(lttb_indices(values[:10], 50), np.arange(10))
+
+
+def test_minmax_keeps_bucket_extremes():
+    values = random_walk()
+    values[1234] = np.nan
+    selected = minmax_indices(values, 200)
+    assert len(selected) <= 202
+    assert np.nanargmax(values) in selected and np.nanargmin(values) in selected
+    assert 1234 not in selected
+
+
+def test_downsampling_keeps_trade_markers():
+    values = random_walk()
+    keep = np.zeros(len(values), dtype=bool)
+    keep[[17, 2500, 4321]] = True
+    for method in ('lttb', 'minmax'):
+        selected = downsample_indices(values, 100, method, keep)
+        assert {17, 2500, 4321} <= set(selected.tolist())
+    with pytest.raises(ValueError):
+        downsample_indices(values, 100, 'every_nth')
+
+
+def test_prepare_graph_data_is_columnar_and_matches_records():
+    index = pd.bdate_range('2015-01-01', periods=3000)
+    data = pd.Series(random_walk(3000), index=index)
+    short_sma = BacktestService.calculate_sma(data, 10)
+    long_sma = BacktestService.calculate_sma(data, 30)
+    signals = BacktestService.generate_signals(short_sma, long_sma)
+    portfolio = BacktestService.simulate_trades(data, signals, 10000.0)
+
+    graph = BacktestService.prepare_graph_data(data, short_sma, long_sma, signals, portfolio)
+    assert len(graph['date']) == 3000
+    assert graph['date'][0] == '2015-01-01'
+    assert graph['short_sma'][8] is None and graph['long_sma'][29] == pytest.approx(long_sma.iloc[29])
+    buys = signals.index[signals['positions'] == 1]
+    assert [graph['date'][i] for i, price in enumerate(graph['buyPrice']) if price is not None] == \
+        list(buys.strftime('%Y-%m-%d'))
+
+    small = BacktestService.prepare_graph_data(data, short_sma, long_sma, signals, portfolio,
+                                               max_points=300, downsample='minmax')
+    trades = int((signals['positions'].fillna(0) != 0).sum())
+    assert len(small['date']) <= 302 + trades
+    assert sum(price is not None for price in small['buyPrice']) == len(buys)
+    assert set(small) == set(graph)
@@ -0,0 +1,52 @@
+import threading
+from datetime import date
+
+import pandas as pd
+from futu import RET_OK, KLType
+
+from trade_execution.services.history_fetcher import HistoryKlineFetcher, RateLimiter
+
+
+class FakeQuoteContext:
+    """Serves daily bars in pages of max_count, like request_history_kline"""
+    def __init__(self):
+        self.used = 3
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def get_history_kl_quota(self, get_detail=False):
+        return RET_OK, (self.used, 100 - self.used, [])
+
+    def request_history_kline(self, code, start, end, ktype, autype, max_count, page_req_key):
+        with self.lock:
+            self.requests.append((start, end, page_req_key))
+            self.used += page_req_key is None and start == "2020-01-01"
+        days = pd.bdate_range(start, end)
+        offset = page_req_key or 0
+        page = days[offset:offset + max_count]
+        data = pd.DataFrame({"code": code, "time_key": page.strftime("%Y-%m-%d 00:00:00"),
+                             "close": range(len(page))})
+        next_key = offset + max_count if offset + max_count < len(days) else None
+        return RET_OK, data, next_key
+
+
+def test_fetch_pages_every_chunk_and_stitches():
+    quote_context = FakeQuoteContext()
+    fetcher = HistoryKlineFetcher(quote_context, max_workers=4, max_count=100,
+                                  rate_limiter=RateLimiter(1000, 1.0))
+    # Chunks sized for weekly bars hold several pages of the fake daily bars
+    data, report = fetcher.fetch("HK.00700", date(2020, 1, 1), date(2022, 12, 31), KLType.K_WEEK)
+
+    expected = pd.bdate_range("2020-01-01", "2022-12-31").strftime("%Y-%m-%d 00:00:00")
+    assert data["time_key"].tolist() == list(expected)
+    assert report["chunks"] == len(fetcher.chunk_range(date(2020, 1, 1), date(2022, 12, 31), KLType.K_WEEK)) == 3
+    assert report["pages"] == len(quote_context.requests) > report["chunks"]
+    assert report["quota_consumed"] == 1
+    assert report["rows"] == len(expected)
+
+
+def test_chunks_cover_range_without_overlap():
+    fetcher = HistoryKlineFetcher(None, max_count=1000)
+    chunks = fetcher.chunk_range(date(2024, 1, 1), date(2024, 1, 10), KLType.K_1M)
+    assert chunks[0][0] == date(2024, 1, 1) and chunks[-1][1] == date(2024, 1, 10)
+    assert all((b[0] - a[1]).days == 1 for a, b in zip(chunks, chunks[1:]))
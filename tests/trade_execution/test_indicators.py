@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.models.Order import OrderSide
+from trade_execution.strategies.indicators import EMA, RSI, SMA, BollingerBands, RollingStd
+from trade_execution.strategies.mean_reversion import MeanReversionStrategy
+from trade_execution.strategies.moving_average import MovingAverageStrategy
+
+
+@pytest.fixture
+def closes():
+    rng = np.random.default_rng(7)
+    return 100 + np.cumsum(rng.normal(0, 1, 400))
+
+
+def feed(indicator, values):
+    return np.array([indicator.update(v) for v in values], dtype=float)
+
+
+def test_indicators_match_pandas(closes):
+    series = pd.Series(closes)
+    np.testing.assert_allclose(feed(SMA(20), closes), series.rolling(20).mean())
+    np.testing.assert_allclose(feed(RollingStd(20), closes), series.rolling(20).std(), rtol=1e-9)
+    np.testing.assert_allclose(feed(EMA(span=12), closes), series.ewm(span=12, adjust=False).mean())
+
+    bands = BollingerBands(20, 2.0)
+    upper = np.array([bands.update(v)[1] for v in closes])
+    np.testing.assert_allclose(upper, series.rolling(20).mean() + 2 * series.rolling(20).std(), rtol=1e-9)
+
+
+def test_rsi_wilder_smoothing():
+    rsi = RSI(period=3)
+    values = feed(rsi, [10, 11, 12, 11, 13])
+    assert np.isnan(values[:3]).all()
+    # First averages: gain (1 + 1 + 0) / 3, loss 1 / 3
+    assert values[3] == pytest.approx(100 - 100 / (1 + 2.0))
+    # Then Wilder smoothing with the +2 change
+    gain, loss = (2 / 3 * 2 + 2) / 3, (1 / 3 * 2) / 3
+    assert values[4] == pytest.approx(100 - 100 / (1 + gain / loss))
+
+
+def test_replace_amends_last_bar(closes):
+    amended = SMA(5)
+    for value in closes[:10]:
+        amended.update(value)
+    amended.update(999.0)
+    amended.replace(closes[10])
+    assert amended.value == pytest.approx(feed(SMA(5), closes[:11])[-1])
+
+    bands = BollingerBands(5)
+    for value in closes[:10]:
+        bands.update(value)
+    bands.update(-5.0)
+    reference = BollingerBands(5)
+    for value in closes[:11]:
+        reference.update(value)
+    np.testing.assert_allclose(bands.replace(closes[10]), reference.value)
+
+
+def rolling_crossover_signal(data, short_window, long_window):
+    """Reference: the previous pandas implementation of MovingAverageStrategy.generate_signal"""
+    short_ma = data["close"].rolling(short_window).mean()
+    long_ma = data["close"].rolling(long_window).mean()
+    if short_ma.iloc[-2] < long_ma.iloc[-2] and short_ma.iloc[-1] > long_ma.iloc[-1]:
+        return OrderSide.BUY
+    if short_ma.iloc[-2] > long_ma.iloc[-2] and short_ma.iloc[-1] < long_ma.iloc[-1]:
+        return OrderSide.SELL
+    return None
+
+
+def test_incremental_signals_match_rolling_windows(closes):
+    strategy = MovingAverageStrategy()
+    strategy.setup(short_window=5, long_window=20)
+    state = strategy.create_signal_state()
+    data = pd.DataFrame({"close": closes})
+    signals = [strategy.on_bar(state, value) for value in closes]
+    expected = [rolling_crossover_signal(data.iloc[:i + 1], 5, 20) if i >= 20 else None
+                for i in range(len(closes))]
+    assert signals == expected
+    assert any(signal is not None for signal in signals)
+
+
+def test_mean_reversion_does_not_mutate_input(closes):
+    strategy = MeanReversionStrategy()
+    strategy.setup(window=10, num_std=1.0)
+    data = pd.DataFrame({"close": closes[:60]})
+    strategy.generate_signal(data)
+    assert list(data.columns) == ["close"]
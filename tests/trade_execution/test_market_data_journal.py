@@ -0,0 +1,79 @@
+import time
+from datetime import datetime
+
+import numpy as np
+
+from trade_execution.services.market_data_journal import (
+    BOOK_DEPTH,
+    ORDER,
+    ORDER_BOOK,
+    JournalReader,
+    MarketDataJournal,
+)
+
+
+def test_journal_round_trip(tmp_path):
+    journal = MarketDataJournal(str(tmp_path), batch_size=4, initial_capacity=2)
+    for i in range(25):
+        bids = [(100.0 - j, 100 * (j + 1), j + 1, {}) for j in range(BOOK_DEPTH + 2)]
+        asks = [(101.0 + i, 300, 2, {})]
+        journal.record_order_book("HK.00700", bids, asks)
+    journal.record_order({
+        "order_id": "8851", "code": "HK.00005", "order_status": "FILLED_ALL",
+        "qty": 400, "price": 61.5, "trd_side": "SELL",
+    })
+    journal.close()
+
+    reader = JournalReader(str(tmp_path))
+    assert reader.codes == ["HK.00700", "HK.00005"]
+
+    segments = list(reader.iter_segments(ORDER_BOOK))
+    assert len(segments) == 1
+    day, books = segments[0]
+    assert isinstance(books, np.memmap)
+    assert len(books) == 25
+    assert np.all(books["n_bid"] == BOOK_DEPTH)
+    assert np.all(books["n_ask"] == 1)
+    assert books["bid_volume"][0, 1] == 200
+    np.testing.assert_allclose(books["ask_price"][:, 0], 101.0 + np.arange(25))
+    assert np.all(np.diff(books["ts"]) >= 0)
+
+    (_, orders), = reader.iter_segments(ORDER)
+    assert orders["order_id"][0] == b"8851"
+    assert orders["code_id"][0] == reader.code_id("HK.00005")
+    assert orders["qty"][0] == 400
+
+
+def test_journal_appends_to_existing_segment(tmp_path):
+    ts = int(datetime(2024, 3, 1, 10, 0).timestamp() * 1e9)
+    for _ in range(2):
+        journal = MarketDataJournal(str(tmp_path))
+        journal.record_order_book("HK.00700", [(1.0, 1, 1)], [(2.0, 1, 1)], ts=ts)
+        journal.close()
+
+    reader = JournalReader(str(tmp_path))
+    (day, books), = reader.iter_segments(ORDER_BOOK)
+    assert day == datetime(2024, 3, 1).date()
+    assert len(books) == 2
+
+
+def test_flush_waits_for_batches_being_written(tmp_path):
+    journal = MarketDataJournal(str(tmp_path), flush_interval=60.0)
+    convert = journal._order_book_batch
+
+    def slow_convert(items):
+        time.sleep(0.2)
+        return convert(items)
+
+    journal._order_book_batch = slow_convert
+    for _ in range(3):
+        journal.record_order_book("HK.00700", [(1.0, 1, 1)], [(2.0, 1, 1)])
+    journal.flush()
+    assert journal.written[ORDER_BOOK] == 3
+
+    # A batch that fails to convert is counted as dropped
+    journal._order_batch = lambda items: 1 / 0
+    journal.record_order({"order_id": "1", "code": "HK.00700"})
+    journal.flush()
+    assert journal.dropped == 1 and journal.written[ORDER] == 0
+    journal.close()
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.services.backtest_service import BacktestService
+
+
+def legacy_positions(data, window, num_std):
+    """Pandas rolling bands and a per-bar long/flat state machine"""
+    ma = data.rolling(window).mean()
+    band = data.rolling(window).std() * num_std
+    upper, lower = ma + band, ma - band
+    held, position = [], 0.0
+    for i in range(len(data)):
+        if i > 0 and data.iloc[i - 1] >= lower.iloc[i - 1] and data.iloc[i] < lower.iloc[i]:
+            position = 1.0
+        elif i > 0 and data.iloc[i - 1] <= upper.iloc[i - 1] and data.iloc[i] > upper.iloc[i]:
+            position = 0.0
+        held.append(position)
+    held = np.array(held[window - 1:])
+    return np.diff(held, prepend=0.0), ma.iloc[window - 1:], upper.iloc[window - 1:]
+
+
+@pytest.fixture
+def prices(monkeypatch):
+    index = pd.bdate_range("2012-01-02", periods=2520)
+    data = pd.Series(50 * np.exp(np.cumsum(np.random.default_rng(4).normal(0, 0.02, len(index)))), index=index)
+    monkeypatch.setattr(BacktestService, "fetch_data", staticmethod(lambda symbol, start, end: data))
+    return data
+
+
+@pytest.mark.parametrize("window, num_std", [(20, 2.0), (10, 1.5)])
+def test_mean_reversion_backtest_matches_rolling_loop(prices, window, num_std):
+    result = BacktestService.run_backtest("mean_reversion", "TEST", datetime(2012, 1, 1), datetime(2022, 1, 1),
+                                          parameters={'window': window, 'num_std': num_std})
+    changes, ma, upper = legacy_positions(prices, window, num_std)
+    graph = result['graph_data']
+
+    assert len(graph['date']) == len(prices) - window + 1
+    assert [i for i, price in enumerate(graph['buyPrice']) if price is not None] == list(np.flatnonzero(changes == 1))
+    assert [i for i, price in enumerate(graph['sellPrice']) if price is not None] == list(np.flatnonzero(changes == -1))
+    np.testing.assert_allclose(graph['middle_band'], ma.to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(graph['upper_band'], upper.to_numpy(), rtol=1e-9)
+    assert result['metrics']['num_trades'] > 0
+
+    portfolio = BacktestService.simulate_trades(prices.iloc[window - 1:], pd.DataFrame({'positions': changes}), 10000.0)
+    assert result['metrics']['final_value'] == pytest.approx(portfolio['total'].iloc[-1])
+
+
+def test_mean_reversion_backtest_rejects_oversized_window(prices):
+    with pytest.raises(ValueError):
+        BacktestService.run_backtest("mean_reversion", "TEST", datetime(2012, 1, 1), datetime(2022, 1, 1),
+                                     parameters={'window': 5000})
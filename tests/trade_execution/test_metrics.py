@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.services.backtest_service import BacktestService
+from trade_execution.services.metrics import METRIC_NAMES, analyze_equity
+
+
+def make_backtest(n=800, seed=2):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2018-01-01', periods=n)
+    data = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.012, n))), index=index)
+    short_sma = BacktestService.calculate_sma(data, 10).iloc[29:]
+    long_sma = BacktestService.calculate_sma(data, 30).iloc[29:]
+    data = data.iloc[29:]
+    signals = BacktestService.generate_signals(short_sma, long_sma)
+    portfolio = BacktestService.simulate_trades(data, signals, 10000.0, commission=0.001)
+    return data, signals, portfolio
+
+
+def test_calculate_metrics_does_not_mutate_its_inputs():
+    data, signals, portfolio = make_backtest()
+    before = portfolio.copy()
+    metrics = BacktestService.calculate_metrics(data, signals, portfolio, 10000.0)
+    pd.testing.assert_frame_equal(portfolio, before)
+    assert set(METRIC_NAMES) | {'turnover'} == set(metrics)
+    assert metrics['final_value'] == portfolio['total'].iloc[-1]
+
+
+def test_risk_metrics_match_pandas():
+    data, signals, portfolio = make_backtest()
+    total = portfolio['total']
+    analysis = BacktestService.analyze_portfolio(data, signals, portfolio, 10000.0, rolling_window=21)
+    metrics, series = analysis['metrics'], analysis['series']
+
+    returns = total.pct_change()
+    downside = np.sqrt((returns.iloc[1:].clip(upper=0) ** 2).mean()) * np.sqrt(252)
+    assert metrics['sortino_ratio'] == pytest.approx(metrics['annualized_return'] / downside)
+    drawdown = total / total.cummax() - 1
+    np.testing.assert_allclose(series['drawdown'], drawdown)
+    assert metrics['calmar_ratio'] == pytest.approx(metrics['annualized_return'] / -drawdown.min())
+
+    in_market = (portfolio['shares'] != 0).mean()
+    assert metrics['exposure'] == pytest.approx(in_market)
+    traded = (portfolio['shares'].diff().fillna(portfolio['shares'].iloc[0]).abs() * data).sum()
+    assert metrics['turnover'] == pytest.approx(traded / total.mean() / (len(total) / 252))
+
+    rolling = returns.rolling(21)
+    np.testing.assert_allclose(series['rolling_volatility'], rolling.std() * np.sqrt(252), rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(series['rolling_sharpe'], rolling.mean() / rolling.std() * np.sqrt(252),
+                               rtol=1e-6, atol=1e-9)
+
+
+def test_flat_curve():
+    analysis = analyze_equity(np.full(10, 500.0), 500.0, position_changes=np.zeros(10))
+    metrics = analysis['metrics']
+    assert metrics['sharpe_ratio'] == metrics['sortino_ratio'] == metrics['calmar_ratio'] == 0
+    assert metrics['max_drawdown'] == 0 and metrics['exposure'] == 0
+    assert 'rolling_sharpe' not in analysis['series']
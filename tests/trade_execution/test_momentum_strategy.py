@@ -0,0 +1,105 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.services.backtest_service import BacktestService
+from trade_execution.strategies.indicators import wilder_rsi
+from trade_execution.strategies.momentum import MomentumStrategy
+
+
+def make_closes(n, seed):
+    return 50 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.02, n)))
+
+
+def pandas_rsi(closes, period):
+    """Wilder RSI the long way round: pandas ewm seeded with the mean of the first changes"""
+    delta = pd.Series(closes).diff()
+
+    def smooth(values):
+        seeded = values.copy()
+        seeded.iloc[:period] = np.nan
+        seeded.iloc[period] = values.iloc[1:period + 1].mean()
+        return seeded.ewm(alpha=1 / period, adjust=False).mean()
+
+    gain, loss = smooth(delta.clip(lower=0)), smooth(-delta.clip(upper=0))
+    return (100 - 100 / (1 + gain / loss)).to_numpy()
+
+
+@pytest.mark.parametrize("period", [2, 14, 30])
+def test_vectorized_rsi_matches_pandas(period):
+    closes = make_closes(3000, period)
+    np.testing.assert_allclose(wilder_rsi(closes, period), pandas_rsi(closes, period), rtol=1e-9)
+
+    matrix = np.column_stack([make_closes(3000, seed) for seed in range(4)])
+    np.testing.assert_allclose(wilder_rsi(matrix, period)[:, 3], wilder_rsi(matrix[:, 3], period))
+    assert wilder_rsi(np.full(40, 10.0), period)[-1] == 50.0
+
+
+@pytest.mark.parametrize("params", [{}, {'period': 7, 'oversold': 25.0, 'overbought': 75.0}])
+@pytest.mark.parametrize("seed", [1, 2])
+def test_signal_paths_agree(params, seed):
+    strategy = MomentumStrategy.create(**params)
+    closes = make_closes(1500, seed)
+    data = pd.DataFrame({'close': closes})
+
+    vectorized = strategy.generate_signals(data)
+    assert np.count_nonzero(vectorized == 1) > 0 and np.count_nonzero(vectorized == -1) > 0
+    np.testing.assert_array_equal(vectorized, strategy.generate_signals_per_bar(data))
+
+    times = pd.bdate_range("2015-01-01", periods=len(closes)).to_numpy()
+    features = np.zeros(len(closes), dtype=np.int8)
+    for end in range(1, len(closes) + 1):
+        signal = strategy.signal_from_features("HK.00700", "K_DAY", times[:end], closes[:end])
+        features[end - 1] = {None: 0, "BUY": 1, "SELL": -1}[signal.value if signal else None]
+    np.testing.assert_array_equal(features, vectorized)
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        MomentumStrategy.create(oversold=70.0, overbought=30.0)
+    with pytest.raises(ValueError):
+        MomentumStrategy.create(period=0)
+
+
+def test_backtest_service_runs_momentum(monkeypatch):
+    index = pd.bdate_range("2012-01-02", periods=2520)
+    data = pd.Series(make_closes(len(index), 9), index=index)
+    monkeypatch.setattr(BacktestService, "fetch_data", staticmethod(lambda symbol, start, end: data))
+
+    result = BacktestService.run_backtest("momentum", "TEST", datetime(2012, 1, 1), datetime(2022, 1, 1),
+                                          parameters={'period': 14})
+    graph = result['graph_data']
+    assert len(graph['date']) == len(data) - 14
+    assert graph['rsi'][0] == pytest.approx(wilder_rsi(data.to_numpy(), 14)[14])
+    assert 'short_sma' not in graph
+
+    # Held positions follow the strategy's own signals: long from a BUY until the next SELL
+    signals = MomentumStrategy().generate_signals(pd.DataFrame({'close': data.to_numpy()}))[14:]
+    position, held = 0, []
+    for signal in signals:
+        position = 1 if signal == 1 else 0 if signal == -1 else position
+        held.append(position)
+    buys = [i for i, price in enumerate(graph['buyPrice']) if price is not None]
+    assert buys == [i for i in range(len(held)) if held[i] and (i == 0 or not held[i - 1])]
+    assert result['metrics']['num_trades'] > 0
+
+
+def test_backtest_computes_rsi_once(monkeypatch):
+    from trade_execution.services import backtest_service, signal_kernels
+
+    index = pd.bdate_range("2012-01-02", periods=500)
+    data = pd.Series(make_closes(len(index), 3), index=index)
+    monkeypatch.setattr(BacktestService, "fetch_data", staticmethod(lambda symbol, start, end: data))
+    calls = []
+
+    def counting_rsi(values, period):
+        calls.append(period)
+        return wilder_rsi(values, period)
+
+    monkeypatch.setattr(backtest_service, "wilder_rsi", counting_rsi)
+    monkeypatch.setattr(signal_kernels, "wilder_rsi", counting_rsi)
+    BacktestService.run_backtest("momentum", "TEST", datetime(2012, 1, 1), datetime(2014, 1, 1),
+                                 parameters={'period': 14})
+    assert calls == [14]
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.services.backtest_service import BacktestService
+from trade_execution.services.metrics import compute_metrics
+from trade_execution.services.parameter_sweep import expand_grid, run_sweep
+from trade_execution.services.signal_kernels import RollingSums, bollinger_positions, sma_crossover_positions
+from trade_execution.strategies.mean_reversion import MeanReversionStrategy
+
+
+def make_prices(n=1500, seed=11):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.012, n)))
+
+
+def reference_metrics(total, positions, initial_capital):
+    """BacktestService.calculate_metrics formulas on a pandas portfolio"""
+    total = pd.Series(total)
+    returns = total.pct_change()
+    net = (total.iloc[-1] - initial_capital) / initial_capital
+    trades = np.flatnonzero(positions != 0)
+    years = len(total) / 252
+    annualized = (1 + net) ** (1 / years) - 1
+    volatility = returns.std() * np.sqrt(252)
+    cumulative = (1 + returns.fillna(0)).cumprod()
+    drawdown = (cumulative / cumulative.expanding(min_periods=1).max() - 1).min()
+    trade_returns = total.iloc[trades].pct_change().fillna(0)
+    return {
+        'net_performance': net,
+        'annualized_return': annualized,
+        'volatility': volatility,
+        'sharpe_ratio': annualized / volatility,
+        'max_drawdown': drawdown,
+        'win_rate': (trade_returns > 0).sum() / len(trade_returns),
+        'num_trades': len(trades),
+    }
+
+
+def test_rolling_sums_match_pandas():
+    prices = make_prices()
+    rolling = RollingSums(prices)
+    series = pd.Series(prices)
+    for window in (1, 5, 37, 200):
+        np.testing.assert_allclose(rolling.mean(window), series.rolling(window).mean(), rtol=1e-10)
+    for window in (2, 20, 200):
+        np.testing.assert_allclose(rolling.std(window), series.rolling(window).std(), rtol=1e-7, atol=1e-7)
+
+
+def test_sma_positions_match_backtest_service():
+    prices = pd.Series(make_prices())
+    start, changes = sma_crossover_positions(RollingSums(prices.to_numpy()), 12, 40)
+
+    short_sma = BacktestService.calculate_sma(prices, 12).iloc[39:]
+    long_sma = BacktestService.calculate_sma(prices, 40).iloc[39:]
+    signals = BacktestService.generate_signals(short_sma, long_sma)
+    assert start == 39
+    np.testing.assert_array_equal(changes, signals['positions'].to_numpy())
+
+
+def test_bollinger_positions_follow_strategy_signals():
+    prices = make_prices(seed=5)
+    strategy = MeanReversionStrategy()
+    strategy.setup(window=20, num_std=1.5)
+    signals = strategy.generate_signals(pd.DataFrame({'close': prices}))
+
+    start, changes = bollinger_positions(RollingSums(prices), 20, 1.5)
+    # Replay the band crossings as a long/flat state machine
+    long, expected = 0, []
+    for signal in signals[start:]:
+        previous = long
+        long = 1 if signal > 0 else 0 if signal < 0 else long
+        expected.append(long - previous)
+    np.testing.assert_array_equal(changes, expected)
+    assert np.count_nonzero(changes) > 0
+
+
+def test_metrics_match_reference():
+    prices = make_prices()
+    start, changes = sma_crossover_positions(RollingSums(prices), 10, 30)
+    total = BacktestService.simulate_trades(
+        pd.Series(prices[start:]), pd.DataFrame({'positions': changes}), 10000.0)['total'].to_numpy()
+
+    metrics = compute_metrics(total, changes, 10000.0)
+    for name, value in reference_metrics(total, changes, 10000.0).items():
+        assert metrics[name] == pytest.approx(value, rel=1e-9), name
+
+
+def test_expand_grid():
+    combinations = expand_grid('sma_crossover', {'short_window': [5, 20, 50], 'long_window': [20, 50]})
+    assert combinations == [
+        {'short_window': 5, 'long_window': 20},
+        {'short_window': 5, 'long_window': 50},
+        {'short_window': 20, 'long_window': 50},
+    ]
+    assert expand_grid('mean_reversion', {'num_std': [1.5, 2.0]}) == [
+        {'window': 20, 'num_std': 1.5}, {'window': 20, 'num_std': 2.0}]
+    with pytest.raises(ValueError):
+        expand_grid('sma_crossover', {'window': [10]})
+    with pytest.raises(ValueError):
+        expand_grid('momentum', {})
+
+
+def test_sweep_ranks_and_skips_oversized_windows():
+    prices = make_prices(n=300)
+    result = run_sweep(prices, 'sma_crossover',
+                       {'short_window': [5, 10], 'long_window': [30, 400]}, max_workers=1)
+    assert result['combinations'] == 4
+    assert result['evaluated'] == 2
+    sharpes = [row['sharpe_ratio'] for row in result['results']]
+    assert sharpes == sorted(sharpes, reverse=True)
+    assert [row['rank'] for row in result['results']] == [1, 2]
+
+    with pytest.raises(ValueError):
+        run_sweep(prices, 'sma_crossover', {'short_window': [5]}, rank_by='luck')
+
+
+def test_parallel_sweep_matches_in_process():
+    prices = make_prices()
+    grid = {'short_window': list(range(5, 45, 4)), 'long_window': list(range(50, 210, 20))}
+    costs = {'commission': 0.001, 'slippage': 0.0005}
+    serial = run_sweep(prices, 'sma_crossover', grid, costs=costs, max_workers=1)
+    parallel = run_sweep(prices, 'sma_crossover', grid, costs=costs, max_workers=2)
+    assert parallel['workers'] == 2
+    assert parallel['results'] == serial['results']
+
+    top = run_sweep(prices, 'mean_reversion', {'window': [10, 20, 40], 'num_std': [1.0, 2.0]},
+                    top_n=2, max_workers=1)
+    assert len(top['results']) == 2
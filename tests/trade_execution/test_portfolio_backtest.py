@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.services.parameter_sweep import strategy_positions
+from trade_execution.services.portfolio_backtest import (
+    align_prices, allocation_weights, portfolio_signals, run_portfolio_backtest
+)
+from trade_execution.services.signal_kernels import RollingSums
+from trade_execution.services.simulation import simulate_all_in
+
+
+def random_prices(n_bars=400, n_symbols=4, seed=7):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2020-01-01', periods=n_bars)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, (n_bars, n_symbols)), axis=0))
+    return pd.DataFrame(values, index=index, columns=[f"S{i}" for i in range(n_symbols)])
+
+
+@pytest.mark.parametrize("strategy_id, parameters", [
+    ('sma_crossover', {'short_window': 10, 'long_window': 30}),
+    ('mean_reversion', {'window': 20, 'num_std': 1.5}),
+])
+def test_signals_match_single_symbol_kernels(strategy_id, parameters):
+    prices = random_prices().to_numpy()
+    signal = portfolio_signals(prices, strategy_id, parameters)
+    for i in range(prices.shape[1]):
+        start, changes = strategy_positions(RollingSums(prices[:, i]), strategy_id, parameters)
+        # Positions of the single-symbol kernel are the running sum of its changes
+        expected = np.cumsum(np.nan_to_num(changes))
+        np.testing.assert_array_equal(signal[start:, i], expected)
+
+
+def test_allocation_rules():
+    signal = np.array([[1.0, 1.0, 0.0, 1.0], [0.0, 0.0, 0.0, 0.0]])
+    rows = np.arange(2)
+
+    equal = allocation_weights(signal, rows, 'equal')
+    np.testing.assert_allclose(equal[0], [1 / 3, 1 / 3, 0, 1 / 3])
+    np.testing.assert_array_equal(equal[1], 0.0)
+
+    capped = allocation_weights(signal, rows, 'capped', max_weight=0.25)
+    np.testing.assert_allclose(capped[0], [0.25, 0.25, 0, 0.25])
+
+    volatility = np.array([[0.01, 0.02, 0.01, np.nan]] * 2)
+    scaled = allocation_weights(signal, rows, 'vol_scaled', volatility=volatility)
+    # The symbol without a volatility yet gets the average inverse volatility
+    np.testing.assert_allclose(scaled[0], np.array([100, 50, 0, 75]) / 225)
+
+    with pytest.raises(ValueError):
+        allocation_weights(signal, rows, 'optimal')
+
+
+def test_single_symbol_matches_all_in_simulation():
+    prices = random_prices(n_symbols=1)
+    parameters = {'short_window': 10, 'long_window': 30}
+    result = run_portfolio_backtest(prices, 'sma_crossover', parameters)
+
+    values = prices.iloc[:, 0].to_numpy()
+    start, changes = strategy_positions(RollingSums(values), 'sma_crossover', parameters)
+    expected = simulate_all_in(values[start:], changes, 10000.0)['total']
+    np.testing.assert_allclose(result['equity_curve']['portfolio_value'][start:], expected)
+
+
+def test_shared_capital_and_pnl_attribution():
+    prices = random_prices(n_symbols=6)
+    costs = {'commission': 0.001, 'min_commission': 1.0, 'slippage': 0.0005}
+    result = run_portfolio_backtest(prices, 'mean_reversion', {'window': 20, 'num_std': 1.0},
+                                    allocation='vol_scaled', max_weight=0.3, costs=costs)
+
+    curve = result['equity_curve']
+    # All symbols draw on one cash balance, which never goes negative
+    assert min(curve['cash']) >= -1e-6
+    assert all(cash <= total + 1e-6 for cash, total in zip(curve['cash'], curve['portfolio_value']))
+    assert all(entry['final_weight'] >= 0 for entry in result['symbol_metrics'])
+    assert result['metrics']['num_trades'] == sum(entry['num_trades'] for entry in result['symbol_metrics'])
+    total_pnl = sum(entry['pnl'] for entry in result['symbol_metrics'])
+    assert total_pnl == pytest.approx(result['metrics']['final_value'] - 10000.0)
+
+
+def test_align_prices_masks_outside_each_history():
+    index = pd.bdate_range('2021-01-01', periods=6)
+    aligned = align_prices({
+        'A': pd.Series([1.0, 2.0, 3.0, 4.0, 5.0, 6.0], index=index),
+        'B': pd.Series([10.0, 11.0], index=index[[2, 4]]),
+    })
+    np.testing.assert_array_equal(aligned['B'].to_numpy(), [np.nan, np.nan, 10.0, 10.0, 11.0, np.nan])
+
+    result = run_portfolio_backtest(aligned, 'sma_crossover', {'short_window': 1, 'long_window': 2})
+    b = next(entry for entry in result['symbol_metrics'] if entry['symbol'] == 'B')
+    assert b['exposure'] <= 2 / 6
@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+from trade_execution.models.ConnectionManager import ConnectionManager
+from trade_execution.services.market_data_journal import MarketDataJournal
+from trade_execution.services.replay_engine import ReplayEngine
+
+
+def record_session(root_dir, num_books=200):
+    journal = MarketDataJournal(root_dir)
+    start = time.time_ns()
+    for i in range(num_books):
+        journal.record_order_book("HK.00700", [(350.0 - i * 0.2, 100, 1)], [(350.2, 200, 2)],
+                                  ts=start + i * 1_000_000)
+    journal.record_order({"order_id": "1", "code": "HK.00700", "order_status": "SUBMITTED",
+                          "qty": 100, "price": 350.0, "trd_side": "BUY"}, ts=start + 5_500_000)
+    journal.record_order_book("HK.00005", [(60.0, 400, 3)], [(60.05, 800, 4)], ts=start + 2_500_000)
+    journal.close()
+
+
+def test_replay_delivers_every_event_in_order(tmp_path):
+    record_session(str(tmp_path))
+    engine = ReplayEngine(str(tmp_path), speed=None, num_clients=3)
+
+    events = list(engine.events())
+    assert len(events) == 202
+    timestamps = [ts for ts, _, _ in events]
+    assert timestamps == sorted(timestamps)
+    assert [kind for _, kind, _ in events][:8].count("order") == 1
+
+    payload = engine.order_book_payload(events[0][2])
+    assert payload == {"code": "HK.00700", "Bid": [(350.0, 100, 1, {})], "Ask": [(350.2, 200, 2, {})]}
+
+    report = asyncio.run(engine.run())
+    assert report["events"] == 202
+    assert report["delivered"] == report["expected"] == 202 * 3
+    assert report["latency_us"]["p50"] >= 0
+    assert ConnectionManager.getInstance().active_connections == []
+
+
+def test_replay_filters_codes(tmp_path):
+    record_session(str(tmp_path), num_books=10)
+    engine = ReplayEngine(str(tmp_path), speed=None, codes=["HK.00005"])
+    assert [engine.reader.codes[record["code_id"]] for _, _, record in engine.events()] == ["HK.00005"]
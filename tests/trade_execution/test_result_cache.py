@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from trade_execution.services import result_cache
+from trade_execution.services.result_cache import BacktestResultCache
+
+ARGUMENTS = {
+    'strategy_id': 'sma_crossover',
+    'symbol': 'AAA',
+    'start_date': datetime(2022, 1, 3, 9, 30),
+    'end_date': datetime(2023, 1, 3, 16, 0),
+    'initial_capital': 10000.0,
+    'parameters': {'short_window': 10, 'long_window': 50},
+}
+
+
+def test_key_is_canonical():
+    key = BacktestResultCache.key("backtest", ARGUMENTS, 1)
+    same = dict(ARGUMENTS, start_date=datetime(2022, 1, 3), initial_capital=10000,
+                parameters={'long_window': 50.0, 'short_window': 10})
+    assert BacktestResultCache.key("backtest", same, 1) == key
+
+    assert BacktestResultCache.key("backtest", ARGUMENTS, 2) != key
+    assert BacktestResultCache.key("sweep", ARGUMENTS, 1) != key
+    assert BacktestResultCache.key("backtest", dict(ARGUMENTS, parameters={'short_window': 20}), 1) != key
+
+
+def test_get_or_compute_and_version_invalidation():
+    cache = BacktestResultCache()
+    calls = []
+    version = [3]
+
+    def compute():
+        calls.append(1)
+        version[0] = 4  # the run filled the bar cache
+        return {'metrics': len(calls)}
+
+    assert cache.get_or_compute("backtest", ARGUMENTS, compute, lambda: version[0]) == {'metrics': 1}
+    assert cache.get_or_compute("backtest", ARGUMENTS, compute, lambda: version[0]) == {'metrics': 1}
+    assert len(calls) == 1
+
+    version[0] = 5
+    assert cache.get_or_compute("backtest", ARGUMENTS, compute, lambda: version[0]) == {'metrics': 2}
+    assert cache.stats['hits'] == 1
+    assert cache.stats['misses'] == 2
+
+
+def test_lru_eviction():
+    cache = BacktestResultCache(max_entries=2)
+    for window in (10, 20, 30):
+        cache.put("backtest", dict(ARGUMENTS, parameters={'short_window': window}), 1, window)
+    assert cache.get("backtest", dict(ARGUMENTS, parameters={'short_window': 10}), 1) is None
+    assert cache.get("backtest", dict(ARGUMENTS, parameters={'short_window': 30}), 1) == 30
+    assert cache.stats['evictions'] == 1
+
+
+def test_live_ranges_expire(monkeypatch):
+    cache = BacktestResultCache(live_ttl=60.0)
+    live = dict(ARGUMENTS, end_date=datetime.now())
+    assert BacktestResultCache.is_live(live)
+    assert not BacktestResultCache.is_live(ARGUMENTS)
+
+    now = [1000.0]
+    monkeypatch.setattr(result_cache, "time", SimpleNamespace(time=lambda: now[0]))
+    cache.put("backtest", live, 1, "live")
+    cache.put("backtest", ARGUMENTS, 1, "history")
+    now[0] += 61
+    assert cache.get("backtest", live, 1) is None
+    assert cache.get("backtest", ARGUMENTS, 1) == "history"
+    assert cache.stats['expired'] == 1
+
+
+def test_disk_tier(tmp_path):
+    cache = BacktestResultCache(disk_dir=str(tmp_path))
+    cache.put("backtest", ARGUMENTS, 1, {'metrics': {'sharpe_ratio': np.float64(1.5)}})
+    cache.put("backtest", dict(ARGUMENTS, end_date=datetime.now() + timedelta(days=1)), 1, "live")
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    reopened = BacktestResultCache(disk_dir=str(tmp_path))
+    assert reopened.get("backtest", ARGUMENTS, 1) == {'metrics': {'sharpe_ratio': 1.5}}
+    assert reopened.stats['disk_hits'] == 1
+    assert reopened.get("backtest", ARGUMENTS, 1) is not None
+    assert reopened.stats['hits'] == 1
+
+    reopened.clear()
+    assert list(tmp_path.glob("*.json")) == []
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from trade_execution.services.metrics import compute_metrics
+from trade_execution.services.robustness import (
+    backtest_sample, path_metrics, resample_paths, run_robustness, trade_returns_from_values
+)
+
+
+def daily_returns(n=2520, seed=0):
+    return np.random.default_rng(seed).normal(0.0004, 0.01, n)
+
+
+def test_path_metrics_match_compute_metrics():
+    returns = daily_returns(500)
+    total = 10000.0 * np.concatenate(([1.0], np.cumprod(1 + returns)))
+    expected = compute_metrics(total, np.zeros(len(total)), 10000.0)
+    observed = path_metrics(returns[None, :], 10000.0)
+    assert observed['final_value'][0] == pytest.approx(expected['final_value'])
+    assert observed['max_drawdown'][0] == pytest.approx(expected['max_drawdown'])
+    # compute_metrics annualizes over the bars of the value curve, one more than the returns
+    assert observed['sharpe_ratio'][0] == pytest.approx(expected['sharpe_ratio'], rel=0.01)
+
+
+def test_block_bootstrap_keeps_blocks_contiguous():
+    sample = np.arange(100, dtype=float)
+    paths = resample_paths(sample, 50, 'block_bootstrap', np.random.default_rng(1), block_size=10)
+    assert paths.shape == (50, 100)
+    steps = np.diff(paths.reshape(50, 10, 10), axis=2)
+    assert np.all((steps == 1) | (steps == -99))
+
+    shuffled = resample_paths(sample, 5, 'trade_reshuffle', np.random.default_rng(1))
+    assert np.all(np.sort(shuffled, axis=1) == sample)
+
+
+def test_chunking_does_not_change_results():
+    returns = daily_returns(300)
+    whole = run_robustness(returns, n_paths=500, seed=7)
+    chunked = run_robustness(returns, n_paths=500, seed=7, chunk_bytes=8 * 300 * 64)
+    assert whole['metrics'] == chunked['metrics']
+
+
+def test_confidence_intervals_cover_the_observed_sample():
+    result = run_robustness(daily_returns(), n_paths=2000, seed=3)
+    for name in ('final_value', 'sharpe_ratio', 'max_drawdown'):
+        stats = result['metrics'][name]
+        assert stats['ci_low'] <= stats['median'] <= stats['ci_high']
+        assert stats['ci_low'] <= stats['observed'] <= stats['ci_high']
+    assert 0 <= result['loss_probability'] <= 1
+
+    reshuffled = run_robustness(daily_returns(100), method='trade_reshuffle', n_paths=200, seed=3)
+    # Reordering trades never changes where they end up
+    assert reshuffled['metrics']['final_value']['std'] == pytest.approx(0, abs=1e-6)
+
+    with pytest.raises(ValueError):
+        run_robustness(daily_returns(), method='jackknife')
+
+
+def test_trade_returns_from_backtest_graph_data():
+    values = np.array([100.0, 110.0, 121.0, 121.0, 108.9, 130.0])
+    entries = np.array([True, False, False, True, False, False])
+    exits = np.array([False, False, True, False, False, False])
+    np.testing.assert_allclose(trade_returns_from_values(values, entries, exits), [0.21, 130.0 / 121.0 - 1])
+
+    graph_data = {'portfolio_value': values.tolist(),
+                  'buyPrice': [1.0, None, None, 1.0, None, None],
+                  'sellPrice': [None, None, 1.0, None, None, None]}
+    trades, periods_per_year = backtest_sample(graph_data, 'trade_bootstrap')
+    assert len(trades) == 2 and periods_per_year == pytest.approx(2 / (6 / 252))
+    returns, _ = backtest_sample(graph_data, 'block_bootstrap')
+    assert len(returns) == 5
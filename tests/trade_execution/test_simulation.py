@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.services.simulation import simulate_all_in
+
+
+def legacy_simulate(prices, positions, initial_capital):
+    """The original per-bar BacktestService.simulate_trades loop"""
+    cash, shares = initial_capital, 0
+    holdings, cash_curve = [], []
+    for price, position in zip(prices, positions):
+        if position == 1:
+            shares = cash / price
+            cash = 0
+        elif position == -1:
+            cash = shares * price
+            shares = 0
+        holdings.append(shares * price)
+        cash_curve.append(cash)
+    return np.array(holdings), np.array(cash_curve)
+
+
+def test_matches_legacy_loop_without_costs():
+    rng = np.random.default_rng(3)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 5000)))
+    signal = (pd.Series(prices).rolling(10).mean() > pd.Series(prices).rolling(40).mean()).astype(float)
+    positions = signal.diff().fillna(signal.iloc[0]).to_numpy()
+
+    result = simulate_all_in(prices, positions, 10000.0)
+    holdings, cash = legacy_simulate(prices, positions, 10000.0)
+    np.testing.assert_allclose(result["holdings"], holdings, rtol=1e-12)
+    np.testing.assert_array_equal(result["cash"], cash)
+    np.testing.assert_allclose(result["total"], holdings + cash, rtol=1e-12)
+    assert len(result["trade_index"]) == np.count_nonzero(positions)
+
+
+def test_costs_and_lot_sizes():
+    prices = np.array([10.0, 10.0, 12.0, 12.0])
+    positions = np.array([1, 0, -1, 0])
+    result = simulate_all_in(prices, positions, 10000.0, commission=0.001, min_commission=5.0,
+                             slippage=0.01, lot_size=100)
+
+    # Buy at 10.10: about 989 affordable shares round down to 900
+    assert result["shares"][0] == 900
+    buy_fee = 900 * 10.1 * 0.001
+    assert result["cash"][0] == pytest.approx(10000 - 900 * 10.1 - buy_fee)
+    # Sell at 11.88
+    sell_fee = 900 * 11.88 * 0.001
+    assert result["cash"][2] == pytest.approx(result["cash"][0] + 900 * 11.88 - sell_fee)
+    np.testing.assert_allclose(result["fees"], [buy_fee, sell_fee])
+    assert result["total"][3] == result["cash"][3]
+
+
+def test_minimum_commission_and_unaffordable_lot():
+    result = simulate_all_in(np.array([50.0, 55.0]), np.array([1, -1]), 1000.0,
+                             commission=0.0001, min_commission=5.0)
+    assert result["shares"][0] == pytest.approx(995.0 / 50.0)
+    assert result["cash"][0] == 0.0
+
+    result = simulate_all_in(np.array([50.0, 55.0]), np.array([1, -1]), 1000.0, lot_size=100)
+    assert len(result["trade_index"]) == 0
+    assert result["total"].tolist() == [1000.0, 1000.0]
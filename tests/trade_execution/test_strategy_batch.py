@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from futu import RET_ERROR, RET_OK
+
+from trade_execution.strategies.base import StrategyBase
+from trade_execution.strategies.indicators import rolling_mean, rolling_std
+from trade_execution.strategies.pool import StrategyPool
+
+from conftest import CODES, PARAMETER_SETS, MultiCodeQuoteContext, kline_frame
+
+
+class CountingQuoteContext(MultiCodeQuoteContext):
+    def __init__(self):
+        super().__init__()
+        self.frames["HK.09999"] = kline_frame("HK.09999", "2024-01-01", [10.0, 11.0, 12.0])
+        self.subscriptions = []
+        self.cur_kline_calls = 0
+
+    def subscribe(self, codes, subtypes, subscribe_push=True):
+        self.subscriptions.append(list(codes))
+        return RET_OK, None
+
+    def get_cur_kline(self, code, num, ktype):
+        self.cur_kline_calls += 1
+        if code not in self.frames:
+            return RET_ERROR, "unknown stock"
+        return super().get_cur_kline(code, num, ktype)
+
+
+@pytest.fixture
+def quote_context():
+    return CountingQuoteContext()
+
+
+@pytest.mark.parametrize("strategy_cls, params", PARAMETER_SETS)
+def test_batch_signals_match_single_runs(bar_store, strategy_cls, params):
+    strategy = StrategyPool().get(strategy_cls, params)
+    codes = CODES + ["HK.09999", "HK.00000"]
+    result = strategy.run_batch(codes)
+
+    quote_context = bar_store.info.quote_context
+    assert quote_context.subscriptions == [codes]
+    assert quote_context.cur_kline_calls == len(codes)
+    rows = {row['code']: row for row in result['results']}
+    for code in CODES:
+        single = strategy.run(code)
+        assert rows[code]['signal'] == single['signal']
+        assert rows[code]['error'] is None
+    assert rows["HK.09999"] == {'code': "HK.09999", 'signal': "HOLD", 'close': 12.0, 'order_id': None,
+                                'error': "Not enough bars"}
+    assert rows["HK.00000"]['signal'] == "HOLD" and "unknown stock" in rows["HK.00000"]['error']
+    assert set(result['timing']) == {'fetch_ms', 'evaluate_ms', 'orders_ms', 'total_ms'}
+
+    # Seeded buffers are reused; only the code that failed is requested again
+    strategy.run_batch(codes)
+    assert len(quote_context.subscriptions) == 2 and quote_context.subscriptions[1] == ["HK.00000"]
+
+
+@pytest.mark.parametrize("strategy_cls, params", PARAMETER_SETS)
+def test_signal_matrix_matches_per_series_signals(strategy_cls, params):
+    closes = 100 * np.exp(np.cumsum(np.random.default_rng(5).normal(0, 0.03, (300, 6)), axis=0))
+    strategy = strategy_cls.create(**params)
+    matrix = strategy.generate_signal_matrix(closes)
+    assert np.count_nonzero(matrix) > 0
+    # The generic column-by-column fallback gives the same signals
+    np.testing.assert_array_equal(matrix, StrategyBase.generate_signal_matrix(strategy, closes))
+    np.testing.assert_allclose(rolling_mean(closes, 20)[:, 2], rolling_mean(closes[:, 2], 20))
+    np.testing.assert_allclose(rolling_std(closes, 20)[:, 4], rolling_std(closes[:, 4], 20))
+
+
+def test_place_orders_reports_failures_per_order():
+    strategy = PARAMETER_SETS[0][0]()
+
+    def place_order(code, side, qty, price=None, is_backtest=True):
+        if code == "HK.00002":
+            raise Exception("rejected")
+        return type("Order", (), {'order_id': code})()
+
+    strategy.place_order = place_order
+    intents = [(code, "BUY", 100, None) for code in ("HK.00001", "HK.00002", "HK.00003")]
+    orders = strategy.place_orders(intents, is_backtest=False)
+    assert orders[0].order_id == "HK.00001" and orders[2].order_id == "HK.00003"
+    assert isinstance(orders[1], Exception) and str(orders[1]) == "rejected"
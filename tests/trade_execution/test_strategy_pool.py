@@ -0,0 +1,83 @@
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.strategies.mean_reversion import MeanReversionStrategy
+from trade_execution.strategies.momentum import MomentumStrategy
+from trade_execution.strategies.moving_average import MovingAverageStrategy
+from trade_execution.strategies.pool import StrategyPool
+
+from conftest import CODES, PARAMETER_SETS
+
+
+def test_pool_shares_instances_per_parameter_set():
+    pool = StrategyPool(max_size=2)
+    first = pool.get(MovingAverageStrategy, {'short_window': 5, 'long_window': 20, 'qty': 100})
+    assert pool.get(MovingAverageStrategy, {'long_window': 20, 'short_window': 5}) is first
+    assert pool.get(MovingAverageStrategy, {}).parameters == {'short_window': 20, 'long_window': 50}
+    assert pool.get(MovingAverageStrategy, {'short_window': 5, 'long_window': 30}) is not first
+    # The least recently used parameter set was dropped
+    assert pool.get(MovingAverageStrategy, {'short_window': 5, 'long_window': 20}) is not first
+    assert pool.info()['size'] == 2
+
+    with pytest.raises(TypeError):
+        first.parameters['short_window'] = 10
+    assert pickle.loads(pickle.dumps(first.parameters)) == first.parameters
+    assert first.with_parameters(short_window=5, qty=10) is first
+    assert first.with_parameters(short_window=10).parameters == {'short_window': 10, 'long_window': 20}
+    assert first.parameters == {'short_window': 5, 'long_window': 20}
+    with pytest.raises(ValueError):
+        pool.get(MovingAverageStrategy, {'short_window': 50, 'long_window': 20})
+
+
+def test_concurrent_runs_match_serial_signals(bar_store):
+    jobs = [(code, strategy_cls, params) for code in CODES for strategy_cls, params in PARAMETER_SETS] * 8
+    np.random.default_rng(0).shuffle(jobs)
+
+    expected = {}
+    for code, strategy_cls, params in jobs:
+        key = (code, strategy_cls, tuple(params.items()))
+        if key not in expected:
+            strategy = strategy_cls.create(**params)
+            bars = bar_store.get_bars(code, "K_DAY", 200)
+            signal = strategy.generate_signal(bars)
+            closes = pd.DataFrame({'time_key': bars['time_key'].astype(str), 'close': bars['close']})
+            expected[key] = (signal.value if signal else "HOLD",
+                             strategy.backtest_on_data(closes)['final_equity'])
+
+    pool = StrategyPool()
+    # One shared default instance per class, as in STRATEGY_MAP, plus the pooled ones
+    shared = {MovingAverageStrategy: MovingAverageStrategy(), MeanReversionStrategy: MeanReversionStrategy(),
+              MomentumStrategy: MomentumStrategy()}
+
+    def run(job):
+        code, strategy_cls, params = job
+        strategies = [pool.get(strategy_cls, params), shared[strategy_cls]]
+        results = []
+        for strategy in strategies:
+            result = strategy.run(code, **params)
+            bars = bar_store.get_bars(code, "K_DAY", 200)
+            closes = pd.DataFrame({'time_key': bars['time_key'].astype(str), 'close': bars['close']})
+            final_equity = strategy.with_parameters(**params).backtest_on_data(closes)['final_equity']
+            results.append((result['signal'], final_equity, result['parameters']))
+        return job, results
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outcomes = list(executor.map(run, jobs))
+    finally:
+        sys.setswitchinterval(interval)
+
+    for (code, strategy_cls, params), results in outcomes:
+        for signal, final_equity, parameters in results:
+            assert (signal, final_equity) == expected[(code, strategy_cls, tuple(params.items()))]
+            assert parameters == params
+    # The shared defaults were never reconfigured by the runs
+    assert shared[MovingAverageStrategy].parameters == {'short_window': 20, 'long_window': 50}
+    assert pool.info()['size'] == len(PARAMETER_SETS)
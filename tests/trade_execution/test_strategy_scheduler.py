@@ -0,0 +1,96 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from futu import KLType
+
+from trade_execution.models.Order import OrderSide
+from trade_execution.services.strategy_scheduler import StrategyScheduler
+from trade_execution.strategies.base import SIGNAL_VALUES
+from trade_execution.strategies.mean_reversion import MeanReversionStrategy
+from trade_execution.strategies.moving_average import MovingAverageStrategy
+
+from conftest import kline_frame, make_store
+
+
+def closes(n, seed=0):
+    return 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.02, n)))
+
+
+def moving_average(short_window=5, long_window=20):
+    return MovingAverageStrategy.create(short_window=short_window, long_window=long_window)
+
+
+def push_bars(store, values, start):
+    """Push bars one at a time, each as a live update and then its final close"""
+    for i, value in enumerate(values):
+        day = pd.Timestamp(start) + pd.Timedelta(days=i)
+        store.on_kline(kline_frame("HK.00700", day, [value * 0.99]))
+        store.on_kline(kline_frame("HK.00700", day, [value]))
+
+
+def test_bar_close_signals_match_vectorized_signals():
+    prices = closes(300)
+    store = make_store(100, prices[:60])
+    scheduler = StrategyScheduler(bar_store=store)
+    orders = []
+    strategies = [moving_average(), moving_average(10, 30), MeanReversionStrategy()]
+    for strategy in strategies:
+        instance = scheduler.register(strategy, "HK.00700", KLType.K_DAY)
+        strategy.place_order = lambda code, side, qty, price, is_backtest, id=instance.instance_id: \
+            orders.append((id, side, is_backtest)) or type("Order", (), {'order_id': None})()
+
+    push_bars(store, prices[60:], "2024-03-01")
+    # The last pushed bar is still forming
+    completed = pd.DataFrame({'close': prices[:-1]})
+    for strategy, instance in zip(strategies, scheduler.instances.values()):
+        expected = strategy.generate_signals(completed)[59:]
+        observed = [SIGNAL_VALUES[side] for id, side, _ in orders if id == instance.instance_id]
+        assert observed == [value for value in expected if value]
+        assert instance.evaluations == len(prices) - 60
+        assert instance.to_dict()['stats']['signals'] == len(observed)
+    assert all(is_backtest for _, _, is_backtest in orders)
+    assert scheduler.stats['bars'] == len(prices) - 60
+    assert scheduler.stats['evaluations'] == 3 * (len(prices) - 60)
+
+
+def test_instances_only_see_their_own_bars_and_can_be_removed():
+    store = make_store(100, closes(40))
+    scheduler = StrategyScheduler(bar_store=store)
+    instance = scheduler.register(moving_average(), "HK.00700")
+    store.on_kline(kline_frame("HK.00005", "2024-03-01", [1.0]))
+    assert instance.evaluations == 0
+
+    # The first push closes the last seeded bar, the second closes the first pushed one
+    push_bars(store, [100.0, 101.0], "2024-02-10")
+    assert instance.evaluations == 2
+    assert scheduler.unregister(instance.instance_id)
+    push_bars(store, [102.0], "2024-02-12")
+    assert instance.evaluations == 2 and not scheduler.unregister(instance.instance_id)
+
+    with pytest.raises(ValueError):
+        moving_average(30, 20)
+
+
+def test_evaluation_runs_on_the_attached_loop():
+    store = make_store(100, closes(40))
+    scheduler = StrategyScheduler(bar_store=store)
+    strategy = moving_average()
+    instance = scheduler.register(strategy, "HK.00700")
+    placed = []
+    strategy.place_order = lambda *args, **kwargs: placed.append(args) or type("Order", (), {'order_id': "1"})()
+    # Force a signal on the next bar close
+    strategy.signal_from_features = lambda code, ktype, times, closes: OrderSide.BUY
+
+    async def main():
+        scheduler.attach(asyncio.get_running_loop())
+        await asyncio.get_running_loop().run_in_executor(None, push_bars, store, [100.0, 101.0], "2024-02-10")
+        for _ in range(100):
+            if len(placed) == 2:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert placed == [("HK.00700", OrderSide.BUY, 100, None)] * 2
+    assert instance.last_order_id == "1" and instance.orders == 2
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.strategies.mean_reversion import MeanReversionStrategy
+from trade_execution.strategies.moving_average import MovingAverageStrategy
+
+
+def make_bars(n, seed):
+    rng = np.random.default_rng(seed)
+    closes = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    times = pd.bdate_range("2010-01-01", periods=n)
+    return pd.DataFrame({"time_key": times.strftime("%Y-%m-%d 00:00:00"), "close": closes})
+
+
+STRATEGIES = [
+    (MovingAverageStrategy, {"short_window": 20, "long_window": 50}),
+    (MovingAverageStrategy, {"short_window": 5, "long_window": 30}),
+    (MeanReversionStrategy, {"window": 20, "num_std": 2.0}),
+    (MeanReversionStrategy, {"window": 10, "num_std": 1.5}),
+]
+
+
+@pytest.mark.parametrize("strategy_cls, params", STRATEGIES)
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_vectorized_signals_match_per_bar_paths(strategy_cls, params, seed):
+    strategy = strategy_cls()
+    strategy.setup(**params)
+    data = make_bars(1500, seed)
+
+    vectorized = strategy.generate_signals(data)
+    assert vectorized.shape == (len(data),)
+    assert np.count_nonzero(vectorized) > 0
+    np.testing.assert_array_equal(vectorized, strategy.generate_signals_per_bar(data))
+    np.testing.assert_array_equal(vectorized[:300],
+                                  strategy.generate_signals_per_bar(data.iloc[:300], incremental=False))
+
+
+def legacy_backtest(strategy, data, initial_capital):
+    """The original bar-by-bar StrategyBase.backtest loop"""
+    capital, shares, trades, equity_curve = initial_capital, 0, [], []
+    for i in range(len(data)):
+        date, price = data.iloc[i]["time_key"], data.iloc[i]["close"]
+        lookback = min(i, 50)
+        signal = strategy.generate_signal(data.iloc[i - lookback:i + 1])
+        if signal is not None and signal.value == "BUY" and shares == 0:
+            shares = int(capital * 0.9 / price)
+            capital -= shares * price
+            trades.append((date, "BUY", shares))
+        elif signal is not None and signal.value == "SELL" and shares > 0:
+            capital += shares * price
+            trades.append((date, "SELL", shares))
+            shares = 0
+        equity_curve.append(capital + shares * price)
+    return trades, equity_curve
+
+
+@pytest.mark.parametrize("strategy_cls, params", STRATEGIES)
+def test_backtest_matches_legacy_loop(strategy_cls, params):
+    strategy = strategy_cls()
+    strategy.setup(**params)
+    data = make_bars(400, 5)
+
+    result = strategy.backtest_on_data(data, 100000)
+    trades, equity_curve = legacy_backtest(strategy, data, 100000)
+    assert [(t["date"], t["action"], t["shares"]) for t in result["trades"]] == trades
+    assert [p["equity"] for p in result["equity_curve"]] == pytest.approx(equity_curve)
+
+
+@pytest.mark.parametrize("strategy_cls, params", STRATEGIES)
+def test_backtest_parity(strategy_cls, params):
+    strategy = strategy_cls()
+    strategy.setup(**params)
+    data = make_bars(1000, 11)
+
+    fast = strategy.backtest_on_data(data, 100000)
+    slow = strategy.backtest_on_data(data, 100000, vectorized=False)
+    assert fast["trades"] == slow["trades"]
+    assert fast["final_equity"] == pytest.approx(slow["final_equity"])
+    assert fast["max_drawdown"] == pytest.approx(slow["max_drawdown"])
+    assert [p["equity"] for p in fast["equity_curve"]] == pytest.approx([p["equity"] for p in slow["equity_curve"]])
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_execution.services.metrics import compute_metrics
+from trade_execution.services.simulation import simulate_all_in
+from trade_execution.services.walk_forward import fold_ranges, walk_forward
+
+GRID = {'short_window': [5, 10, 20], 'long_window': [30, 60]}
+
+
+def make_prices(n=1200, seed=21):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.012, n)))
+
+
+def reference_best(prices, start, end):
+    """Brute-force pick of the best train-slice Sharpe with pandas SMAs"""
+    series = pd.Series(prices)
+    best, best_score = None, None
+    for short in GRID['short_window']:
+        for long in GRID['long_window']:
+            first = max(start, long - 1)
+            signal = (series.rolling(short).mean() > series.rolling(long).mean()).astype(float).to_numpy()
+            signal = signal[first:end]
+            changes = np.concatenate(([signal[0]], np.diff(signal)))
+            total = simulate_all_in(prices[first:end], changes, 10000.0)['total']
+            score = compute_metrics(total, changes, 10000.0)['sharpe_ratio']
+            if best_score is None or score > best_score:
+                best, best_score = {'short_window': short, 'long_window': long}, score
+    return best, best_score
+
+
+def test_fold_ranges():
+    assert fold_ranges(100, 40, 25) == [(0, 40, 40, 65), (25, 65, 65, 90), (50, 90, 90, 100)]
+    assert fold_ranges(100, 40, 25, mode='anchored') == [(0, 40, 40, 65), (0, 65, 65, 90), (0, 90, 90, 100)]
+    assert fold_ranges(30, 40, 25) == []
+    with pytest.raises(ValueError):
+        fold_ranges(100, 40, 25, mode='expanding')
+
+
+def test_chooses_best_train_parameters_per_fold():
+    prices = make_prices()
+    result = walk_forward(prices, 'sma_crossover', GRID, train_size=300, test_size=200, max_workers=1)
+    assert len(result['folds']) == 5
+    for fold, (train_start, train_end, _, _) in zip(result['folds'], fold_ranges(len(prices), 300, 200)):
+        best, score = reference_best(prices, train_start, train_end)
+        assert fold['parameters'] == best
+        assert fold['train_score'] == pytest.approx(score, rel=1e-9)
+
+
+def test_stitched_equity_chains_test_slices():
+    prices = make_prices()
+    index = pd.date_range("2015-01-01", periods=len(prices), freq="B")
+    result = walk_forward(prices, 'sma_crossover', GRID, train_size=300, test_size=200,
+                          mode='anchored', max_workers=1, index=index)
+    equity = [point['value'] for point in result['equity_curve']]
+    assert len(equity) == len(prices) - 300
+    assert result['equity_curve'][0]['date'] == index[300].strftime('%Y-%m-%d')
+    assert all(fold['train_start'] == index[0].strftime('%Y-%m-%d') for fold in result['folds'])
+
+    # Each test slice starts from the previous slice's final value
+    capital = 10000.0
+    for fold in result['folds']:
+        assert fold['test_metrics']['initial_value'] == pytest.approx(capital)
+        capital = fold['test_metrics']['final_value']
+    assert result['metrics']['final_value'] == pytest.approx(equity[-1])
+    assert result['metrics']['final_value'] == pytest.approx(capital)
+
+
+def test_parallel_folds_match_in_process():
+    prices = make_prices(n=1600)
+    grid = {'window': [10, 20, 30, 40], 'num_std': [1.0, 1.5, 2.0, 2.5]}
+    serial = walk_forward(prices, 'mean_reversion', grid, train_size=400, test_size=200, max_workers=1)
+    parallel = walk_forward(prices, 'mean_reversion', grid, train_size=400, test_size=200, max_workers=2)
+    assert parallel['workers'] == 2
+    assert parallel['folds'] == serial['folds']
+    assert parallel['equity_curve'] == serial['equity_curve']